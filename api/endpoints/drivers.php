@@ -157,9 +157,22 @@ if ($method === 'GET') {
             echo json_encode(['error' => 'Internal server error']);
         }
         
-    } else {
-        // Get all drivers
+    } elseif (isset($_GET['ids'])) {
+        // Bulk lookup: drivers?ids=1,2,3 with statistics and season results
+        $driverIds = array_values(array_unique(array_filter(
+            array_map('intval', explode(',', $_GET['ids'])),
+            fn($id) => $id > 0
+        )));
+        
+        if (empty($driverIds) || count($driverIds) > 50) {
+            http_response_code(400);
+            echo json_encode(['error' => 'ids must contain between 1 and 50 driver IDs']);
+            exit();
+        }
+        
         try {
+            $placeholders = implode(',', array_fill(0, count($driverIds), '?'));
+            
             $query = "
                 SELECT 
                     d.*,
@@ -169,34 +182,144 @@ if ($method === 'GET') {
                 FROM drivers d
                 LEFT JOIN users u ON d.user_id = u.id
                 LEFT JOIN teams t ON d.team_id = t.id
-                WHERE u.verified = 1
-                ORDER BY u.username ASC
+                WHERE d.id IN ($placeholders) AND u.verified = 1
             ";
             
             $stmt = $conn->prepare($query);
-            $stmt->execute();
+            $stmt->execute($driverIds);
             
-            $drivers = $stmt->fetchAll(PDO::FETCH_ASSOC);
+            $drivers = [];
+            foreach ($stmt->fetchAll(PDO::FETCH_ASSOC) as $driver) {
+                $driver['statistics'] = null;
+                $driver['results'] = [];
+                $drivers[$driver['id']] = $driver;
+            }
             
-            // Add basic statistics for each driver
-            foreach ($drivers as &$driver) {
+            if ($drivers) {
+                // Statistics for all requested drivers in one grouped query
                 $statsQuery = "
                     SELECT 
+                        rr.driver_id,
                         COUNT(*) as races_participated,
                         COUNT(CASE WHEN position = 1 THEN 1 END) as wins,
-                        SUM(points) as total_points
+                        COUNT(CASE WHEN position <= 3 THEN 1 END) as podiums,
+                        COUNT(CASE WHEN pole_position = 1 THEN 1 END) as poles,
+                        COUNT(CASE WHEN fastest_lap = 1 THEN 1 END) as fastest_laps,
+                        COUNT(CASE WHEN dnf = 1 THEN 1 END) as dnfs,
+                        SUM(points) as total_points,
+                        AVG(CASE WHEN position IS NOT NULL THEN position END) as avg_position,
+                        MIN(CASE WHEN position IS NOT NULL THEN position END) as best_position
                     FROM race_results rr
                     LEFT JOIN races r ON rr.race_id = r.id
                     LEFT JOIN seasons s ON r.season_id = s.id
-                    WHERE rr.driver_id = :driver_id AND s.is_active = 1
+                    WHERE rr.driver_id IN ($placeholders) AND s.is_active = 1
+                    GROUP BY rr.driver_id
                 ";
                 
                 $statsStmt = $conn->prepare($statsQuery);
-                $statsStmt->bindParam(':driver_id', $driver['id'], PDO::PARAM_INT);
-                $statsStmt->execute();
+                $statsStmt->execute($driverIds);
                 
-                $stats = $statsStmt->fetch(PDO::FETCH_ASSOC);
-                $driver['statistics'] = $stats;
+                foreach ($statsStmt->fetchAll(PDO::FETCH_ASSOC) as $stats) {
+                    $drivers[$stats['driver_id']]['statistics'] = $stats;
+                }
+                
+                // Season results so head-to-head records can be computed client side
+                $resultsQuery = "
+                    SELECT 
+                        rr.driver_id,
+                        rr.race_id,
+                        rr.position,
+                        rr.points,
+                        rr.dnf
+                    FROM race_results rr
+                    LEFT JOIN races r ON rr.race_id = r.id
+                    LEFT JOIN seasons s ON r.season_id = s.id
+                    WHERE rr.driver_id IN ($placeholders) AND s.is_active = 1
+                    ORDER BY r.race_date ASC
+                ";
+                
+                $resultsStmt = $conn->prepare($resultsQuery);
+                $resultsStmt->execute($driverIds);
+                
+                foreach ($resultsStmt->fetchAll(PDO::FETCH_ASSOC) as $result) {
+                    $drivers[$result['driver_id']]['results'][] = $result;
+                }
+            }
+            
+            echo json_encode(array_values($drivers));
+        } catch (Exception $e) {
+            logError('Error fetching drivers in bulk', ['ids' => $driverIds, 'error' => $e->getMessage()]);
+            http_response_code(500);
+            echo json_encode(['error' => 'Internal server error']);
+        }
+        
+    } else {
+        // Get all drivers; ?fields= narrows the columns (statistics are only
+        // queried when asked for) and ?limit= caps the rows
+        $columns = [
+            'id' => 'd.id',
+            'user_id' => 'd.user_id',
+            'team_id' => 'd.team_id',
+            'driver_number' => 'd.driver_number',
+            'platform' => 'd.platform',
+            'country' => 'd.country',
+            'livery_image' => 'd.livery_image',
+            'bio' => 'd.bio',
+            'created_at' => 'd.created_at',
+            'updated_at' => 'd.updated_at',
+            'username' => 'u.username',
+            'team_name' => 't.name as team_name',
+            'team_logo' => 't.logo as team_logo'
+        ];
+        $fields = requestedFields();
+        validateFields($fields, array_merge(array_keys($columns), ['statistics']));
+        $withStatistics = fieldRequested($fields, 'statistics');
+        $limit = requestedLimit(1000);
+        
+        try {
+            $select = $fields === null
+                ? "d.*, u.username, t.name as team_name, t.logo as team_logo"
+                : projectColumns($columns, $fields, '', $withStatistics ? ['id'] : []);
+            $query = "
+                SELECT 
+                    $select
+                FROM drivers d
+                LEFT JOIN users u ON d.user_id = u.id
+                LEFT JOIN teams t ON d.team_id = t.id
+                WHERE u.verified = 1
+                ORDER BY u.username ASC
+            " . ($limit !== null ? "LIMIT :limit" : "");
+            
+            $stmt = $conn->prepare($query);
+            if ($limit !== null) {
+                $stmt->bindValue(':limit', $limit, PDO::PARAM_INT);
+            }
+            $stmt->execute();
+            
+            $drivers = $stmt->fetchAll(PDO::FETCH_ASSOC);
+            
+            // Add basic statistics for each driver
+            if ($withStatistics) {
+                foreach ($drivers as &$driver) {
+                    $statsQuery = "
+                        SELECT 
+                            COUNT(*) as races_participated,
+                            COUNT(CASE WHEN position = 1 THEN 1 END) as wins,
+                            SUM(points) as total_points
+                        FROM race_results rr
+                        LEFT JOIN races r ON rr.race_id = r.id
+                        LEFT JOIN seasons s ON r.season_id = s.id
+                        WHERE rr.driver_id = :driver_id AND s.is_active = 1
+                    ";
+                    
+                    $statsStmt = $conn->prepare($statsQuery);
+                    $statsStmt->bindParam(':driver_id', $driver['id'], PDO::PARAM_INT);
+                    $statsStmt->execute();
+                    
+                    $stats = $statsStmt->fetch(PDO::FETCH_ASSOC);
+                    $driver['statistics'] = $stats;
+                }
+                unset($driver);
             }
             
             echo json_encode($drivers);
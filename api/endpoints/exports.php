@@ -6,6 +6,191 @@
 
 requirePermission('export');
 
+// Export rows in keyset pages for clients that write their own file:
+// GET exports/rows/{results|standings|penalties}?after_id=&limit=
+// (&season_id=, &race_id=, &severity= for penalties). Each page continues
+// after the last key of the previous one, so deep pages cost the same as
+// the first; rows come in key order (result/penalty ID, standings position).
+if ($method === 'GET' && ($segments[1] ?? '') === 'rows') {
+    $dataType = $segments[2] ?? '';
+    if (!in_array($dataType, ['results', 'standings', 'penalties'])) {
+        http_response_code(400);
+        echo json_encode(['error' => 'Invalid data_type. Must be: results, standings, or penalties']);
+        exit();
+    }
+    
+    $afterId = isset($_GET['after_id']) ? max(0, intval($_GET['after_id'])) : 0;
+    $limit = isset($_GET['limit']) ? min(5000, max(1, intval($_GET['limit']))) : 1000;
+    $seasonId = isset($_GET['season_id']) && is_numeric($_GET['season_id']) ? intval($_GET['season_id']) : null;
+    $raceId = isset($_GET['race_id']) && is_numeric($_GET['race_id']) ? intval($_GET['race_id']) : null;
+    $severity = $_GET['severity'] ?? null;
+    if ($severity !== null && !in_array($severity, ['warning', 'minor', 'major', 'severe'])) {
+        http_response_code(400);
+        echo json_encode(['error' => 'Invalid severity']);
+        exit();
+    }
+    
+    try {
+        $db = new Database();
+        $conn = $db->getConnection();
+        
+        $params = [':after_id' => $afterId];
+        $conditions = '';
+        if ($raceId && $dataType !== 'standings') {
+            $conditions .= ' AND r.id = :race_id';
+            $params[':race_id'] = $raceId;
+        }
+        if ($seasonId && $dataType !== 'standings') {
+            $conditions .= ' AND r.season_id = :season_id';
+            $params[':season_id'] = $seasonId;
+        }
+        
+        switch ($dataType) {
+            case 'results':
+                $key = 'result_id';
+                $query = "
+                    SELECT 
+                        rr.id as result_id,
+                        s.name as season_name,
+                        r.name as race_name,
+                        r.track,
+                        r.race_date,
+                        u.username,
+                        d.driver_number,
+                        t.name as team_name,
+                        rr.position,
+                        rr.points,
+                        rr.fastest_lap,
+                        rr.fastest_lap_time,
+                        rr.pole_position,
+                        rr.dnf,
+                        rr.dnf_reason,
+                        rr.penalties_applied,
+                        rr.created_at as result_recorded_at
+                    FROM race_results rr
+                    JOIN races r ON rr.race_id = r.id
+                    JOIN seasons s ON r.season_id = s.id
+                    JOIN drivers d ON rr.driver_id = d.id
+                    JOIN users u ON d.user_id = u.id
+                    LEFT JOIN teams t ON d.team_id = t.id
+                    WHERE rr.id > :after_id$conditions
+                    ORDER BY rr.id ASC
+                    LIMIT :limit
+                ";
+                break;
+                
+            case 'penalties':
+                $key = 'penalty_id';
+                if ($severity !== null) {
+                    $conditions .= ' AND p.severity = :severity';
+                    $params[':severity'] = $severity;
+                }
+                $query = "
+                    SELECT 
+                        p.id as penalty_id,
+                        s.name as season_name,
+                        r.name as race_name,
+                        r.track,
+                        r.race_date,
+                        u.username,
+                        d.driver_number,
+                        t.name as team_name,
+                        p.incident_description,
+                        p.penalty_type,
+                        p.penalty_value,
+                        p.severity,
+                        p.points_deducted,
+                        p.time_penalty,
+                        p.grid_penalty,
+                        p.steward_notes,
+                        p.incident_lap,
+                        p.incident_time,
+                        p.created_at as penalty_issued_at,
+                        admin_u.username as issued_by
+                    FROM penalties p
+                    JOIN races r ON p.race_id = r.id
+                    JOIN seasons s ON r.season_id = s.id
+                    JOIN drivers d ON p.driver_id = d.id
+                    JOIN users u ON d.user_id = u.id
+                    LEFT JOIN teams t ON d.team_id = t.id
+                    LEFT JOIN users admin_u ON p.issued_by = admin_u.id
+                    WHERE p.id > :after_id$conditions
+                    ORDER BY p.id ASC
+                    LIMIT :limit
+                ";
+                break;
+                
+            case 'standings':
+                // Ranked once per page, then paged by position
+                $key = 'position';
+                if (!$seasonId) {
+                    $stmt = $conn->prepare("SELECT id FROM seasons WHERE is_active = 1 LIMIT 1");
+                    $stmt->execute();
+                    $season = $stmt->fetch(PDO::FETCH_ASSOC);
+                    $seasonId = $season['id'] ?? 1;
+                }
+                $params[':season_id'] = $seasonId;
+                $query = "
+                    SELECT * FROM (
+                        SELECT 
+                            ROW_NUMBER() OVER (
+                                ORDER BY SUM(rr.points) DESC,
+                                    COUNT(CASE WHEN rr.position = 1 THEN 1 END) DESC,
+                                    COUNT(CASE WHEN rr.position <= 3 THEN 1 END) DESC,
+                                    d.id ASC
+                            ) as position,
+                            s.name as season_name,
+                            u.username,
+                            d.driver_number,
+                            t.name as team_name,
+                            SUM(rr.points) as total_points,
+                            COUNT(rr.race_id) as races_participated,
+                            COUNT(CASE WHEN rr.position = 1 THEN 1 END) as wins,
+                            COUNT(CASE WHEN rr.position <= 3 THEN 1 END) as podiums,
+                            COUNT(CASE WHEN rr.pole_position = 1 THEN 1 END) as poles,
+                            COUNT(CASE WHEN rr.fastest_lap = 1 THEN 1 END) as fastest_laps,
+                            COUNT(CASE WHEN rr.dnf = 1 THEN 1 END) as dnfs,
+                            AVG(CASE WHEN rr.position IS NOT NULL THEN rr.position END) as avg_position,
+                            MIN(CASE WHEN rr.position IS NOT NULL THEN rr.position END) as best_position,
+                            MAX(r.race_date) as last_race_date
+                        FROM drivers d
+                        JOIN users u ON d.user_id = u.id
+                        LEFT JOIN teams t ON d.team_id = t.id
+                        JOIN race_results rr ON d.id = rr.driver_id
+                        JOIN races r ON rr.race_id = r.id
+                        JOIN seasons s ON r.season_id = s.id
+                        WHERE s.id = :season_id AND u.verified = 1
+                        GROUP BY d.id, u.username, d.driver_number, t.name, s.name
+                    ) ranked
+                    WHERE position > :after_id
+                    ORDER BY position ASC
+                    LIMIT :limit
+                ";
+                break;
+        }
+        
+        $stmt = $conn->prepare($query);
+        foreach ($params as $name => $value) {
+            $stmt->bindValue($name, $value, is_int($value) ? PDO::PARAM_INT : PDO::PARAM_STR);
+        }
+        $stmt->bindValue(':limit', $limit, PDO::PARAM_INT);
+        $stmt->execute();
+        
+        $rows = $stmt->fetchAll(PDO::FETCH_ASSOC);
+        
+        echo json_encode([
+            'data_type' => $dataType,
+            'rows' => $rows,
+            'next_after_id' => count($rows) === $limit ? intval(end($rows)[$key]) : null
+        ]);
+    } catch (Exception $e) {
+        logError('Export rows failed', ['data_type' => $dataType, 'after_id' => $afterId, 'error' => $e->getMessage()]);
+        http_response_code(500);
+        echo json_encode(['error' => 'Internal server error']);
+    }
+    exit();
+}
+
 try {
     // Load export manager
     require_once '../utils/ExportManager.php';
@@ -0,0 +1,140 @@
+<?php
+/**
+ * Race Control API Endpoint
+ * Long-polled feed of incidents, steward decisions and session status for live sessions
+ */
+
+requirePermission('races');
+
+$db = new Database();
+$conn = $db->getConnection();
+
+// Session statuses during which race control is live
+$liveStatuses = "'active', 'red_flag', 'safety_car'";
+
+if ($method === 'GET') {
+    if (isset($segments[1]) && $segments[1] === 'feed') {
+        // Incidents and decisions after these IDs, for races with a live session
+        $afterIncident = isset($_GET['after_incident']) ? max(0, intval($_GET['after_incident'])) : 0;
+        $afterDecision = isset($_GET['after_decision']) ? max(0, intval($_GET['after_decision'])) : 0;
+        $limit = isset($_GET['limit']) ? min(200, max(1, intval($_GET['limit']))) : 100;
+        
+        // Long poll: hold the request up to `wait` seconds until there is something new.
+        // `sessions` is the sessions_version the client last saw; a change also ends the wait.
+        $wait = isset($_GET['wait']) ? min(25, max(0, intval($_GET['wait']))) : 0;
+        $knownSessions = isset($_GET['sessions']) ? strval($_GET['sessions']) : '';
+        set_time_limit($wait + 30);
+        
+        $sessionStmt = $conn->prepare("
+            SELECT 
+                rcs.id,
+                rcs.race_id,
+                r.name as race_name,
+                r.track,
+                st.name as session_type,
+                rcs.status,
+                rcs.current_lap,
+                rcs.total_laps,
+                rcs.safety_car_active,
+                rcs.red_flag_active,
+                rcs.weather_update
+            FROM race_control_sessions rcs
+            INNER JOIN races r ON rcs.race_id = r.id
+            LEFT JOIN session_types st ON rcs.session_type_id = st.id
+            WHERE rcs.status IN ($liveStatuses)
+            ORDER BY rcs.id ASC
+        ");
+        
+        // Rows are only sent once their second has passed, so a row committed
+        // late within the same second can't fall behind the cursor
+        $incidentStmt = $conn->prepare("
+            SELECT 
+                ri.id,
+                ri.race_id,
+                ri.incident_type,
+                ri.incident_title,
+                ri.incident_lap,
+                ri.incident_turn,
+                ri.drivers_involved,
+                ri.severity,
+                ri.status
+            FROM race_incidents ri
+            WHERE ri.id > :after_id
+            AND ri.created_at < NOW()
+            AND ri.race_id IN (SELECT race_id FROM race_control_sessions WHERE status IN ($liveStatuses))
+            ORDER BY ri.id ASC
+            LIMIT :limit
+        ");
+        
+        $decisionStmt = $conn->prepare("
+            SELECT 
+                sd.id,
+                sd.incident_id,
+                ri.race_id,
+                ri.incident_title,
+                sd.decision_type,
+                sd.decision_summary,
+                sd.penalty_value,
+                sd.penalty_target,
+                sd.is_final
+            FROM steward_decisions sd
+            INNER JOIN race_incidents ri ON sd.incident_id = ri.id
+            WHERE sd.id > :after_id
+            AND sd.decision_date < NOW()
+            AND ri.race_id IN (SELECT race_id FROM race_control_sessions WHERE status IN ($liveStatuses))
+            ORDER BY sd.id ASC
+            LIMIT :limit
+        ");
+        
+        $deadline = time() + $wait;
+        while (true) {
+            $sessionStmt->execute();
+            $sessions = $sessionStmt->fetchAll();
+            $sessionsVersion = sprintf('%08x', crc32(json_encode($sessions)));
+            
+            $incidentStmt->bindValue(':after_id', $afterIncident, PDO::PARAM_INT);
+            $incidentStmt->bindValue(':limit', $limit, PDO::PARAM_INT);
+            $incidentStmt->execute();
+            $incidents = $incidentStmt->fetchAll();
+            
+            $decisionStmt->bindValue(':after_id', $afterDecision, PDO::PARAM_INT);
+            $decisionStmt->bindValue(':limit', $limit, PDO::PARAM_INT);
+            $decisionStmt->execute();
+            $decisions = $decisionStmt->fetchAll();
+            
+            if ($incidents || $decisions || $sessionsVersion !== $knownSessions || time() >= $deadline) {
+                break;
+            }
+            sleep(1);
+        }
+        
+        foreach ($incidents as &$incident) {
+            $incident['drivers_involved'] = json_decode($incident['drivers_involved'] ?? '[]', true) ?? [];
+        }
+        unset($incident);
+        foreach ($decisions as &$decision) {
+            $decision['penalty_target'] = json_decode($decision['penalty_target'] ?? '[]', true) ?? [];
+        }
+        unset($decision);
+        
+        echo json_encode([
+            'server_time' => time(),
+            'sessions' => $sessions,
+            'sessions_version' => $sessionsVersion,
+            'incidents' => $incidents,
+            'decisions' => $decisions,
+            'next_cursor' => [
+                'after_incident' => $incidents ? intval(end($incidents)['id']) : $afterIncident,
+                'after_decision' => $decisions ? intval(end($decisions)['id']) : $afterDecision
+            ],
+            'has_more' => count($incidents) === $limit || count($decisions) === $limit
+        ]);
+    } else {
+        http_response_code(404);
+        echo json_encode(['error' => 'Endpoint not found']);
+    }
+} else {
+    http_response_code(405);
+    echo json_encode(['error' => 'Method not allowed']);
+}
+?>
@@ -51,49 +51,198 @@ if ($method === 'GET') {
         echo json_encode($races);
         
     } elseif (isset($segments[1]) && $segments[1] === 'recent') {
-        // Get recent race results
+        // Get recent race results; ?fields= narrows race and result columns
+        // ('results.position'; results are only queried when asked for) and
+        // ?limit= sets the number of races
+        $raceColumns = [
+            'id' => 'r.id',
+            'season_id' => 'r.season_id',
+            'name' => 'r.name',
+            'track' => 'r.track',
+            'race_date' => 'r.race_date',
+            'format' => 'r.format',
+            'laps' => 'r.laps',
+            'status' => 'r.status',
+            'track_image' => 'r.track_image',
+            'weather_conditions' => 'r.weather_conditions',
+            'description' => 'r.description',
+            'season_name' => 's.name as season_name',
+            'season_year' => 's.year as season_year'
+        ];
+        $resultColumns = [
+            'id' => 'rr.id',
+            'race_id' => 'rr.race_id',
+            'driver_id' => 'rr.driver_id',
+            'position' => 'rr.position',
+            'points' => 'rr.points',
+            'fastest_lap' => 'rr.fastest_lap',
+            'fastest_lap_time' => 'rr.fastest_lap_time',
+            'pole_position' => 'rr.pole_position',
+            'dnf' => 'rr.dnf',
+            'dnf_reason' => 'rr.dnf_reason',
+            'grid_position' => 'rr.grid_position',
+            'status' => 'rr.status',
+            'username' => 'u.username',
+            'driver_number' => 'd.driver_number',
+            'team_name' => 't.name as team_name'
+        ];
+        $fields = requestedFields();
+        validateFields($fields, array_merge(
+            array_keys($raceColumns),
+            ['results'],
+            array_map(fn($name) => "results.$name", array_keys($resultColumns))
+        ));
+        $withResults = fieldRequested($fields, 'results');
+        $limit = requestedLimit(20) ?? 5;
+        
+        $raceSelect = $fields === null
+            ? "r.*, s.name as season_name, s.year as season_year"
+            : projectColumns($raceColumns, $fields, '', $withResults ? ['id'] : []);
         $query = "
             SELECT 
-                r.*,
-                s.name as season_name,
-                s.year as season_year
+                $raceSelect
             FROM races r
             LEFT JOIN seasons s ON r.season_id = s.id
             WHERE r.race_date <= NOW()
             ORDER BY r.race_date DESC
-            LIMIT 5
+            LIMIT :limit
         ";
         
         $stmt = $conn->prepare($query);
+        $stmt->bindValue(':limit', $limit, PDO::PARAM_INT);
         $stmt->execute();
         
         $races = $stmt->fetchAll();
         
-        // Get results for each race
-        foreach ($races as &$race) {
-            $resultsQuery = "
+        if ($withResults) {
+            $resultSelect = $fields === null
+                ? "rr.*, u.username, d.driver_number, t.name as team_name"
+                : projectColumns($resultColumns, $fields, 'results.');
+            $resultsStmt = $conn->prepare("
                 SELECT 
-                    rr.*,
-                    u.username,
-                    d.driver_number,
-                    t.name as team_name
+                    $resultSelect
                 FROM race_results rr
                 LEFT JOIN drivers d ON rr.driver_id = d.id
                 LEFT JOIN users u ON d.user_id = u.id
                 LEFT JOIN teams t ON d.team_id = t.id
                 WHERE rr.race_id = :race_id
                 ORDER BY rr.position ASC
-            ";
-            
-            $resultsStmt = $conn->prepare($resultsQuery);
-            $resultsStmt->bindParam(':race_id', $race['id']);
-            $resultsStmt->execute();
+            ");
             
-            $race['results'] = $resultsStmt->fetchAll();
+            // Get results for each race
+            foreach ($races as &$race) {
+                $resultsStmt->bindParam(':race_id', $race['id']);
+                $resultsStmt->execute();
+                
+                $race['results'] = $resultsStmt->fetchAll();
+            }
+            unset($race);
         }
         
         echo json_encode($races);
         
+    } elseif (isset($segments[1]) && $segments[1] === 'archive') {
+        // All seasons' results in ID order, paged by the last ID seen so
+        // clients can keep an append-only copy in sync
+        $afterId = isset($_GET['after_id']) ? max(0, intval($_GET['after_id'])) : 0;
+        $limit = isset($_GET['limit']) ? min(5000, max(1, intval($_GET['limit']))) : 1000;
+        
+        $query = "
+            SELECT 
+                rr.id,
+                rr.race_id,
+                rr.driver_id,
+                r.season_id,
+                r.race_date,
+                rr.position,
+                rr.points,
+                rr.dnf,
+                rr.pole_position,
+                rr.fastest_lap,
+                u.username
+            FROM race_results rr
+            INNER JOIN races r ON rr.race_id = r.id
+            LEFT JOIN drivers d ON rr.driver_id = d.id
+            LEFT JOIN users u ON d.user_id = u.id
+            WHERE rr.id > :after_id
+            ORDER BY rr.id ASC
+            LIMIT :limit
+        ";
+        
+        $stmt = $conn->prepare($query);
+        $stmt->bindValue(':after_id', $afterId, PDO::PARAM_INT);
+        $stmt->bindValue(':limit', $limit, PDO::PARAM_INT);
+        $stmt->execute();
+        
+        $results = $stmt->fetchAll();
+        
+        echo json_encode([
+            'results' => $results,
+            'next_after_id' => count($results) === $limit ? intval(end($results)['id']) : null
+        ]);
+        
+    } elseif (isset($segments[1]) && $segments[1] === 'results') {
+        // Results added or amended (e.g. by penalties) after a cursor of
+        // (updated_after unix time, after_id), oldest change first. Rows
+        // stamped with the current second are held back until it has passed
+        // so a cursor never skips rows that share its timestamp.
+        $updatedAfter = isset($_GET['updated_after']) ? max(0, intval($_GET['updated_after'])) : 0;
+        $afterId = isset($_GET['after_id']) ? max(0, intval($_GET['after_id'])) : 0;
+        $limit = isset($_GET['limit']) ? min(1000, max(1, intval($_GET['limit']))) : 500;
+        
+        $query = "
+            SELECT 
+                rr.id,
+                rr.race_id,
+                rr.driver_id,
+                rr.position,
+                rr.points,
+                rr.dnf,
+                rr.pole_position,
+                rr.fastest_lap,
+                rr.updated_at > rr.created_at as amended,
+                UNIX_TIMESTAMP(rr.updated_at) as updated_ts,
+                r.name as race_name,
+                r.track,
+                r.format,
+                r.laps,
+                r.race_date,
+                u.username,
+                d.driver_number,
+                t.name as team_name
+            FROM race_results rr
+            INNER JOIN races r ON rr.race_id = r.id
+            LEFT JOIN drivers d ON rr.driver_id = d.id
+            LEFT JOIN users u ON d.user_id = u.id
+            LEFT JOIN teams t ON d.team_id = t.id
+            WHERE (rr.updated_at > FROM_UNIXTIME(:updated_after)
+                   OR (rr.updated_at = FROM_UNIXTIME(:updated_at) AND rr.id > :after_id))
+              AND rr.updated_at < NOW()
+            ORDER BY rr.updated_at ASC, rr.id ASC
+            LIMIT :limit
+        ";
+        
+        $stmt = $conn->prepare($query);
+        $stmt->bindValue(':updated_after', $updatedAfter, PDO::PARAM_INT);
+        $stmt->bindValue(':updated_at', $updatedAfter, PDO::PARAM_INT);
+        $stmt->bindValue(':after_id', $afterId, PDO::PARAM_INT);
+        $stmt->bindValue(':limit', $limit, PDO::PARAM_INT);
+        $stmt->execute();
+        
+        $results = $stmt->fetchAll();
+        
+        if ($results) {
+            $last = end($results);
+            $updatedAfter = intval($last['updated_ts']);
+            $afterId = intval($last['id']);
+        }
+        
+        echo json_encode([
+            'results' => $results,
+            'next_cursor' => ['updated_after' => $updatedAfter, 'after_id' => $afterId],
+            'has_more' => count($results) === $limit
+        ]);
+        
     } elseif (isset($segments[1]) && is_numeric($segments[1])) {
         // Get specific race details
         $raceId = intval($segments[1]);
@@ -187,6 +336,42 @@ if ($method === 'GET') {
         
         $races = $stmt->fetchAll();
         
+        // Optionally embed every result of the season (one query for all races)
+        if (($_GET['include'] ?? '') === 'results') {
+            $resultsQuery = "
+                SELECT 
+                    rr.id,
+                    rr.race_id,
+                    rr.driver_id,
+                    rr.position,
+                    rr.points,
+                    rr.dnf,
+                    rr.fastest_lap,
+                    u.username,
+                    d.driver_number
+                FROM race_results rr
+                INNER JOIN races r ON rr.race_id = r.id
+                LEFT JOIN drivers d ON rr.driver_id = d.id
+                LEFT JOIN users u ON d.user_id = u.id
+                WHERE r.season_id = :season_id
+                ORDER BY rr.race_id ASC, rr.position ASC
+            ";
+            
+            $resultsStmt = $conn->prepare($resultsQuery);
+            $resultsStmt->bindParam(':season_id', $seasonId);
+            $resultsStmt->execute();
+            
+            $resultsByRace = [];
+            foreach ($resultsStmt->fetchAll() as $result) {
+                $resultsByRace[$result['race_id']][] = $result;
+            }
+            
+            foreach ($races as &$race) {
+                $race['results'] = $resultsByRace[$race['id']] ?? [];
+            }
+            unset($race);
+        }
+        
         echo json_encode([
             'season_id' => $seasonId,
             'races' => $races
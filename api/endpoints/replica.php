@@ -0,0 +1,121 @@
+<?php
+/**
+ * Replica API Endpoint
+ * Delta feed of league reference data for client-side read replicas
+ */
+
+requirePermission('drivers');
+requirePermission('teams');
+requirePermission('races');
+
+$db = new Database();
+$conn = $db->getConnection();
+
+if ($method === 'GET') {
+    // Rows changed at or after updated_since (unix time); 0 returns every row.
+    // Clients send the returned server_time back as the next updated_since, so
+    // rows changed within that second are sent twice rather than missed.
+    $updatedSince = isset($_GET['updated_since']) ? max(0, intval($_GET['updated_since'])) : 0;
+    
+    $stmt = $conn->prepare("
+        SELECT 
+            UNIX_TIMESTAMP(NOW()) as server_time,
+            TIMESTAMPDIFF(SECOND, UTC_TIMESTAMP(), NOW()) as utc_offset,
+            (SELECT `value` FROM settings WHERE `key` = 'db_version') as schema_version
+    ");
+    $stmt->execute();
+    $info = $stmt->fetch();
+    
+    $tables = [
+        'seasons' => "
+            SELECT id, name, year, is_active, start_date, end_date
+            FROM seasons
+            WHERE updated_at >= FROM_UNIXTIME(:since)
+        ",
+        'teams' => "
+            SELECT id, name, logo
+            FROM teams
+            WHERE updated_at >= FROM_UNIXTIME(:since)
+        ",
+        'drivers' => "
+            SELECT 
+                d.id,
+                u.username,
+                u.verified,
+                d.team_id,
+                d.driver_number,
+                d.platform,
+                d.country,
+                d.bio,
+                d.livery_image
+            FROM drivers d
+            INNER JOIN users u ON d.user_id = u.id
+            WHERE d.updated_at >= FROM_UNIXTIME(:since) OR u.updated_at >= FROM_UNIXTIME(:since_user)
+        ",
+        'races' => "
+            SELECT id, season_id, name, track, race_date, format, laps, status
+            FROM races
+            WHERE updated_at >= FROM_UNIXTIME(:since)
+        ",
+        // Results of the active season only; statistics are per season
+        'race_results' => "
+            SELECT 
+                rr.id,
+                rr.race_id,
+                rr.driver_id,
+                rr.position,
+                rr.points,
+                rr.pole_position,
+                rr.fastest_lap,
+                rr.dnf
+            FROM race_results rr
+            INNER JOIN races r ON rr.race_id = r.id
+            INNER JOIN seasons s ON r.season_id = s.id
+            WHERE s.is_active = 1 AND rr.updated_at >= FROM_UNIXTIME(:since)
+        "
+    ];
+    
+    // Row counts let clients notice deleted rows and resync
+    $counts = [
+        'seasons' => "SELECT COUNT(*) FROM seasons",
+        'teams' => "SELECT COUNT(*) FROM teams",
+        'drivers' => "SELECT COUNT(*) FROM drivers d INNER JOIN users u ON d.user_id = u.id",
+        'races' => "SELECT COUNT(*) FROM races",
+        'race_results' => "
+            SELECT COUNT(*)
+            FROM race_results rr
+            INNER JOIN races r ON rr.race_id = r.id
+            INNER JOIN seasons s ON r.season_id = s.id
+            WHERE s.is_active = 1
+        "
+    ];
+    
+    $response = [
+        'schema_version' => $info['schema_version'],
+        'server_time' => intval($info['server_time']),
+        // DATETIME columns (race_date etc.) are in the database's local time
+        'utc_offset' => intval($info['utc_offset']),
+        'tables' => [],
+        'counts' => []
+    ];
+    
+    foreach ($tables as $table => $query) {
+        $stmt = $conn->prepare($query);
+        $stmt->bindValue(':since', $updatedSince, PDO::PARAM_INT);
+        if ($table === 'drivers') {
+            $stmt->bindValue(':since_user', $updatedSince, PDO::PARAM_INT);
+        }
+        $stmt->execute();
+        $response['tables'][$table] = $stmt->fetchAll();
+        
+        $countStmt = $conn->prepare($counts[$table]);
+        $countStmt->execute();
+        $response['counts'][$table] = intval($countStmt->fetchColumn());
+    }
+    
+    echo json_encode($response);
+} else {
+    http_response_code(405);
+    echo json_encode(['error' => 'Method not allowed']);
+}
+?>
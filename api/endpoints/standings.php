@@ -126,8 +126,11 @@ if ($method === 'GET') {
         ]);
         
     } else {
-        // Get full championship standings
-        $standings = calculateStandings($seasonId);
+        // Get full championship standings (?fields= and ?limit= are pushed into the query)
+        $fields = requestedFields();
+        validateFields($fields, array_keys(STANDINGS_COLUMNS));
+        $columns = $fields !== null ? projectColumns(STANDINGS_COLUMNS, $fields) : null;
+        $standings = calculateStandings($seasonId, $columns, requestedLimit(100));
         
         // Get season info
         $seasonStmt = $conn->prepare("SELECT name, year FROM seasons WHERE id = :season_id");
@@ -0,0 +1,148 @@
+<?php
+/**
+ * Stewarding API Endpoint
+ * Delta feed of race incidents, penalties and appeals for client-side search indexes
+ */
+
+requirePermission('races');
+
+$db = new Database();
+$conn = $db->getConnection();
+
+// GET stewarding/{incidents|penalties|appeals}?updated_since=&after_id=&limit=
+// Rows changed at or after updated_since (unix time; 0 returns every row), in
+// ID order after after_id. Clients page with next_after_id and keep the
+// server_time of the first page as the next updated_since, so rows changed
+// while they page are sent again on the next sync rather than missed.
+if ($method === 'GET') {
+    $kind = $segments[1] ?? '';
+    
+    $queries = [
+        'incidents' => "
+            SELECT
+                ri.id,
+                ri.race_id,
+                r.name as race_name,
+                r.season_id,
+                ri.incident_type as type,
+                ri.incident_title as title,
+                ri.incident_description as description,
+                ri.incident_lap as lap,
+                ri.incident_turn as turn,
+                ri.drivers_involved as drivers,
+                ri.severity,
+                ri.status,
+                UNIX_TIMESTAMP(ri.updated_at) as changed_at
+            FROM race_incidents ri
+            INNER JOIN races r ON ri.race_id = r.id
+            WHERE ri.updated_at >= FROM_UNIXTIME(:since) AND ri.id > :after_id
+            ORDER BY ri.id ASC
+            LIMIT :limit
+        ",
+        'penalties' => "
+            SELECT
+                p.id,
+                p.race_id,
+                r.name as race_name,
+                r.season_id,
+                p.penalty_type as type,
+                p.penalty_value,
+                p.incident_description as description,
+                p.incident_lap as lap,
+                p.driver_id,
+                p.severity,
+                UNIX_TIMESTAMP(p.updated_at) as changed_at
+            FROM penalties p
+            INNER JOIN races r ON p.race_id = r.id
+            WHERE p.updated_at >= FROM_UNIXTIME(:since) AND p.id > :after_id
+            ORDER BY p.id ASC
+            LIMIT :limit
+        ",
+        'appeals' => "
+            SELECT
+                pa.id,
+                ri.race_id,
+                r.name as race_name,
+                r.season_id,
+                sd.decision_type as type,
+                sd.decision_summary as title,
+                CONCAT_WS('\n\n', pa.appeal_reason, pa.committee_decision, pa.committee_reasoning) as description,
+                ri.incident_lap as lap,
+                ri.incident_turn as turn,
+                pa.appealing_driver_id as driver_id,
+                ri.severity,
+                pa.appeal_status as status,
+                UNIX_TIMESTAMP(pa.updated_at) as changed_at
+            FROM penalty_appeals pa
+            INNER JOIN steward_decisions sd ON pa.decision_id = sd.id
+            INNER JOIN race_incidents ri ON sd.incident_id = ri.id
+            INNER JOIN races r ON ri.race_id = r.id
+            WHERE pa.updated_at >= FROM_UNIXTIME(:since) AND pa.id > :after_id
+            ORDER BY pa.id ASC
+            LIMIT :limit
+        "
+    ];
+    
+    // Row counts let clients notice deleted rows and rebuild
+    $counts = [
+        'incidents' => "SELECT COUNT(*) FROM race_incidents",
+        'penalties' => "SELECT COUNT(*) FROM penalties",
+        'appeals' => "
+            SELECT COUNT(*)
+            FROM penalty_appeals pa
+            INNER JOIN steward_decisions sd ON pa.decision_id = sd.id
+        "
+    ];
+    
+    if (!isset($queries[$kind])) {
+        http_response_code(400);
+        echo json_encode(['error' => 'Invalid kind. Must be: incidents, penalties, or appeals']);
+        exit();
+    }
+    
+    $updatedSince = isset($_GET['updated_since']) ? max(0, intval($_GET['updated_since'])) : 0;
+    $afterId = isset($_GET['after_id']) ? max(0, intval($_GET['after_id'])) : 0;
+    $limit = isset($_GET['limit']) ? min(5000, max(1, intval($_GET['limit']))) : 1000;
+    
+    $stmt = $conn->prepare("
+        SELECT
+            UNIX_TIMESTAMP(NOW()) as server_time,
+            (SELECT `value` FROM settings WHERE `key` = 'db_version') as schema_version
+    ");
+    $stmt->execute();
+    $info = $stmt->fetch();
+    
+    $stmt = $conn->prepare($queries[$kind]);
+    $stmt->bindValue(':since', $updatedSince, PDO::PARAM_INT);
+    $stmt->bindValue(':after_id', $afterId, PDO::PARAM_INT);
+    $stmt->bindValue(':limit', $limit, PDO::PARAM_INT);
+    $stmt->execute();
+    $rows = $stmt->fetchAll();
+    
+    // Every kind lists the drivers it concerns the same way
+    foreach ($rows as &$row) {
+        if ($kind === 'incidents') {
+            $row['drivers'] = array_map('intval', json_decode($row['drivers'] ?? '[]', true) ?? []);
+        } else {
+            $row['drivers'] = [intval($row['driver_id'])];
+            unset($row['driver_id']);
+        }
+    }
+    unset($row);
+    
+    $countStmt = $conn->prepare($counts[$kind]);
+    $countStmt->execute();
+    
+    echo json_encode([
+        'kind' => $kind,
+        'schema_version' => $info['schema_version'],
+        'server_time' => intval($info['server_time']),
+        'rows' => $rows,
+        'next_after_id' => count($rows) === $limit ? intval(end($rows)['id']) : null,
+        'count' => intval($countStmt->fetchColumn())
+    ]);
+} else {
+    http_response_code(405);
+    echo json_encode(['error' => 'Method not allowed']);
+}
+?>
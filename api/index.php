@@ -7,6 +7,8 @@
 require_once '../config/config.php';
 require_once 'middleware/auth.php';
 require_once 'middleware/cors.php';
+require_once 'middleware/projection.php';
+require_once 'middleware/encoding.php';
 
 // Enable CORS for API requests
 handleCORS();
@@ -14,6 +16,9 @@ handleCORS();
 // Set JSON content type
 header('Content-Type: application/json');
 
+// MessagePack and compression when the client asks for them
+negotiateEncoding();
+
 // Parse the request
 $method = $_SERVER['REQUEST_METHOD'];
 $path = parse_url($_SERVER['REQUEST_URI'], PHP_URL_PATH);
@@ -50,6 +55,22 @@ try {
             require_once 'endpoints/stats.php';
             break;
             
+        case 'replica':
+            require_once 'endpoints/replica.php';
+            break;
+            
+        case 'racecontrol':
+            require_once 'endpoints/racecontrol.php';
+            break;
+            
+        case 'exports':
+            require_once 'endpoints/exports.php';
+            break;
+            
+        case 'stewarding':
+            require_once 'endpoints/stewarding.php';
+            break;
+            
         default:
             http_response_code(404);
             echo json_encode(['error' => 'Endpoint not found']);
@@ -0,0 +1,96 @@
+<?php
+/**
+ * Response Encoding Middleware
+ * Negotiates the response format and compression from the request's Accept
+ * and Accept-Encoding headers: MessagePack instead of JSON when the client
+ * accepts application/msgpack (and the msgpack extension is loaded), and
+ * br (brotli extension), gzip or deflate for bodies worth compressing
+ */
+
+// Bodies smaller than this are sent uncompressed
+define('COMPRESSION_MIN_BYTES', 1024);
+
+// Brotli quality: well below the maximum (11), which is too slow per request
+define('BROTLI_QUALITY', 5);
+
+/**
+ * Buffer the response so it is encoded once it is complete
+ */
+function negotiateEncoding() {
+    ob_start('encodeResponse');
+}
+
+/**
+ * Whether request header $header lists $token without q=0
+ */
+function acceptsToken($header, $token) {
+    foreach (explode(',', $_SERVER[$header] ?? '') as $part) {
+        $params = array_map('trim', explode(';', $part));
+        if (strtolower($params[0]) !== $token) {
+            continue;
+        }
+        foreach (array_slice($params, 1) as $param) {
+            if (preg_match('/^q\s*=\s*0(\.0*)?$/i', $param)) {
+                return false;
+            }
+        }
+        return true;
+    }
+    return false;
+}
+
+/**
+ * Value of response header $name already set by the endpoint (null if unset)
+ */
+function responseHeader($name) {
+    foreach (headers_list() as $header) {
+        [$key, $value] = array_pad(explode(':', $header, 2), 2, '');
+        if (strcasecmp(trim($key), $name) === 0) {
+            return trim($value);
+        }
+    }
+    return null;
+}
+
+/**
+ * Output handler: convert and compress the complete response body
+ * Partial flushes, file downloads (Content-Length/Content-Disposition) and
+ * bodies PHP already compresses are sent unchanged.
+ */
+function encodeResponse($buffer, $phase) {
+    $complete = PHP_OUTPUT_HANDLER_START | PHP_OUTPUT_HANDLER_FINAL;
+    if ($buffer === '' || ($phase & $complete) !== $complete || headers_sent()
+        || responseHeader('Content-Length') !== null || responseHeader('Content-Disposition') !== null) {
+        return $buffer;
+    }
+    
+    header('Vary: Accept, Accept-Encoding');
+    
+    $contentType = responseHeader('Content-Type') ?? '';
+    if (stripos($contentType, 'application/json') === 0 && function_exists('msgpack_pack')
+        && acceptsToken('HTTP_ACCEPT', 'application/msgpack')) {
+        $data = json_decode($buffer, true);
+        if (json_last_error() === JSON_ERROR_NONE) {
+            $buffer = msgpack_pack($data);
+            header('Content-Type: application/msgpack');
+        }
+    }
+    
+    if (strlen($buffer) < COMPRESSION_MIN_BYTES || ini_get('zlib.output_compression')) {
+        return $buffer;
+    }
+    if (function_exists('brotli_compress') && acceptsToken('HTTP_ACCEPT_ENCODING', 'br')) {
+        header('Content-Encoding: br');
+        return brotli_compress($buffer, BROTLI_QUALITY);
+    }
+    if (acceptsToken('HTTP_ACCEPT_ENCODING', 'gzip')) {
+        header('Content-Encoding: gzip');
+        return gzencode($buffer, 6);
+    }
+    if (acceptsToken('HTTP_ACCEPT_ENCODING', 'deflate')) {
+        header('Content-Encoding: deflate');
+        return gzcompress($buffer, 6);
+    }
+    return $buffer;
+}
+?>
@@ -0,0 +1,79 @@
+<?php
+/**
+ * Field Projection Middleware
+ * Lets clients ask for only the columns they render (?fields=) and only the
+ * rows they show (?limit=), so the SQL selects and returns nothing else
+ */
+
+/**
+ * Fields requested with ?fields=a,b,nested.c (null when absent: everything)
+ */
+function requestedFields() {
+    if (!isset($_GET['fields']) || trim($_GET['fields']) === '') {
+        return null;
+    }
+    $fields = array_values(array_unique(array_filter(array_map('trim', explode(',', $_GET['fields'])))));
+    return $fields ?: null;
+}
+
+/**
+ * Reject requested fields the endpoint doesn't know with a 400
+ * $known lists plain names; nested names are given as 'results.position'
+ */
+function validateFields($requested, $known) {
+    if ($requested === null) {
+        return;
+    }
+    $unknown = array_diff($requested, $known);
+    if ($unknown) {
+        http_response_code(400);
+        echo json_encode(['error' => 'Unknown fields: ' . implode(', ', $unknown)]);
+        exit();
+    }
+}
+
+/**
+ * Select items for the requested fields
+ * $columns maps field name => SQL select item; $prefix picks nested fields
+ * ('results.'), and a bare nested name ('results') selects all of them.
+ * $required fields are always selected (keys the client and queries rely on).
+ */
+function projectColumns($columns, $requested, $prefix = '', $required = []) {
+    if ($requested === null || ($prefix !== '' && in_array(rtrim($prefix, '.'), $requested))) {
+        return implode(",\n                ", $columns);
+    }
+    
+    $selected = [];
+    foreach ($columns as $name => $item) {
+        if (in_array($prefix . $name, $requested) || in_array($name, $required)) {
+            $selected[] = $item;
+        }
+    }
+    return implode(",\n                ", $selected);
+}
+
+/**
+ * Whether a nested or computed field (e.g. 'statistics', 'results') is wanted
+ */
+function fieldRequested($requested, $name) {
+    if ($requested === null) {
+        return true;
+    }
+    foreach ($requested as $field) {
+        if ($field === $name || str_starts_with($field, $name . '.')) {
+            return true;
+        }
+    }
+    return false;
+}
+
+/**
+ * Row limit from ?limit= (null when absent), capped at $max
+ */
+function requestedLimit($max) {
+    if (!isset($_GET['limit'])) {
+        return null;
+    }
+    return min($max, max(1, intval($_GET['limit'])));
+}
+?>
@@ -0,0 +1,95 @@
+"""
+Query latency for the memory-mapped all-time archive
+
+Builds a synthetic archive (seasons x races x drivers results) in a
+temporary directory through ResultsArchive.append, then times every
+/alltime category and reports the heap allocated while querying.
+
+Usage: python benchmarks/archive_query.py [seasons] [races_per_season] [drivers]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.archive import CATEGORIES, ResultsArchive  # noqa: E402
+
+
+def build_rows(seasons: int, races: int, drivers: int):
+    rng = random.Random(42)
+    points_table = (25, 18, 15, 12, 10, 8, 6, 4, 2, 1)
+    result_id = 0
+    race_id = 0
+    for season in range(1, seasons + 1):
+        # A changing grid: most drivers stay, some are replaced each season
+        grid = rng.sample(range(1, drivers * 3), drivers)
+        for race in range(races):
+            race_id += 1
+            order = sorted(grid, key=lambda d: d % 97 + rng.gauss(0, 30))
+            for position, driver_id in enumerate(order, 1):
+                result_id += 1
+                dnf = rng.random() < 0.07
+                yield {
+                    'id': result_id,
+                    'race_id': race_id,
+                    'driver_id': driver_id,
+                    'season_id': season,
+                    'race_date': f"{2000 + season}-{1 + race * 12 // races:02d}-{1 + race % 28:02d} 19:00:00",
+                    'position': None if dnf else position,
+                    'points': 0 if dnf or position > 10 else points_table[position - 1],
+                    'dnf': int(dnf),
+                    'pole_position': int(rng.random() < 1 / drivers),
+                    'fastest_lap': int(rng.random() < 1 / drivers),
+                    'username': f"Driver {driver_id}",
+                }
+
+
+def main():
+    seasons = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    races = int(sys.argv[2]) if len(sys.argv) > 2 else 22
+    drivers = int(sys.argv[3]) if len(sys.argv) > 3 else 40
+
+    with tempfile.TemporaryDirectory() as path:
+        archive = ResultsArchive(path)
+
+        start = time.perf_counter()
+        page = []
+        for row in build_rows(seasons, races, drivers):
+            page.append(row)
+            if len(page) == 2000:
+                archive.append(page)
+                page = []
+        archive.append(page)
+        build_time = time.perf_counter() - start
+
+        on_disk = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        print(f"{seasons} seasons x {races} races x {drivers} drivers = {archive.rows:,} results")
+        print(f"  built in {build_time:.2f}s, {on_disk / 1024:.0f} KiB on disk")
+
+        # Reopen so queries start from the files, as after a restart
+        archive = ResultsArchive(path)
+        for category in CATEGORIES:
+            timings = []
+            for _ in range(20):
+                begin = time.perf_counter()
+                records, summary = archive.leaderboard(category, 10)
+                timings.append(time.perf_counter() - begin)
+
+            tracemalloc.start()
+            archive.leaderboard(category, 10)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(f"  {category:<14} median {statistics.median(timings) * 1000:7.2f} ms  "
+                  f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:7.2f} ms  "
+                  f"peak heap {peak / 1024:7.0f} KiB  leader: {records[0][0]} ({records[0][1]:g})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Burst of identical commands in one channel: with and without deduplication
+
+Right after a race several people run /lastrace (and /standings) within
+seconds of each other. This drives such bursts through the real cogs
+against a stub bot whose API answers after a simulated upstream latency
+and is cached like api_request (so callers that arrive before the first
+response is cached each make their own request). Callers arrive spread
+over a few seconds, some while the first answer is still being built,
+the rest after it was posted. A second channel running the same command
+at the same time checks that answers aren't shared across channels.
+
+For each mode it prints the upstream requests, public messages posted,
+ephemeral replies and Discord calls, and the p50/max reply latency.
+
+Usage: python benchmarks/burst_dedupe.py [callers] [spread_seconds] [api_latency_ms]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from commands.races import RacesCog  # noqa: E402
+from commands.standings import StandingsCog  # noqa: E402
+from utils.cache import TTLCache  # noqa: E402
+from utils.dedupe import POINTER, REUSE, ResponseDeduper  # noqa: E402
+from utils.models import parse_payload  # noqa: E402
+
+RESULTS = [{'id': i, 'race_id': 6, 'driver_id': i, 'position': i, 'points': max(0, 26 - 2 * i),
+            'username': f"Driver {i}", 'driver_number': i, 'team_name': 'Apex'} for i in range(1, 21)]
+ROWS = [{'id': i, 'username': f"Driver {i}", 'driver_number': i, 'total_points': 300 - 10 * i, 'wins': 5 - i // 4}
+        for i in range(1, 21)]
+
+PAYLOADS = {
+    'races/recent': [{'id': 6, 'name': 'Spa GP', 'track': 'Spa', 'race_date': '2030-08-01 18:00:00',
+                      'format': 'Feature', 'laps': 30, 'results': RESULTS}],
+    'standings': {'season': {'name': 'Season 3', 'year': 2030}, 'standings': ROWS},
+}
+
+
+class StubBot:
+    def __init__(self, latency: float, dedupe: bool, overrides: str = ''):
+        self.latency = latency
+        self.api_calls = 0
+        self.api_cache = TTLCache(default_ttl=60)
+        self.embed_cache = TTLCache(default_ttl=60)
+        self.trace = None
+        self.dedupe = ResponseDeduper(overrides) if dedupe else None
+
+    async def api_request(self, endpoint, **kwargs):
+        cached = self.api_cache.get(endpoint)
+        if cached is not None:
+            return cached
+        self.api_calls += 1
+        await asyncio.sleep(self.latency)
+        data = parse_payload(endpoint, PAYLOADS[endpoint])
+        self.api_cache.set(endpoint, data)
+        return data
+
+
+class FakeInteraction:
+    """Counts Discord calls; the first public reply gets a message link"""
+
+    def __init__(self, counter: dict, channel_id: int, name: str):
+        counter_ref = counter
+        interaction = self
+        self.counter = counter
+        self.channel_id = channel_id
+        self.command = SimpleNamespace(qualified_name=name)
+        self.ephemeral = False
+
+        class Response:
+            async def defer(self, ephemeral=False):
+                counter_ref['discord_calls'] += 1
+                interaction.ephemeral = ephemeral
+
+            async def send_message(self, ephemeral=False, **kwargs):
+                counter_ref['discord_calls'] += 1
+                interaction.ephemeral = ephemeral
+
+        class Followup:
+            async def send(self, ephemeral=False, **kwargs):
+                counter_ref['discord_calls'] += 1
+
+        self.response = Response()
+        self.followup = Followup()
+
+    async def original_response(self):
+        self.counter['discord_calls'] += 1
+        return SimpleNamespace(jump_url=f"https://discord.com/channels/1/{self.channel_id}/{id(self)}")
+
+
+async def caller(command, interaction: FakeInteraction, delay: float, latencies: list, kwargs: dict):
+    await asyncio.sleep(delay)
+    start = time.perf_counter()
+    await command.callback(command.binding, interaction, **kwargs)
+    latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run_burst(callers: int, spread: float, latency: float, dedupe: bool, overrides: str = ''):
+    bot = StubBot(latency, dedupe, overrides)
+    races, standings = RacesCog(bot), StandingsCog(bot)
+    bursts = (
+        (races.last_race, 'lastrace', {}),
+        (standings.standings, 'standings', {'limit': 10, 'chart': False}),
+    )
+
+    counter = {'discord_calls': 0}
+    latencies = []
+    interactions = []
+    jobs = []
+    for command, name, kwargs in bursts:
+        for channel_id in (111, 222):
+            # The other channel only sees two callers
+            count = callers if channel_id == 111 else 2
+            for i in range(count):
+                interaction = FakeInteraction(counter, channel_id, name)
+                interactions.append(interaction)
+                jobs.append(caller(command, interaction, spread * i / max(1, count - 1), latencies, kwargs))
+
+    await asyncio.gather(*jobs)
+    public = sum(not interaction.ephemeral for interaction in interactions)
+    return {
+        'commands': len(interactions),
+        'api_calls': bot.api_calls,
+        'public': public,
+        'ephemeral': len(interactions) - public,
+        'discord_calls': counter['discord_calls'],
+        'p50_ms': statistics.median(latencies),
+        'max_ms': max(latencies),
+        'stats': bot.dedupe.stats if bot.dedupe else None,
+    }
+
+
+def main():
+    callers = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    spread = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 600) / 1000
+
+    print(f"{callers} identical /lastrace and /standings calls in one channel over {spread:.0f}s "
+          f"(+2 each in a second channel), API latency {latency * 1000:.0f}ms")
+    modes = (
+        ('no dedupe', False, ''),
+        (f'dedupe ({POINTER})', True, ''),
+        (f'dedupe ({REUSE})', True, 'lastrace=reuse,standings=reuse'),
+    )
+    failed = False
+    baseline_calls = None
+    for label, dedupe, overrides in modes:
+        result = asyncio.run(run_burst(callers, spread, latency, dedupe, overrides))
+        print(f"  {label:<17} {result['commands']} commands: {result['api_calls']} upstream requests, "
+              f"{result['public']} public messages, {result['ephemeral']} ephemeral, "
+              f"{result['discord_calls']} Discord calls, p50 {result['p50_ms']:.0f}ms, max {result['max_ms']:.0f}ms")
+        if result['stats']:
+            print(f"  {'':<17} {result['stats']}")
+        if not dedupe:
+            baseline_calls = result['api_calls']
+        else:
+            # One public answer per command and channel, and never more upstream work
+            failed |= result['public'] != 4 or result['api_calls'] > baseline_calls
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Side-by-side read latency: PHP API vs direct database (DATA_SOURCE=sql)
+
+Needs a local MariaDB with the schema from database_setup.sql, the API
+serving the same database (``docker compose up db web`` starts both: the
+database on 127.0.0.1:3306 and the API on http://localhost:8080/api), a
+valid GRIDKING_API_KEY and aiomysql. The database is taken from DB_HOST,
+DB_PORT, DB_NAME, DB_USER and DB_PASS (the compose defaults if unset).
+
+With ``--seed`` a synthetic league is written first: teams, verified
+drivers and seasons of races with every result. Its rows are named
+``bench_*``/``Bench ...`` and replace those of a previous run, and its last
+season becomes the active one (so only run it against a development
+database).
+
+Each hot read route is requested through the real
+``GridKingBot.api_request`` with the projections the cogs use, once
+through the API and once through the SQL source: one at a time for p50/p95
+latency, then with ``concurrency`` requests in flight for throughput. Both
+answers are parsed into models and compared.
+
+Usage: python benchmarks/datasource_compare.py [requests] [concurrency] [--seed [drivers] [seasons] [races]]
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import aiohttp
+import aiomysql
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bot import GridKingBot  # noqa: E402
+from commands.races import RacesCog  # noqa: E402
+from commands.standings import StandingsCog  # noqa: E402
+from commands.stats import StatsCog  # noqa: E402
+from utils.datasource import HttpSource, SqlSource  # noqa: E402
+from utils.notifier import RateBucket  # noqa: E402
+from utils.scheduler import INTERACTIVE, RequestScheduler  # noqa: E402
+
+POINTS = (25, 18, 15, 12, 10, 8, 6, 4, 2, 1)
+
+DATABASE = {
+    'host': os.getenv('DB_HOST', '127.0.0.1'),
+    'port': int(os.getenv('DB_PORT', '3306')),
+    'database': os.getenv('DB_NAME', 'racing_league'),
+    'user': os.getenv('DB_USER', 'racing_user'),
+    'password': os.getenv('DB_PASS', 'racing_pass123'),
+}
+
+
+async def seed(conn, drivers: int, seasons: int, races: int):
+    """Replace the previous synthetic league with a new one"""
+    rng = random.Random(7)
+    async with conn.cursor() as cursor:
+        # Drivers and their results cascade from users, races from seasons
+        await cursor.execute(r"DELETE FROM users WHERE username LIKE 'bench\_%'")
+        await cursor.execute("DELETE FROM seasons WHERE name LIKE 'Bench Season %'")
+        await cursor.execute("DELETE FROM teams WHERE name LIKE 'Bench Team %'")
+        await cursor.execute("UPDATE seasons SET is_active = 0")
+
+        await cursor.executemany("INSERT INTO teams (name) VALUES (%s)",
+                                 [(f"Bench Team {i}",) for i in range(1, drivers // 2 + 2)])
+        await cursor.execute("SELECT id FROM teams WHERE name LIKE 'Bench Team %' ORDER BY id")
+        team_ids = [row[0] for row in await cursor.fetchall()]
+
+        await cursor.executemany(
+            "INSERT INTO users (username, email, password_hash, role, verified) VALUES (%s, %s, 'x', 'driver', 1)",
+            [(f"bench_driver_{i}", f"bench_driver_{i}@example.com") for i in range(1, drivers + 1)]
+        )
+        await cursor.execute(r"SELECT id FROM users WHERE username LIKE 'bench\_%' ORDER BY id")
+        user_ids = [row[0] for row in await cursor.fetchall()]
+        await cursor.executemany(
+            "INSERT INTO drivers (user_id, team_id, driver_number, platform, country, bio) "
+            "VALUES (%s, %s, %s, 'PC', 'GBR', %s)",
+            [(user_id, team_ids[i // 2], 1000 + i, "Synthetic benchmark driver. " * 10)
+             for i, user_id in enumerate(user_ids)]
+        )
+        await cursor.execute(
+            r"SELECT d.id FROM drivers d JOIN users u ON u.id = d.user_id WHERE u.username LIKE 'bench\_%'"
+        )
+        driver_ids = [row[0] for row in await cursor.fetchall()]
+
+        results = 0
+        for s in range(seasons):
+            active = s == seasons - 1
+            await cursor.execute("INSERT INTO seasons (name, year, is_active) VALUES (%s, %s, %s)",
+                                 (f"Bench Season {s + 1}", 2030 - seasons + s + 1, active))
+            season_id = cursor.lastrowid
+            for r in range(races):
+                # The active season is half run; earlier ones are complete
+                weeks_ago = races // 2 - r if active else (seasons - s) * 52 - r
+                await cursor.execute(
+                    "INSERT INTO races (season_id, name, track, race_date, format, laps, status, description) "
+                    "VALUES (%s, %s, 'Monza', NOW() - INTERVAL %s WEEK, 'Feature', 30, %s, %s)",
+                    (season_id, f"Bench Round {r + 1}", weeks_ago, 'completed' if weeks_ago > 0 else 'scheduled',
+                     "Full race distance, mandatory pit stop. " * 4)
+                )
+                race_id = cursor.lastrowid
+                if weeks_ago <= 0:
+                    continue
+                order = rng.sample(driver_ids, len(driver_ids))
+                fastest = rng.randrange(len(order))
+                rows = [(race_id, driver_id, position, POINTS[position - 1] if position <= len(POINTS) else 0,
+                         index == fastest, position == 1, rng.random() < 0.05, position)
+                        for index, (position, driver_id) in enumerate(enumerate(order, 1))]
+                await cursor.executemany(
+                    "INSERT INTO race_results (race_id, driver_id, position, points, fastest_lap, pole_position, "
+                    "dnf, grid_position) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)", rows
+                )
+                results += len(rows)
+    print(f"Seeded {drivers} drivers, {seasons} seasons x {races} races, {results} results")
+
+
+async def sample_ids(conn):
+    """A verified driver and the latest race with results, for the lookup routes"""
+    async with conn.cursor() as cursor:
+        await cursor.execute(
+            "SELECT d.id, u.username FROM drivers d JOIN users u ON u.id = d.user_id "
+            "WHERE u.verified = 1 ORDER BY d.id LIMIT 1"
+        )
+        driver_id, username = await cursor.fetchone()
+        await cursor.execute(
+            "SELECT r.id FROM races r WHERE r.race_date <= NOW() "
+            "AND EXISTS (SELECT 1 FROM race_results rr WHERE rr.race_id = r.id) "
+            "ORDER BY r.race_date DESC LIMIT 1"
+        )
+        race_id, = await cursor.fetchone()
+    return driver_id, username, race_id
+
+
+class Client:
+    """Just what GridKingBot.api_request needs: one tenant with the given source"""
+
+    def __init__(self, session: aiohttp.ClientSession, concurrency: int, sql: bool):
+        self.tenant = SimpleNamespace(
+            name='sql' if sql else 'http', session=session, api_key=os.getenv('GRIDKING_API_KEY', ''),
+            api_base_url=os.getenv('GRIDKING_API_URL', 'http://localhost:8080/api').rstrip('/'),
+            scheduler=RequestScheduler(max_concurrency=concurrency, limits={INTERACTIVE: concurrency}),
+            budget=RateBucket(10 ** 6, 60.0), api_cache=None,
+        )
+        http = HttpSource(self.tenant)
+        self.tenant.source = SqlSource(http, connections=concurrency, **DATABASE) if sql else http
+        self.trace = None
+
+    async def get(self, endpoint: str, fields, limit):
+        return await GridKingBot.api_request(self, endpoint, use_cache=False, fields=fields, limit=limit)
+
+
+async def latency(client: Client, case, requests: int):
+    _, endpoint, fields, limit = case
+    timings = []
+    data = None
+    for _ in range(requests):
+        start = time.perf_counter()
+        data = await client.get(endpoint, fields, limit)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert data is not None, f"no data for {endpoint} from {client.tenant.name}"
+    timings.sort()
+    return data, statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+async def throughput(client: Client, case, requests: int, concurrency: int) -> float:
+    _, endpoint, fields, limit = case
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            await client.get(endpoint, fields, limit)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+    seeding = '--seed' in sys.argv
+    args = sys.argv[1:sys.argv.index('--seed')] if seeding else sys.argv[1:]
+    requests = int(args[0]) if args else 200
+    concurrency = int(args[1]) if len(args) > 1 else 8
+    if seeding:
+        seed_args = [int(value) for value in sys.argv[sys.argv.index('--seed') + 1:]]
+        drivers, seasons, races = seed_args + [40, 3, 12][len(seed_args):]
+    if not os.getenv('GRIDKING_API_KEY'):
+        sys.exit("Set GRIDKING_API_KEY (and GRIDKING_API_URL) for the API serving this database")
+
+    conn = await aiomysql.connect(host=DATABASE['host'], port=DATABASE['port'], db=DATABASE['database'],
+                                  user=DATABASE['user'], password=DATABASE['password'], autocommit=True)
+    try:
+        if seeding:
+            await seed(conn, drivers, seasons, races)
+        driver_id, username, race_id = await sample_ids(conn)
+    finally:
+        conn.close()
+
+    cases = (
+        ('/standings', 'standings', StandingsCog.STANDINGS_FIELDS, 10),
+        ('/leaderboard', 'standings', StatsCog.LEADERBOARD_FIELDS, 10),
+        ('/lastrace', 'races/recent', RacesCog.LAST_RACE_FIELDS, 1),
+        ('/raceresults', f'races/{race_id}', None, None),
+        ('/driver', f'drivers/{driver_id}', None, None),
+        ('driver search', f'drivers/search?q={username[:6]}', None, None),
+    )
+
+    async with aiohttp.ClientSession(headers={'Authorization': f"Bearer {os.getenv('GRIDKING_API_KEY')}"}) as session:
+        http, sql = Client(session, concurrency, sql=False), Client(session, concurrency, sql=True)
+        print(f"{requests} requests per case, {concurrency} in flight for throughput")
+        print(f"{'command':<14} {'api p50':>9} {'sql p50':>9} {'api p95':>9} {'sql p95':>9} "
+              f"{'api req/s':>10} {'sql req/s':>10}  same models")
+        for case in cases:
+            http_data, http_p50, http_p95 = await latency(http, case, requests)
+            sql_data, sql_p50, sql_p95 = await latency(sql, case, requests)
+            http_rate = await throughput(http, case, requests, concurrency)
+            sql_rate = await throughput(sql, case, requests, concurrency)
+            print(f"{case[0]:<14} {http_p50:>7.2f}ms {sql_p50:>7.2f}ms {http_p95:>7.2f}ms {sql_p95:>7.2f}ms "
+                  f"{http_rate:>10.0f} {sql_rate:>10.0f}  {'yes' if http_data == sql_data else 'NO'}")
+
+        source = sql.tenant.source.snapshot()
+        print(f"SQL source: {source['queries']} queries, avg {source['avg_ms']:.2f} ms, "
+              f"{source['fallbacks']} answered by the API instead")
+        await sql.tenant.source.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
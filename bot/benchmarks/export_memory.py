@@ -0,0 +1,167 @@
+"""
+Memory profile of /export: streamed pages vs building the file in memory
+
+Starts a local stub API serving ``exports/rows/results`` with synthetic
+rows and ``after_id`` paging, then exports increasing row counts through
+the real ``GridKingBot.api_request`` and ``stream_export``, as CSV, gzipped
+CSV and JSON. For each run it prints the peak Python allocation (tracemalloc)
+and the resulting file size, next to the naive approach of collecting every
+row and serializing the whole file at once. The streamed peak should stay
+flat as the row count grows; the naive one grows with it. Each streamed file
+is read back to check it holds every row.
+
+Usage: python benchmarks/export_memory.py [max_rows] [page_size]
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bot import GridKingBot  # noqa: E402
+from utils.datasource import HttpSource  # noqa: E402
+from utils.exports import stream_export  # noqa: E402
+from utils.notifier import RateBucket  # noqa: E402
+from utils.scheduler import RequestScheduler  # noqa: E402
+
+
+def make_row(row_id: int) -> dict:
+    return {
+        'result_id': row_id,
+        'season_name': "Season 2030",
+        'race_name': f"Round {row_id // 20 + 1}",
+        'track': "Monza",
+        'race_date': "2030-05-04 18:00:00",
+        'username': f"driver_{row_id % 40}",
+        'driver_number': row_id % 99 + 1,
+        'team_name': f"Team {row_id % 20}",
+        'position': row_id % 20 + 1,
+        'points': max(0, 25 - row_id % 20 * 2),
+        'fastest_lap': row_id % 20 == 3,
+        'fastest_lap_time': "1:21.345",
+        'pole_position': row_id % 20 == 0,
+        'dnf': False,
+        'dnf_reason': None,
+        'penalties_applied': 0,
+        'result_recorded_at': "2030-05-04 20:00:00",
+    }
+
+
+def make_app(total: dict) -> web.Application:
+    async def rows(request: web.Request) -> web.Response:
+        after_id = int(request.query.get('after_id', 0))
+        limit = min(5000, int(request.query.get('limit', 1000)))
+        page = [make_row(i) for i in range(after_id + 1, min(after_id + limit, total['rows']) + 1)]
+        return web.json_response({
+            'data_type': request.match_info['data_type'],
+            'rows': page,
+            'next_after_id': page[-1]['result_id'] if len(page) == limit else None,
+        })
+
+    app = web.Application()
+    app.router.add_get('/api/exports/rows/{data_type}', rows)
+    return app
+
+
+class Client:
+    """Just what GridKingBot.api_request needs: one tenant talking to the stub"""
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str):
+        self.tenant = SimpleNamespace(
+            name='bench', session=session, api_key='x' * 32, api_base_url=base_url,
+            scheduler=RequestScheduler(), budget=RateBucket(10 ** 6, 60.0), api_cache=None,
+        )
+        self.tenant.source = HttpSource(self.tenant)
+        self.trace = None
+
+    async def api_request(self, endpoint: str, **kwargs):
+        return await GridKingBot.api_request(self, endpoint, **kwargs)
+
+
+async def naive_export(client: Client, page_size: int, compress: bool) -> int:
+    """Collect every row, then serialize the whole file in one go"""
+    rows, after_id = [], 0
+    while after_id is not None:
+        page = await client.api_request(f"exports/rows/results?after_id={after_id}&limit={page_size}",
+                                        use_cache=False)
+        rows.extend(page['rows'])
+        after_id = page['next_after_id']
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    data = text.getvalue().encode('utf-8')
+    return len(gzip.compress(data) if compress else data)
+
+
+def count_rows(spool, fmt: str, compress: bool) -> int:
+    raw = gzip.GzipFile(fileobj=spool, mode='rb') if compress else spool
+    text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+    if fmt == 'json':
+        return len(json.load(text))
+    return sum(1 for _ in csv.reader(text)) - 1
+
+
+async def measure(coro):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = await coro
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, seconds
+
+
+async def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    sizes = sorted({max(page_size, max_rows // 20), max_rows // 4, max_rows // 2, max_rows})
+
+    total = {'rows': 0}
+    runner = web.AppRunner(make_app(total))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    failed = 0
+    async with aiohttp.ClientSession() as session:
+        client = Client(session, f"http://127.0.0.1:{port}/api")
+        print(f"Page size {page_size}; peak traced memory (includes the stub server's current page)")
+        print(f"{'rows':>8} {'format':<8} {'streamed peak':>14} {'naive peak':>11} {'file size':>10} {'time':>7}  rows ok")
+        for rows in sizes:
+            total['rows'] = rows
+            for fmt, compress in (('csv', False), ('csv', True), ('json', False)):
+                (spool, exported, size), peak, seconds = await measure(
+                    stream_export(client.api_request, 'results', fmt, compress, page_size=page_size)
+                )
+                ok = exported == rows and count_rows(spool, fmt, compress) == rows
+                spool.close()
+                failed += not ok
+
+                naive = ''
+                if fmt == 'csv':
+                    _, naive_peak, _ = await measure(naive_export(client, page_size, compress))
+                    naive = f"{naive_peak / 2 ** 20:.1f} MiB"
+                label = fmt + ('.gz' if compress else '')
+                print(f"{rows:>8} {label:<8} {peak / 2 ** 20:>10.1f} MiB {naive:>11} "
+                      f"{size / 2 ** 20:>6.1f} MiB {seconds:>6.1f}s  {'yes' if ok else 'NO'}")
+
+    await runner.cleanup()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,285 @@
+"""
+Stewarding search latency: local inverted index vs LIKE scans
+
+Starts a local stub of the ``stewarding/<kind>`` feed serving synthetic
+incidents, penalties and appeals (50,000 records by default, spread over
+ten seasons), builds an ``IncidentIndex`` from it through the real
+``GridKingBot.api_request``, then:
+- applies a delta (edited and new records, one deleted penalty) and times
+  the incremental sync
+- runs a mix of /incidents searches (keywords, prefixes, quoted words,
+  driver, race and lap filters) against the index, and the same searches as
+  ``LIKE '%...%'`` scans with GROUP BY facets over a plain table holding
+  the same rows (what a per-query database search costs)
+- checks that single-word searches find exactly the records containing the
+  word, and that the delta is reflected
+
+Exits non-zero if a check fails or the index's p95 exceeds --max-p95 ms.
+
+Usage: python benchmarks/incident_search.py [--records N] [--max-p95 MS]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bot import GridKingBot  # noqa: E402
+from utils.datasource import HttpSource  # noqa: E402
+from utils.incidents import IncidentIndex, doc_id  # noqa: E402
+from utils.notifier import RateBucket  # noqa: E402
+from utils.scheduler import RequestScheduler  # noqa: E402
+
+TRACKS = ('Monza', 'Spa', 'Silverstone', 'Suzuka', 'Interlagos', 'Imola', 'Zandvoort', 'Baku', 'Monaco', 'Austin')
+TURNS = ('1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12', 'Eau Rouge', 'Parabolica', 'Copse',
+         'Tamburello', 'Hairpin', 'Chicane')
+INCIDENT_TYPES = ('collision', 'track_limits', 'unsafe_driving', 'blocking', 'false_start', 'technical', 'other')
+SEVERITIES = ('minor', 'major', 'severe', 'dangerous')
+STATUSES = ('reported', 'investigating', 'under_review', 'penalty_issued', 'no_action', 'dismissed')
+PENALTY_TYPES = ('time', 'grid', 'points', 'warning', 'dsq')
+DECISION_TYPES = ('warning', 'time_penalty', 'grid_penalty', 'points_deduction', 'disqualification')
+APPEAL_STATUSES = ('submitted', 'under_review', 'hearing_scheduled', 'upheld', 'overturned', 'dismissed')
+WORDS = (
+    'contact', 'divebomb', 'understeer', 'oversteer', 'lockup', 'braking', 'apex', 'kerb', 'gravel', 'rejoin',
+    'unsafe', 'spin', 'wing', 'damage', 'puncture', 'overtake', 'defending', 'weaving', 'pitlane', 'exit',
+    'entry', 'blue', 'flags', 'ignored', 'yellow', 'safety', 'car', 'restart', 'formation', 'grid', 'lap',
+    'corner', 'inside', 'outside', 'line', 'squeezed', 'wall', 'barrier', 'rear', 'ended', 'sidepod', 'wet',
+    'dry', 'tyres', 'cold', 'late', 'move', 'under', 'investigation', 'steward', 'replay', 'onboard', 'footage',
+    'evidence', 'lapped', 'traffic', 'dirty', 'air', 'clean', 'racing', 'incident', 'avoidable', 'unavoidable',
+    'netcode', 'lag', 'ghosting', 'disconnect', 'vsc', 'track', 'limits', 'cut', 'gained', 'advantage', 'gave',
+    'back', 'position', 'chicane', 'hairpin', 'straight', 'drs', 'zone', 'slipstream', 'tow', 'draft', 'marshal',
+    'hit', 'the', 'a', 'and', 'into', 'after', 'before', 'during', 'while', 'was', 'on', 'at', 'of', 'by',
+)
+DRIVERS = 60
+
+
+def make_records(total: int, seed: int = 7) -> dict:
+    """Synthetic stewarding feed rows by kind (70% incidents, 20% penalties, 10% appeals)"""
+    rng = random.Random(seed)
+    races = [(i, f"{TRACKS[i % len(TRACKS)]} GP {2020 + i // 20}", i // 20 + 1) for i in range(1, 201)]
+
+    def text(low: int, high: int) -> str:
+        return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + '.'
+
+    def base(row_id: int) -> dict:
+        race_id, race_name, season_id = rng.choice(races)
+        return {'id': row_id, 'race_id': race_id, 'race_name': race_name, 'season_id': season_id,
+                'lap': rng.randint(1, 40), 'changed_at': 1900000000 + row_id}
+
+    records = {'incidents': [], 'penalties': [], 'appeals': []}
+    for i in range(1, int(total * 0.7) + 1):
+        records['incidents'].append(dict(
+            base(i), type=rng.choice(INCIDENT_TYPES), title=text(2, 5), description=text(20, 60),
+            turn=rng.choice(TURNS), drivers=rng.sample(range(1, DRIVERS + 1), rng.randint(1, 3)),
+            severity=rng.choice(SEVERITIES), status=rng.choice(STATUSES),
+        ))
+    for i in range(1, int(total * 0.2) + 1):
+        records['penalties'].append(dict(
+            base(i), type=rng.choice(PENALTY_TYPES), penalty_value=rng.choice((0, 3, 5, 10)),
+            description=text(15, 40), drivers=[rng.randint(1, DRIVERS)], severity=rng.choice(SEVERITIES[:3]),
+        ))
+    for i in range(1, total - len(records['incidents']) - len(records['penalties']) + 1):
+        records['appeals'].append(dict(
+            base(i), type=rng.choice(DECISION_TYPES), title=text(4, 8), description=text(30, 80),
+            turn=rng.choice(TURNS), drivers=[rng.randint(1, DRIVERS)], severity=rng.choice(SEVERITIES),
+            status=rng.choice(APPEAL_STATUSES),
+        ))
+    return records
+
+
+def make_app(state: dict) -> web.Application:
+    async def feed(request: web.Request) -> web.Response:
+        kind = request.match_info['kind']
+        since = int(request.query.get('updated_since', 0))
+        after_id = int(request.query.get('after_id', 0))
+        limit = min(5000, int(request.query.get('limit', 1000)))
+        rows = [row for row in state['records'][kind] if row['changed_at'] >= since and row['id'] > after_id]
+        rows = rows[:limit]
+        return web.json_response({
+            'kind': kind, 'schema_version': '1.3.2', 'server_time': state['server_time'], 'rows': rows,
+            'next_after_id': rows[-1]['id'] if len(rows) == limit else None,
+            'count': len(state['records'][kind]),
+        })
+
+    app = web.Application()
+    app.router.add_get('/api/stewarding/{kind}', feed)
+    return app
+
+
+class Client:
+    """Just what GridKingBot.api_request needs: one tenant talking to the stub"""
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str):
+        self.tenant = SimpleNamespace(
+            name='bench', session=session, api_key='x' * 32, api_base_url=base_url,
+            scheduler=RequestScheduler(), budget=RateBucket(10 ** 6, 60.0), api_cache=None,
+        )
+        self.tenant.source = HttpSource(self.tenant)
+        self.trace = None
+
+    async def api_request(self, endpoint: str, **kwargs):
+        return await GridKingBot.api_request(self, endpoint, **kwargs)
+
+
+class LikeScan:
+    """The same rows in a plain table, searched with LIKE and GROUP BY per query"""
+
+    def __init__(self, index: IncidentIndex):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(f"ATTACH DATABASE '{index.path}' AS source")
+        self.conn.execute('CREATE TABLE docs AS SELECT * FROM source.docs')
+        self.conn.execute('CREATE INDEX idx_race ON docs (race_id, lap)')
+        self.conn.execute('DETACH DATABASE source')
+
+    def search(self, query: str = '', race_id=None, lap=None, driver_ids=(), limit: int = 8):
+        conditions, params = [], []
+        for word in re.findall(r'[^\W_]+', query.casefold()):
+            conditions.append('(title LIKE ? OR description LIKE ? OR turn LIKE ? OR tags LIKE ?)')
+            params.extend([f'%{word}%'] * 4)
+        if race_id is not None:
+            conditions.append('race_id = ?')
+            params.append(race_id)
+        if lap is not None:
+            conditions.append('lap = ?')
+            params.append(lap)
+        if driver_ids:
+            conditions.append('(' + ' OR '.join(["',' || drivers || ',' LIKE ?"] * len(driver_ids)) + ')')
+            params.extend(f'%,{driver_id},%' for driver_id in driver_ids)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        hits = self.conn.execute(f'SELECT * FROM docs {where} ORDER BY changed_at DESC LIMIT ?', (*params, limit)).fetchall()
+        facets = self.conn.execute(f'''
+            SELECT 'kind', kind, COUNT(*) FROM docs {where} GROUP BY kind
+            UNION ALL SELECT 'severity', severity, COUNT(*) FROM docs {where} GROUP BY severity
+            UNION ALL SELECT 'race', race_id, COUNT(*) FROM docs {where} GROUP BY race_id
+            UNION ALL SELECT 'drivers', drivers, COUNT(*) FROM docs {where} GROUP BY drivers
+        ''', params * 4).fetchall()
+        return hits, facets
+
+
+SEARCHES = (
+    ('one word', {'query': 'divebomb'}),
+    ('two words', {'query': 'unsafe rejoin'}),
+    ('prefix', {'query': 'puncture sidep'}),
+    ('quoted', {'query': '"blue" flags ignored'}),
+    ('common word', {'query': 'contact'}),
+    ('word + driver', {'query': 'blocking', 'driver_ids': [7]}),
+    ('driver only', {'driver_ids': [12]}),
+    ('race + lap', {'race_id': 42, 'lap': 1}),
+    ('word + race', {'query': 'kerb', 'race_id': 17}),
+    ('type', {'query': 'track limits'}),
+)
+
+
+def timed(function, repeats: int) -> list:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def words_of(row: dict, kind: str) -> set:
+    tags = ' '.join(filter(None, (kind, row.get('type'), row.get('severity'), row.get('status'))))
+    text = ' '.join(str(row.get(field) or '') for field in ('title', 'description', 'turn'))
+    return set(re.findall(r'[^\W_]+', f"{text} {tags}".casefold()))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--records', type=int, default=50000)
+    parser.add_argument('--repeats', type=int, default=30)
+    parser.add_argument('--max-p95', type=float, default=50.0, help="Index p95 budget per search (ms)")
+    args = parser.parse_args()
+
+    state = {'records': make_records(args.records), 'server_time': 1900000000 + args.records + 10}
+    runner = web.AppRunner(make_app(state))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    failed = []
+    with tempfile.TemporaryDirectory() as path:
+        index = IncidentIndex(os.path.join(path, 'incidents.sqlite3'))
+        async with aiohttp.ClientSession() as session:
+            client = Client(session, f"http://127.0.0.1:{port}/api")
+
+            start = time.perf_counter()
+            rows = await index.sync(client.api_request)
+            build = time.perf_counter() - start
+            size = sum(os.path.getsize(name) for name in (index.path, index.path + '-wal') if os.path.exists(name))
+            print(f"Full build: {rows} records in {build:.1f}s ({size / 2 ** 20:.1f} MiB on disk, "
+                  f"{len(index.memory.postings)} terms)")
+
+            # Delta: edited and new records after the cursor, one penalty deleted upstream
+            state['server_time'] += 60
+            incidents = state['records']['incidents']
+            for row in incidents[:200]:
+                row.update(description=row['description'] + ' Contact with a kangaroo.', changed_at=state['server_time'])
+            incidents.append(dict(incidents[-1], id=len(incidents) + 1, title='Wombat on track',
+                                  changed_at=state['server_time']))
+            removed = state['records']['penalties'].pop(0)
+            start = time.perf_counter()
+            rows = await index.sync(client.api_request)
+            print(f"Delta sync: {rows} records in {(time.perf_counter() - start) * 1000:.0f} ms "
+                  f"(incl. refetching penalties after a deletion)")
+
+            # A restart rebuilds the index from the file alone
+            await index.load()
+            print(f"Index load from disk: {index.metrics['last_load_ms']:.0f} ms")
+
+        kangaroo = index.search('kangaroo', limit=1)
+        if kangaroo.total != 200 or index.search('wombat').total != 1:
+            failed.append('delta not applied')
+        if index._reader.execute('SELECT 1 FROM docs WHERE id = ?', (doc_id('penalties', removed['id']),)).fetchone():
+            failed.append('deleted penalty still indexed')
+
+        # Single words find exactly the records containing them
+        for word in ('divebomb', 'parabolica', 'netcode', 'dangerous', 'collision'):
+            expected = sum(word in words_of(row, kind) for kind, rows in state['records'].items() for row in rows)
+            found = index.search(f'"{word}"', limit=1).total
+            if found != expected:
+                failed.append(f"'{word}': {found} found, {expected} expected")
+
+        scan = LikeScan(index)
+        print(f"\n{len(index)} records; p50/p95 per search over {args.repeats} runs, matches of the query")
+        print(f"  {'search':<15} {'index p50':>10} {'p95':>8} {'LIKE p50':>10} {'p95':>8} {'matches':>8}")
+        all_index = []
+        for label, search in SEARCHES:
+            matches = index.search(**search).total
+            ours = timed(lambda: index.search(**search), args.repeats)
+            theirs = timed(lambda: scan.search(**search), max(3, args.repeats // 5))
+            all_index.extend(ours)
+            print(f"  {label:<15} {statistics.median(ours):>8.2f}ms {_p95(ours):>6.2f}ms "
+                  f"{statistics.median(theirs):>8.2f}ms {_p95(theirs):>6.2f}ms {matches:>8}")
+
+        p95 = _p95(all_index)
+        print(f"\nIndex p95 over all searches: {p95:.2f} ms (budget {args.max_p95:g} ms)")
+        if p95 > args.max_p95:
+            failed.append(f"p95 {p95:.2f} ms over budget")
+
+    await runner.cleanup()
+    for failure in failed:
+        print(f"FAILED: {failure}")
+    sys.exit(1 if failed else 0)
+
+
+def _p95(timings: list) -> float:
+    return statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,151 @@
+"""
+Discord API calls per command: always-defer vs the inline responder
+
+Runs a typical command mix through the real cogs against a stub bot whose
+API answers after a simulated upstream latency (cached for 60s like
+api_request) and whose local replica is synced from that API. Fake
+interactions count response/followup calls. The mix is run once with the
+previous defer-then-followup flow swapped in for responder.respond, and
+once with the inline responder.
+
+Usage: python benchmarks/interaction_calls.py [rounds] [api_latency_ms]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from commands.drivers import DriversCog  # noqa: E402
+from commands.races import RacesCog  # noqa: E402
+from commands.standings import StandingsCog  # noqa: E402
+from commands.stats import StatsCog  # noqa: E402
+from utils import responder  # noqa: E402
+from utils.cache import TTLCache  # noqa: E402
+from utils.models import parse_payload  # noqa: E402
+from utils.replica import ReferenceReplica  # noqa: E402
+
+RACE = {'id': 7, 'name': 'Monza GP', 'track': 'Monza', 'race_date': '2030-09-01 18:00:00',
+        'format': 'Sprint', 'laps': 20, 'time_until': {'total_seconds': 90000}}
+RESULTS = [{'id': i, 'race_id': 6, 'driver_id': i, 'position': i, 'points': max(0, 26 - 2 * i),
+            'username': f"Driver {i}", 'driver_number': i} for i in range(1, 11)]
+ROWS = [{'id': i, 'username': f"Driver {i}", 'driver_number': i, 'total_points': 200 - 10 * i, 'wins': 5 - i // 2}
+        for i in range(1, 11)]
+
+PAYLOADS = {
+    'standings': {'season': {'name': 'Season 3', 'year': 2030}, 'standings': ROWS},
+    'races/upcoming': [RACE],
+    'races/recent': [dict(RACE, id=6, results=RESULTS)],
+    'stats/wins': {'type': 'wins', 'season_id': 3, 'data': ROWS},
+    'replica?updated_since=0': {
+        'schema_version': '1.3.1',
+        'server_time': 1900000000,
+        'tables': {
+            'seasons': [{'id': 3, 'name': 'Season 3', 'year': 2030, 'is_active': 1}],
+            'teams': [{'id': 1, 'name': 'Apex'}],
+            'drivers': [{'id': i, 'username': f"Driver {i}", 'verified': 1, 'team_id': 1, 'driver_number': i}
+                        for i in range(1, 11)],
+            'races': [{k: RACE[k] for k in ('id', 'name', 'track', 'race_date', 'format', 'laps')},
+                      dict(id=6, season_id=3, name='Spa GP', track='Spa', race_date='2030-08-01 18:00:00')],
+            'race_results': RESULTS,
+        },
+    },
+}
+
+
+class StubBot:
+    def __init__(self, latency: float, replica_path: str):
+        self.latency = latency
+        self.api_cache = TTLCache(default_ttl=60)
+        self.embed_cache = TTLCache(default_ttl=60)
+        self.replica = ReferenceReplica(replica_path)
+
+    async def api_request(self, endpoint, **kwargs):
+        cached = self.api_cache.get(endpoint)
+        if cached is not None:
+            return cached
+        await asyncio.sleep(self.latency)
+        data = parse_payload(endpoint, PAYLOADS[endpoint])
+        self.api_cache.set(endpoint, data)
+        return data
+
+
+class FakeInteraction:
+    def __init__(self, counter):
+        counter_ref = counter
+
+        class Response:
+            async def defer(self, ephemeral=False):
+                counter_ref['defer'] += 1
+
+            async def send_message(self, **kwargs):
+                counter_ref['send_message'] += 1
+
+        class Followup:
+            async def send(self, **kwargs):
+                counter_ref['followup'] += 1
+
+        self.response = Response()
+        self.followup = Followup()
+
+
+async def legacy_respond(interaction, message, error, budget=None, ephemeral=False):
+    """The flow every command used before: defer, build, followup"""
+    await interaction.response.defer(ephemeral=ephemeral)
+    await interaction.followup.send(**await responder._build(message, error))
+
+
+async def run_mix(rounds: int, latency: float):
+    with tempfile.TemporaryDirectory() as path:
+        bot = StubBot(latency, os.path.join(path, 'replica.sqlite3'))
+        await bot.replica.sync(bot.api_request)
+        return await _run_mix(bot, rounds)
+
+
+async def _run_mix(bot, rounds: int):
+    standings, races, stats, drivers = StandingsCog(bot), RacesCog(bot), StatsCog(bot), DriversCog(bot)
+    mix = [
+        (standings.standings, (10, False)),
+        (stats.leaderboard, ()),
+        (races.last_race, ()),
+        (races.next_race, ()),
+        (races.schedule, (5,)),
+        (stats.stats, ('wins', 10)),
+        (drivers.driver_by_id, (1,)),
+    ]
+
+    counter = {'defer': 0, 'send_message': 0, 'followup': 0}
+    start = time.perf_counter()
+    commands = 0
+    for _ in range(rounds):
+        for command, args in mix:
+            await command.callback(command.binding, FakeInteraction(counter), *args)
+            commands += 1
+    elapsed = time.perf_counter() - start
+    return commands, counter, elapsed
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 400) / 1000
+
+    inline_respond = responder.respond
+    modes = (
+        ('before (always defer)', legacy_respond),
+        (f'after (inline budget {responder.INLINE_BUDGET}s)', inline_respond),
+    )
+    for label, respond in modes:
+        responder.respond = respond
+        commands, counter, elapsed = asyncio.run(run_mix(rounds, latency))
+        calls = sum(counter.values())
+        print(f"{label}: {commands} commands in {elapsed:.1f}s, {calls} Discord calls "
+              f"({calls / commands:.2f}/command) - defer {counter['defer']}, "
+              f"send_message {counter['send_message']}, followup {counter['followup']}")
+    responder.respond = inline_respond
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Event-loop stall caused by logging under a burst of commands
+
+Runs a burst of simulated commands (each logging a few lines, as the cogs
+and api_request do) while a ticker task measures how late the event loop
+wakes up. Compares the old direct FileHandler setup with the queued pipeline
+from utils.logging_config. ``write_latency_ms`` emulates a slow disk or
+network volume by sleeping inside every stream write.
+
+Usage: python benchmarks/logging_stall.py [commands] [write_latency_ms]
+"""
+
+import asyncio
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.logging_config import configure_logging, shutdown_logging  # noqa: E402
+
+ARRIVAL_INTERVAL = 0.0005  # seconds between command arrivals
+
+
+class LegacySensitiveDataFilter(logging.Filter):
+    """The filter bot.py used before the queued pipeline"""
+
+    def filter(self, record):
+        if hasattr(record, 'msg'):
+            record.msg = re.sub(r'(token|key|password)["\s=:]+\S+', r'\1=***', str(record.msg), flags=re.IGNORECASE)
+        return True
+
+
+class SlowStream:
+    """File wrapper that blocks for a fixed time on every write"""
+
+    def __init__(self, stream, latency):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, data):
+        time.sleep(self.latency)
+        return self.stream.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def slow_down(handlers, latency):
+    for handler in handlers:
+        if latency and hasattr(handler, 'stream'):
+            handler.stream = SlowStream(handler.stream, latency)
+
+
+def configure_legacy(log_file, latency):
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = (logging.FileHandler(log_file), logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    logging.getLogger('gridking_bot').addFilter(LegacySensitiveDataFilter())
+    slow_down(handlers, latency)
+
+
+def configure_queued(log_file, latency):
+    # The legacy filter rewrites record.msg without its args, which breaks lazy %-formatting
+    logging.getLogger('gridking_bot').filters.clear()
+    listener = configure_logging(log_file=log_file, level='INFO')
+    slow_down(listener.handlers, latency)
+    return listener
+
+
+async def fake_command(logger, i, lazy, spent):
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    if lazy:
+        logger.debug('API %s %s -> %s', 'GET', f'drivers/{i}', 200)
+        logger.info('Command %s from user %d', 'standings', i)
+        logger.warning('API request failed: %s (key=%s)', 503, 'abc123')
+    else:
+        logger.debug(f'API GET drivers/{i} -> 200')
+        logger.info(f'Command standings from user {i}')
+        logger.warning(f'API request failed: {503} (key=abc123)')
+    spent.append(time.perf_counter() - start)
+
+
+async def run_burst(count, lazy):
+    logger = logging.getLogger('gridking_bot')
+    lags = []
+    spent = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    tick = asyncio.create_task(ticker())
+    commands = []
+    for i in range(count):
+        commands.append(asyncio.create_task(fake_command(logger, i, lazy, spent)))
+        await asyncio.sleep(ARRIVAL_INTERVAL)
+    await asyncio.gather(*commands)
+    done.set()
+    await tick
+    return sum(spent), lags
+
+
+def report(name, on_loop, lags):
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    p99 = lags_ms[max(int(len(lags_ms) * 0.99) - 1, 0)]
+    print(f'  {name:<7} logging on loop {on_loop * 1000:8.1f} ms | '
+          f'loop lag p99 {p99:7.2f} ms, max {lags_ms[-1]:7.2f} ms')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    tmp = tempfile.mkdtemp()
+    # Console handlers write to /dev/null so the benchmark output stays readable
+    real_stderr = sys.stderr
+    sys.stderr = open(os.devnull, 'w')
+
+    configure_legacy(os.path.join(tmp, 'legacy.log'), latency)
+    legacy = asyncio.run(run_burst(count, lazy=False))
+
+    configure_queued(os.path.join(tmp, 'queued.log'), latency)
+    queued = asyncio.run(run_burst(count, lazy=True))
+    shutdown_logging()
+
+    sys.stderr = real_stderr
+    print(f'{count} commands, 3 log calls each, write latency {latency * 1000:g} ms')
+    report('legacy', *legacy)
+    report('queued', *queued)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Memory comparison: raw JSON dicts vs slotted models for a cached league
+
+Builds a synthetic 10k-driver ``drivers`` payload shaped like the API
+response, decodes it the way aiohttp does and measures retained heap with
+tracemalloc before and after converting it with utils.models.
+
+Usage: python benchmarks/model_memory.py [driver_count]
+"""
+
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.models import parse_payload  # noqa: E402
+
+TEAMS = [f'Team {name}' for name in ('Apex', 'Box Box', 'Chicane', 'Drift', 'Eau Rouge', 'Flatout', 'Gravel', 'Hairpin')]
+COUNTRIES = ['GBR', 'DEU', 'NLD', 'FRA', 'ESP', 'ITA', 'USA', 'BRA']
+
+
+def build_payload(count: int) -> bytes:
+    rng = random.Random(42)
+    drivers = []
+    for i in range(1, count + 1):
+        team = rng.randrange(len(TEAMS))
+        drivers.append({
+            'id': str(i),
+            'user_id': str(i + 100),
+            'team_id': str(team + 1),
+            'driver_number': str(i),
+            'platform': rng.choice(['PC', 'Xbox', 'PlayStation']),
+            'country': rng.choice(COUNTRIES),
+            'livery_image': f'uploads/liveries/driver_{i}.png',
+            'bio': 'Sim racer since 2015. ' * rng.randint(1, 4),
+            'created_at': '2025-01-01 12:00:00',
+            'updated_at': '2025-06-01 12:00:00',
+            'username': f'driver_{i}',
+            'team_name': TEAMS[team],
+            'team_logo': f'uploads/teams/{team}.png',
+            'statistics': {
+                'races_participated': str(rng.randint(0, 20)),
+                'wins': str(rng.randint(0, 5)),
+                'total_points': f'{rng.uniform(0, 400):.2f}',
+            },
+        })
+    return json.dumps(drivers).encode()
+
+
+def measure(factory):
+    gc.collect()
+    tracemalloc.start()
+    obj = factory()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    raw = build_payload(count)
+
+    dicts, dict_bytes = measure(lambda: json.loads(raw))
+    models, model_bytes = measure(lambda: parse_payload('drivers', json.loads(raw)))
+
+    print(f'{count} drivers, payload {len(raw) / 1024:.0f} KiB')
+    print(f'  raw dicts : {dict_bytes / 1024 / 1024:7.2f} MiB ({dict_bytes / count:.0f} B/driver)')
+    print(f'  models    : {model_bytes / 1024 / 1024:7.2f} MiB ({model_bytes / count:.0f} B/driver)')
+    print(f'  saved     : {100 * (1 - model_bytes / dict_bytes):.0f}%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Notification fan-out throughput against a mocked Discord HTTP layer
+
+Fake channels answer ``send`` after a simulated Discord latency and fail
+a share of sends with 503. The same burst (messages x routes) is sent once
+by a sequential loop (the previous one-channel.send-at-a-time approach,
+retrying failures) and once through NotificationDispatcher, and the bucket
+limits are checked against the recorded send times.
+
+Usage: python benchmarks/notify_fanout.py [routes] [messages] [latency_ms] [failure_rate]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import discord  # noqa: E402
+
+from utils import notifier  # noqa: E402
+from utils.notifier import GLOBAL_RATE, ROUTE_RATE, NotificationDispatcher  # noqa: E402
+
+
+class FakeResponse:
+    status = 503
+    reason = 'Service Unavailable'
+    headers = {}
+
+
+class FakeChannel:
+    def __init__(self, channel_id, latency, failure_rate, log, rng):
+        self.id = channel_id
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.log = log
+        self.rng = rng
+
+    async def send(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        if self.rng.random() < self.failure_rate:
+            raise discord.HTTPException(FakeResponse(), 'upstream error')
+        self.log.append((self.id, time.perf_counter()))
+
+
+class FakeBot:
+    def __init__(self, routes, latency, failure_rate):
+        self.log = []
+        rng = random.Random(7)
+        self.channels = {route: FakeChannel(route, latency, failure_rate, self.log, rng) for route in routes}
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    async def fetch_channel(self, channel_id):
+        return self.channels[channel_id]
+
+
+def peak_in_window(times, window):
+    times = sorted(times)
+    peak = start = 0
+    for end, stamp in enumerate(times):
+        while stamp - times[start] >= window:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak
+
+
+def report(label, bot, elapsed, expected):
+    per_route = defaultdict(list)
+    for route, stamp in bot.log:
+        per_route[route].append(stamp)
+    route_peak = max(peak_in_window(times, ROUTE_RATE[1]) for times in per_route.values())
+    global_peak = peak_in_window([stamp for _, stamp in bot.log], GLOBAL_RATE[1])
+    print(f"  {label:<11} {elapsed:6.2f}s  {len(bot.log)}/{expected} delivered  "
+          f"{len(bot.log) / elapsed:6.1f} msg/s  peak {route_peak}/route/{ROUTE_RATE[1]:g}s "
+          f"{global_peak}/global/{GLOBAL_RATE[1]:g}s")
+
+
+async def sequential(routes, messages, embed, latency, failure_rate):
+    bot = FakeBot(routes, latency, failure_rate)
+    start = time.perf_counter()
+    for _ in range(messages):
+        for route in routes:
+            for attempt in range(notifier.MAX_ATTEMPTS):
+                try:
+                    await bot.get_channel(route).send(embed=embed)
+                    break
+                except discord.HTTPException:
+                    await asyncio.sleep(notifier.RETRY_BACKOFF * 2 ** attempt)
+    report('sequential', bot, time.perf_counter() - start, len(routes) * messages)
+
+
+async def dispatched(routes, messages, embed, latency, failure_rate):
+    bot = FakeBot(routes, latency, failure_rate)
+    dispatcher = NotificationDispatcher(bot, {notifier.REMINDER: routes})
+    start = time.perf_counter()
+    for _ in range(messages):
+        dispatcher.publish(notifier.REMINDER, embed=embed)
+    await dispatcher.flush()
+    report('dispatcher', bot, time.perf_counter() - start, len(routes) * messages)
+    print(f"  dispatcher stats: {dispatcher.stats}")
+    dispatcher.stop()
+
+
+def main():
+    routes = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    latency = (int(sys.argv[3]) if len(sys.argv) > 3 else 80) / 1000
+    failure_rate = float(sys.argv[4]) if len(sys.argv) > 4 else 0.03
+
+    # Short backoff so the benchmark measures queueing, not sleeping
+    notifier.RETRY_BACKOFF = 0.1
+
+    embed = discord.Embed(title="🏁 Race Reminder", description="Monza GP starts in 1h")
+    route_ids = list(range(1000, 1000 + routes))
+    print(f"{messages} messages x {routes} routes, {latency * 1000:.0f} ms per send, "
+          f"{failure_rate:.0%} failures")
+    asyncio.run(sequential(route_ids, messages, embed, latency, failure_rate))
+    asyncio.run(dispatched(route_ids, messages, embed, latency, failure_rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Timing for the /predict Monte Carlo simulation
+
+Builds a synthetic season (drivers with 12 results each), runs
+simulate_championship for the remaining races and reports wall time
+against the one-second budget.
+
+Usage: python benchmarks/predict_speed.py [drivers] [races] [simulations]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.predictor import simulate_championship  # noqa: E402
+
+BUDGET_SECONDS = 1.0
+
+
+def main():
+    drivers = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    races = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    simulations = int(sys.argv[3]) if len(sys.argv) > 3 else 50000
+
+    rng = random.Random(42)
+    histories = []
+    for i in range(drivers):
+        # Lower index = faster driver, with some spread
+        histories.append([max(1, min(drivers, int(rng.gauss(i + 1, drivers / 8)))) for _ in range(12)])
+    points = sorted((rng.uniform(0, 250) for _ in range(drivers)), reverse=True)
+    dnf_rates = [0.08] * drivers
+    fastest_lap_rates = [1 / drivers] * drivers
+
+    # Warm-up so NumPy import/allocation costs aren't counted
+    simulate_championship(points, histories, dnf_rates, fastest_lap_rates, races, 1000, seed=1)
+
+    timings = []
+    for run in range(3):
+        start = time.perf_counter()
+        result = simulate_championship(points, histories, dnf_rates, fastest_lap_rates, races, simulations, seed=run)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"{drivers} drivers x {races} races x {simulations:,} simulations")
+    print(f"  best {best * 1000:.0f} ms, worst {max(timings) * 1000:.0f} ms (budget {BUDGET_SECONDS * 1000:.0f} ms)")
+    top = sorted(range(drivers), key=lambda i: -result['title'][i])[:3]
+    print('  title odds: ' + ', '.join(f"driver {i + 1} {result['title'][i]:.1%}" for i in top))
+
+    sys.exit(0 if best < BUDGET_SECONDS else 1)
+
+
+if __name__ == '__main__':
+    main()
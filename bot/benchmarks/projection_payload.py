@@ -0,0 +1,177 @@
+"""
+Payload size and latency: full rows vs fields=/limit= projections
+
+Serves synthetic full-size API responses (bios, livery URLs, every results
+column) from a local aiohttp server that applies ``fields=`` and ``limit=``
+the way the PHP endpoints do, then calls each endpoint through the real
+``GridKingBot.api_request`` (URL building, JSON decode, model parsing) once
+without a projection and once with the fields the cogs declare. Prints the
+response bytes and p50/p95 end-to-end latency for both. SQL time saved by
+skipping columns and the per-driver statistics queries is not included.
+
+Usage: python benchmarks/projection_payload.py [requests] [drivers]
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bot import GridKingBot  # noqa: E402
+from commands.races import RacesCog  # noqa: E402
+from commands.standings import StandingsCog  # noqa: E402
+from commands.stats import StatsCog  # noqa: E402
+from utils.batch import ROSTER_FIELDS  # noqa: E402
+from utils.datasource import HttpSource  # noqa: E402
+from utils.notifier import RateBucket  # noqa: E402
+from utils.scheduler import RequestScheduler  # noqa: E402
+
+BIO = "Sim racer since the early days of online leagues. " * 8
+
+
+def build_payloads(drivers: int) -> dict:
+    standings = [{
+        'id': i, 'username': f"Driver {i}", 'driver_number': i, 'team_name': f"Team {i % 10}",
+        'total_points': 400 - i * 3, 'wins': max(0, 8 - i), 'poles': max(0, 6 - i),
+        'fastest_laps': max(0, 5 - i), 'dnfs': i % 3, 'avg_position': 1 + i / 2,
+    } for i in range(1, drivers + 1)]
+    roster = [{
+        'id': i, 'user_id': 100 + i, 'team_id': i % 10, 'driver_number': i, 'platform': 'PC',
+        'country': 'GBR', 'livery_image': f"https://cdn.example.com/liveries/driver_{i}_2030_v3.png",
+        'bio': BIO, 'created_at': '2029-01-01 12:00:00', 'updated_at': '2030-06-01 12:00:00',
+        'username': f"Driver {i}", 'team_name': f"Team {i % 10}",
+        'team_logo': f"https://cdn.example.com/logos/team_{i % 10}.png",
+        'statistics': {'races_participated': 12, 'wins': 1, 'total_points': 120},
+    } for i in range(1, drivers + 1)]
+    races = [{
+        'id': 50 - r, 'season_id': 3, 'name': f"Round {12 - r}", 'track': 'Monza',
+        'race_date': '2030-06-01 18:00:00', 'format': 'Feature', 'laps': 30, 'status': 'completed',
+        'track_image': 'https://cdn.example.com/tracks/monza.png', 'weather_conditions': 'Dry',
+        'description': "Full race distance, mandatory pit stop, tyre rules as per the sporting regulations. " * 4,
+        'season_name': 'Season 3', 'season_year': 2030,
+        'results': [{
+            'id': 1000 * r + p, 'race_id': 50 - r, 'driver_id': p, 'position': p, 'points': max(0, 26 - p),
+            'fastest_lap': p == 3, 'fastest_lap_time': '00:01:21', 'pole_position': p == 1, 'dnf': False,
+            'dnf_reason': None, 'penalties_applied': 0, 'grid_position': p, 'status': 'finished',
+            'created_at': '2030-06-01 20:00:00', 'updated_at': '2030-06-01 20:00:00',
+            'username': f"Driver {p}", 'driver_number': p, 'team_name': f"Team {p % 10}",
+        } for p in range(1, drivers + 1)],
+    } for r in range(5)]
+    return {
+        'standings': {'season': {'name': 'Season 3', 'year': 2030}, 'standings': standings},
+        'drivers': roster,
+        'races/recent': races,
+    }
+
+
+def project(rows: list, fields: list, limit) -> list:
+    """What the endpoints return for ?fields=&limit= (see api/middleware/projection.php)"""
+    if limit is not None:
+        rows = rows[:limit]
+    if not fields:
+        return rows
+    top = [name for name in fields if '.' not in name]
+    nested = {}
+    for name in fields:
+        if '.' in name:
+            parent, child = name.split('.', 1)
+            nested.setdefault(parent, []).append(child)
+    projected = []
+    for row in rows:
+        out = {key: row[key] for key in top if key in row}
+        for parent, children in nested.items():
+            out[parent] = [{key: child[key] for key in children} for child in row.get(parent, [])]
+        projected.append(out)
+    return projected
+
+
+def make_app(payloads: dict) -> web.Application:
+    async def handle(request: web.Request) -> web.Response:
+        endpoint = request.match_info['endpoint']
+        fields = [name for name in request.query.get('fields', '').split(',') if name]
+        limit = int(request.query['limit']) if 'limit' in request.query else None
+        payload = payloads[endpoint]
+        if endpoint == 'standings':
+            payload = dict(payload, standings=project(payload['standings'], fields, limit))
+        else:
+            payload = project(payload, fields, limit)
+        return web.Response(body=json.dumps(payload).encode(), content_type='application/json')
+
+    app = web.Application()
+    app.router.add_get('/api/{endpoint:.+}', handle)
+    return app
+
+
+class Client:
+    """Just what GridKingBot.api_request needs (a single tenant)"""
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str):
+        self.tenant = SimpleNamespace(
+            name='bench', session=session, api_key='x' * 32, api_base_url=base_url,
+            scheduler=RequestScheduler(), budget=RateBucket(10 ** 6, 60.0), api_cache=None,
+        )
+        self.tenant.source = HttpSource(self.tenant)
+        self.trace = None
+
+
+CASES = (
+    ('/standings', 'standings', StandingsCog.STANDINGS_FIELDS, 10),
+    ('/leaderboard', 'standings', StatsCog.LEADERBOARD_FIELDS, 10),
+    ('/lastrace', 'races/recent', RacesCog.LAST_RACE_FIELDS, 1),
+    ('driver roster', 'drivers', ROSTER_FIELDS, None),
+)
+
+
+async def measure(client: Client, endpoint: str, fields, limit, requests: int):
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        data = await GridKingBot.api_request(client, endpoint, use_cache=False, fields=fields, limit=limit)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert data, f"no data for {endpoint}"
+    timings.sort()
+    url = f"{client.tenant.api_base_url}/{endpoint}"
+    params = {}
+    if fields:
+        params['fields'] = ','.join(fields)
+    if limit is not None:
+        params['limit'] = str(limit)
+    async with client.tenant.session.get(url, params=params) as response:
+        size = len(await response.read())
+    return size, statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    drivers = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    runner = web.AppRunner(make_app(build_payloads(drivers)))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    async with aiohttp.ClientSession() as session:
+        client = Client(session, f"http://127.0.0.1:{port}/api")
+        print(f"{requests} requests per case, {drivers} drivers")
+        print(f"{'command':<15} {'full bytes':>11} {'proj bytes':>11} {'full p50':>9} {'proj p50':>9} "
+              f"{'full p95':>9} {'proj p95':>9}")
+        for label, endpoint, fields, limit in CASES:
+            full_size, full_p50, full_p95 = await measure(client, endpoint, None, None, requests)
+            size, p50, p95 = await measure(client, endpoint, fields, limit, requests)
+            print(f"{label:<15} {full_size:>11,} {size:>11,} {full_p50:>7.2f}ms {p50:>7.2f}ms "
+                  f"{full_p95:>7.2f}ms {p95:>7.2f}ms  ({size / full_size:.1%} of the bytes)")
+
+    await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
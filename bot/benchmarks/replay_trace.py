@@ -0,0 +1,342 @@
+"""
+Replay a recorded traffic trace as a performance regression gate
+
+Reads a trace recorded with TRACE_FILE (see utils.trace), starts a local
+stub API that answers every upstream request with the response recorded
+for it, and builds the real bot against the stub (without logging in to
+Discord). Each tenant's replica is synced once from the stub, then the
+recorded commands are invoked through the real cogs with fake interactions,
+at their recorded arrival times divided by ``--speed``. A command's
+upstream requests get the response recorded closest before that point in
+the trace, after the recorded upstream latency (scaled by
+``--latency-scale``).
+
+Measured:
+- p50/p95 reply latency, overall and per command
+- upstream calls made by the commands (the replica sync is not counted)
+- RSS growth over the replay
+- replies that were errors
+- requests with no recorded response
+
+``--save-baseline FILE`` stores the results. ``--baseline FILE`` compares
+against stored results and exits non-zero when p95 latency, upstream
+calls or memory grow by more than the given percentages. Commands that
+post to channels (/liveboard) are skipped.
+
+Usage: python benchmarks/replay_trace.py TRACE [--speed N] [--baseline FILE | --save-baseline FILE]
+       [--max-p95 PCT] [--max-calls PCT] [--max-memory PCT]
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.memstats import rss_bytes  # noqa: E402
+from utils.tenants import DEFAULT, use_tenant  # noqa: E402
+
+# Commands with side effects outside the reply
+SKIPPED_COMMANDS = ('liveboard',)
+
+# Differences below these are noise, whatever the percentage
+LATENCY_SLACK_MS = 5
+MEMORY_SLACK_MIB = 8
+
+GUILD_BASE = 10000
+
+
+def load_trace(path: str):
+    """Commands in arrival order and recorded responses per (tenant, method, endpoint)"""
+    commands, responses = [], defaultdict(list)
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry['type'] == 'command':
+                commands.append(entry)
+            elif entry['type'] == 'api':
+                responses[(entry['tenant'], entry['method'], entry['endpoint'])].append(entry)
+    commands.sort(key=lambda entry: entry['t'])
+    for recorded in responses.values():
+        recorded.sort(key=lambda entry: entry['t'])
+    return commands, responses
+
+
+class StubApi:
+    """Serves recorded responses as of the replay's position in the trace"""
+
+    def __init__(self, responses: dict, latency_scale: float):
+        self.responses = responses
+        self.times = {key: [entry['t'] for entry in recorded] for key, recorded in responses.items()}
+        # Requests whose query string was never recorded get the path's latest response
+        self.by_path = defaultdict(list)
+        for key, recorded in responses.items():
+            tenant, method, endpoint = key
+            self.by_path[(tenant, method, endpoint.split('?', 1)[0])].extend(recorded)
+        for recorded in self.by_path.values():
+            recorded.sort(key=lambda entry: entry['t'])
+        self.latency_scale = latency_scale
+        self.clock = lambda: float('inf')
+        self.calls = 0
+        self.unmatched = 0
+
+    def lookup(self, tenant: str, method: str, endpoint: str):
+        key = (tenant, method, endpoint)
+        recorded = self.responses.get(key)
+        if recorded:
+            index = bisect.bisect_right(self.times[key], self.clock()) - 1
+            return recorded[max(index, 0)]
+        recorded = self.by_path.get((tenant, method, endpoint.split('?', 1)[0]))
+        return recorded[-1] if recorded else None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        endpoint = request.path_qs.split('/api/', 1)[1]
+        entry = self.lookup(request.match_info['tenant'], request.method, endpoint)
+        if entry is None:
+            self.unmatched += 1
+            return web.json_response({'error': 'Not recorded'}, status=404)
+        await asyncio.sleep(entry['ms'] / 1000 * self.latency_scale)
+        if entry['body'] is None:
+            return web.json_response({'error': 'Recorded failure'}, status=500)
+        return web.json_response(entry['body'])
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route('*', '/{tenant}/api/{path:.*}', self.handle)
+        return app
+
+
+class FakeInteraction:
+    """Just what the cogs and the responder use"""
+
+    def __init__(self, command, guild_id: int, user_id: int, channel_id: int):
+        replies = self.replies = []
+
+        class Response:
+            async def defer(self, ephemeral=False):
+                pass
+
+            async def send_message(self, **kwargs):
+                replies.append(kwargs)
+
+        class Followup:
+            async def send(self, **kwargs):
+                replies.append(kwargs)
+
+        self.command = command
+        self.guild_id = guild_id
+        self.guild = SimpleNamespace(id=guild_id, filesize_limit=25 * 2 ** 20)
+        self.user = SimpleNamespace(id=user_id)
+        self.channel_id = channel_id
+        self.channel = SimpleNamespace(id=channel_id)
+        self.response = Response()
+        self.followup = Followup()
+
+    @property
+    def failed(self) -> bool:
+        content = self.replies[-1].get('content', '') if self.replies else ''
+        return not self.replies or content.startswith('❌')
+
+
+def write_tenants(workdir: str, port: int, names: list) -> str:
+    path = os.path.join(workdir, 'tenants.json')
+    entries = [{
+        'name': name,
+        'api_url': f"http://127.0.0.1:{port}/{name}/api",
+        'api_key': 'x' * 32,
+        'guilds': [GUILD_BASE + index],
+    } for index, name in enumerate(names, 1)]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f)
+    return path
+
+
+async def replay(bot, stub: StubApi, commands: list, speed: float) -> dict:
+    ids = defaultdict(lambda: len(ids) + 1)
+    latencies = defaultdict(list)
+    errors = skipped = 0
+    peak_rss = 0
+    first = commands[0]['t'] if commands else 0.0
+
+    async def run(entry):
+        nonlocal errors, skipped
+        command = bot.tree.get_command(entry['command'])
+        tenant = bot.tenants.get(entry['tenant'])
+        if command is None or tenant is None or entry['command'] in SKIPPED_COMMANDS:
+            skipped += 1
+            return
+        interaction = FakeInteraction(command, tenant.guild_ids[0] if tenant.guild_ids else 0,
+                                      ids[entry['user']], ids[entry['channel']])
+        with use_tenant(tenant):
+            start = time.perf_counter()
+            await command.callback(command.binding, interaction, **entry['options'])
+            latencies[entry['command']].append((time.perf_counter() - start) * 1000)
+        errors += interaction.failed
+
+    async def sample_rss():
+        nonlocal peak_rss
+        while True:
+            peak_rss = max(peak_rss, rss_bytes()[0] or 0)
+            await asyncio.sleep(0.1)
+
+    loop = asyncio.get_running_loop()
+    rss_before = rss_bytes()[0] or 0
+    sampler = asyncio.ensure_future(sample_rss())
+    start = loop.time()
+    stub.clock = lambda: first + (loop.time() - start) * speed
+    stub.calls = stub.unmatched = 0
+    running = []
+    for entry in commands:
+        delay = start + (entry['t'] - first) / speed - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        running.append(asyncio.ensure_future(run(entry)))
+    await asyncio.gather(*running)
+    elapsed = loop.time() - start
+    sampler.cancel()
+
+    everything = sorted(ms for values in latencies.values() for ms in values)
+    return {
+        'speed': speed,
+        'commands': len(everything),
+        'seconds': round(elapsed, 2),
+        'p50_ms': round(statistics.median(everything), 2) if everything else None,
+        'p95_ms': round(percentile(everything, 0.95), 2) if everything else None,
+        'max_ms': round(everything[-1], 2) if everything else None,
+        'upstream_calls': stub.calls,
+        'unmatched': stub.unmatched,
+        'errors': errors,
+        'skipped': skipped,
+        'rss_growth_mib': round(max(0, peak_rss - rss_before) / 2 ** 20, 2),
+        'per_command': {
+            name: {'count': len(values), 'p50_ms': round(statistics.median(values), 2),
+                   'p95_ms': round(percentile(sorted(values), 0.95), 2)}
+            for name, values in sorted(latencies.items())
+        },
+    }
+
+
+def percentile(ordered: list, fraction: float) -> float:
+    return ordered[max(0, int(len(ordered) * fraction + 0.5) - 1)]
+
+
+def regressions(result: dict, baseline: dict, max_p95: float, max_calls: float, max_memory: float) -> list:
+    failures = []
+    latency_limit = max(baseline['p95_ms'] * (1 + max_p95 / 100), baseline['p95_ms'] + LATENCY_SLACK_MS)
+    if result['p95_ms'] > latency_limit:
+        failures.append(f"p95 latency {result['p95_ms']:.1f} ms vs {baseline['p95_ms']:.1f} ms "
+                        f"(up to {latency_limit:.1f} ms allowed)")
+    if result['upstream_calls'] > baseline['upstream_calls'] * (1 + max_calls / 100):
+        failures.append(f"upstream calls {result['upstream_calls']} vs {baseline['upstream_calls']} "
+                        f"(+{max_calls:g}% allowed)")
+    memory_limit = max(baseline['rss_growth_mib'] * (1 + max_memory / 100), baseline['rss_growth_mib'] + MEMORY_SLACK_MIB)
+    if result['rss_growth_mib'] > memory_limit:
+        failures.append(f"RSS growth {result['rss_growth_mib']:.1f} MiB vs {baseline['rss_growth_mib']:.1f} MiB "
+                        f"(up to {memory_limit:.1f} MiB allowed)")
+    return failures
+
+
+def print_result(result: dict, baseline: dict = None):
+    print(f"{result['commands']} commands in {result['seconds']:.1f}s: p50 {result['p50_ms']} ms, "
+          f"p95 {result['p95_ms']} ms, max {result['max_ms']} ms")
+    print(f"Upstream calls {result['upstream_calls']} ({result['unmatched']} not in the trace), "
+          f"RSS growth {result['rss_growth_mib']:.1f} MiB, {result['errors']} error replies, "
+          f"{result['skipped']} skipped")
+    print(f"{'command':<14} {'count':>6} {'p50':>9} {'p95':>9}" + (f" {'base p95':>9}" if baseline else ""))
+    for name, stats in result['per_command'].items():
+        line = f"{name:<14} {stats['count']:>6} {stats['p50_ms']:>7.1f}ms {stats['p95_ms']:>7.1f}ms"
+        if baseline and name in baseline.get('per_command', {}):
+            line += f" {baseline['per_command'][name]['p95_ms']:>7.1f}ms"
+        print(line)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded trace against a stub API")
+    parser.add_argument('trace')
+    parser.add_argument('--speed', type=float, default=1.0, help="arrival pace multiplier (default: recorded pace)")
+    parser.add_argument('--latency-scale', type=float, default=1.0, help="multiplier for recorded upstream latency")
+    parser.add_argument('--baseline', help="results to compare against")
+    parser.add_argument('--save-baseline', help="write the results here")
+    parser.add_argument('--max-p95', type=float, default=20, help="allowed p95 latency growth in percent")
+    parser.add_argument('--max-calls', type=float, default=5, help="allowed upstream call growth in percent")
+    parser.add_argument('--max-memory', type=float, default=25, help="allowed RSS growth increase in percent")
+    args = parser.parse_args()
+
+    commands, responses = load_trace(args.trace)
+    tenants = sorted({entry['tenant'] for entry in commands} | {key[0] for key in responses} | {DEFAULT})
+    stub = StubApi(responses, args.latency_scale)
+    runner = web.AppRunner(stub.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ.pop('TRACE_FILE', None)
+        os.environ.update(
+            GRIDKING_API_URL=f"http://127.0.0.1:{port}/{DEFAULT}/api",
+            GRIDKING_API_KEY='x' * 32,
+            DISCORD_GUILD_ID=str(GUILD_BASE),
+            TENANTS_FILE=write_tenants(workdir, port, [name for name in tenants if name != DEFAULT]),
+            TENANT_DATA_DIR=os.path.join(workdir, 'tenants'),
+            REPLICA_PATH=os.path.join(workdir, 'replica.sqlite3'),
+            ARCHIVE_DIR=os.path.join(workdir, 'archive'),
+            RESULTS_STATE_FILE=os.path.join(workdir, 'results_feed.json'),
+            LIVE_BOARD_STATE_FILE=os.path.join(workdir, 'live_boards.json'),
+            MEMSTATS_FILE=os.path.join(workdir, 'memstats.jsonl'),
+            LOG_FILE=os.path.join(workdir, 'bot.log'),
+        )
+        import bot as bot_module
+        logging.getLogger('gridking_bot').setLevel(logging.ERROR)
+
+        # Cogs and sessions only: background loops would add upstream calls of their own
+        bot = bot_module.GridKingBot()
+        bot.tenants.open()
+        for extension in bot_module.EXTENSIONS:
+            await bot.load_extension(extension)
+        await bot.for_each_tenant(bot._sync_replica)
+
+        print(f"Replaying {len(commands)} commands from {args.trace} at {args.speed:g}x "
+              f"({len(tenants)} tenant{'s' if len(tenants) > 1 else ''})")
+        result = await replay(bot, stub, commands, args.speed)
+        await bot.close()
+    await runner.cleanup()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_result(result, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if baseline:
+        if baseline.get('speed') != args.speed:
+            print(f"Warning: the baseline was replayed at {baseline.get('speed')}x, this run at {args.speed:g}x")
+        failures = regressions(result, baseline, args.max_p95, args.max_calls, args.max_memory)
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+        if failures:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
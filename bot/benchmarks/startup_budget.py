@@ -0,0 +1,109 @@
+"""
+Startup time budget check
+
+Starts a fresh interpreter (so imports are cold), builds the bot and runs
+setup_hook without logging in to Discord, then prints the per-phase
+breakdown recorded by utils.startup. Exits non-zero if process start to
+the end of setup_hook exceeds the budget, or if a heavy dependency that is
+meant to be imported on first use (NumPy, matplotlib) was loaded during
+startup or by the background tasks in the moment after it (while the
+gateway would be connecting), so it can run as a regression check in CI.
+
+Usage: python benchmarks/startup_budget.py [budget_seconds] [runs]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+DEFAULT_BUDGET = 2.0
+
+# Modules that must not be imported before their first use
+LAZY_MODULES = ('numpy', 'matplotlib')
+
+# How long the lazy modules must stay unloaded after setup_hook
+SETTLE_SECONDS = 1.0
+
+CHILD = '''
+import asyncio, json, sys
+
+import bot
+
+
+async def main():
+    instance = bot.GridKingBot()
+    await instance.setup_hook()
+    report = instance.startup.snapshot()
+    report['loaded'] = [name for name in LAZY_MODULES if name in sys.modules]
+    # Background tasks started by setup_hook get their first iterations in
+    await asyncio.sleep(SETTLE_SECONDS)
+    report['loaded_after'] = [name for name in LAZY_MODULES if name in sys.modules]
+    await instance.close()
+    print(json.dumps(report))
+
+LAZY_MODULES = %r
+SETTLE_SECONDS = %r
+asyncio.run(main())
+'''
+
+
+def run_once(workdir: str) -> dict:
+    env = dict(
+        os.environ,
+        DISCORD_GUILD_ID='0',
+        GRIDKING_API_URL='http://localhost/api',
+        GRIDKING_API_KEY='x' * 32,
+        LOG_FILE=os.path.join(workdir, 'bot.log'),
+        ARCHIVE_DIR=os.path.join(workdir, 'archive'),
+        REPLICA_PATH=os.path.join(workdir, 'replica.sqlite3'),
+        INCIDENT_INDEX_PATH=os.path.join(workdir, 'incidents.sqlite3'),
+        RESULTS_STATE_FILE=os.path.join(workdir, 'results_feed.json'),
+        LIVE_BOARD_STATE_FILE=os.path.join(workdir, 'live_boards.json'),
+        RACE_CONTROL_STATE_FILE=os.path.join(workdir, 'race_control.json'),
+        TENANT_DATA_DIR=os.path.join(workdir, 'tenants'),
+        MEMSTATS_FILE=os.path.join(workdir, 'memstats.jsonl'),
+        TENANTS_FILE='',
+        TRACE_FILE='',
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD % (LAZY_MODULES, SETTLE_SECONDS)],
+        cwd=BOT_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as workdir:
+        reports = [run_once(workdir) for _ in range(runs)]
+
+    # The fastest run is the least disturbed by other load on the machine
+    best = min(reports, key=lambda report: sum(report['phases_ms'].values()))
+    total = sum(best['phases_ms'].values())
+    print(f'Startup to end of setup_hook (best of {runs}): {total:.0f} ms, budget {budget * 1000:.0f} ms')
+    for phase, ms in best['phases_ms'].items():
+        print(f'  {phase:<20} {ms:8.1f} ms')
+
+    failed = False
+    if total > budget * 1000:
+        print('FAIL: over the startup budget')
+        failed = True
+    loaded = sorted(set(name for report in reports for name in report['loaded']))
+    if loaded:
+        print(f"FAIL: imported during startup: {', '.join(loaded)}")
+        failed = True
+    loaded_after = sorted(set(name for report in reports for name in report['loaded_after']) - set(loaded))
+    if loaded_after:
+        print(f"FAIL: imported by background tasks within {SETTLE_SECONDS:g}s of setup_hook: {', '.join(loaded_after)}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Multi-tenant load test: one noisy league against many quiet ones
+
+Starts a local stub API that serves one league per path prefix, writes a
+tenants file mapping a guild to each, and builds the real bot with it
+(without logging in). One tenant is noisy: its API answers slowly and it is
+flooded with concurrent requests, while every other tenant issues a steady
+stream of uncached standings requests. The same load is run twice: with the
+per-tenant schedulers and rate budgets, and with one scheduler shared by all
+tenants (a single pool, as before tenants existed). Prints the quiet
+tenants' latency and what happened to the noisy tenant's requests, checks
+that no tenant ever sees another league's data (including from cache), and
+reports the memory cost per tenant.
+
+Usage: python benchmarks/tenant_load.py [tenants] [requests_per_tenant] [flood] [noisy_latency_s]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.memstats import rss_bytes  # noqa: E402
+from utils.scheduler import RequestScheduler  # noqa: E402
+from utils.tenants import use_tenant  # noqa: E402
+
+QUIET_LATENCY = 0.02
+
+NOISY = 't0'
+
+
+def make_app(noisy_latency: float, in_flight: dict) -> web.Application:
+    async def handle(request: web.Request) -> web.Response:
+        league = request.match_info['league']
+        in_flight[league] = in_flight.get(league, 0) + 1
+        in_flight['peak_' + league] = max(in_flight.get('peak_' + league, 0), in_flight[league])
+        try:
+            await asyncio.sleep(noisy_latency if league == NOISY else QUIET_LATENCY)
+        finally:
+            in_flight[league] -= 1
+        rows = [{'id': i, 'username': f"{league} driver {i}", 'total_points': 100 - i} for i in range(1, 21)]
+        return web.json_response({'season': {'name': f"League {league}", 'year': 2030}, 'standings': rows})
+
+    app = web.Application()
+    app.router.add_get('/{league}/api/standings', handle)
+    return app
+
+
+def write_tenants(workdir: str, port: int, tenants: int) -> str:
+    path = os.path.join(workdir, 'tenants.json')
+    entries = [{
+        'name': f"t{i}",
+        'api_url': f"http://127.0.0.1:{port}/t{i}/api",
+        'api_key': 'x' * 32,
+        'guilds': [1000 + i],
+        'connections': 2,
+        'api_rate': 600,
+    } for i in range(tenants)]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f)
+    return path
+
+
+async def request_as(bot, tenant, **kwargs):
+    with use_tenant(tenant):
+        start = time.perf_counter()
+        data = await bot.api_request('standings', **kwargs)
+        return data, time.perf_counter() - start
+
+
+async def run_load(bot, requests: int, flood: int) -> dict:
+    tenants = list(bot.tenants)
+    noisy = bot.tenants.get(NOISY)
+    quiet = [tenant for tenant in tenants if tenant.name.startswith('t') and tenant is not noisy]
+    latencies = []
+    wrong = 0
+
+    async def steady(tenant):
+        nonlocal wrong
+        for _ in range(requests):
+            data, seconds = await request_as(bot, tenant, use_cache=False)
+            if data is None:
+                latencies.append(float('inf'))
+            else:
+                latencies.append(seconds)
+                wrong += data.season_name != f"League {tenant.name}"
+            await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    flood_tasks = [asyncio.ensure_future(request_as(bot, noisy, use_cache=False)) for _ in range(flood)]
+    await asyncio.gather(*(steady(tenant) for tenant in quiet))
+    quiet_done = time.perf_counter() - start
+    noisy_results = await asyncio.gather(*flood_tasks)
+
+    served = sorted(seconds for seconds in latencies if seconds != float('inf'))
+    return {
+        'quiet_requests': len(latencies),
+        'quiet_failed': len(latencies) - len(served),
+        'quiet_p50_ms': statistics.median(served) * 1000 if served else None,
+        'quiet_p95_ms': served[int(len(served) * 0.95) - 1] * 1000 if served else None,
+        'quiet_max_ms': served[-1] * 1000 if served else None,
+        'quiet_seconds': quiet_done,
+        'noisy_served': sum(1 for data, _ in noisy_results if data is not None),
+        'noisy_dropped': sum(1 for data, _ in noisy_results if data is None),
+        'wrong_league': wrong,
+    }
+
+
+def print_run(label: str, result: dict):
+    print(f"{label}:")
+    print(f"  quiet tenants: {result['quiet_requests']} requests in {result['quiet_seconds']:.1f}s, "
+          f"p50 {result['quiet_p50_ms']:.0f} ms, p95 {result['quiet_p95_ms']:.0f} ms, "
+          f"max {result['quiet_max_ms']:.0f} ms, {result['quiet_failed']} failed")
+    print(f"  noisy tenant:  {result['noisy_served']} served, {result['noisy_dropped']} dropped")
+    print(f"  responses from another league: {result['wrong_league']}")
+
+
+async def check_cache_partitions(bot) -> int:
+    """Cached standings must stay within their tenant"""
+    leaks = 0
+    tenants = [tenant for tenant in bot.tenants if tenant.name.startswith('t') and tenant.name != NOISY]
+    for _ in range(2):
+        for tenant in tenants:
+            data, _ = await request_as(bot, tenant)
+            leaks += data is None or data.season_name != f"League {tenant.name}"
+    leaks += sum(len(tenant.api_cache) != 1 for tenant in tenants)
+    return leaks
+
+
+async def main():
+    tenants = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    flood = int(sys.argv[3]) if len(sys.argv) > 3 else 400
+    noisy_latency = float(sys.argv[4]) if len(sys.argv) > 4 else 1.0
+
+    in_flight = {}
+    runner = web.AppRunner(make_app(noisy_latency, in_flight))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ.update(
+            GRIDKING_API_URL=f"http://127.0.0.1:{port}/default/api",
+            GRIDKING_API_KEY='x' * 32,
+            TENANTS_FILE=write_tenants(workdir, port, tenants),
+            TENANT_DATA_DIR=os.path.join(workdir, 'tenants'),
+            REPLICA_PATH=os.path.join(workdir, 'replica.sqlite3'),
+            ARCHIVE_DIR=os.path.join(workdir, 'archive'),
+            LOG_FILE=os.path.join(workdir, 'bot.log'),
+        )
+        import bot as bot_module
+        logging.getLogger('gridking_bot').setLevel(logging.ERROR)
+
+        rss_before, _ = rss_bytes()
+        bot = bot_module.GridKingBot()
+        bot.tenants.open()
+        rss_after, _ = rss_bytes()
+
+        print(f"{len(bot.tenants)} tenants ({tenants} from the tenants file), "
+              f"{requests} uncached requests per quiet tenant, flood of {flood} on {NOISY} "
+              f"({noisy_latency:g}s upstream latency, {QUIET_LATENCY * 1000:.0f} ms for the others)")
+        if rss_before and rss_after:
+            print(f"Memory for the tenants: {(rss_after - rss_before) / 2 ** 20:.1f} MiB, "
+                  f"~{(rss_after - rss_before) / len(bot.tenants) / 1024:.0f} KiB per tenant")
+
+        isolated = await run_load(bot, requests, flood)
+        print_run("Per-tenant pools, schedulers and budgets", isolated)
+        print(f"  peak concurrent upstream requests from {NOISY}: {in_flight.get('peak_' + NOISY, 0)}")
+
+        # One scheduler for everyone, as with a single shared session
+        shared = RequestScheduler()
+        originals = {tenant.name: tenant.scheduler for tenant in bot.tenants}
+        for tenant in bot.tenants:
+            tenant.scheduler = shared
+        in_flight.clear()
+        pooled = await run_load(bot, requests, flood)
+        print_run("One shared scheduler (single pool)", pooled)
+        for tenant in bot.tenants:
+            tenant.scheduler = originals[tenant.name]
+
+        leaks = await check_cache_partitions(bot)
+        print(f"Cache partition check: {'ok' if not leaks else f'{leaks} leaks'}")
+
+        await bot.tenants.close()
+    await runner.cleanup()
+
+    sys.exit(1 if leaks or isolated['wrong_league'] or pooled['wrong_league'] else 0)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,160 @@
+"""
+Bytes on the wire and decode time per API response format
+
+Starts a local stub API that negotiates like api/middleware/encoding.php:
+JSON or MessagePack from Accept, then br, gzip or deflate from
+Accept-Encoding for bodies of 1 KiB or more. It serves a large ``drivers``
+list and a ``races/<id>`` classification. Each is fetched through
+``HttpSource`` once per format and coding, and the benchmark prints per
+response:
+- the bytes on the wire
+- the bytes once decompressed
+- the bot's decompress + decode time
+- the end-to-end p50 latency
+
+It also checks that every format yields the same models as plain JSON.
+Formats whose package (msgpack, Brotli) isn't installed are skipped.
+
+Usage: python benchmarks/wire_formats.py [drivers] [requests]
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+import zlib
+from types import SimpleNamespace
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.datasource import HttpSource, _codec  # noqa: E402
+from utils.models import parse_payload  # noqa: E402
+from utils.notifier import RateBucket  # noqa: E402
+
+COMPRESSION_MIN_BYTES = 1024
+
+# (label, Accept, Accept-Encoding)
+FORMATS = (
+    ('json', 'application/json', 'identity'),
+    ('json+gzip', 'application/json', 'gzip'),
+    ('json+br', 'application/json', 'br'),
+    ('msgpack', 'application/msgpack', 'identity'),
+    ('msgpack+gzip', 'application/msgpack', 'gzip'),
+    ('msgpack+br', 'application/msgpack', 'br'),
+)
+
+
+def make_payloads(drivers: int) -> dict:
+    # Numbers as strings, as PDO returns them through json_encode
+    rows = [{
+        'id': str(i), 'user_id': str(i + 100), 'username': f"driver_{i:05d}", 'driver_number': str(i % 99 + 1),
+        'team_id': str(i % 20 + 1), 'team_name': f"Team {i % 20 + 1}", 'platform': 'PC', 'country': 'GBR',
+        'bio': f"Sim racer since 20{i % 20:02d}. Prefers long stints and wet races.",
+        'verified': '1', 'created_at': '2030-01-04 18:00:00',
+    } for i in range(1, drivers + 1)]
+    results = [{
+        'id': str(1000 + p), 'race_id': '42', 'driver_id': str(p), 'position': str(p),
+        'points': str(max(0, 26 - 2 * p)), 'fastest_lap': '0', 'pole_position': '1' if p == 1 else '0',
+        'dnf': '0', 'dnf_reason': None, 'grid_position': str(p), 'username': f"driver_{p:05d}",
+        'driver_number': str(p), 'team_name': f"Team {p % 20 + 1}",
+    } for p in range(1, 41)]
+    race = {'id': '42', 'season_id': '3', 'name': 'Monza GP', 'track': 'Monza', 'race_date': '2030-09-01 18:00:00',
+            'format': 'Feature', 'laps': '30', 'status': 'completed',
+            'description': "Full race distance, mandatory pit stop. " * 4, 'results': results}
+    return {'drivers': rows, 'races/42': race}
+
+
+def accepts(header: str, token: str) -> bool:
+    return any(part.split(';')[0].strip().lower() == token for part in header.split(','))
+
+
+def make_app(payloads: dict) -> web.Application:
+    msgpack, brotli = _codec('msgpack'), _codec('brotli', 'brotlicffi')
+
+    async def handle(request: web.Request) -> web.Response:
+        data = payloads[request.match_info['path']]
+        headers = {'Vary': 'Accept, Accept-Encoding'}
+        if msgpack and accepts(request.headers.get('Accept', ''), 'application/msgpack'):
+            body, content_type = msgpack.packb(data), 'application/msgpack'
+        else:
+            body, content_type = json.dumps(data).encode(), 'application/json'
+        coding = request.headers.get('Accept-Encoding', '')
+        if len(body) >= COMPRESSION_MIN_BYTES:
+            if brotli and accepts(coding, 'br'):
+                body, headers['Content-Encoding'] = brotli.compress(body, quality=5), 'br'
+            elif accepts(coding, 'gzip'):
+                body, headers['Content-Encoding'] = gzip.compress(body, 6), 'gzip'
+            elif accepts(coding, 'deflate'):
+                body, headers['Content-Encoding'] = zlib.compress(body, 6), 'deflate'
+        return web.Response(body=body, content_type=content_type, headers=headers)
+
+    app = web.Application()
+    app.router.add_get('/api/{path:.*}', handle)
+    return app
+
+
+def available(label: str) -> bool:
+    if 'msgpack' in label and _codec('msgpack') is None:
+        return False
+    return not label.endswith('+br') or _codec('brotli', 'brotlicffi') is not None
+
+
+async def measure(session, base_url: str, label: str, accept: str, coding: str, endpoint: str, requests: int):
+    tenant = SimpleNamespace(name='bench', session=session, api_base_url=base_url, budget=RateBucket(10 ** 6, 60.0))
+    source = HttpSource(tenant)
+    source.headers = {'Accept': accept, 'Accept-Encoding': coding}
+    timings = []
+    data = None
+    for _ in range(requests):
+        start = time.perf_counter()
+        data = await source.fetch(endpoint)
+        timings.append((time.perf_counter() - start) * 1000)
+    (stats,) = source.transfer.values()
+    n = stats['responses']
+    return parse_payload(endpoint, data), {
+        'wire_bytes': stats['wire_bytes'] / n,
+        'decoded_bytes': stats['decoded_bytes'] / n,
+        'decode_ms': stats['decode_ms'] / n,
+        'p50_ms': statistics.median(timings),
+    }
+
+
+async def main():
+    drivers = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    runner = web.AppRunner(make_app(make_payloads(drivers)))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/api"
+
+    mismatches = 0
+    async with aiohttp.ClientSession(auto_decompress=False) as session:
+        for endpoint in ('drivers', 'races/42'):
+            print(f"{endpoint} ({drivers} drivers)" if endpoint == 'drivers' else endpoint)
+            print(f"  {'format':<14} {'on the wire':>12} {'decoded':>10} {'decode':>9} {'p50':>9}  same models")
+            reference = None
+            for label, accept, coding in FORMATS:
+                if not available(label):
+                    print(f"  {label:<14} skipped (package not installed)")
+                    continue
+                models, stats = await measure(session, base_url, label, accept, coding, endpoint, requests)
+                reference = models if reference is None else reference
+                same = models == reference
+                mismatches += not same
+                print(f"  {label:<14} {stats['wire_bytes'] / 1024:>9.1f} KB {stats['decoded_bytes'] / 1024:>7.1f} KB "
+                      f"{stats['decode_ms']:>7.2f}ms {stats['p50_ms']:>7.2f}ms  {'yes' if same else 'NO'}")
+
+    await runner.cleanup()
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
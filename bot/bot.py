@@ -18,60 +18,165 @@ import discord
 from discord.ext import commands, tasks
 import aiohttp
 import asyncio
+import functools
 import json
 import os
 import re
+import time
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Dict, Sequence
 import logging
 from urllib.parse import quote
 
-# Configure logging with security considerations
-logging.basicConfig(
-    level=logging.INFO, 
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler()
-    ]
-)
+from utils.charts import ChartRenderer
+from utils.dedupe import ResponseDeduper
+from utils.logging_config import configure_logging
+from utils.live_board import LiveBoard
+from utils.loop_monitor import LoopMonitor
+from utils.memstats import MemoryStats
+from utils.models import Race, parse_payload
+from utils.notifier import PENALTY, REMINDER, RESULTS, NotificationDispatcher
+from utils.predictor import ChampionshipPredictor
+from utils.race_control import RaceControlFeed
+from utils.results_feed import ResultsPublisher
+from utils.scheduler import BACKGROUND, INTERACTIVE, NOTIFICATION, DeadlineExceeded
+from utils.startup import StartupProfiler
+from utils.tenants import DEFAULT, Tenant, TenantCommandTree, TenantRegistry, current_tenant, use_tenant
+from utils.trace import TraceRecorder
+from utils.warmer import CacheWarmer
+
 logger = logging.getLogger('gridking_bot')
 
-# Security filters for logging
-class SensitiveDataFilter(logging.Filter):
-    def filter(self, record):
-        # Remove potential sensitive data from logs
-        if hasattr(record, 'msg'):
-            record.msg = re.sub(r'(token|key|password)["\s=:]+\S+', r'\1=***', str(record.msg), flags=re.IGNORECASE)
-        return True
+# Extensions loaded at startup; heavy dependencies (NumPy, matplotlib) are imported on first use
+EXTENSIONS = ('commands.standings', 'commands.races', 'commands.drivers', 'commands.stats', 'commands.exports',
+              'commands.stewarding', 'commands.admin')
 
-logger.addFilter(SensitiveDataFilter())
+# Seconds after the gateway is ready before the first archive sync opens the archive
+ARCHIVE_SYNC_DELAY = 60
+
+# Projected field names: a column, or a nested row's column ('results.points')
+FIELD_PATTERN = re.compile(r'^[a-z_]+(\.[a-z_]+)?$')
 
 class GridKingBot(commands.Bot):
     def __init__(self):
+        self.startup = StartupProfiler()
         intents = discord.Intents.default()
         intents.message_content = True
         
         super().__init__(
             command_prefix='!',
             intents=intents,
-            description='Grid King League Management Bot'
+            description='Grid King League Management Bot',
+            tree_cls=TenantCommandTree
         )
         
         # Configuration with validation
-        self.api_base_url = self._validate_url(os.getenv('GRIDKING_API_URL', 'http://localhost/api'))
-        self.api_key = self._validate_api_key(os.getenv('GRIDKING_API_KEY', ''))
         self.guild_id = self._validate_id(os.getenv('DISCORD_GUILD_ID', '0'))
         self.results_channel_id = self._validate_id(os.getenv('DISCORD_RESULTS_CHANNEL', '0'))
         self.notifications_channel_id = self._validate_id(os.getenv('DISCORD_NOTIFICATIONS_CHANNEL', '0'))
+        reminder_routes = self._validate_routes(os.getenv('DISCORD_REMINDER_ROUTES', ''), self.notifications_channel_id)
+        
+        # Hot read routes can be served straight from the league database
+        # instead of the API (see utils.datasource)
+        database = None
+        if os.getenv('DATA_SOURCE', 'http').lower() == 'sql':
+            database = {
+                'host': os.getenv('DB_HOST', 'db'),
+                'port': int(os.getenv('DB_PORT', '3306')),
+                'database': os.getenv('DB_NAME', 'racing_league'),
+                'user': os.getenv('DB_USER', 'racing_user'),
+                'password': os.getenv('DB_PASS', ''),
+            }
+        
+        # Leagues served by this process; each has its own HTTP pool, request
+        # scheduler, caches and replica (see utils.tenants). The default
+        # tenant is the league configured by GRIDKING_API_URL/GRIDKING_API_KEY.
+        default = Tenant(
+            self, DEFAULT,
+            self._validate_url(os.getenv('GRIDKING_API_URL', 'http://localhost/api')),
+            self._validate_api_key(os.getenv('GRIDKING_API_KEY', '')),
+            guild_ids=[self.guild_id] if self.guild_id else [],
+            reminder_routes=reminder_routes,
+            replica_path=os.getenv('REPLICA_PATH', 'data/replica.sqlite3'),
+            incident_index_path=os.getenv('INCIDENT_INDEX_PATH', 'data/incidents.sqlite3'),
+            archive_dir=os.getenv('ARCHIVE_DIR', 'data/archive'),
+            database=database,
+            response_format='msgpack' if os.getenv('API_FORMAT', 'json').lower() == 'msgpack' else 'json'
+        )
+        self.tenants = TenantRegistry.load(self, os.getenv('TENANTS_FILE', ''), default,
+                                           os.getenv('TENANT_DATA_DIR', 'data/tenants'))
         
-        # HTTP session for API calls
-        self.session = None
+        # Event loop lag and blocking-call detection (/botstatus)
+        self.loop_monitor = LoopMonitor()
         
         # Rate limiting
         self.rate_limits = {}
         self.max_requests_per_minute = 30
         
+        # Cache warming and renderers (the warmer only warms the default tenant)
+        self.warmer = CacheWarmer(self)
+        self.charts = ChartRenderer()
+        self.predictor = ChampionshipPredictor()
+        
+        # Notification fan-out: extra channels/threads per notification kind
+        self.notifier = NotificationDispatcher(self, {
+            REMINDER: reminder_routes,
+            RESULTS: self._validate_routes(os.getenv('DISCORD_RESULTS_ROUTES', ''), self.results_channel_id),
+            PENALTY: self._validate_routes(os.getenv('DISCORD_PENALTY_ROUTES', ''), self.notifications_channel_id),
+        })
+        self.results_feed = ResultsPublisher(self, os.getenv('RESULTS_STATE_FILE', 'data/results_feed.json'))
+        self.live_board = LiveBoard(self, os.getenv('LIVE_BOARD_STATE_FILE', 'data/live_boards.json'))
+        self.race_control = RaceControlFeed(
+            self,
+            self._validate_id(os.getenv('DISCORD_RACE_CONTROL_CHANNEL', '0')),
+            os.getenv('RACE_CONTROL_STATE_FILE', 'data/race_control.json')
+        )
+        
+        # Periodic memory reports (/memstats) exported as JSON lines
+        self.memstats = MemoryStats(self, os.getenv('MEMSTATS_FILE', 'data/memstats.jsonl'))
+        
+        # Anonymised command/response trace for replays (off unless TRACE_FILE is set)
+        self.trace = TraceRecorder.from_env()
+        
+        # Identical commands in one channel share an answer (see utils.dedupe)
+        self.dedupe = ResponseDeduper(os.getenv('DEDUPE_COMMANDS', ''))
+        self.startup.mark('init')
+        
+    @property
+    def tenant(self) -> Tenant:
+        """Tenant of the current interaction or background job"""
+        return current_tenant.get() or self.tenants.default
+    
+    # Per-tenant state, resolved for the current tenant
+    @property
+    def api_cache(self):
+        return self.tenant.api_cache
+    
+    @property
+    def embed_cache(self):
+        return self.tenant.embed_cache
+    
+    @property
+    def scheduler(self):
+        return self.tenant.scheduler
+    
+    @property
+    def replica(self):
+        return self.tenant.replica
+    
+    @property
+    def incidents(self):
+        return self.tenant.incidents
+    
+    @property
+    def driver_batch(self):
+        return self.tenant.driver_batch
+    
+    @property
+    def archive(self):
+        """All-time results archive, opened on first use (imports NumPy)"""
+        return self.tenant.archive
+    
     def _validate_url(self, url: str) -> str:
         """Validate and sanitize URL"""
         if not url:
@@ -100,9 +205,18 @@ class GridKingBot(commands.Bot):
         try:
             return int(id_str) if id_str and id_str != '0' else 0
         except ValueError:
-            logger.error(f"Invalid Discord ID: {id_str}")
+            logger.error("Invalid Discord ID: %s", id_str)
             return 0
     
+    def _validate_routes(self, ids: str, default: int) -> List[int]:
+        """Validate a comma-separated list of channel/thread IDs"""
+        routes = [default] if default else []
+        for id_str in ids.split(','):
+            route_id = self._validate_id(id_str.strip())
+            if route_id and route_id not in routes:
+                routes.append(route_id)
+        return routes
+    
     async def _check_rate_limit(self, user_id: int) -> bool:
         """Check if user is rate limited"""
         now = datetime.now()
@@ -125,119 +239,230 @@ class GridKingBot(commands.Bot):
         
     async def setup_hook(self):
         """Initialize the bot"""
-        # Create HTTP session
-        self.session = aiohttp.ClientSession(
-            headers={
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-        )
+        self.startup.mark('login')
+        
+        # Create an HTTP session (connection pool) per tenant
+        self.tenants.open()
+        
+        self.startup.mark('session')
         
         # Load cogs
-        await self.load_extension('commands.standings')
-        await self.load_extension('commands.races')
-        await self.load_extension('commands.drivers')
-        await self.load_extension('commands.stats')
+        for extension in EXTENSIONS:
+            await self.load_extension(extension)
+            self.startup.mark(extension)
         
         # Start background tasks
+        self.loop_monitor.start()
         self.check_upcoming_races.start()
+        self.sync_archive.start()
+        self.sync_replica.start()
+        self.sync_incidents.start()
+        self.warmer.start()
+        self.memstats.start()
+        self.live_board.start()
+        if self.notifier.routes[RESULTS]:
+            self.results_feed.start()
+        if self.race_control.channel_id:
+            self.race_control.start()
+        if self.trace:
+            self.trace.start()
+        self.startup.mark('tasks')
         
         logger.info("Bot setup completed")
     
     async def on_ready(self):
         """Bot is ready and connected"""
-        logger.info(f'{self.user} has connected to Discord!')
+        logger.info('%s has connected to Discord!', self.user)
+        self.startup.ready()
         
-        # Sync slash commands
+        # Sync slash commands (globally when several leagues share the bot)
         try:
-            guild = discord.Object(id=self.guild_id) if self.guild_id else None
+            guild = discord.Object(id=self.guild_id) if self.guild_id and len(self.tenants) == 1 else None
             synced = await self.tree.sync(guild=guild)
-            logger.info(f'Synced {len(synced)} command(s)')
+            logger.info('Synced %d command(s)', len(synced))
         except Exception as e:
-            logger.error(f'Failed to sync commands: {e}')
+            logger.error('Failed to sync commands: %s', e)
     
     async def close(self):
         """Clean shutdown"""
-        if self.session:
-            await self.session.close()
+        self.loop_monitor.stop()
+        self.memstats.stop()
+        self.live_board.stop()
+        self.warmer.stop()
+        self.results_feed.stop()
+        self.race_control.stop()
+        self.notifier.stop()
+        if self.trace:
+            self.trace.stop()
+        self.charts.shutdown()
+        self.predictor.shutdown()
+        await self.tenants.close()
         await super().close()
     
-    async def api_request(self, endpoint: str, method: str = 'GET') -> Optional[Dict]:
-        """Make secure API request to Grid King"""
-        if not self.session:
+    async def api_request(self, endpoint: str, method: str = 'GET', use_cache: bool = True,
+                          refresh: bool = False, cache_ttl: Optional[float] = None,
+                          priority: str = INTERACTIVE, timeout: float = 10,
+                          fields: Optional[Sequence[str]] = None, limit: Optional[int] = None) -> Optional[Any]:
+        """Make secure API request to Grid King
+        
+        Responses are converted to models (see utils.models) before being
+        returned. GET responses are cached; ``refresh`` skips the cache lookup
+        but still stores the fresh response (used by the cache warmer).
+        Cache misses wait for a slot in ``priority``'s class (see
+        utils.scheduler) and are dropped if that takes past its deadline.
+        ``timeout`` (seconds) covers the whole request; long polls raise it.
+        ``fields`` and ``limit`` are sent as ``fields=``/``limit=`` so the API
+        only selects the columns (``results.position`` for nested rows) and
+        rows the caller renders; they are part of the cache key.
+        The request goes to the current tenant's data source (its API, or its
+        database for hot read routes; see utils.datasource) through its own
+        cache, scheduler and rate budget (see utils.tenants).
+        """
+        tenant = self.tenant
+        if not tenant.session:
             logger.error("HTTP session not initialized")
             return None
         
-        if not self.api_key:
-            logger.error("API key not configured")
+        if not tenant.api_key:
+            logger.error("API key not configured for tenant %s", tenant.name)
             return None
         
         # Sanitize endpoint
         endpoint = endpoint.lstrip('/')
-        if not re.match(r'^[a-zA-Z0-9/_\-?&=]*$', endpoint):
-            logger.error(f"Invalid endpoint format: {endpoint}")
+        if not re.match(r'^[a-zA-Z0-9/_\-?&=,]*$', endpoint):
+            logger.error("Invalid endpoint format: %s", endpoint)
             return None
         
-        url = f"{self.api_base_url}/{endpoint}"
+        params = []
+        if fields:
+            if not all(FIELD_PATTERN.match(name) for name in fields):
+                logger.error("Invalid fields for %s: %s", endpoint, fields)
+                return None
+            params.append(f"fields={','.join(fields)}")
+        if limit is not None:
+            params.append(f"limit={int(limit)}")
+        if params:
+            endpoint += ('&' if '?' in endpoint else '?') + '&'.join(params)
+        
+        cacheable = use_cache and method == 'GET'
+        if cacheable and not refresh:
+            cached = tenant.api_cache.get(endpoint)
+            if cached is not None:
+                return cached
         
         try:
-            timeout = aiohttp.ClientTimeout(total=10)  # 10 second timeout
-            async with self.session.request(method, url, timeout=timeout) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data
-                elif response.status == 401:
-                    logger.error("API authentication failed")
-                    return None
-                elif response.status == 429:
-                    logger.warning("API rate limit exceeded")
-                    return None
-                else:
-                    logger.error(f'API request failed: {response.status}')
-                    return None
+            async with tenant.scheduler.slot(priority):
+                start = time.perf_counter()
+                data = await tenant.source.fetch(endpoint, method, timeout)
+            if self.trace:
+                self.trace.api(tenant.name, endpoint, method, data, (time.perf_counter() - start) * 1000)
+            if data is None:
+                return None
+            try:
+                data = parse_payload(endpoint, data)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error('Invalid API payload for %s: %s', endpoint, type(e).__name__)
+                return None
+            if cacheable:
+                tenant.api_cache.set(endpoint, data, ttl=cache_ttl)
+            return data
+        except DeadlineExceeded:
+            logger.warning('Dropped %s API request past its deadline: %s', priority, endpoint)
+            return None
         except asyncio.TimeoutError:
-            logger.error(f'API request timeout: {url}')
+            logger.error('API request timeout: %s %s', tenant.name, endpoint)
             return None
         except aiohttp.ClientError as e:
-            logger.error(f'API request error: {type(e).__name__}')
+            logger.error('API request error: %s', type(e).__name__)
             return None
         except Exception as e:
-            logger.error(f'Unexpected API error: {type(e).__name__}')
-            return None
+            logger.error('Unexpected API error: %s', type(e).__name__)
             return None
     
+    async def for_each_tenant(self, job):
+        """Run ``job(tenant)`` for every tenant concurrently, each as its own tenant"""
+        async def run(tenant: Tenant):
+            with use_tenant(tenant):
+                await job(tenant)
+        
+        await asyncio.gather(*(run(tenant) for tenant in self.tenants))
+    
     @tasks.loop(hours=1)
     async def check_upcoming_races(self):
-        """Check for upcoming races and send reminders"""
+        """Check every tenant's upcoming races and send reminders"""
+        await self.for_each_tenant(self._check_upcoming_races)
+    
+    async def _check_upcoming_races(self, tenant: Tenant):
         try:
-            races = await self.api_request('races/upcoming')
+            if not tenant.reminder_routes:
+                return
+            races = await self.api_request('races/upcoming', priority=NOTIFICATION)
             if not races:
                 return
             
             now = datetime.utcnow()
             
             for race in races[:3]:  # Check next 3 races
-                race_date = datetime.fromisoformat(race['race_date'].replace('Z', '+00:00'))
-                time_until = race_date - now
+                time_until = race.race_date - now
                 
-                # Send reminder 24 hours before race
-                if timedelta(hours=23, minutes=30) <= time_until <= timedelta(hours=24, minutes=30):
-                    await self.send_race_reminder(race, time_until)
-                    
-                # Send reminder 1 hour before race  
-                elif timedelta(minutes=30) <= time_until <= timedelta(hours=1, minutes=30):
-                    await self.send_race_reminder(race, time_until, urgent=True)
+                # Reminders at each of the tenant's lead times (24h and 1h by default)
+                hours = tenant.reminder_due(time_until.total_seconds())
+                if hours is not None:
+                    await self.send_race_reminder(race, time_until, urgent=hours <= 1)
                     
         except Exception as e:
-            logger.error(f'Error checking upcoming races: {e}')
+            logger.error('Error checking upcoming races for tenant %s: %s', tenant.name, e)
     
-    async def send_race_reminder(self, race: Dict, time_until: timedelta, urgent: bool = False):
-        """Send race reminder to notifications channel"""
-        if not self.notifications_channel_id:
-            return
-            
-        channel = self.get_channel(self.notifications_channel_id)
-        if not channel:
+    @tasks.loop(hours=1)
+    async def sync_archive(self):
+        """Append newly published results to every tenant's all-time archive"""
+        await self.for_each_tenant(self._sync_archive)
+    
+    @sync_archive.before_loop
+    async def before_sync_archive(self):
+        # Opening the archive imports NumPy; leave the connect and first commands alone
+        await self.wait_until_ready()
+        await asyncio.sleep(ARCHIVE_SYNC_DELAY)
+    
+    async def _sync_archive(self, tenant: Tenant):
+        try:
+            archive = await tenant.open_archive()
+            added = await archive.sync(functools.partial(self.api_request, priority=BACKGROUND))
+            if added:
+                logger.info('Archived %d new results for tenant %s (%d total)', added, tenant.name, archive.rows)
+        except Exception as e:
+            logger.error('Error syncing results archive for tenant %s: %s', tenant.name, e)
+    
+    @tasks.loop(minutes=1)
+    async def sync_replica(self):
+        """Apply reference data changes to every tenant's local replica"""
+        await self.for_each_tenant(self._sync_replica)
+    
+    async def _sync_replica(self, tenant: Tenant):
+        try:
+            rows = await tenant.replica.sync(functools.partial(self.api_request, priority=BACKGROUND))
+            if rows:
+                logger.debug('Replica for tenant %s applied %d changed rows', tenant.name, rows)
+        except Exception as e:
+            logger.error('Error syncing replica for tenant %s: %s', tenant.name, e)
+    
+    @tasks.loop(minutes=1)
+    async def sync_incidents(self):
+        """Index stewarding records changed since the last sync for every tenant"""
+        await self.for_each_tenant(self._sync_incidents)
+    
+    async def _sync_incidents(self, tenant: Tenant):
+        try:
+            rows = await tenant.incidents.sync(functools.partial(self.api_request, priority=BACKGROUND))
+            if rows:
+                logger.debug('Incident index for tenant %s applied %d changed records', tenant.name, rows)
+        except Exception as e:
+            logger.error('Error syncing incident index for tenant %s: %s', tenant.name, e)
+    
+    async def send_race_reminder(self, race: Race, time_until: timedelta, urgent: bool = False):
+        """Queue a race reminder for every reminder route of the current tenant"""
+        routes = self.tenant.reminder_routes
+        if not routes:
             return
         
         hours = int(time_until.total_seconds() // 3600)
@@ -248,9 +473,9 @@ class GridKingBot(commands.Bot):
             color=discord.Color.orange() if not urgent else discord.Color.red()
         )
         
-        embed.add_field(name="Race", value=race['name'], inline=True)
-        embed.add_field(name="Track", value=race['track'], inline=True)
-        embed.add_field(name="Format", value=race['format'], inline=True)
+        embed.add_field(name="Race", value=race.name, inline=True)
+        embed.add_field(name="Track", value=race.track, inline=True)
+        embed.add_field(name="Format", value=race.format, inline=True)
         
         if hours > 0:
             time_text = f"{hours}h {minutes}m"
@@ -259,28 +484,32 @@ class GridKingBot(commands.Bot):
             
         embed.add_field(name="Starts in", value=time_text, inline=False)
         
-        embed.timestamp = datetime.fromisoformat(race['race_date'].replace('Z', '+00:00'))
+        embed.timestamp = race.race_date
         
-        try:
-            await channel.send(embed=embed)
-        except Exception as e:
-            logger.error(f'Failed to send race reminder: {e}')
+        # Built once, sent to every route by the dispatcher
+        self.notifier.publish_to(routes, embed=embed)
 
-# Bot instance
-bot = GridKingBot()
-
-if __name__ == '__main__':
-    # Load environment variables
+def main():
+    """Load the environment, configure logging and run the bot"""
     from dotenv import load_dotenv
     load_dotenv()
     
-    # Run bot
+    # Configure logging with security considerations (queued, redacted, rotated)
+    configure_logging()
+    
     token = os.getenv('DISCORD_BOT_TOKEN')
     if not token:
         logger.error('DISCORD_BOT_TOKEN not found in environment variables')
         exit(1)
     
+    # Built here rather than at import time, so importing this module stays cheap
+    # and the configuration is read after .env has been loaded
+    bot = GridKingBot()
     try:
-        bot.run(token)
+        # Logging is already configured; don't let discord.py add its own handler
+        bot.run(token, log_handler=None)
     except Exception as e:
-        logger.error(f'Failed to start bot: {e}')
+        logger.error('Failed to start bot: %s', e)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Admin Commands for Grid King Discord Bot
+"""
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from utils.memstats import MemoryStats
+from utils.responder import reply, responder, response_stats
+
+def format_bytes(size) -> str:
+    """Human-readable byte count"""
+    if size is None:
+        return "n/a"
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+class AdminCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @app_commands.command(name="botstatus", description="Show bot health: event loop lag, queues and sync state")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.checks.has_permissions(administrator=True)
+    @responder("Error fetching bot status", ephemeral=True)
+    async def status(self, interaction: discord.Interaction):
+        """Show bot health for admins"""
+        return reply(embed=self.create_status_embed(), ephemeral=True)
+    
+    def create_status_embed(self) -> discord.Embed:
+        """Create bot health embed"""
+        bot = self.bot
+        lag = bot.loop_monitor.snapshot()
+        
+        embed = discord.Embed(
+            title="🩺 Bot Status",
+            color=discord.Color.red() if lag['p95_ms'] >= lag['threshold_ms'] else discord.Color.green()
+        )
+        
+        embed.add_field(name="Gateway Latency", value=f"{bot.latency * 1000:.0f} ms", inline=True)
+        embed.add_field(
+            name="Event Loop Lag",
+            value=f"now {lag['current_ms']:g} ms • p95 {lag['p95_ms']:g} ms • max {lag['max_ms']:g} ms",
+            inline=True
+        )
+        embed.add_field(
+            name="Stalls",
+            value=f"{lag['stalls']} over {lag['threshold_ms']:g} ms",
+            inline=True
+        )
+        
+        # Blocking call sites (recorded in debug mode only)
+        if lag['debug']:
+            worst_text = ""
+            for site, entry in bot.loop_monitor.worst(5):
+                worst_text += f"`{site}` • {entry['count']}x • max {entry['max'] * 1000:.0f} ms\n"
+            embed.add_field(name="Worst Blocking Calls", value=worst_text or "None recorded", inline=False)
+        else:
+            embed.add_field(
+                name="Worst Blocking Calls",
+                value="Set LOOP_DEBUG=1 to record where the loop blocks",
+                inline=False
+            )
+        
+        scheduler_text = ""
+        for priority, stats in bot.scheduler.snapshot().items():
+            scheduler_text += (
+                f"**{priority}**: {stats['running']} running • {stats['queued']} queued • "
+                f"avg wait {stats['avg_wait_ms']:g} ms • {stats['dropped']} dropped\n"
+            )
+        embed.add_field(name="API Scheduler", value=scheduler_text, inline=False)
+        
+        source = bot.tenant.source.snapshot()
+        if source['kind'] == 'sql':
+            embed.add_field(
+                name="Data Source",
+                value=(f"database {'connected' if source['connected'] else 'unavailable'} • "
+                       f"{source['queries']} queries • avg {source['avg_ms']:.1f} ms • "
+                       f"{source['fallbacks']} via API"),
+                inline=False
+            )
+        
+        if len(bot.tenants) > 1:
+            busiest = max(bot.tenants.snapshot(), key=lambda tenant: tenant['queued'])
+            embed.add_field(
+                name="Leagues",
+                value=(f"{len(bot.tenants)} served • this server: {bot.tenant.name} • "
+                       f"most queued: {busiest['name']} ({busiest['queued']})"),
+                inline=False
+            )
+        
+        replica = bot.replica.snapshot()
+        replica_lag = replica['lag_seconds']
+        embed.add_field(
+            name="Replica",
+            value=(f"lag {replica_lag:.0f}s • last sync {replica['last_fetch_ms'] + replica['last_apply_ms']:g} ms"
+                   if replica_lag is not None else "Not synced yet"),
+            inline=True
+        )
+        
+        incidents = bot.incidents.snapshot()
+        embed.add_field(
+            name="Incident Index",
+            value=(f"{incidents['documents']} records • lag {incidents['lag_seconds']:.0f}s • "
+                   f"avg search {incidents['avg_search_ms'] or 0:g} ms"
+                   if incidents['lag_seconds'] is not None else "Not synced yet"),
+            inline=True
+        )
+        
+        notifier = bot.notifier.stats
+        embed.add_field(
+            name="Notifications",
+            value=f"{notifier['sent']} sent • {notifier['retried']} retried • {notifier['failed']} failed",
+            inline=True
+        )
+        startup = bot.startup.snapshot()
+        embed.add_field(
+            name="Startup",
+            value=(f"ready {startup['ready_ms'] / 1000:.1f}s after start (budget {startup['budget_ms'] / 1000:.0f}s)"
+                   if startup['ready_ms'] is not None else "Not ready yet"),
+            inline=True
+        )
+        embed.add_field(
+            name="Responses",
+            value=(f"{response_stats['inline']} inline • {response_stats['deferred']} deferred • "
+                   f"{self.bot.dedupe.stats['duplicates']} deduplicated"),
+            inline=True
+        )
+        
+        return embed
+    
+    @app_commands.command(name="memstats", description="Show what holds memory: caches, rate limits, views and allocations")
+    @app_commands.describe(allocations="Include the top allocation sites (starts tracemalloc if needed)")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.checks.has_permissions(administrator=True)
+    @responder("Error fetching memory stats", ephemeral=True)
+    async def memstats(self, interaction: discord.Interaction, allocations: bool = False):
+        """Show memory usage for admins"""
+        memstats = self.bot.memstats
+        report = memstats.report()
+        
+        traced = started = False
+        top, growth = [], []
+        if allocations:
+            started = MemoryStats.start_tracing()
+            if not started:
+                top, growth = await memstats.allocations()
+                traced = True
+        
+        embed = self.create_memstats_embed(report, memstats.history[-1] if memstats.history else None)
+        if traced:
+            top_text = ""
+            for stat in top:
+                frame = stat.traceback[0]
+                top_text += f"`{frame.filename.rsplit('/', 1)[-1]}:{frame.lineno}` • {format_bytes(stat.size)} • {stat.count} blocks\n"
+            embed.add_field(name="Top Allocation Sites", value=top_text[:1024] or "None", inline=False)
+            
+            if growth:
+                growth_text = ""
+                for stat in growth:
+                    frame = stat.traceback[0]
+                    growth_text += f"`{frame.filename.rsplit('/', 1)[-1]}:{frame.lineno}` • +{format_bytes(stat.size_diff)}\n"
+                embed.add_field(name="Growth Since Last Snapshot", value=growth_text[:1024], inline=False)
+        elif started:
+            embed.add_field(
+                name="Top Allocation Sites",
+                value="tracemalloc started now; run again to see allocation sites",
+                inline=False
+            )
+        
+        return reply(embed=embed, ephemeral=True)
+    
+    def create_memstats_embed(self, report: dict, previous: dict = None) -> discord.Embed:
+        """Create memory usage embed"""
+        embed = discord.Embed(title="🧠 Memory", color=discord.Color.blue())
+        
+        embed.add_field(name="RSS", value=format_bytes(report['rss_bytes']), inline=True)
+        embed.add_field(name="Peak RSS", value=format_bytes(report['peak_rss_bytes']), inline=True)
+        embed.add_field(name="tracemalloc", value="on" if report['tracing'] else "off", inline=True)
+        
+        cache_text = ""
+        for name, stats in report['caches'].items():
+            cache_text += f"**{name}**: {stats['entries']}/{stats['max_entries']} • ~{format_bytes(stats['bytes'])}\n"
+        embed.add_field(name="Caches", value=cache_text, inline=False)
+        
+        rate_limits = report['rate_limits']
+        views = report['views']
+        embed.add_field(
+            name="Rate Limits",
+            value=f"{rate_limits['users']} users • {rate_limits['timestamps']} timestamps • ~{format_bytes(rate_limits['bytes'])}",
+            inline=True
+        )
+        embed.add_field(
+            name="Active Views",
+            value=f"{views['persistent']} persistent • {views['message_bound']} on messages",
+            inline=True
+        )
+        
+        structures = report['structures']
+        files = report['files']
+        embed.add_field(
+            name="Other",
+            value=(
+                f"Notifier: {structures['notifier_pending']} pending on {structures['notifier_routes']} routes\n"
+                f"Scheduler: {structures['scheduler_waiting']} waiting\n"
+                f"Live boards: {structures['live_boards']}\n"
+                f"Deduplicated answers: {structures['dedupe_answers']}\n"
+                f"Incident index: {structures['incident_documents']} records\n"
+                f"Leagues: {structures['tenants']} • {structures['tenant_cache_entries']} cached entries\n"
+                f"Results feed: {structures['results_feed_races']} races • ~{format_bytes(structures['results_feed_bytes'])}\n"
+                f"Archive mapped: {format_bytes(files['archive_mapped_bytes'])} • "
+                f"replica: {format_bytes(files['replica_bytes'])} • "
+                f"incident index: {format_bytes(files['incident_index_bytes'])}"
+            ),
+            inline=False
+        )
+        
+        # Growth since the last periodic snapshot
+        if previous:
+            diff = MemoryStats.diff(previous, report)
+            changed = [
+                f"{name} {stats['bytes']:+,} B ({stats['entries']:+d})"
+                for name, stats in diff['caches'].items() if stats['bytes'] or stats['entries']
+            ]
+            rss = diff['rss_bytes']
+            embed.add_field(
+                name=f"Change Over {diff['seconds'] // 60} min",
+                value=(f"RSS {'n/a' if rss is None else f'{rss:+,} B'}"
+                       + (f" • {', '.join(changed)}" if changed else "")),
+                inline=False
+            )
+        
+        return embed
+
+async def setup(bot):
+    await bot.add_cog(AdminCog(bot))
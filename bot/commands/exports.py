@@ -0,0 +1,77 @@
+"""
+Export Commands for Grid King Discord Bot
+"""
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+from typing import Literal, Optional
+
+from utils.exports import ExportError, ExportFile, stream_export
+from utils.responder import reply, responder
+
+class ExportsCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Guilds with an export in progress; one at a time each
+        self.running = set()
+    
+    @app_commands.command(name="export", description="Download league results, standings or penalties as a file")
+    @app_commands.describe(
+        data="What to export",
+        format="File format (default: CSV)",
+        compressed="Gzip the file (default: no)",
+        season_id="Only this season (standings default to the active season)",
+        race_id="Only this race (results and penalties)"
+    )
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.checks.has_permissions(manage_guild=True)
+    @responder("Error exporting data", ephemeral=True)
+    async def export(
+        self,
+        interaction: discord.Interaction,
+        data: Literal['results', 'standings', 'penalties'],
+        format: Literal['csv', 'json'] = 'csv',
+        compressed: bool = False,
+        season_id: Optional[int] = None,
+        race_id: Optional[int] = None
+    ):
+        """Stream an export into a file attachment"""
+        guild_key = interaction.guild_id or interaction.user.id
+        if guild_key in self.running:
+            return reply("⏳ An export is already running here, try again when it has finished.", ephemeral=True)
+        
+        self.running.add(guild_key)
+        try:
+            spool, rows, size = await stream_export(
+                self.bot.api_request, data, format, compressed, season_id=season_id, race_id=race_id
+            )
+        except ExportError as e:
+            return reply(f"❌ {e}", ephemeral=True)
+        finally:
+            self.running.discard(guild_key)
+        
+        if not rows:
+            spool.close()
+            return reply(f"No {data} to export.", ephemeral=True)
+        
+        limit = interaction.guild.filesize_limit if interaction.guild else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+        if size > limit:
+            spool.close()
+            hint = " Try `compressed: True` or a single season." if not compressed else " Try a single season or race."
+            return reply(
+                f"❌ The export is {size / 2 ** 20:.1f} MB, over this server's {limit / 2 ** 20:.0f} MB upload limit.{hint}",
+                ephemeral=True
+            )
+        
+        scope = f"_season{season_id}" if season_id else ""
+        scope += f"_race{race_id}" if race_id else ""
+        filename = f"gridking_{data}{scope}.{format}" + (".gz" if compressed else "")
+        return reply(
+            f"📦 {rows:,} {data} rows ({size / 1024:,.0f} KB)",
+            file=ExportFile(spool, filename=filename),
+            ephemeral=True
+        )
+
+async def setup(bot):
+    await bot.add_cog(ExportsCog(bot))
@@ -5,226 +5,375 @@ Standings Commands for Grid King Discord Bot
 import discord
 from discord.ext import commands
 from discord import app_commands
-from typing import Optional
+import io
+from typing import List, Literal, Optional
+
+from utils.charts import ChartBusyError, build_progression_series, last_result_id
+from utils.models import Race, StandingsTable, Statistics
+from utils.predictor import FASTEST_LAP_BONUS, POINTS_TABLE, clinch_scenarios
+from utils.responder import reply, responder
+
+MAX_CHART_DRIVERS = 10
+
+# Rows a standings embed shows at most (the API caps limit= at 100)
+MAX_STANDINGS_ROWS = 25
 
 class StandingsCog(commands.Cog):
+    # Standings columns rendered by /standings, live boards and the charts/predictor (driver IDs)
+    STANDINGS_FIELDS = ('id', 'username', 'driver_number', 'team_name', 'total_points', 'wins')
+    
     def __init__(self, bot):
         self.bot = bot
     
     @app_commands.command(name="standings", description="Show current championship standings")
-    @app_commands.describe(limit="Number of drivers to show (default: 10)")
-    async def standings(self, interaction: discord.Interaction, limit: Optional[int] = 10):
+    @app_commands.describe(
+        limit="Number of drivers to show (1-25, default: 10)",
+        chart="Attach a points progression chart of the shown drivers"
+    )
+    @responder("Error fetching standings", dedupe=15)
+    async def standings(self, interaction: discord.Interaction,
+                        limit: Optional[app_commands.Range[int, 1, MAX_STANDINGS_ROWS]] = 10,
+                        chart: Optional[bool] = False):
         """Display championship standings"""
-        await interaction.response.defer()
+        limit = max(1, min(limit or 10, MAX_STANDINGS_ROWS))
+        cache_key = ('standings', limit)
+        embed = self.bot.embed_cache.get(cache_key)
+        if embed is None or chart:
+            data = await self.bot.api_request('standings', fields=self.STANDINGS_FIELDS, limit=limit)
+            if not data:
+                return reply("❌ Could not fetch standings data.")
+            
+            embed = self.build_standings_embed(data, limit)
+            self.bot.embed_cache.set(cache_key, embed)
+        
+        if not chart:
+            return reply(embed=embed)
         
+        driver_ids = [row.driver_id for row in data.standings[:min(limit, MAX_CHART_DRIVERS)] if row.driver_id]
         try:
-            data = await self.bot.api_request('standings')
-            if not data or 'standings' not in data:
-                await interaction.followup.send("❌ Could not fetch standings data.")
-                return
-            
-            standings = data['standings'][:limit]
-            season = data.get('season', {})
-            
-            embed = discord.Embed(
-                title=f"🏆 Championship Standings - {season.get('name', 'Current Season')}",
-                color=discord.Color.gold()
-            )
-            
-            standings_text = ""
-            for i, driver in enumerate(standings, 1):
-                points = driver['total_points'] or 0
-                wins = driver['wins'] or 0
-                
-                # Position indicator
-                if i == 1:
-                    pos_icon = "🥇"
-                elif i == 2:
-                    pos_icon = "🥈"
-                elif i == 3:
-                    pos_icon = "🥉"
-                else:
-                    pos_icon = f"{i}."
-                
-                standings_text += f"{pos_icon} **{driver['username']}** #{driver['driver_number']}\n"
-                standings_text += f"    {points} pts • {wins} wins\n"
-                
-                if driver['team_name']:
-                    standings_text += f"    *{driver['team_name']}*\n"
-                standings_text += "\n"
+            chart_file = await self.render_progression_chart(driver_ids, data.season_name)
+        except ChartBusyError:
+            return reply("📉 Chart renderer is busy, showing standings only.", embed=embed)
+        if chart_file is None:
+            return reply(embed=embed)
+        
+        # Copy so the cached embed isn't modified
+        embed = embed.copy()
+        embed.set_image(url=f"attachment://{chart_file.filename}")
+        return reply(embed=embed, file=chart_file)
+    
+    @app_commands.command(name="progression", description="Chart championship points across the season")
+    @app_commands.describe(drivers="Comma-separated driver names or numbers (default: top 5)")
+    @responder("Error creating progression chart", dedupe=15)
+    async def progression(self, interaction: discord.Interaction, drivers: Optional[str] = None):
+        """Show points progression chart"""
+        standings = await self.bot.api_request('standings', fields=self.STANDINGS_FIELDS)
+        if not standings:
+            return reply("❌ Could not fetch standings data.")
+        
+        if drivers:
+            queries = [query for query in drivers.split(',') if query.strip()][:MAX_CHART_DRIVERS]
+            driver_ids, unresolved = await self.bot.driver_batch.resolve(queries)
+            if unresolved:
+                return reply(f"❌ Could not find: {', '.join(q.strip() for q in unresolved)}")
+        else:
+            driver_ids = [row.driver_id for row in standings.standings[:5] if row.driver_id]
+        
+        try:
+            chart_file = await self.render_progression_chart(driver_ids, standings.season_name)
+        except ChartBusyError:
+            return reply("📉 Chart renderer is busy, please try again in a moment.")
+        if chart_file is None:
+            return reply("❌ No race results available for this season yet.")
+        
+        embed = discord.Embed(
+            title=f"📈 Points Progression - {standings.season_name or 'Current Season'}",
+            color=discord.Color.gold()
+        )
+        embed.set_image(url=f"attachment://{chart_file.filename}")
+        
+        return reply(embed=embed, file=chart_file)
+    
+    async def render_progression_chart(self, driver_ids: List[int], season_name: Optional[str]) -> Optional[discord.File]:
+        """Render (or reuse) the progression chart for the given drivers"""
+        schedule = await self.bot.api_request('races?include=results')
+        if not schedule or not driver_ids:
+            return None
+        
+        labels, series = build_progression_series(schedule.races, driver_ids)
+        if not labels:
+            return None
+        
+        # Leagues can share season and driver IDs, so the tenant is part of the key
+        cache_key = (self.bot.tenant.name, schedule.season_id, tuple(driver_ids), last_result_id(schedule.races))
+        title = f"Points Progression - {season_name or 'Current Season'}"
+        png = await self.bot.charts.render_progression(cache_key, title, labels, series)
+        
+        return discord.File(io.BytesIO(png), filename="progression.png")
+    
+    def build_standings_embed(self, data: StandingsTable, limit: int = 10) -> discord.Embed:
+        """Create championship standings embed"""
+        standings = data.standings[:limit]
+        
+        embed = discord.Embed(
+            title=f"🏆 Championship Standings - {data.season_name or 'Current Season'}",
+            color=discord.Color.gold()
+        )
+        
+        standings_text = ""
+        for i, driver in enumerate(standings, 1):
+            points = driver.total_points
+            wins = driver.wins
             
-            embed.description = standings_text
-            embed.set_footer(text=f"Showing top {len(standings)} drivers")
+            # Position indicator
+            if i == 1:
+                pos_icon = "🥇"
+            elif i == 2:
+                pos_icon = "🥈"
+            elif i == 3:
+                pos_icon = "🥉"
+            else:
+                pos_icon = f"{i}."
             
-            await interaction.followup.send(embed=embed)
+            standings_text += f"{pos_icon} **{driver.username}** #{driver.driver_number}\n"
+            standings_text += f"    {points:g} pts • {wins} wins\n"
             
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error fetching standings: {str(e)}")
+            if driver.team_name:
+                standings_text += f"    *{driver.team_name}*\n"
+            standings_text += "\n"
+        
+        embed.description = standings_text
+        embed.set_footer(text=f"Showing top {len(standings)} drivers")
+        
+        return embed
+    
+    @app_commands.command(name="liveboard", description="Post a standings board in this channel that updates itself")
+    @app_commands.describe(action="Start (or re-post) the board here, or stop it")
+    @app_commands.default_permissions(manage_channels=True)
+    @app_commands.checks.has_permissions(manage_channels=True)
+    @responder("Error managing live board", ephemeral=True)
+    async def liveboard(self, interaction: discord.Interaction, action: Literal['start', 'stop'] = 'start'):
+        """Start or stop the live standings board in this channel"""
+        live_board = self.bot.live_board
+        channel = interaction.channel
+        
+        # Boards are rendered by a background worker for the default league only
+        if self.bot.tenant is not self.bot.tenants.default:
+            return reply("❌ Live boards are not available for this league.", ephemeral=True)
+        
+        if action == 'stop':
+            message_id = live_board.remove(channel.id)
+            if message_id is None:
+                return reply("❌ There is no live board in this channel.", ephemeral=True)
+            return reply("✅ Live board stopped; the last board stays as posted.", ephemeral=True)
+        
+        if live_board.full(channel.id):
+            return reply("❌ The maximum number of live boards is already running.", ephemeral=True)
+        
+        message = await live_board.post(channel)
+        if message is None:
+            return reply("❌ Could not fetch standings data.", ephemeral=True)
+        return reply(f"✅ Live board posted: {message.jump_url}", ephemeral=True)
+    
+    @app_commands.command(name="predict", description="Simulate the rest of the season and show title chances")
+    @responder("Error running prediction", dedupe=30)
+    async def predict(self, interaction: discord.Interaction):
+        """Monte Carlo championship prediction"""
+        standings = await self.bot.api_request('standings', fields=self.STANDINGS_FIELDS)
+        schedule = await self.bot.api_request('races?include=results')
+        if not standings or not schedule:
+            return reply("❌ Could not fetch season data.")
+        
+        rows = [row for row in standings.standings if row.driver_id]
+        remaining = [race for race in schedule.races if not race.results and race.status != 'cancelled']
+        if not rows or not remaining:
+            return reply("🏁 No races left to simulate this season.")
+        
+        cache_key = (self.bot.tenant.name, schedule.season_id, last_result_id(schedule.races),
+                     tuple(race.id for race in remaining))
+        prediction = await self.bot.predictor.predict(cache_key, rows, schedule.races, len(remaining))
+        
+        embed = self.build_prediction_embed(standings.season_name, rows, remaining, prediction)
+        return reply(embed=embed)
+    
+    def build_prediction_embed(self, season_name: Optional[str], rows: list, remaining: List[Race], prediction: dict) -> discord.Embed:
+        """Create championship prediction embed"""
+        embed = discord.Embed(
+            title=f"🔮 Championship Prediction - {season_name or 'Current Season'}",
+            description=f"{self.bot.predictor.simulations:,} simulations of the {len(remaining)} remaining races",
+            color=discord.Color.purple()
+        )
+        
+        ranked = sorted(range(len(rows)), key=lambda i: (-prediction['title'][i], -prediction['expected_points'][i]))
+        chances_text = ""
+        for i in ranked[:10]:
+            chance = prediction['title'][i]
+            if chance == 0 and chances_text:
+                break
+            chance_label = f"{chance:.1%}" if chance >= 0.001 else "<0.1%"
+            chances_text += (f"`{chance_label:>6}` **{rows[i].username}** #{rows[i].driver_number} • "
+                             f"{rows[i].total_points:g} pts → ~{prediction['expected_points'][i]:.0f}\n")
+        embed.add_field(name="🏆 Title Chances", value=chances_text or "No data", inline=False)
+        
+        scenarios = clinch_scenarios(rows, remaining)
+        early = sum(prediction['decided_after'][:-1])
+        scenarios.append(f"Title decided before the final race in {early:.0%} of simulations")
+        embed.add_field(name="🔐 Clinch Scenarios", value="\n".join(scenarios), inline=False)
+        
+        embed.set_footer(text=f"Points: {'-'.join(str(p) for p in POINTS_TABLE)}, "
+                              f"+{FASTEST_LAP_BONUS} for fastest lap in the top 10 • Based on this season's results")
+        
+        return embed
     
     @app_commands.command(name="driver", description="Show detailed driver information")
     @app_commands.describe(driver="Driver name or number")
+    @responder("Error fetching driver info", dedupe=15)
     async def driver_info(self, interaction: discord.Interaction, driver: str):
         """Show detailed driver information"""
-        await interaction.response.defer()
+        # First search for the driver
+        search_data = await self.bot.api_request(f'drivers/search?q={driver}')
+        if not search_data:
+            return reply(f"❌ Driver '{driver}' not found.")
         
-        try:
-            # First search for the driver
-            search_data = await self.bot.api_request(f'drivers/search?q={driver}')
-            if not search_data:
-                await interaction.followup.send(f"❌ Driver '{driver}' not found.")
-                return
-            
-            if not search_data:
-                await interaction.followup.send(f"❌ No drivers found matching '{driver}'.")
-                return
-            
-            # Get detailed info for first match
-            driver_data = search_data[0]
-            detailed = await self.bot.api_request(f'drivers/{driver_data["id"]}')
-            
-            if not detailed:
-                await interaction.followup.send("❌ Could not fetch driver details.")
-                return
-            
-            stats = detailed.get('statistics', {})
-            
-            embed = discord.Embed(
-                title=f"🏎️ {detailed['username']} #{detailed['driver_number']}",
-                color=discord.Color.blue()
-            )
-            
-            # Basic info
-            embed.add_field(
-                name="Team", 
-                value=detailed.get('team_name', 'Independent'), 
-                inline=True
-            )
-            embed.add_field(
-                name="Platform", 
-                value=detailed.get('platform', 'Unknown'), 
-                inline=True
-            )
-            embed.add_field(
-                name="Country", 
-                value=detailed.get('country', 'Unknown'), 
-                inline=True
-            )
+        if not search_data:
+            return reply(f"❌ No drivers found matching '{driver}'.")
+        
+        # Get detailed info for first match
+        driver_data = search_data[0]
+        detailed = await self.bot.api_request(f'drivers/{driver_data.id}')
+        
+        if not detailed:
+            return reply("❌ Could not fetch driver details.")
+        
+        stats = detailed.statistics or Statistics()
+        
+        embed = discord.Embed(
+            title=f"🏎️ {detailed.username} #{detailed.driver_number}",
+            color=discord.Color.blue()
+        )
+        
+        # Basic info
+        embed.add_field(
+            name="Team", 
+            value=detailed.team_name or 'Independent', 
+            inline=True
+        )
+        embed.add_field(
+            name="Platform", 
+            value=detailed.platform or 'Unknown', 
+            inline=True
+        )
+        embed.add_field(
+            name="Country", 
+            value=detailed.country or 'Unknown', 
+            inline=True
+        )
+        
+        # Statistics
+        embed.add_field(
+            name="Championship Points", 
+            value=f"{stats.total_points:g} pts", 
+            inline=True
+        )
+        embed.add_field(
+            name="Races", 
+            value=stats.races_participated, 
+            inline=True
+        )
+        embed.add_field(
+            name="Wins", 
+            value=stats.wins, 
+            inline=True
+        )
+        embed.add_field(
+            name="Podiums", 
+            value=stats.podiums, 
+            inline=True
+        )
+        embed.add_field(
+            name="Poles", 
+            value=stats.poles, 
+            inline=True
+        )
+        embed.add_field(
+            name="Fastest Laps", 
+            value=stats.fastest_laps, 
+            inline=True
+        )
+        
+        # Recent results
+        if detailed.recent_results:
+            recent_text = ""
+            for result in detailed.recent_results[:3]:
+                position = result.position or 'DNF'
+                points = result.points
+                recent_text += f"**{result.race_name}**: P{position} ({points:g} pts)\n"
             
-            # Statistics
-            embed.add_field(
-                name="Championship Points", 
-                value=f"{stats.get('total_points', 0)} pts", 
-                inline=True
-            )
-            embed.add_field(
-                name="Races", 
-                value=stats.get('races_participated', 0), 
-                inline=True
-            )
-            embed.add_field(
-                name="Wins", 
-                value=stats.get('wins', 0), 
-                inline=True
-            )
-            embed.add_field(
-                name="Podiums", 
-                value=stats.get('podiums', 0), 
-                inline=True
-            )
             embed.add_field(
-                name="Poles", 
-                value=stats.get('poles', 0), 
-                inline=True
+                name="Recent Results", 
+                value=recent_text or "No recent results", 
+                inline=False
             )
-            embed.add_field(
-                name="Fastest Laps", 
-                value=stats.get('fastest_laps', 0), 
-                inline=True
-            )
-            
-            # Recent results
-            if detailed.get('recent_results'):
-                recent_text = ""
-                for result in detailed['recent_results'][:3]:
-                    position = result.get('position', 'DNF')
-                    points = result.get('points', 0)
-                    recent_text += f"**{result['race_name']}**: P{position} ({points} pts)\n"
-                
-                embed.add_field(
-                    name="Recent Results", 
-                    value=recent_text or "No recent results", 
-                    inline=False
-                )
-            
-            if detailed.get('bio'):
-                embed.description = detailed['bio']
-            
-            await interaction.followup.send(embed=embed)
-            
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error fetching driver info: {str(e)}")
+        
+        if detailed.bio:
+            embed.description = detailed.bio
+        
+        return reply(embed=embed)
     
     @app_commands.command(name="team", description="Show team information and standings")
     @app_commands.describe(team="Team name")
+    @responder("Error fetching team info", dedupe=15)
     async def team_info(self, interaction: discord.Interaction, team: str):
         """Show team information"""
-        await interaction.response.defer()
+        # Search for team
+        search_data = self.bot.replica.search_teams(team)
+        if not search_data:
+            return reply(f"❌ Team '{team}' not found.")
         
-        try:
-            # Search for team
-            search_data = await self.bot.api_request(f'teams/search?q={team}')
-            if not search_data:
-                await interaction.followup.send(f"❌ Team '{team}' not found.")
-                return
-            
-            # Get detailed info for first match
-            team_data = search_data[0]
-            detailed = await self.bot.api_request(f'teams/{team_data["id"]}')
-            
-            if not detailed:
-                await interaction.followup.send("❌ Could not fetch team details.")
-                return
-            
-            stats = detailed.get('statistics', {})
-            
-            embed = discord.Embed(
-                title=f"🏁 {detailed['name']}",
-                color=discord.Color.green()
-            )
+        # Get detailed info for first match
+        team_data = search_data[0]
+        detailed = self.bot.replica.team(team_data.id)
+        
+        if not detailed:
+            return reply("❌ Could not fetch team details.")
+        
+        stats = detailed.statistics or Statistics()
+        
+        embed = discord.Embed(
+            title=f"🏁 {detailed.name}",
+            color=discord.Color.green()
+        )
+        
+        # Team statistics
+        embed.add_field(
+            name="Total Points", 
+            value=f"{stats.total_points:g} pts", 
+            inline=True
+        )
+        embed.add_field(
+            name="Wins", 
+            value=stats.wins, 
+            inline=True
+        )
+        embed.add_field(
+            name="Podiums", 
+            value=stats.podiums, 
+            inline=True
+        )
+        
+        # Drivers
+        if detailed.drivers:
+            drivers_text = ""
+            for driver in detailed.drivers:
+                drivers_text += f"#{driver.driver_number} {driver.username}\n"
             
-            # Team statistics
-            embed.add_field(
-                name="Total Points", 
-                value=f"{stats.get('total_points', 0)} pts", 
-                inline=True
-            )
             embed.add_field(
-                name="Wins", 
-                value=stats.get('wins', 0), 
-                inline=True
+                name="Drivers", 
+                value=drivers_text, 
+                inline=False
             )
-            embed.add_field(
-                name="Podiums", 
-                value=stats.get('podiums', 0), 
-                inline=True
-            )
-            
-            # Drivers
-            if detailed.get('drivers'):
-                drivers_text = ""
-                for driver in detailed['drivers']:
-                    drivers_text += f"#{driver['driver_number']} {driver['username']}\n"
-                
-                embed.add_field(
-                    name="Drivers", 
-                    value=drivers_text, 
-                    inline=False
-                )
-            
-            await interaction.followup.send(embed=embed)
-            
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error fetching team info: {str(e)}")
+        
+        return reply(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(StandingsCog(bot))
@@ -5,9 +5,20 @@ Statistics Commands for Grid King Discord Bot
 import discord
 from discord.ext import commands
 from discord import app_commands
-from typing import Optional, Literal
+import asyncio
+from typing import List, Optional, Literal, Tuple
+
+from utils.archive import CATEGORIES as ALLTIME_CATEGORIES
+from utils.batch import head_to_head
+from utils.models import StandingsTable, Statistics
+from utils.responder import reply, responder
+
+MAX_COMPARE = 10
 
 class StatsCog(commands.Cog):
+    # Standings columns rendered by /leaderboard
+    LEADERBOARD_FIELDS = ('username', 'total_points')
+    
     def __init__(self, bot):
         self.bot = bot
     
@@ -16,6 +27,7 @@ class StatsCog(commands.Cog):
         category="Type of statistics to show",
         limit="Number of results to show (default: 10)"
     )
+    @responder("Error fetching statistics", dedupe=15)
     async def stats(
         self, 
         interaction: discord.Interaction, 
@@ -23,71 +35,70 @@ class StatsCog(commands.Cog):
         limit: Optional[int] = 10
     ):
         """Show league statistics"""
-        await interaction.response.defer()
-        
-        try:
+        cache_key = ('stats', category, limit)
+        embed = self.bot.embed_cache.get(cache_key)
+        if embed is None:
             if category == 'overview':
                 data = await self.bot.api_request('stats/overview')
                 if not data:
-                    await interaction.followup.send("❌ Could not fetch overview statistics.")
-                    return
+                    return reply("❌ Could not fetch overview statistics.")
                 
-                embed = discord.Embed(
-                    title="📊 League Overview",
-                    color=discord.Color.purple()
-                )
-                
-                embed.add_field(
-                    name="Total Races", 
-                    value=data.get('total_races', 0), 
-                    inline=True
-                )
-                embed.add_field(
-                    name="Active Drivers", 
-                    value=data.get('total_drivers', 0), 
-                    inline=True
-                )
-                embed.add_field(
-                    name="Teams", 
-                    value=data.get('total_teams', 0), 
-                    inline=True
-                )
-                embed.add_field(
-                    name="Total Results", 
-                    value=data.get('total_results', 0), 
-                    inline=True
-                )
-                embed.add_field(
-                    name="Points Awarded", 
-                    value=data.get('total_points_awarded', 0), 
-                    inline=True
-                )
-                
-                if data.get('leading_driver'):
-                    leading = data['leading_driver']
-                    embed.add_field(
-                        name="Championship Leader", 
-                        value=f"{leading['username']} ({leading['total_points']} pts)", 
-                        inline=False
-                    )
+                embed = self.create_overview_embed(data)
+            else:
+                # Get category-specific statistics
+                data = await self.bot.api_request(f'stats/{category}')
+                if not data:
+                    return reply(f"❌ Could not fetch {category} statistics.")
                 
-                await interaction.followup.send(embed=embed)
-                return
-            
-            # Get category-specific statistics
-            data = await self.bot.api_request(f'stats/{category}')
-            if not data or 'data' not in data:
-                await interaction.followup.send(f"❌ Could not fetch {category} statistics.")
-                return
-            
-            results = data['data'][:limit]
-            
-            # Create embed based on category
-            embed = await self.create_stats_embed(category, results)
-            await interaction.followup.send(embed=embed)
+                # Create embed based on category
+                embed = await self.create_stats_embed(category, data.rows[:limit])
             
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error fetching statistics: {str(e)}")
+            self.bot.embed_cache.set(cache_key, embed)
+        
+        return reply(embed=embed)
+    
+    def create_overview_embed(self, data: dict) -> discord.Embed:
+        """Create league overview embed"""
+        embed = discord.Embed(
+            title="📊 League Overview",
+            color=discord.Color.purple()
+        )
+        
+        embed.add_field(
+            name="Total Races", 
+            value=data.get('total_races', 0), 
+            inline=True
+        )
+        embed.add_field(
+            name="Active Drivers", 
+            value=data.get('total_drivers', 0), 
+            inline=True
+        )
+        embed.add_field(
+            name="Teams", 
+            value=data.get('total_teams', 0), 
+            inline=True
+        )
+        embed.add_field(
+            name="Total Results", 
+            value=data.get('total_results', 0), 
+            inline=True
+        )
+        embed.add_field(
+            name="Points Awarded", 
+            value=data.get('total_points_awarded', 0), 
+            inline=True
+        )
+        
+        if data.get('leading_driver'):
+            leading = data['leading_driver']
+            embed.add_field(
+                name="Championship Leader", 
+                value=f"{leading['username']} ({leading['total_points']} pts)", 
+                inline=False
+            )
+        
+        return embed
     
     async def create_stats_embed(self, category: str, results: list) -> discord.Embed:
         """Create statistics embed based on category"""
@@ -121,7 +132,7 @@ class StatsCog(commands.Cog):
                 'title': '📊 Most Points',
                 'color': discord.Color.green(),
                 'value_field': 'total_points',
-                'format': lambda x: f"{x} pts"
+                'format': lambda x: f"{x:g} pts"
             },
             'dnf': {
                 'title': '❌ Most DNFs',
@@ -145,10 +156,10 @@ class StatsCog(commands.Cog):
         
         stats_text = ""
         for i, result in enumerate(results, 1):
-            username = result.get('username', 'Unknown')
-            driver_number = result.get('driver_number', '')
-            team_name = result.get('team_name', '')
-            value = result.get(info['value_field'], 0)
+            username = result.username
+            driver_number = result.driver_number
+            team_name = result.team_name
+            value = getattr(result, info['value_field'], 0)
             
             # Position indicator
             if i == 1:
@@ -169,10 +180,10 @@ class StatsCog(commands.Cog):
                 stats_text += f"    *{team_name}*\n"
             
             # Add additional context for specific categories
-            if category == 'dnf' and result.get('dnf_percentage'):
-                stats_text += f"    {result['dnf_percentage']}% DNF rate\n"
-            elif category == 'points' and result.get('avg_points_per_race'):
-                stats_text += f"    {result['avg_points_per_race']} avg pts/race\n"
+            if category == 'dnf' and result.dnf_percentage:
+                stats_text += f"    {result.dnf_percentage:g}% DNF rate\n"
+            elif category == 'points' and result.avg_points_per_race:
+                stats_text += f"    {result.avg_points_per_race:g} avg pts/race\n"
             
             stats_text += "\n"
         
@@ -182,121 +193,200 @@ class StatsCog(commands.Cog):
         return embed
     
     @app_commands.command(name="leaderboard", description="Show top 10 championship standings")
+    @responder("Error fetching leaderboard", dedupe=15)
     async def leaderboard(self, interaction: discord.Interaction):
         """Quick leaderboard command"""
-        await interaction.response.defer()
-        
-        try:
-            data = await self.bot.api_request('standings')
-            if not data or 'standings' not in data:
-                await interaction.followup.send("❌ Could not fetch standings data.")
-                return
-            
-            standings = data['standings'][:10]
-            season = data.get('season', {})
+        embed = self.bot.embed_cache.get('leaderboard')
+        if embed is None:
+            data = await self.bot.api_request('standings', fields=self.LEADERBOARD_FIELDS, limit=10)
+            if not data:
+                return reply("❌ Could not fetch standings data.")
             
-            embed = discord.Embed(
-                title=f"🏆 Top 10 - {season.get('name', 'Current Season')}",
-                color=discord.Color.gold()
-            )
-            
-            leaderboard_text = ""
-            for i, driver in enumerate(standings, 1):
-                points = driver['total_points'] or 0
-                
-                # Position indicators
-                if i == 1:
-                    pos_icon = "🥇"
-                elif i == 2:
-                    pos_icon = "🥈"
-                elif i == 3:
-                    pos_icon = "🥉"
-                else:
-                    pos_icon = f"**{i}.**"
-                
-                leaderboard_text += f"{pos_icon} {driver['username']} - {points} pts\n"
-            
-            embed.description = leaderboard_text
+            embed = self.build_leaderboard_embed(data)
+            self.bot.embed_cache.set('leaderboard', embed)
+        
+        return reply(embed=embed)
+    
+    def build_leaderboard_embed(self, data: StandingsTable) -> discord.Embed:
+        """Create top 10 leaderboard embed"""
+        standings = data.standings[:10]
+        
+        embed = discord.Embed(
+            title=f"🏆 Top 10 - {data.season_name or 'Current Season'}",
+            color=discord.Color.gold()
+        )
+        
+        leaderboard_text = ""
+        for i, driver in enumerate(standings, 1):
+            points = driver.total_points
             
-            await interaction.followup.send(embed=embed)
+            # Position indicators
+            if i == 1:
+                pos_icon = "🥇"
+            elif i == 2:
+                pos_icon = "🥈"
+            elif i == 3:
+                pos_icon = "🥉"
+            else:
+                pos_icon = f"**{i}.**"
             
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error fetching leaderboard: {str(e)}")
+            leaderboard_text += f"{pos_icon} {driver.username} - {points:g} pts\n"
+        
+        embed.description = leaderboard_text
+        
+        return embed
     
-    @app_commands.command(name="compare", description="Compare two drivers' statistics")
+    @app_commands.command(name="alltime", description="Show all-time records across every season")
     @app_commands.describe(
-        driver1="First driver name or number",
-        driver2="Second driver name or number"
+        category="Record to show",
+        limit="Number of drivers to show (default: 10)"
     )
-    async def compare_drivers(self, interaction: discord.Interaction, driver1: str, driver2: str):
-        """Compare two drivers"""
-        await interaction.response.defer()
-        
-        try:
-            # Search for both drivers
-            search1 = await self.bot.api_request(f'drivers/search?q={driver1}')
-            search2 = await self.bot.api_request(f'drivers/search?q={driver2}')
-            
-            if not search1 or not search2:
-                await interaction.followup.send("❌ Could not find one or both drivers.")
-                return
-            
-            # Get detailed stats for both
-            detailed1 = await self.bot.api_request(f'drivers/{search1[0]["id"]}')
-            detailed2 = await self.bot.api_request(f'drivers/{search2[0]["id"]}')
-            
-            if not detailed1 or not detailed2:
-                await interaction.followup.send("❌ Could not fetch driver details.")
-                return
-            
-            embed = discord.Embed(
-                title=f"🔄 Driver Comparison",
-                color=discord.Color.blue()
-            )
-            
-            # Driver names
-            name1 = f"{detailed1['username']} #{detailed1['driver_number']}"
-            name2 = f"{detailed2['username']} #{detailed2['driver_number']}"
-            
-            embed.add_field(name="Driver 1", value=name1, inline=True)
-            embed.add_field(name="Driver 2", value=name2, inline=True)
-            embed.add_field(name="\u200b", value="\u200b", inline=True)  # Spacer
-            
-            # Compare statistics
-            stats1 = detailed1.get('statistics', {})
-            stats2 = detailed2.get('statistics', {})
-            
-            comparisons = [
-                ('Championship Points', 'total_points'),
-                ('Wins', 'wins'),
-                ('Podiums', 'podiums'),
-                ('Poles', 'poles'),
-                ('Fastest Laps', 'fastest_laps'),
-                ('DNFs', 'dnfs'),
-                ('Races', 'races_participated')
-            ]
-            
-            for stat_name, stat_key in comparisons:
-                val1 = stats1.get(stat_key, 0)
-                val2 = stats2.get(stat_key, 0)
-                
-                embed.add_field(name=stat_name, value=str(val1), inline=True)
-                embed.add_field(name=stat_name, value=str(val2), inline=True)
-                
-                # Winner indicator
-                if val1 > val2:
-                    winner = "🥇"
-                elif val2 > val1:
-                    winner = "🥈"
-                else:
-                    winner = "🟡"
-                
-                embed.add_field(name="\u200b", value=winner, inline=True)
-            
-            await interaction.followup.send(embed=embed)
+    @responder("Error fetching all-time records", dedupe=15)
+    async def alltime(
+        self,
+        interaction: discord.Interaction,
+        category: Literal['wins', 'podiums', 'poles', 'points', 'starts', 'podium_streak'],
+        limit: Optional[int] = 10
+    ):
+        """Show all-time records from the local results archive"""
+        archive = self.bot.archive
+        if not archive.rows:
+            return reply("❌ The all-time archive is still being built, try again later.")
+        
+        limit = max(1, min(limit, 25))
+        # Row count in the key: any sync invalidates the cached embed
+        cache_key = ('alltime', category, limit, archive.rows)
+        embed = self.bot.embed_cache.get(cache_key)
+        if embed is None:
+            loop = asyncio.get_running_loop()
+            records, summary = await loop.run_in_executor(None, archive.leaderboard, category, limit)
+            embed = self.create_alltime_embed(category, records, summary)
+            self.bot.embed_cache.set(cache_key, embed, ttl=60 * 60)
+        
+        return reply(embed=embed)
+    
+    def create_alltime_embed(self, category: str, records: List[Tuple[str, float]], summary: dict) -> discord.Embed:
+        """Create all-time records embed"""
+        units = {
+            'wins': 'wins',
+            'podiums': 'podiums',
+            'poles': 'poles',
+            'points': 'pts',
+            'starts': 'starts',
+            'podium_streak': 'in a row',
+        }
+        
+        embed = discord.Embed(
+            title=f"🏛️ All-Time {ALLTIME_CATEGORIES[category]}",
+            color=discord.Color.dark_gold()
+        )
+        
+        records_text = ""
+        for i, (username, value) in enumerate(records, 1):
+            if i == 1:
+                pos_icon = "🥇"
+            elif i == 2:
+                pos_icon = "🥈"
+            elif i == 3:
+                pos_icon = "🥉"
+            else:
+                pos_icon = f"{i}."
             
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error comparing drivers: {str(e)}")
+            records_text += f"{pos_icon} **{username}** - {value:g} {units[category]}\n"
+        
+        embed.description = records_text or "No records yet"
+        embed.set_footer(
+            text=f"{summary['results']:,} results • {summary['races']} races • {summary['seasons']} seasons"
+        )
+        
+        return embed
+    
+    @app_commands.command(name="compare", description="Compare up to 10 drivers head-to-head")
+    @app_commands.describe(
+        drivers="Comma-separated driver names or numbers (2-10 drivers)"
+    )
+    @responder("Error comparing drivers")
+    async def compare_drivers(self, interaction: discord.Interaction, drivers: str):
+        """Compare several drivers"""
+        queries = [query for query in drivers.split(',') if query.strip()]
+        if not 2 <= len(queries) <= MAX_COMPARE:
+            return reply(f"❌ Please name between 2 and {MAX_COMPARE} drivers, separated by commas.")
+        
+        # Resolve names against the roster, then fetch everyone in one batch
+        driver_ids, unresolved = await self.bot.driver_batch.resolve(queries)
+        if unresolved:
+            return reply(f"❌ Could not find: {', '.join(q.strip() for q in unresolved)}")
+        
+        details = await self.bot.driver_batch.get_many(driver_ids)
+        selected = [details[driver_id] for driver_id in driver_ids if driver_id in details]
+        
+        if len(selected) < 2:
+            return reply("❌ Could not fetch driver details.")
+        
+        embed = self.build_comparison_embed(selected)
+        return reply(embed=embed)
+    
+    @staticmethod
+    def comparison_labels(drivers: list) -> List[str]:
+        """Short unique column labels: the driver number, else the start of the name"""
+        labels = []
+        for i, driver in enumerate(drivers, 1):
+            label = f"#{driver.driver_number}" if driver.driver_number is not None else driver.username[:4]
+            if label in labels:
+                label = f"{label[:3]}{i}"
+            labels.append(label)
+        return labels
+    
+    def build_comparison_embed(self, drivers: list) -> discord.Embed:
+        """Create comparison table and head-to-head matrix embed"""
+        embed = discord.Embed(
+            title="🔄 Driver Comparison",
+            color=discord.Color.blue()
+        )
+        
+        comparisons = [
+            ('Pts', 'total_points'),
+            ('W', 'wins'),
+            ('Pod', 'podiums'),
+            ('Pol', 'poles'),
+            ('FL', 'fastest_laps'),
+            ('DNF', 'dnfs'),
+            ('R', 'races_participated')
+        ]
+        
+        labels = self.comparison_labels(drivers)
+        
+        # Statistics table, one row per driver
+        table = f"{'':<5}" + "".join(f"{name:>6}" for name, _ in comparisons) + "\n"
+        for label, driver in zip(labels, drivers):
+            stats = driver.statistics or Statistics()
+            values = [getattr(stats, key) for _, key in comparisons]
+            table += f"{label:<5}" + "".join(f"{float(value):>6g}" for value in values) + "\n"
+        
+        embed.description = "\n".join(
+            f"`{label}` {driver.username}" for label, driver in zip(labels, drivers)
+        ) + f"\n```\n{table}```"
+        
+        # Leader for each statistic (fewest DNFs is best)
+        leaders_text = ""
+        for name, key in comparisons:
+            values = [getattr(driver.statistics or Statistics(), key) for driver in drivers]
+            best = min(values) if key == 'dnfs' else max(values)
+            leaders = [label for label, value in zip(labels, values) if value == best]
+            leaders_text += f"**{name}**: {', '.join(leaders) if len(leaders) < len(labels) else 'tied'}\n"
+        
+        embed.add_field(name="Leaders", value=leaders_text, inline=False)
+        
+        # Race-by-race head-to-head: row driver finished ahead of column driver
+        matrix = head_to_head(drivers)
+        h2h = f"{'':<5}" + "".join(f"{label:>5}" for label in labels) + "\n"
+        for i, label in enumerate(labels):
+            cells = ["-" if i == j else str(matrix[i][j]) for j in range(len(labels))]
+            h2h += f"{label:<5}" + "".join(f"{cell:>5}" for cell in cells) + "\n"
+        
+        embed.add_field(name="Head-to-Head (row ahead of column)", value=f"```\n{h2h}```", inline=False)
+        
+        return embed
 
 async def setup(bot):
     await bot.add_cog(StatsCog(bot))
@@ -0,0 +1,127 @@
+"""
+Stewarding Commands for Grid King Discord Bot
+"""
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+from typing import Dict, Literal, Optional
+
+from utils.incidents import SearchResults
+from utils.replica import ReplicaNotReady
+from utils.responder import reply, responder
+
+KIND_ICONS = {'incidents': '⚠️', 'penalties': '⚖️', 'appeals': '📨'}
+FACET_NAMES = (('kind', 'Kinds'), ('severity', 'Severity'), ('race', 'Races'), ('driver', 'Drivers'))
+
+# Discord limits embeds to 6000 characters; 8 hits stay well inside at these caps
+HIT_NAME_LIMIT = 100
+HIT_VALUE_LIMIT = 450
+
+class StewardingCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @app_commands.command(name="incidents", description="Search race incidents, penalties and appeals")
+    @app_commands.describe(
+        query="Words to look for (the last one may be partial; quote it to match it exactly)",
+        driver="Only records involving this driver (name or number)",
+        race_id="Only this race",
+        lap="Only this lap",
+        kind="Only incidents, penalties or appeals"
+    )
+    @app_commands.default_permissions(moderate_members=True)
+    @app_commands.checks.has_permissions(moderate_members=True)
+    @responder("Error searching incidents", ephemeral=True)
+    async def incidents(
+        self,
+        interaction: discord.Interaction,
+        query: Optional[str] = None,
+        driver: Optional[str] = None,
+        race_id: Optional[int] = None,
+        lap: Optional[int] = None,
+        kind: Optional[Literal['incidents', 'penalties', 'appeals']] = None
+    ):
+        """Search the local stewarding index"""
+        driver_ids = []
+        if driver:
+            drivers = self.bot.replica.search_drivers(driver)
+            wanted = driver.strip().casefold()
+            exact = [found for found in drivers
+                     if found.username.casefold() == wanted or str(found.driver_number) == wanted]
+            drivers = exact or drivers
+            if not drivers:
+                return reply(f"❌ No drivers found matching '{driver}'.", ephemeral=True)
+            driver_ids = [found.id for found in drivers]
+        
+        results = self.bot.incidents.search(
+            query or '', kinds=(kind,) if kind else (), race_id=race_id, lap=lap, driver_ids=driver_ids
+        )
+        if not results.hits:
+            return reply("No stewarding records match that search.", ephemeral=True)
+        
+        return reply(embed=self.create_results_embed(results, query), ephemeral=True)
+    
+    def _driver_names(self, results: SearchResults) -> Dict[int, str]:
+        driver_ids = {driver_id for hit in results.hits for driver_id in hit['drivers']}
+        driver_ids.update(driver_id for driver_id, _, _ in results.facets.get('driver', ()))
+        try:
+            return self.bot.replica.driver_names(driver_ids)
+        except ReplicaNotReady:
+            return {}
+    
+    @staticmethod
+    def _snippet(snippet: str) -> str:
+        """Escape the excerpt and bold the matched words"""
+        return discord.utils.escape_markdown(snippet).replace('\x02', '**').replace('\x03', '**')
+    
+    def create_results_embed(self, results: SearchResults, query: Optional[str]) -> discord.Embed:
+        """Create stewarding search results embed"""
+        names = self._driver_names(results)
+        
+        embed = discord.Embed(
+            title=f"🔍 Stewarding: '{query}'"[:256] if query else "🔍 Stewarding: latest records",
+            description=f"{results.total:,} matching records, best {len(results.hits)} shown",
+            color=discord.Color.orange()
+        )
+        
+        for hit in results.hits:
+            title = hit['title'] or (hit['type'] or hit['kind']).replace('_', ' ').capitalize()
+            details = ' • '.join(filter(None, (
+                hit['race_name'],
+                f"Lap {hit['lap']}" if hit['lap'] else None,
+                f"T{hit['turn']}" if hit['turn'] else None,
+                hit['severity'],
+                (hit['status'] or '').replace('_', ' ') or None,
+            )))
+            value = details
+            if hit['drivers']:
+                value += "\n" + ', '.join(names.get(driver_id, f"#{driver_id}") for driver_id in hit['drivers'])
+            if hit['snippet']:
+                value += "\n" + self._snippet(hit['snippet'])
+            if len(value) > HIT_VALUE_LIMIT:
+                value = value[:HIT_VALUE_LIMIT - 1] + "…"
+            embed.add_field(
+                name=f"{KIND_ICONS[hit['kind']]} {title}"[:HIT_NAME_LIMIT],
+                value=value or "—",
+                inline=False
+            )
+        
+        for facet, label in FACET_NAMES:
+            values = results.facets.get(facet)
+            if not values or (facet == 'kind' and len(values) == 1):
+                continue
+            facet_text = ""
+            for value, race_name, count in values:
+                if facet == 'race':
+                    value = f"{race_name or 'Race'} (#{value})"
+                elif facet == 'driver':
+                    value = names.get(value, f"#{value}")
+                facet_text += f"{value}: {count:,}\n"
+            embed.add_field(name=label, value=facet_text[:1024], inline=True)
+        
+        embed.set_footer(text=f"Searched {len(self.bot.incidents):,} records in {results.ms:.1f} ms")
+        return embed
+
+async def setup(bot):
+    await bot.add_cog(StewardingCog(bot))
@@ -0,0 +1,3 @@
+"""
+Shared utilities for Grid King Discord Bot
+"""
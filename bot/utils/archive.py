@@ -0,0 +1,293 @@
+"""
+All-time results archive for Grid King Discord Bot
+
+Every season's race results are stored on disk as one fixed-width binary
+file per column. Files only ever grow by appending rows with a higher
+result ID. Queries map the columns read-only (``numpy.memmap``) and scan
+them, so the raw results live in the OS page cache rather than the bot's
+heap; only the per-driver aggregates are materialised.
+
+Corrections to results that are already archived are not picked up by the
+incremental sync; delete the archive directory to rebuild it. NumPy is
+imported on first use, so the command definitions can import this module
+without slowing down startup.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from calendar import timegm
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from utils.models import parse_datetime
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger('gridking_bot')
+
+SCHEMA_VERSION = 1
+
+COLUMNS = {
+    'id': 'int32',
+    'race_id': 'int32',
+    'driver_id': 'int32',
+    'season_id': 'int32',
+    'race_time': 'int64',
+    'position': 'int16',
+    'points': 'float32',
+    'flags': 'uint8',
+}
+
+FLAG_DNF = 1
+FLAG_POLE = 2
+FLAG_FASTEST_LAP = 4
+
+# Rows requested per races/archive page during sync
+ARCHIVE_PAGE_SIZE = 2000
+
+CATEGORIES = {
+    'wins': 'Career Wins',
+    'podiums': 'Career Podiums',
+    'poles': 'Career Poles',
+    'points': 'Career Points',
+    'starts': 'Most Starts',
+    'podium_streak': 'Longest Podium Streak',
+}
+
+
+def rows_to_columns(rows: List[dict]) -> Dict[str, 'np.ndarray']:
+    """Convert races/archive rows into column arrays"""
+    import numpy as np
+
+    def race_time(value):
+        race_date = parse_datetime(value)
+        return timegm(race_date.timetuple()) if race_date else 0
+
+    def flag(value, bit):
+        return 0 if value in (None, '', 0, '0', False) else bit
+
+    flags = [
+        flag(row.get('dnf'), FLAG_DNF)
+        | flag(row.get('pole_position'), FLAG_POLE)
+        | flag(row.get('fastest_lap'), FLAG_FASTEST_LAP)
+        for row in rows
+    ]
+    return {
+        'id': np.array([int(row['id']) for row in rows], dtype=COLUMNS['id']),
+        'race_id': np.array([int(row['race_id']) for row in rows], dtype=COLUMNS['race_id']),
+        'driver_id': np.array([int(row['driver_id']) for row in rows], dtype=COLUMNS['driver_id']),
+        'season_id': np.array([int(row.get('season_id') or 0) for row in rows], dtype=COLUMNS['season_id']),
+        'race_time': np.array([race_time(row.get('race_date')) for row in rows], dtype=COLUMNS['race_time']),
+        'position': np.array([int(row.get('position') or 0) for row in rows], dtype=COLUMNS['position']),
+        'points': np.array([float(row.get('points') or 0) for row in rows], dtype=COLUMNS['points']),
+        'flags': np.array(flags, dtype=COLUMNS['flags']),
+    }
+
+
+def longest_streaks(driver_id: 'np.ndarray', race_time: 'np.ndarray', race_id: 'np.ndarray',
+                    hit: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+    """Longest run of consecutive starts satisfying ``hit`` per driver
+
+    Returns the driver IDs and their best streak lengths.
+    """
+    import numpy as np
+
+    if not len(driver_id):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    order = np.lexsort((race_id, race_time, driver_id))
+    drivers = driver_id[order]
+    hits = hit[order]
+    index = np.arange(len(order))
+
+    first = np.empty(len(order), dtype=bool)
+    first[0] = True
+    np.not_equal(drivers[1:], drivers[:-1], out=first[1:])
+
+    # A streak at i counts back to the last miss (or the driver's first start)
+    resets = np.where(~hits, index, np.where(first, index - 1, -1))
+    streak = index - np.maximum.accumulate(resets)
+
+    starts = np.flatnonzero(first)
+    return drivers[starts], np.maximum.reduceat(streak, starts)
+
+
+class ResultsArchive:
+    """Append-only columnar store of every archived race result"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mapped: Optional[Tuple[int, Dict[str, 'np.ndarray']]] = None
+        self._summary: Optional[dict] = None
+        os.makedirs(path, exist_ok=True)
+        self.meta = self._load_meta()
+
+    @property
+    def rows(self) -> int:
+        return self.meta['rows']
+
+    @property
+    def last_id(self) -> int:
+        return self.meta['last_id']
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _load_meta(self) -> dict:
+        import numpy as np
+
+        empty = {'version': SCHEMA_VERSION, 'rows': 0, 'last_id': 0, 'names': {}}
+        try:
+            with open(os.path.join(self.path, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = empty
+
+        if meta.get('version') != SCHEMA_VERSION:
+            logger.warning('Archive schema changed, rebuilding %s', self.path)
+            meta = empty
+
+        # Drop rows written after the last committed meta (interrupted append)
+        for name, dtype in COLUMNS.items():
+            size = meta['rows'] * np.dtype(dtype).itemsize
+            column_path = self._column_path(name)
+            if not os.path.exists(column_path) or os.path.getsize(column_path) < size:
+                if meta['rows']:
+                    logger.warning('Archive column %s is short, rebuilding %s', name, self.path)
+                return self._reset(empty)
+            if os.path.getsize(column_path) > size:
+                with open(column_path, 'r+b') as f:
+                    f.truncate(size)
+        return meta
+
+    def _reset(self, meta: dict) -> dict:
+        for name in COLUMNS:
+            open(self._column_path(name), 'wb').close()
+        self._write_meta(meta)
+        return meta
+
+    def _write_meta(self, meta: dict):
+        meta_path = os.path.join(self.path, 'meta.json')
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def append(self, rows: List[dict]) -> int:
+        """Append rows newer than the last archived ID; returns rows added"""
+        rows = [row for row in rows if int(row['id']) > self.last_id]
+        if not rows:
+            return 0
+        rows.sort(key=lambda row: int(row['id']))
+        columns = rows_to_columns(rows)
+
+        with self._lock:
+            for name, values in columns.items():
+                with open(self._column_path(name), 'ab') as f:
+                    values.tofile(f)
+
+            names = dict(self.meta['names'])
+            for row in rows:
+                if row.get('username'):
+                    names[str(row['driver_id'])] = row['username']
+
+            meta = {
+                'version': SCHEMA_VERSION,
+                'rows': self.rows + len(rows),
+                'last_id': int(columns['id'][-1]),
+                'names': names,
+            }
+            # Meta is written last, so a crash mid-append is rolled back on load
+            self._write_meta(meta)
+            self.meta = meta
+        return len(rows)
+
+    def columns(self) -> Dict[str, 'np.ndarray']:
+        """Read-only memory maps of every column"""
+        import numpy as np
+
+        with self._lock:
+            rows = self.rows
+            if self._mapped is None or self._mapped[0] != rows:
+                if rows:
+                    mapped = {name: np.memmap(self._column_path(name), dtype=dtype, mode='r', shape=(rows,))
+                              for name, dtype in COLUMNS.items()}
+                else:
+                    mapped = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+                self._mapped = (rows, mapped)
+            return self._mapped[1]
+
+    def mapped_bytes(self) -> int:
+        """Bytes of column data currently memory-mapped (0 before the first read)"""
+        mapped = self._mapped
+        return sum(column.nbytes for column in mapped[1].values()) if mapped else 0
+
+    def driver_name(self, driver_id: int) -> str:
+        return self.meta['names'].get(str(driver_id), f"Driver {driver_id}")
+
+    def leaderboard(self, category: str, limit: int = 10) -> Tuple[List[Tuple[str, float]], dict]:
+        """Top drivers for an all-time category plus archive coverage"""
+        import numpy as np
+
+        columns = self.columns()
+        driver_id = columns['driver_id']
+        position = columns['position']
+
+        if category == 'podium_streak':
+            podium = (position >= 1) & (position <= 3)
+            drivers, values = longest_streaks(driver_id, columns['race_time'], columns['race_id'], podium)
+        else:
+            if category == 'starts':
+                selected = driver_id
+            elif category == 'wins':
+                selected = driver_id[position == 1]
+            elif category == 'podiums':
+                selected = driver_id[(position >= 1) & (position <= 3)]
+            elif category == 'poles':
+                selected = driver_id[(columns['flags'] & FLAG_POLE) != 0]
+            elif category != 'points':
+                raise ValueError(f"Unknown category: {category}")
+
+            if category == 'points':
+                values = np.bincount(driver_id, weights=columns['points'])
+            else:
+                # Counting selected IDs avoids a float64 weights copy of the column
+                values = np.bincount(selected)
+            drivers = np.arange(len(values))
+
+        top = [i for i in np.argsort(-values, kind='stable')[:limit] if values[i] > 0]
+        records = [(self.driver_name(int(drivers[i])), float(values[i])) for i in top]
+        return records, self.summary()
+
+    def summary(self) -> dict:
+        """Result, race and season counts (computed once per archive size)"""
+        import numpy as np
+
+        rows = self.rows
+        if self._summary is None or self._summary['results'] != rows:
+            columns = self.columns()
+            self._summary = {
+                'results': rows,
+                'seasons': len(np.unique(columns['season_id'])),
+                'races': len(np.unique(columns['race_id'])),
+            }
+        return self._summary
+
+    async def sync(self, api_request) -> int:
+        """Fetch and append results newer than the archive; returns rows added"""
+        loop = asyncio.get_running_loop()
+        added = 0
+        while True:
+            page = await api_request(f'races/archive?after_id={self.last_id}&limit={ARCHIVE_PAGE_SIZE}', use_cache=False)
+            if not page:
+                break
+            rows = page.get('results') or []
+            if rows:
+                # File writes happen off the event loop
+                added += await loop.run_in_executor(None, self.append, rows)
+            if not page.get('next_after_id'):
+                break
+        return added
@@ -0,0 +1,107 @@
+"""
+Batched driver lookups for Grid King Discord Bot
+"""
+
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from utils.cache import TTLCache
+from utils.models import Driver
+
+logger = logging.getLogger('gridking_bot')
+
+# Upper bound enforced by the drivers?ids= endpoint
+MAX_BATCH = 50
+
+# Roster columns needed to match names and numbers
+ROSTER_FIELDS = ('id', 'username', 'driver_number')
+
+
+class DriverBatchClient:
+    """Resolves many drivers with a single bulk request"""
+
+    def __init__(self, bot, ttl: float = 60):
+        self.bot = bot
+        self.cache = TTLCache(default_ttl=ttl, max_entries=1024)
+
+    async def get_many(self, driver_ids: Iterable[int]) -> Dict[int, Driver]:
+        """Fetch drivers (with statistics and season results) by ID"""
+        found = {}
+        missing = []
+        for driver_id in dict.fromkeys(int(i) for i in driver_ids):
+            cached = self.cache.get(driver_id)
+            if cached is not None:
+                found[driver_id] = cached
+            else:
+                missing.append(driver_id)
+
+        for start in range(0, len(missing), MAX_BATCH):
+            chunk = missing[start:start + MAX_BATCH]
+            data = await self.bot.api_request(
+                f"drivers?ids={','.join(str(i) for i in chunk)}", use_cache=False
+            )
+            for driver in data or []:
+                self.cache.set(driver.id, driver)
+                found[driver.id] = driver
+
+        return found
+
+    async def resolve(self, queries: List[str]) -> Tuple[List[int], List[str]]:
+        """Match names or numbers against the driver roster
+
+        Returns the matched driver IDs (in query order) and the queries that
+        could not be resolved unambiguously.
+        """
+        roster = await self.bot.api_request('drivers', fields=ROSTER_FIELDS) or []
+
+        by_number = {}
+        by_name = {}
+        for driver in roster:
+            if driver.driver_number is not None:
+                by_number[str(driver.driver_number)] = driver.id
+            by_name[driver.username.casefold()] = driver.id
+
+        matched = []
+        unresolved = []
+        for query in queries:
+            key = query.strip().lstrip('#').casefold()
+            driver_id = by_number.get(key) or by_name.get(key)
+            if driver_id is None:
+                partial = [i for name, i in by_name.items() if key and key in name]
+                driver_id = partial[0] if len(partial) == 1 else None
+
+            if driver_id is None:
+                unresolved.append(query)
+            elif driver_id not in matched:
+                matched.append(driver_id)
+
+        return matched, unresolved
+
+
+def head_to_head(drivers: List[Driver]) -> List[List[int]]:
+    """Count races each driver finished ahead of each other driver
+
+    ``matrix[i][j]`` is the number of shared races where driver ``i`` beat
+    driver ``j``. A classified finish beats a DNF or missing position.
+    """
+    finishes = []
+    for driver in drivers:
+        by_race = {}
+        for result in driver.results:
+            if result.dnf or result.position is None:
+                by_race[result.race_id] = float('inf')
+            else:
+                by_race[result.race_id] = result.position
+        finishes.append(by_race)
+
+    size = len(drivers)
+    matrix = [[0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i + 1, size):
+            for race_id in finishes[i].keys() & finishes[j].keys():
+                a, b = finishes[i][race_id], finishes[j][race_id]
+                if a < b:
+                    matrix[i][j] += 1
+                elif b < a:
+                    matrix[j][i] += 1
+    return matrix
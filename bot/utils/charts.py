@@ -0,0 +1,145 @@
+"""
+Off-loop chart rendering for Grid King Discord Bot
+
+Rasterising a chart takes tens of milliseconds of pure CPU, which would
+stall the discord.py event loop. Series are built on the loop (cheap), the
+PNG is rendered in a process pool, and finished images are cached by
+(season, drivers, last result id) so they are only redrawn when new results
+land.
+"""
+
+import asyncio
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from utils.cache import TTLCache
+from utils.models import Race
+
+logger = logging.getLogger('gridking_bot')
+
+# Worker processes and the maximum number of renders running or waiting
+CHART_WORKERS = 2
+CHART_MAX_PENDING = 6
+
+SERIES_COLORS = [
+    '#e6194b', '#3cb44b', '#ffe119', '#4363d8', '#f58231',
+    '#911eb4', '#46f0f0', '#f032e6', '#bcf60c', '#fabebe',
+]
+
+
+class ChartBusyError(Exception):
+    """Raised when the render queue is full"""
+
+
+def build_progression_series(races: Sequence[Race], driver_ids: Sequence[int]) -> Tuple[List[str], Dict[str, List[float]]]:
+    """Cumulative championship points per driver after each scored race"""
+    scored = sorted((race for race in races if race.results), key=lambda race: race.race_date)
+    labels = [race.track for race in scored]
+
+    names = {}
+    totals = {driver_id: 0.0 for driver_id in driver_ids}
+    points = {driver_id: [] for driver_id in driver_ids}
+    for race in scored:
+        for result in race.results:
+            if result.driver_id in totals:
+                totals[result.driver_id] += result.points
+                names.setdefault(result.driver_id, f"#{result.driver_number} {result.username}")
+        for driver_id in driver_ids:
+            points[driver_id].append(totals[driver_id])
+
+    series = {names.get(driver_id, f"Driver {driver_id}"): points[driver_id] for driver_id in driver_ids}
+    return labels, series
+
+
+def last_result_id(races: Sequence[Race]) -> int:
+    """Highest race_results ID in the season, used to invalidate charts"""
+    return max((result.id or 0 for race in races for result in race.results), default=0)
+
+
+def render_progression_png(title: str, labels: List[str], series: Dict[str, List[float]]) -> bytes:
+    """Render a points-progression line chart (runs in a worker process)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 5.5), dpi=100, facecolor='#2f3136')
+    ax = fig.subplots()
+    ax.set_facecolor('#2f3136')
+
+    x = list(range(1, len(labels) + 1))
+    for i, (name, values) in enumerate(series.items()):
+        ax.plot(x, values, marker='o', linewidth=2, markersize=4,
+                color=SERIES_COLORS[i % len(SERIES_COLORS)], label=name)
+
+    ax.set_title(title, color='white', fontsize=14)
+    ax.set_ylabel('Points', color='white')
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
+    ax.tick_params(colors='white')
+    ax.grid(True, alpha=0.2)
+    for spine in ax.spines.values():
+        spine.set_color('#72767d')
+    ax.legend(loc='upper left', fontsize=8, facecolor='#36393f', labelcolor='white', framealpha=0.9)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', facecolor=fig.get_facecolor())
+    return buffer.getvalue()
+
+
+class ChartRenderer:
+    """Process-pool renderer with a bounded queue and a PNG cache"""
+
+    def __init__(self, workers: int = CHART_WORKERS, max_pending: int = CHART_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.cache = TTLCache(default_ttl=60 * 60, max_entries=64)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._in_flight)
+
+    async def render_progression(self, cache_key: Hashable, title: str,
+                                 labels: List[str], series: Dict[str, List[float]]) -> bytes:
+        """Return a cached PNG or render one off the event loop
+
+        Identical concurrent requests share one render. Raises ChartBusyError
+        when the queue is full.
+        """
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        in_flight = self._in_flight.get(cache_key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ChartBusyError()
+
+        if self._executor is None:
+            # Started on first use so the bot doesn't pay for idle workers
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, render_progression_png, title, labels, series)
+        self._in_flight[cache_key] = future
+        try:
+            png = await asyncio.shield(future)
+        finally:
+            self._in_flight.pop(cache_key, None)
+
+        self.cache.set(cache_key, png)
+        return png
+
+    def shutdown(self):
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,564 @@
+"""
+Data sources for Grid King Discord Bot
+
+``api_request`` reads league data through its tenant's data source, which
+returns the decoded payload in the API's shape so models, caches,
+projections and cogs don't depend on where it came from:
+
+- ``HttpSource`` calls the league's PHP API (every route)
+- ``SqlSource`` answers the hot read routes (``standings``, ``drivers/<id>``,
+  ``drivers/search``, ``races/recent`` and ``races/<id>``) from a read-only
+  aiomysql pool to the league database (``database_setup.sql``), skipping
+  PHP-FPM and the API router. Every other route, writes, and requests made
+  while the database can't be reached go to the API.
+
+The SQL for each route and projection is built once and reused with bound
+parameters. The queries start from the index that narrows the rows
+(``idx_active``/``idx_season_id`` then ``unique_race_driver`` for season
+results, ``idx_race_date`` for recent races, primary keys for lookups),
+aggregate results before joining driver details, and fetch the results of
+several races in one query.
+
+The default tenant uses it with ``DATA_SOURCE=sql`` and ``DB_HOST``,
+``DB_PORT``, ``DB_NAME``, ``DB_USER`` and ``DB_PASS`` (a user with SELECT
+only is enough); aiomysql is imported on first use.
+
+API responses are negotiated per request. With ``API_FORMAT=msgpack`` (or
+``format`` in the tenants file) the bot asks for MessagePack instead of
+JSON. That needs the msgpack package here and the msgpack extension on the
+server, which answers JSON otherwise. Larger bodies come compressed with
+br (when the Brotli package is installed), gzip or deflate. ``HttpSource``
+decompresses and decodes bodies itself rather than leaving it to aiohttp,
+so ``snapshot()`` can report the bytes on the wire and the decode time per
+format.
+"""
+
+import asyncio
+import gzip
+import importlib
+import json
+import logging
+import time
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import aiohttp
+
+logger = logging.getLogger('gridking_bot')
+
+HTTP = 'http'
+SQL = 'sql'
+
+# Response formats the API can be asked for
+JSON = 'json'
+MSGPACK = 'msgpack'
+FORMATS = (JSON, MSGPACK)
+
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+# Seconds before connecting again after the database couldn't be reached
+RECONNECT_DELAY = 60
+
+# Limits of the API routes the SQL source stands in for
+STANDINGS_MAX_LIMIT = 100
+RECENT_MAX_LIMIT = 20
+RECENT_DEFAULT_LIMIT = 5
+SEARCH_LIMIT = 10
+MIN_SEARCH_LENGTH = 2
+MAX_SEARCH_LENGTH = 50
+
+# Field name => select item, as in config.php's STANDINGS_COLUMNS (over the
+# per-driver season aggregate below)
+STANDINGS_COLUMNS = {
+    'id': 'd.id',
+    'username': 'u.username',
+    'driver_number': 'd.driver_number',
+    'team_name': 't.name AS team_name',
+    'total_points': 's.total_points',
+    'wins': 'COALESCE(s.wins, 0) AS wins',
+    'poles': 'COALESCE(s.poles, 0) AS poles',
+    'fastest_laps': 'COALESCE(s.fastest_laps, 0) AS fastest_laps',
+    'dnfs': 'COALESCE(s.dnfs, 0) AS dnfs',
+    'avg_position': 's.avg_position',
+}
+
+# Columns of races/recent (see api/endpoints/races.php)
+RACE_COLUMNS = {
+    'id': 'r.id',
+    'season_id': 'r.season_id',
+    'name': 'r.name',
+    'track': 'r.track',
+    'race_date': 'r.race_date',
+    'format': 'r.format',
+    'laps': 'r.laps',
+    'status': 'r.status',
+    'track_image': 'r.track_image',
+    'weather_conditions': 'r.weather_conditions',
+    'description': 'r.description',
+    'season_name': 's.name AS season_name',
+    'season_year': 's.year AS season_year',
+}
+
+RESULT_COLUMNS = {
+    'id': 'rr.id',
+    'race_id': 'rr.race_id',
+    'driver_id': 'rr.driver_id',
+    'position': 'rr.position',
+    'points': 'rr.points',
+    'fastest_lap': 'rr.fastest_lap',
+    'fastest_lap_time': 'rr.fastest_lap_time',
+    'pole_position': 'rr.pole_position',
+    'dnf': 'rr.dnf',
+    'dnf_reason': 'rr.dnf_reason',
+    'grid_position': 'rr.grid_position',
+    'status': 'rr.status',
+    'username': 'u.username',
+    'driver_number': 'd.driver_number',
+    'team_name': 't.name AS team_name',
+}
+
+DRIVER_COLUMNS = (
+    'd.id, d.user_id, d.team_id, d.driver_number, d.platform, d.country, d.livery_image, d.bio, '
+    'd.created_at, d.updated_at, u.username, t.name AS team_name'
+)
+
+STATISTICS_COLUMNS = '''
+    COUNT(*) AS races_participated,
+    COUNT(CASE WHEN rr.position = 1 THEN 1 END) AS wins,
+    COUNT(CASE WHEN rr.position <= 3 THEN 1 END) AS podiums,
+    COUNT(CASE WHEN rr.pole_position = 1 THEN 1 END) AS poles,
+    COUNT(CASE WHEN rr.fastest_lap = 1 THEN 1 END) AS fastest_laps,
+    COUNT(CASE WHEN rr.dnf = 1 THEN 1 END) AS dnfs,
+    SUM(rr.points) AS total_points,
+    AVG(rr.position) AS avg_position,
+    MIN(rr.position) AS best_position
+'''
+
+# Active-season results of one driver: the active season's races, then each
+# race's (race_id, driver_id) entry in unique_race_driver
+ACTIVE_SEASON_RESULTS = '''
+    FROM seasons se
+    JOIN races r ON r.season_id = se.id
+    JOIN race_results rr ON rr.race_id = r.id AND rr.driver_id = %s
+    WHERE se.is_active = 1
+'''
+
+DRIVER_SQL = f'''
+    SELECT {DRIVER_COLUMNS}, t.logo AS team_logo
+    FROM drivers d
+    JOIN users u ON u.id = d.user_id
+    LEFT JOIN teams t ON t.id = d.team_id
+    WHERE d.id = %s AND u.verified = 1
+'''
+
+DRIVER_STATISTICS_SQL = f'SELECT {STATISTICS_COLUMNS} {ACTIVE_SEASON_RESULTS}'
+
+DRIVER_RECENT_SQL = f'''
+    SELECT rr.*, r.name AS race_name, r.track, r.race_date
+    {ACTIVE_SEASON_RESULTS}
+    ORDER BY r.race_date DESC
+    LIMIT 5
+'''
+
+SEARCH_SQL = f'''
+    SELECT {DRIVER_COLUMNS}
+    FROM drivers d
+    JOIN users u ON u.id = d.user_id
+    LEFT JOIN teams t ON t.id = d.team_id
+    WHERE u.verified = 1 AND (u.username LIKE %s OR d.driver_number = %s)
+    ORDER BY u.username ASC
+    LIMIT {SEARCH_LIMIT}
+'''
+
+ACTIVE_SEASON_SQL = 'SELECT id, name, year FROM seasons WHERE is_active = 1 LIMIT 1'
+
+SEASON_SQL = 'SELECT id, name, year FROM seasons WHERE id = %s'
+
+RACE_SQL = '''
+    SELECT r.*, s.name AS season_name, s.year AS season_year
+    FROM races r
+    LEFT JOIN seasons s ON s.id = r.season_id
+    WHERE r.id = %s
+'''
+
+
+def _requested_fields(query: Dict[str, str]) -> Optional[List[str]]:
+    """Fields from ``fields=`` (None when absent: everything), as requestedFields() in PHP"""
+    fields = [name.strip() for name in query.get('fields', '').split(',') if name.strip()]
+    return list(dict.fromkeys(fields)) or None
+
+
+def _requested_limit(query: Dict[str, str], maximum: int) -> Optional[int]:
+    if 'limit' not in query:
+        return None
+    return min(maximum, max(1, int(query['limit'])))
+
+
+def _select(columns: Dict[str, str], fields: Optional[Sequence[str]], prefix: str = '',
+            required: Sequence[str] = ()) -> str:
+    """Select items for the requested fields (see projectColumns in the API)"""
+    if fields is None or (prefix and prefix.rstrip('.') in fields):
+        return ', '.join(columns.values())
+    return ', '.join(item for name, item in columns.items() if prefix + name in fields or name in required)
+
+
+@lru_cache(maxsize=64)
+def _standings_sql(select: str, limited: bool) -> str:
+    # The season's races (idx_season_id) and their results (unique_race_driver)
+    # are aggregated per driver before the driver details are joined by key.
+    # Drivers without any results are listed too, as by calculateStandings().
+    return f'''
+        SELECT {select}
+        FROM drivers d
+        LEFT JOIN users u ON u.id = d.user_id
+        LEFT JOIN teams t ON t.id = d.team_id
+        LEFT JOIN (
+            SELECT
+                rr.driver_id,
+                SUM(rr.points) AS total_points,
+                COUNT(CASE WHEN rr.position = 1 THEN 1 END) AS wins,
+                COUNT(CASE WHEN rr.pole_position = TRUE THEN 1 END) AS poles,
+                COUNT(CASE WHEN rr.fastest_lap = TRUE THEN 1 END) AS fastest_laps,
+                COUNT(CASE WHEN rr.dnf = TRUE THEN 1 END) AS dnfs,
+                AVG(rr.position) AS avg_position
+            FROM races r
+            JOIN race_results rr ON rr.race_id = r.id
+            WHERE r.season_id = %s
+            GROUP BY rr.driver_id
+        ) s ON s.driver_id = d.id
+        WHERE s.driver_id IS NOT NULL
+           OR NOT EXISTS (SELECT 1 FROM race_results x WHERE x.driver_id = d.id)
+        ORDER BY s.total_points DESC, s.wins DESC, s.avg_position ASC
+    ''' + ('LIMIT %s' if limited else '')
+
+
+@lru_cache(maxsize=64)
+def _recent_sql(select: str) -> str:
+    # Backward range scan of idx_race_date, stopping after LIMIT rows
+    return f'''
+        SELECT {select}
+        FROM races r
+        LEFT JOIN seasons s ON s.id = r.season_id
+        WHERE r.race_date <= NOW()
+        ORDER BY r.race_date DESC
+        LIMIT %s
+    '''
+
+
+@lru_cache(maxsize=64)
+def _results_sql(select: str, races: int) -> str:
+    # One query for all the races, by the race_id prefix of unique_race_driver
+    placeholders = ', '.join(['%s'] * races)
+    return f'''
+        SELECT rr.race_id AS race_key, {select}
+        FROM race_results rr
+        LEFT JOIN drivers d ON d.id = rr.driver_id
+        LEFT JOIN users u ON u.id = d.user_id
+        LEFT JOIN teams t ON t.id = d.team_id
+        WHERE rr.race_id IN ({placeholders})
+        ORDER BY rr.race_id, rr.position ASC
+    '''
+
+
+@lru_cache(maxsize=None)
+def _codec(*names: str):
+    """The first of the modules ``names`` that is installed, or None"""
+    for name in names:
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            pass
+    return None
+
+
+def accept_encoding() -> str:
+    """Content codings the bot can decompress, best first"""
+    return 'br, gzip, deflate' if _codec('brotli', 'brotlicffi') else 'gzip, deflate'
+
+
+def decompress(body: bytes, encoding: str) -> bytes:
+    """Body without its Content-Encoding"""
+    encoding = encoding.strip().lower()
+    if encoding in ('', 'identity'):
+        return body
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send raw deflate without the zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    brotli = _codec('brotli', 'brotlicffi') if encoding == 'br' else None
+    if brotli is None:
+        raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+    return brotli.decompress(body)
+
+
+def decode(body: bytes, content_type: str) -> Any:
+    """Payload of a JSON or MessagePack body"""
+    if content_type in MSGPACK_TYPES:
+        msgpack = _codec('msgpack')
+        if msgpack is None:
+            raise ValueError("MessagePack response without the msgpack package")
+        # PHP arrays with numeric keys become integer map keys
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    return json.loads(body)
+
+
+class HttpSource:
+    """The league's PHP API (every route)"""
+
+    kind = HTTP
+
+    def __init__(self, tenant, response_format: str = JSON):
+        self.tenant = tenant
+        if response_format == MSGPACK and _codec('msgpack') is None:
+            logger.warning("msgpack is not installed; tenant %s uses JSON responses", tenant.name)
+            response_format = JSON
+        self.format = response_format
+        self.headers = {
+            'Accept': 'application/msgpack, application/json;q=0.5' if response_format == MSGPACK
+            else 'application/json',
+            'Accept-Encoding': accept_encoding(),
+        }
+        # Per format and coding ('json+gzip'): responses, wire/decoded bytes and decode time
+        self.transfer: Dict[str, Dict[str, float]] = {}
+
+    async def fetch(self, endpoint: str, method: str = 'GET', timeout: float = 10) -> Optional[Any]:
+        """Decoded payload of a 200 response; None (logged) for any other status"""
+        tenant = self.tenant
+        # Only the tenant's own requests wait for its API budget
+        await tenant.budget.acquire()
+        async with tenant.session.request(method, f"{tenant.api_base_url}/{endpoint}", headers=self.headers,
+                                          timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            logger.debug('API %s %s %s -> %s', tenant.name, method, endpoint, response.status)
+            if response.status == 200:
+                body = await response.read()
+                # Tenant sessions leave decompression to us; other sessions (benchmarks) may not
+                encoding = '' if tenant.session.auto_decompress else response.headers.get('Content-Encoding', '')
+                start = time.perf_counter()
+                raw = decompress(body, encoding)
+                data = decode(raw, response.content_type)
+                self._count(response.content_type, encoding, len(body), len(raw), time.perf_counter() - start)
+                return data
+            elif response.status == 401:
+                logger.error("API authentication failed for tenant %s", tenant.name)
+            elif response.status == 429:
+                logger.warning("API rate limit exceeded for tenant %s", tenant.name)
+            else:
+                logger.error('API request failed: %s', response.status)
+            return None
+
+    def _count(self, content_type: str, encoding: str, wire: int, decoded: int, seconds: float):
+        name = (MSGPACK if content_type in MSGPACK_TYPES else JSON) + '+' + (encoding.strip().lower() or 'identity')
+        stats = self.transfer.get(name)
+        if stats is None:
+            stats = self.transfer[name] = {'responses': 0, 'wire_bytes': 0, 'decoded_bytes': 0, 'decode_ms': 0.0}
+        stats['responses'] += 1
+        stats['wire_bytes'] += wire
+        stats['decoded_bytes'] += decoded
+        stats['decode_ms'] += seconds * 1000
+
+    async def close(self):
+        pass
+
+    def snapshot(self) -> dict:
+        return {'kind': self.kind, 'format': self.format, 'transfer': dict(self.transfer)}
+
+
+class SqlSource:
+    """Read-only connection pool to the league database for the hot read routes"""
+
+    kind = SQL
+
+    def __init__(self, fallback: HttpSource, host: str, port: int, database: str, user: str, password: str,
+                 connections: int = 4):
+        self.fallback = fallback
+        self.host = host
+        self.port = port
+        self.database = database
+        self.user = user
+        self.password = password
+        self.connections = connections
+        self.pool = None
+        self._errors: Tuple[type, ...] = ()
+        self._connect_lock = asyncio.Lock()
+        self._retry_at = 0.0
+        self.metrics = {'queries': 0, 'fallbacks': 0, 'errors': 0, 'total_ms': 0.0}
+
+    def _route(self, endpoint: str):
+        """(handler, argument, query) for routes answered from the database, else None"""
+        split = urlsplit(endpoint)
+        parts = split.path.strip('/').split('/')
+        query = {key: values[-1] for key, values in parse_qs(split.query).items()}
+        root, sub = parts[0], parts[1] if len(parts) > 1 else ''
+        if len(parts) > 2:
+            return None
+        if root == 'standings' and not sub:
+            return self._standings, None, query
+        if root == 'drivers' and sub.isdigit():
+            return self._driver, int(sub), query
+        if root == 'drivers' and sub == 'search':
+            return self._search, query.get('q', ''), query
+        if root == 'races' and sub == 'recent':
+            return self._recent, None, query
+        if root == 'races' and sub.isdigit():
+            return self._race, int(sub), query
+        return None
+
+    async def _connect(self) -> bool:
+        """Create the pool on first use; False while the database is unavailable"""
+        if self.pool is not None:
+            return True
+        async with self._connect_lock:
+            if self.pool is not None:
+                return True
+            if time.monotonic() < self._retry_at:
+                return False
+            try:
+                import aiomysql
+            except ImportError:
+                logger.error('DATA_SOURCE=sql needs aiomysql; reading from the API instead')
+                self._retry_at = float('inf')
+                return False
+            self._errors = (aiomysql.Error,)
+            try:
+                self.pool = await aiomysql.create_pool(
+                    host=self.host, port=self.port, db=self.database, user=self.user, password=self.password,
+                    minsize=1, maxsize=self.connections, autocommit=True, charset='utf8mb4',
+                    cursorclass=aiomysql.DictCursor, connect_timeout=5,
+                    init_command='SET SESSION TRANSACTION READ ONLY'
+                )
+            except (aiomysql.Error, OSError) as e:
+                logger.error('Database connection failed (%s), using the API for %ds', type(e).__name__,
+                             RECONNECT_DELAY)
+                self._retry_at = time.monotonic() + RECONNECT_DELAY
+                return False
+            logger.info('Reading league data from %s:%s/%s', self.host, self.port, self.database)
+            return True
+
+    async def fetch(self, endpoint: str, method: str = 'GET', timeout: float = 10) -> Optional[Any]:
+        """Answer ``endpoint`` from the database, or from the API if it isn't a hot read route"""
+        route = self._route(endpoint) if method == 'GET' else None
+        if route is None or not await self._connect():
+            if route is not None:
+                self.metrics['fallbacks'] += 1
+            return await self.fallback.fetch(endpoint, method, timeout)
+
+        handler, argument, query = route
+        start = time.perf_counter()
+        try:
+            async with self.pool.acquire() as conn:
+                try:
+                    async with conn.cursor() as cursor:
+                        return await asyncio.wait_for(handler(cursor, argument, query), timeout)
+                except asyncio.TimeoutError:
+                    # A cancelled query leaves unread rows on the connection; the pool drops closed ones
+                    conn.close()
+                    raise
+        except self._errors as e:
+            logger.warning('Database read failed for %s (%s), using the API', endpoint, type(e).__name__)
+            self.metrics['errors'] += 1
+            self.metrics['fallbacks'] += 1
+            return await self.fallback.fetch(endpoint, method, timeout)
+        finally:
+            self.metrics['queries'] += 1
+            self.metrics['total_ms'] += (time.perf_counter() - start) * 1000
+
+    async def _standings(self, cursor, _, query: Dict[str, str]) -> Optional[dict]:
+        fields = _requested_fields(query)
+        if fields is not None and not set(fields) <= STANDINGS_COLUMNS.keys():
+            logger.error('Unknown standings fields: %s', fields)
+            return None
+        limit = _requested_limit(query, STANDINGS_MAX_LIMIT)
+
+        season_id = query.get('season_id')
+        if season_id is not None:
+            if not season_id.isdigit() or int(season_id) <= 0:
+                return None
+            season_id = int(season_id)
+            await cursor.execute(SEASON_SQL, (season_id,))
+            season = await cursor.fetchone()
+        else:
+            await cursor.execute(ACTIVE_SEASON_SQL)
+            season = await cursor.fetchone()
+            if season is None:
+                # Same fallback as the endpoint when no season is active
+                season_id = 1
+                await cursor.execute(SEASON_SQL, (season_id,))
+                season = await cursor.fetchone()
+            else:
+                season_id = season['id']
+
+        sql = _standings_sql(_select(STANDINGS_COLUMNS, fields), limit is not None)
+        await cursor.execute(sql, (season_id,) if limit is None else (season_id, limit))
+        season_info = {'name': season['name'], 'year': season['year']} if season else None
+        return {'season': season_info, 'standings': list(await cursor.fetchall())}
+
+    async def _driver(self, cursor, driver_id: int, _) -> Optional[dict]:
+        await cursor.execute(DRIVER_SQL, (driver_id,))
+        driver = await cursor.fetchone()
+        if driver is None:
+            return None
+        await cursor.execute(DRIVER_STATISTICS_SQL, (driver_id,))
+        driver['statistics'] = await cursor.fetchone()
+        await cursor.execute(DRIVER_RECENT_SQL, (driver_id,))
+        driver['recent_results'] = list(await cursor.fetchall())
+        return driver
+
+    async def _search(self, cursor, text: str, _) -> Optional[list]:
+        text = text.strip()
+        if not MIN_SEARCH_LENGTH <= len(text) <= MAX_SEARCH_LENGTH:
+            return None
+        pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        await cursor.execute(SEARCH_SQL, (pattern, int(text) if text.isdigit() else 0))
+        return list(await cursor.fetchall())
+
+    async def _recent(self, cursor, _, query: Dict[str, str]) -> Optional[list]:
+        fields = _requested_fields(query)
+        known = set(RACE_COLUMNS) | {'results'} | {f"results.{name}" for name in RESULT_COLUMNS}
+        if fields is not None and not set(fields) <= known:
+            logger.error('Unknown races/recent fields: %s', fields)
+            return None
+        with_results = fields is None or any(name == 'results' or name.startswith('results.') for name in fields)
+        limit = _requested_limit(query, RECENT_MAX_LIMIT) or RECENT_DEFAULT_LIMIT
+
+        await cursor.execute(_recent_sql(_select(RACE_COLUMNS, fields, required=('id',) if with_results else ())),
+                             (limit,))
+        races = list(await cursor.fetchall())
+        if with_results:
+            await self._attach_results(cursor, races, _select(RESULT_COLUMNS, fields, 'results.'))
+        return races
+
+    async def _race(self, cursor, race_id: int, _) -> Optional[dict]:
+        # Sessions aren't read: races/<id> is only used for its results
+        await cursor.execute(RACE_SQL, (race_id,))
+        race = await cursor.fetchone()
+        if race is None:
+            return None
+        await self._attach_results(cursor, [race], _select(RESULT_COLUMNS, None))
+        return race
+
+    async def _attach_results(self, cursor, races: List[dict], select: str):
+        for race in races:
+            race['results'] = []
+        if not races or not select:
+            return
+        by_id = {race['id']: race for race in races}
+        await cursor.execute(_results_sql(select, len(by_id)), tuple(by_id))
+        for row in await cursor.fetchall():
+            by_id[row.pop('race_key')]['results'].append(row)
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    def snapshot(self) -> dict:
+        queries = self.metrics['queries']
+        return dict(self.metrics, kind=self.kind, connected=self.pool is not None,
+                    avg_ms=self.metrics['total_ms'] / queries if queries else 0.0)
@@ -0,0 +1,191 @@
+"""
+Per-channel response deduplication for Grid King Discord Bot
+
+Right after a race several people in one channel tend to run the same
+command within seconds. Each would cost an API call (or a cache lookup and
+a render) and post the same embed again. Commands that opt in with
+``@responder(..., dedupe=<seconds>)`` share one answer per
+(channel, command, normalised options) for that window after it was
+posted. A caller who arrives while the first answer is still being built
+waits for it instead of starting another. Later callers get, by policy:
+
+- POINTER: an ephemeral link to the message that was just posted (the
+  default; falls back to REUSE if the link can't be fetched)
+- REUSE: the already-rendered reply again, ephemerally (replies with
+  files fall back to POINTER, since a file can only be sent once)
+
+Only public, successful answers are shared. If the first caller fails,
+its duplicates run the command themselves (answering privately, as
+decided when they arrived). DEDUPE_COMMANDS overrides the
+window and policy per command, e.g. ``lastrace=reuse:20,stats=off``.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger('gridking_bot')
+
+POINTER = 'pointer'
+REUSE = 'reuse'
+OFF = 'off'
+POLICIES = (POINTER, REUSE, OFF)
+
+# Answers kept at most (oldest dropped first)
+MAX_ENTRIES = 1024
+
+_OVERRIDE = re.compile(r'^([a-z0-9_-]+)=(pointer|reuse|off)(?::(\d+(?:\.\d+)?))?$')
+
+
+def normalise(value):
+    """Option value as compared between invocations"""
+    if isinstance(value, str):
+        return ' '.join(value.split()).casefold()
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    return getattr(value, 'id', str(value))
+
+
+class _Answer:
+    """The first invocation's reply, shared with its duplicates"""
+
+    __slots__ = ('posted', 'reply', 'interaction', 'expires', 'jump_url')
+
+    def __init__(self):
+        self.posted = asyncio.get_running_loop().create_future()
+        self.reply: Optional[dict] = None
+        self.interaction: Optional[discord.Interaction] = None
+        self.expires: Optional[float] = None
+        self.jump_url: Optional[str] = None
+
+
+class Claim:
+    """An invocation's place in a dedupe window: the first answer, or a duplicate of it"""
+
+    def __init__(self, deduper: 'ResponseDeduper', key: tuple, answer: _Answer, duplicate: bool,
+                 window: float, policy: str):
+        self.deduper = deduper
+        self.key = key
+        self.answer = answer
+        self.duplicate = duplicate
+        self.window = window
+        self.policy = policy
+
+    async def run(self, build: Callable[[], Awaitable[dict]]) -> dict:
+        """Reply for this invocation; ``build`` runs the command itself"""
+        if self.duplicate:
+            shared = await self.deduper.shared_reply(self.answer, self.policy)
+            if shared is not None:
+                return shared
+            return await build()
+        self.answer.reply = await build()
+        return self.answer.reply
+
+    def done(self, interaction: discord.Interaction, sent: bool):
+        """The first invocation is over; its reply is shared if it was sent"""
+        if not self.duplicate:
+            self.deduper.posted(self.key, self.answer, interaction, self.window, sent)
+
+
+class ResponseDeduper:
+    """Shares recent identical answers within a channel"""
+
+    def __init__(self, overrides: str = ''):
+        self.overrides: Dict[str, Tuple[str, Optional[float]]] = {}
+        for item in filter(None, (part.strip().lower() for part in overrides.split(','))):
+            match = _OVERRIDE.match(item)
+            if not match:
+                logger.error("Invalid DEDUPE_COMMANDS entry: %s", item)
+                continue
+            window = match.group(3)
+            self.overrides[match.group(1)] = (match.group(2), float(window) if window else None)
+        self.answers: 'OrderedDict[tuple, _Answer]' = OrderedDict()
+        self.stats = {'duplicates': 0, 'pointers': 0, 'reused': 0, 'fallbacks': 0}
+
+    def rule(self, command: str, window: Optional[float], policy: str) -> Optional[Tuple[float, str]]:
+        """Window and policy for ``command`` after overrides; None when it isn't deduplicated"""
+        override_policy, override_window = self.overrides.get(command, (policy, None))
+        window = override_window if override_window is not None else window
+        if not window or override_policy == OFF:
+            return None
+        return window, override_policy
+
+    def claim(self, interaction: discord.Interaction, command: str, args: tuple, kwargs: dict,
+              window: Optional[float], policy: str = POINTER) -> Optional[Claim]:
+        """Claim for this invocation, or None when it isn't deduplicated"""
+        rule = self.rule(command, window, policy)
+        channel_id = getattr(interaction, 'channel_id', None)
+        if rule is None or not channel_id:
+            return None
+        window, policy = rule
+
+        key = (channel_id, command, tuple(normalise(arg) for arg in args),
+               tuple(sorted((name, normalise(value)) for name, value in kwargs.items())))
+        self._prune()
+        answer = self.answers.get(key)
+        if answer is not None:
+            self.stats['duplicates'] += 1
+            return Claim(self, key, answer, True, window, policy)
+
+        answer = self.answers[key] = _Answer()
+        while len(self.answers) > MAX_ENTRIES:
+            self.answers.popitem(last=False)
+        return Claim(self, key, answer, False, window, policy)
+
+    def posted(self, key: tuple, answer: _Answer, interaction: discord.Interaction, window: float, sent: bool):
+        reply = answer.reply
+        shareable = (sent and reply is not None and not reply.get('ephemeral')
+                     and not str(reply.get('content') or '').startswith('❌'))
+        if shareable:
+            answer.interaction = interaction
+            answer.expires = time.monotonic() + window
+        elif self.answers.get(key) is answer:
+            del self.answers[key]
+        if not answer.posted.done():
+            answer.posted.set_result(shareable)
+
+    async def shared_reply(self, answer: _Answer, policy: str) -> Optional[dict]:
+        """Reply for a duplicate once the first answer is posted; None to run the command instead"""
+        if not await asyncio.shield(answer.posted):
+            self.stats['fallbacks'] += 1
+            return None
+
+        reply = answer.reply
+        reusable = 'file' not in reply and 'files' not in reply
+        if policy == REUSE and reusable:
+            return self._reuse(reply)
+
+        if answer.jump_url is None:
+            try:
+                message = await answer.interaction.original_response()
+                answer.jump_url = message.jump_url
+            except discord.HTTPException as e:
+                logger.debug("Could not fetch the shared answer's message: %s", e)
+                if reusable:
+                    return self._reuse(reply)
+                self.stats['fallbacks'] += 1
+                return None
+        self.stats['pointers'] += 1
+        return {'content': f"↩️ This was just answered here: {answer.jump_url}", 'ephemeral': True}
+
+    def _reuse(self, reply: dict) -> dict:
+        self.stats['reused'] += 1
+        # Views belong to the message they were sent with
+        shared = {name: value for name, value in reply.items() if name != 'view'}
+        shared['ephemeral'] = True
+        return shared
+
+    def _prune(self):
+        now = time.monotonic()
+        expired = [key for key, answer in self.answers.items()
+                   if answer.expires is not None and answer.expires <= now]
+        for key in expired:
+            del self.answers[key]
+
+    def __len__(self) -> int:
+        return len(self.answers)
@@ -0,0 +1,148 @@
+"""
+Streamed data exports for Grid King Discord Bot
+
+``/export`` pages through ``exports/rows/<type>`` with an ``after_id``
+cursor (keyset pagination: each page starts after the last key of the
+previous one, so page 100 costs the API as much as page 1). Every page is
+written to a spooled temporary file as CSV or JSON, optionally through
+gzip, before the next one is requested, so only one page of rows is held
+at a time however large the export gets. The file stays in memory up to
+SPOOL_MEMORY bytes and moves to disk beyond that; ``ExportFile`` attaches
+it and deletes it once sent.
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import tempfile
+from typing import Callable, Optional, Tuple
+
+import discord
+
+from utils.scheduler import BACKGROUND
+
+logger = logging.getLogger('gridking_bot')
+
+EXPORT_TYPES = ('results', 'standings', 'penalties')
+FORMATS = ('csv', 'json')
+
+# Rows per request (the API allows up to 5000)
+PAGE_SIZE = 1000
+
+# Bytes of export kept in memory before the spool moves to a temp file
+SPOOL_MEMORY = 4 * 1024 * 1024
+
+# Stop runaway exports; anything this large would not fit an upload anyway
+MAX_ROWS = 1_000_000
+
+# Seconds per page request
+PAGE_TIMEOUT = 30
+
+
+class ExportError(Exception):
+    """Raised when an export cannot be completed"""
+
+
+class ExportFile(discord.File):
+    """Attachment that closes (and so deletes) its spooled file once sent
+
+    discord.py only closes files it opened itself; this one owns the spool.
+    """
+
+    def close(self):
+        super().close()
+        self.fp.close()
+
+
+class _CsvWriter:
+    def __init__(self, text: io.TextIOBase):
+        self.text = text
+        self.writer = None
+
+    def write(self, rows: list):
+        if self.writer is None:
+            # Columns come from the first row; every page selects the same ones
+            self.writer = csv.DictWriter(self.text, fieldnames=list(rows[0]), extrasaction='ignore')
+            self.writer.writeheader()
+        self.writer.writerows(rows)
+
+    def finish(self):
+        pass
+
+
+class _JsonWriter:
+    def __init__(self, text: io.TextIOBase):
+        self.text = text
+        self.separator = '[\n'
+
+    def write(self, rows: list):
+        for row in rows:
+            self.text.write(self.separator)
+            self.text.write(json.dumps(row, ensure_ascii=False, default=str))
+            self.separator = ',\n'
+
+    def finish(self):
+        self.text.write('[]\n' if self.separator == '[\n' else '\n]\n')
+
+
+def export_endpoint(data_type: str, after_id: int, limit: int, season_id: Optional[int] = None,
+                    race_id: Optional[int] = None) -> str:
+    endpoint = f"exports/rows/{data_type}?after_id={after_id}&limit={limit}"
+    if season_id is not None:
+        endpoint += f"&season_id={season_id}"
+    if race_id is not None:
+        endpoint += f"&race_id={race_id}"
+    return endpoint
+
+
+async def stream_export(api_request: Callable, data_type: str, fmt: str = 'csv', compress: bool = False,
+                        season_id: Optional[int] = None, race_id: Optional[int] = None,
+                        page_size: int = PAGE_SIZE, max_rows: int = MAX_ROWS) -> Tuple[io.IOBase, int, int]:
+    """Write every row of an export into a spooled file
+
+    ``api_request`` is ``GridKingBot.api_request``. Returns the file
+    (rewound), the row count and its size in bytes; the caller closes the
+    file (``ExportFile`` does so once it has been sent). Raises
+    ``ExportError`` if a page cannot be fetched.
+    """
+    if data_type not in EXPORT_TYPES or fmt not in FORMATS:
+        raise ExportError(f"Unknown export {data_type}/{fmt}")
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY)
+    try:
+        raw = gzip.GzipFile(fileobj=spool, mode='wb', mtime=0) if compress else spool
+        text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        writer = _CsvWriter(text) if fmt == 'csv' else _JsonWriter(text)
+
+        rows = 0
+        after_id = 0
+        while after_id is not None:
+            page = await api_request(
+                export_endpoint(data_type, after_id, page_size, season_id, race_id),
+                use_cache=False, priority=BACKGROUND, timeout=PAGE_TIMEOUT
+            )
+            if not isinstance(page, dict) or 'rows' not in page:
+                raise ExportError(f"Could not fetch {data_type} after row {after_id}")
+            if page['rows']:
+                writer.write(page['rows'])
+                rows += len(page['rows'])
+            if rows > max_rows:
+                raise ExportError(f"Export has more than {max_rows:,} rows")
+            after_id = page.get('next_after_id')
+
+        writer.finish()
+        # Leave the spool open: detaching keeps the wrapper from closing it,
+        # and GzipFile only writes its trailer on close
+        text.detach()
+        if compress:
+            raw.close()
+
+        size = spool.tell()
+        spool.seek(0)
+        logger.info("Exported %d %s rows (%s%s, %d bytes)", rows, data_type, fmt, '.gz' if compress else '', size)
+        return spool, rows, size
+    except BaseException:
+        spool.close()
+        raise
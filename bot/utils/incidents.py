@@ -0,0 +1,595 @@
+"""
+Local stewarding search index for Grid King Discord Bot
+
+Race incidents, penalties and appeals are searched by /incidents through an
+inverted index the bot keeps in memory, instead of a ``LIKE '%...%'`` scan
+of the league database per query. Every word of a record's title,
+description, turn and type maps to the records containing it; results are
+ranked by BM25 (title words weigh most) and come with facet counts (kind,
+severity, race, driver) over every match, not just the hits shown. Race and
+driver filters are postings too, so they narrow a search before it is
+scored.
+
+The records themselves are kept in a SQLite file. A background loop pages
+the ``stewarding/<kind>?updated_since=`` feed and upserts only the rows
+changed since the previous sync; each page is written by a writer
+connection and tokenized in an executor thread, then added to the index on
+the event loop. On startup the index is rebuilt from the file, not the API.
+A kind is refetched when its API schema version changes or its row count no
+longer matches the server (deleted rows); refetched rows are marked with a
+new generation and the stale ones dropped at the end, so searches never see
+a half-empty kind.
+
+Updated and deleted records leave dead slots behind in the postings; once
+they make up a quarter of the index it is rebuilt from the file.
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain, islice
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger('gridking_bot')
+
+KINDS = ('incidents', 'penalties', 'appeals')
+
+# Feed page size (the endpoint allows up to 5000)
+PAGE_SIZE = 1000
+
+SEARCH_LIMIT = 8
+FACET_LIMIT = 5
+
+# Terms a trailing partial word expands to, most frequent first
+PREFIX_TERMS = 32
+
+# Bump when the docs table changes; the file is rebuilt and fully resynced
+LOCAL_SCHEMA = 1
+
+# Term frequency weight per field (BM25F-style)
+FIELD_WEIGHTS = (('title', 4), ('turn', 2), ('tags', 2), ('description', 1))
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Fraction of dead slots that triggers a rebuild from the file
+COMPACT_RATIO = 0.25
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'had', 'has', 'he', 'his', 'in', 'into',
+    'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'their', 'they', 'this', 'to', 'was', 'were', 'with',
+))
+
+PENALTY_LABELS = {
+    'time': 'Time penalty',
+    'grid': 'Grid penalty',
+    'points': 'Points deduction',
+    'warning': 'Warning',
+    'dsq': 'Disqualification',
+}
+
+PENALTY_UNITS = {'time': 's', 'grid': ' places', 'points': ' pts'}
+
+COLUMNS = ('id', 'kind', 'source_id', 'race_id', 'race_name', 'season_id', 'type', 'severity', 'status',
+           'lap', 'turn', 'title', 'description', 'tags', 'drivers', 'changed_at', 'generation')
+
+# Document IDs encode the kind, so a source row always maps to the same document
+SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS docs (
+        id INTEGER PRIMARY KEY, kind TEXT NOT NULL, source_id INTEGER NOT NULL, race_id INTEGER, race_name TEXT,
+        season_id INTEGER, type TEXT, severity TEXT, status TEXT, lap INTEGER, turn TEXT, title TEXT,
+        description TEXT, tags TEXT, drivers TEXT, changed_at INTEGER, generation INTEGER
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_docs_kind ON docs (kind, generation)',
+)
+
+UPSERT = (
+    f"INSERT INTO docs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+    f"ON CONFLICT (id) DO UPDATE SET {', '.join(f'{name} = excluded.{name}' for name in COLUMNS[1:])}"
+)
+
+_WORD = re.compile(r'[^\W_]+')
+_TERM = re.compile(r'"([^"]*)"|([^\W_]+)')
+
+
+class IndexNotReady(Exception):
+    """Raised by searches before the index has been built"""
+
+    def __init__(self):
+        super().__init__("stewarding records are still being indexed, try again shortly")
+
+
+@dataclass
+class SearchResults:
+    hits: List[dict]
+    total: int
+    # Facet name -> (value, label, count), most frequent first
+    facets: Dict[str, List[Tuple[Any, Optional[str], int]]]
+    terms: List[str]
+    ms: float
+
+
+def doc_id(kind: str, source_id: int) -> int:
+    return int(source_id) * 4 + KINDS.index(kind) + 1
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased words without accents or stopwords"""
+    if not text:
+        return []
+    text = text.casefold()
+    if not text.isascii():
+        text = ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+    return [word for word in _WORD.findall(text) if word not in STOPWORDS]
+
+
+def parse_query(query: str) -> Tuple[List[str], Optional[str]]:
+    """Whole words to match, and a trailing partial word to match as a prefix
+
+    Quoting a word ("kerb") matches it exactly even when it ends the query.
+    """
+    words = []
+    for quoted, word in _TERM.findall(query):
+        words.extend(tokenize(quoted or word))
+    prefix = None
+    if words and not query.rstrip().endswith('"') and len(words[-1]) >= 2:
+        prefix = words.pop()
+    return list(dict.fromkeys(words)), prefix
+
+
+def _document(kind: str, row: dict, generation: int) -> tuple:
+    row_type = row.get('type') or ''
+    title = row.get('title')
+    if kind == 'penalties':
+        title = PENALTY_LABELS.get(row_type, row_type)
+        if row_type in PENALTY_UNITS and row.get('penalty_value'):
+            title += f" {row['penalty_value']}{PENALTY_UNITS[row_type]}"
+    tags = ' '.join(filter(None, (kind, row_type.replace('_', ' '), row.get('severity'),
+                                  (row.get('status') or '').replace('_', ' '))))
+    lap = row.get('lap')
+    return (
+        doc_id(kind, row['id']), kind, int(row['id']), row.get('race_id'), row.get('race_name'),
+        row.get('season_id'), row_type or None, row.get('severity'), row.get('status'),
+        None if lap in (None, '') else int(lap), row.get('turn'), title, row.get('description'), tags,
+        ','.join(str(int(driver_id)) for driver_id in row.get('drivers') or ()),
+        int(row.get('changed_at') or 0), generation,
+    )
+
+
+def _entry(document) -> tuple:
+    """What the in-memory index keeps of a stored document (a docs row or _document tuple)"""
+    fields = dict(zip(COLUMNS, document))
+    terms = Counter(chain.from_iterable(tokenize(fields[field]) * weight for field, weight in FIELD_WEIGHTS))
+    drivers = tuple(int(driver_id) for driver_id in fields['drivers'].split(',') if driver_id)
+    return (fields['id'], fields['kind'], fields['race_id'], fields['race_name'], fields['lap'],
+            fields['severity'], fields['changed_at'], drivers, terms)
+
+
+class InvertedIndex:
+    """Term, race and driver postings over dense document slots
+
+    Slots are handed out in increasing order, so every postings array is
+    sorted. Replacing or removing a document only marks its old slot dead.
+    """
+
+    def __init__(self):
+        self.slot_of: Dict[int, int] = {}
+        self.doc_of = array('q')
+        self.alive = bytearray()
+        self.kind_of: List[str] = []
+        self.race_of: List[Optional[int]] = []
+        self.lap_of: List[Optional[int]] = []
+        self.severity_of: List[Optional[str]] = []
+        self.changed_of = array('q')
+        self.drivers_of: List[Tuple[int, ...]] = []
+        self.length_of = array('I')
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.by_race: Dict[int, array] = {}
+        self.by_driver: Dict[int, array] = {}
+        self.race_names: Dict[int, str] = {}
+        self.total_length = 0
+        self.dead = 0
+        self._vocabulary: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    @property
+    def fragmented(self) -> bool:
+        return self.dead > max(1000, len(self.alive) * COMPACT_RATIO)
+
+    def add(self, entry: tuple):
+        document, kind, race_id, race_name, lap, severity, changed_at, drivers, terms = entry
+        self.remove(document)
+        slot = len(self.alive)
+        self.slot_of[document] = slot
+        self.doc_of.append(document)
+        self.alive.append(1)
+        self.kind_of.append(kind)
+        self.race_of.append(race_id)
+        self.lap_of.append(lap)
+        self.severity_of.append(severity)
+        self.changed_of.append(changed_at)
+        self.drivers_of.append(drivers)
+        length = sum(terms.values())
+        self.length_of.append(length)
+        self.total_length += length
+
+        for term, frequency in terms.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = (array('I'), array('H'))
+                self._vocabulary = None
+            postings[0].append(slot)
+            postings[1].append(min(frequency, 0xFFFF))
+        if race_id is not None:
+            self.by_race.setdefault(race_id, array('I')).append(slot)
+            if race_name:
+                self.race_names[race_id] = race_name
+        for driver_id in drivers:
+            self.by_driver.setdefault(driver_id, array('I')).append(slot)
+
+    def remove(self, document: int):
+        slot = self.slot_of.pop(document, None)
+        if slot is not None:
+            self.alive[slot] = 0
+            self.total_length -= self.length_of[slot]
+            self.dead += 1
+
+    def expand(self, prefix: str) -> List[str]:
+        """Known terms starting with ``prefix``, most frequent first"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, prefix)
+        matches = []
+        for term in islice(vocabulary, start, None):
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return heapq.nlargest(PREFIX_TERMS, matches, key=lambda term: len(self.postings[term][0]))
+
+    def _scores(self, term_groups: List[List[str]], allowed) -> Dict[int, float]:
+        """BM25 score of every live slot in ``allowed`` (None: any) matching
+        at least one term of each group"""
+        count = len(self)
+        average = self.total_length / count if count else 1.0
+        length_of, alive = self.length_of, self.alive
+        # tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average)), constants hoisted
+        base, per_length = K1 * (1 - B), K1 * B / average
+
+        def group_postings(terms):
+            return [self.postings[term] for term in terms if term in self.postings]
+
+        groups = sorted((group_postings(terms) for terms in term_groups),
+                        key=lambda postings: sum(len(slots) for slots, _ in postings))
+        scores = None
+        for postings in groups:
+            group_scores: Dict[int, float] = {}
+            for slots, frequencies in postings:
+                weight = math.log(1 + (count - len(slots) + 0.5) / (len(slots) + 0.5)) * (K1 + 1)
+                pairs = zip(slots, frequencies)
+                if scores is None:
+                    term_scores = {slot: weight * frequency / (frequency + base + per_length * length_of[slot])
+                                   for slot, frequency in pairs
+                                   if alive[slot] and (allowed is None or slot in allowed)}
+                else:
+                    term_scores = {slot: weight * frequency / (frequency + base + per_length * length_of[slot])
+                                   for slot, frequency in pairs if slot in scores}
+                if group_scores:
+                    # A prefix counts once per record, by its best-scoring expansion
+                    for slot, score in term_scores.items():
+                        if score > group_scores.get(slot, 0.0):
+                            group_scores[slot] = score
+                else:
+                    group_scores = term_scores
+            if scores is None:
+                scores = group_scores
+            else:
+                scores = {slot: scores[slot] + score for slot, score in group_scores.items()}
+            if not scores:
+                break
+        return scores or {}
+
+    def search(self, words: List[str], prefix: Optional[str], kinds: Sequence[str], race_id: Optional[int],
+               lap: Optional[int], driver_ids: Sequence[int], limit: int):
+        """Top ``limit`` (document, score) pairs, facet counters and match count"""
+        allowed = None
+        if race_id is not None:
+            allowed = set(self.by_race.get(race_id, ()))
+        if driver_ids:
+            slots = set(chain.from_iterable(self.by_driver.get(driver_id, ()) for driver_id in driver_ids))
+            allowed = slots if allowed is None else allowed & slots
+        if lap is not None or kinds:
+            kinds = set(kinds)
+            candidates = allowed if allowed is not None else range(len(self.alive))
+            allowed = {slot for slot in candidates
+                       if (lap is None or self.lap_of[slot] == lap) and (not kinds or self.kind_of[slot] in kinds)}
+
+        groups = [[word] for word in words]
+        if prefix:
+            groups.append(self.expand(prefix))
+        if groups:
+            scores = self._scores(groups, allowed)
+            matches = list(scores)
+            top = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        else:
+            alive = self.alive
+            matches = [slot for slot in (allowed if allowed is not None else range(len(alive))) if alive[slot]]
+            changed = self.changed_of
+            top = [(slot, None) for slot in heapq.nlargest(limit, matches, key=changed.__getitem__)]
+
+        facets = {
+            'kind': Counter(map(self.kind_of.__getitem__, matches)),
+            'severity': Counter(map(self.severity_of.__getitem__, matches)),
+            'race': Counter(map(self.race_of.__getitem__, matches)),
+            'driver': Counter(chain.from_iterable(map(self.drivers_of.__getitem__, matches))),
+        }
+        return [(self.doc_of[slot], score) for slot, score in top], facets, len(matches)
+
+
+def _snippet(text: Optional[str], terms: Iterable[str], width: int = 180) -> Optional[str]:
+    """Part of ``text`` around the first matched term, matched words between \\x02 and \\x03"""
+    if not text:
+        return None
+    terms = [re.escape(term) for term in terms]
+    if not terms:
+        return text[:width] + ('…' if len(text) > width else '')
+    pattern = re.compile(r'\b(' + '|'.join(terms) + r')[^\W_]*', re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(0, match.start() - width // 3) if match else 0
+    excerpt = text[start:start + width]
+    excerpt = pattern.sub(lambda found: f"\x02{found.group(0)}\x03", excerpt)
+    return ('…' if start else '') + excerpt + ('…' if start + width < len(text) else '')
+
+
+class IncidentIndex:
+    """Stewarding records in SQLite, searched through an in-memory inverted index"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
+        self._prepare()
+        self._reader = self._connect()
+        self.memory: Optional[InvertedIndex] = None
+        self.metrics = {
+            'syncs': 0,
+            'refetches': 0,
+            'compactions': 0,
+            'failures': 0,
+            'rows_applied': 0,
+            'last_sync_ms': 0.0,
+            'last_load_ms': 0.0,
+            'searches': 0,
+            'search_ms_total': 0.0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _prepare(self):
+        """Create the tables, rebuilding them if the local schema changed"""
+        conn = self._writer
+        with conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            row = conn.execute("SELECT value FROM meta WHERE key = 'local_schema'").fetchone()
+            if row is None or int(row['value']) != LOCAL_SCHEMA:
+                conn.execute('DROP TABLE IF EXISTS docs')
+                conn.execute('DELETE FROM meta')
+                conn.execute("INSERT INTO meta VALUES ('local_schema', ?)", (str(LOCAL_SCHEMA),))
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def _meta(self, key: str, conn: Optional[sqlite3.Connection] = None) -> Optional[str]:
+        row = (conn or self._reader).execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row['value']
+
+    @property
+    def ready(self) -> bool:
+        """Whether the index is loaded and every kind has been synced at least once"""
+        return self.memory is not None and all(self._meta(f'cursor:{kind}') is not None for kind in KINDS)
+
+    def __len__(self) -> int:
+        return len(self.memory) if self.memory is not None else 0
+
+    def lag(self) -> Optional[float]:
+        """Seconds since the index was last confirmed current"""
+        synced_at = self._meta('synced_at')
+        return None if synced_at is None else max(0.0, time.time() - float(synced_at))
+
+    def snapshot(self) -> dict:
+        """Sync and search counters plus lag and size"""
+        lag = self.lag()
+        searches = self.metrics['searches']
+        return dict(self.metrics, documents=len(self), terms=len(self.memory.postings) if self.memory else 0,
+                    lag_seconds=None if lag is None else round(lag, 1),
+                    avg_search_ms=round(self.metrics['search_ms_total'] / searches, 2) if searches else None)
+
+    def _load(self) -> InvertedIndex:
+        """Build a fresh index from every stored document (executor thread)"""
+        conn = self._connect()
+        try:
+            memory = InvertedIndex()
+            for row in conn.execute(f"SELECT {', '.join(COLUMNS)} FROM docs ORDER BY id"):
+                memory.add(_entry(row))
+            return memory
+        finally:
+            conn.close()
+
+    async def load(self):
+        """(Re)build the in-memory index from the file, off the event loop"""
+        started = time.perf_counter()
+        self.memory = await asyncio.get_running_loop().run_in_executor(None, self._load)
+        self.metrics['last_load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def sync(self, api_request) -> int:
+        """Pull and index changes since the last sync; returns rows applied"""
+        if self.memory is None:
+            await self.load()
+        started = time.perf_counter()
+        applied = 0
+        for kind in KINDS:
+            cursor = self._meta(f'cursor:{kind}')
+            result = await self._pull(api_request, kind, cursor)
+            if result is None:
+                self.metrics['failures'] += 1
+                return applied
+            rows, mismatched = result
+            applied += rows
+            if mismatched and cursor is not None:
+                logger.info('Incident index %s counts differ from the API, refetching', kind)
+                result = await self._pull(api_request, kind, None)
+                if result is None:
+                    self.metrics['failures'] += 1
+                    return applied
+                applied += result[0]
+                mismatched = result[1]
+            if mismatched:
+                logger.warning('Incident index %s counts still differ after a refetch', kind)
+
+        if self.memory.fragmented:
+            self.metrics['compactions'] += 1
+            await self.load()
+        self.metrics['syncs'] += 1
+        self.metrics['rows_applied'] += applied
+        self.metrics['last_sync_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return applied
+
+    async def _pull(self, api_request, kind: str, cursor: Optional[str]) -> Optional[Tuple[int, bool]]:
+        """Page through ``kind``'s changes since ``cursor`` (None refetches it)
+
+        Returns the rows applied and whether the local count differs from
+        the server's afterwards, or None when a page could not be fetched.
+        """
+        loop = asyncio.get_running_loop()
+        generation = None
+        if cursor is None:
+            generation = int(self._meta('generation') or 0) + 1
+            self.metrics['refetches'] += 1
+
+        first = None
+        after_id = 0
+        written = 0
+        while True:
+            page = await api_request(f'stewarding/{kind}?updated_since={cursor or 0}&after_id={after_id}'
+                                     f'&limit={PAGE_SIZE}', use_cache=False)
+            if not page:
+                return None
+            if first is None:
+                first = page
+                if cursor is not None and str(page['schema_version']) != self._meta(f'schema:{kind}'):
+                    logger.info('API schema changed (%s -> %s), refetching %s for the incident index',
+                                self._meta(f'schema:{kind}'), page['schema_version'], kind)
+                    return await self._pull(api_request, kind, None)
+
+            last = page['next_after_id'] is None
+            entries, stale, count = await loop.run_in_executor(None, self._apply, kind, page['rows'], generation,
+                                                               first if last else None)
+            for entry in entries:
+                self.memory.add(entry)
+            for document in stale:
+                self.memory.remove(document)
+            written += len(entries)
+            if last:
+                return written, count != int(page['count'])
+            after_id = page['next_after_id']
+
+    def _apply(self, kind: str, rows: List[dict], generation: Optional[int],
+               first: Optional[dict]) -> Tuple[List[tuple], List[int], Optional[int]]:
+        """Store one feed page in a single transaction (executor thread)
+
+        ``generation`` is set while refetching ``kind``; ``first`` (the
+        first page of this pass) marks the last page, which stores the
+        cursor. Returns the index entries for the page, the documents
+        dropped as stale and, after the last page, the stored count of
+        ``kind``.
+        """
+        with self._write_lock:
+            conn = self._writer
+            conn.execute('BEGIN')
+            try:
+                current = generation if generation is not None else int(self._meta('generation', conn) or 0)
+                documents = [_document(kind, row, current) for row in rows]
+                conn.executemany(UPSERT, documents)
+
+                stale, count = [], None
+                if first is not None:
+                    if generation is not None:
+                        # Rows not in the refetched set were deleted upstream
+                        stale = [row[0] for row in conn.execute(
+                            'SELECT id FROM docs WHERE kind = ? AND generation < ?', (kind, generation))]
+                        conn.execute('DELETE FROM docs WHERE kind = ? AND generation < ?', (kind, generation))
+                        conn.execute("INSERT OR REPLACE INTO meta VALUES ('generation', ?)", (str(generation),))
+                    conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', (
+                        (f'cursor:{kind}', str(int(first['server_time']))),
+                        (f'schema:{kind}', str(first['schema_version'])),
+                        ('synced_at', str(time.time())),
+                    ))
+                    count = conn.execute('SELECT COUNT(*) FROM docs WHERE kind = ?', (kind,)).fetchone()[0]
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return [_entry(document) for document in documents], stale, count
+
+    def search(self, query: str = '', kinds: Sequence[str] = (), race_id: Optional[int] = None,
+               lap: Optional[int] = None, driver_ids: Sequence[int] = (), limit: int = SEARCH_LIMIT) -> SearchResults:
+        """Best matches for ``query`` within the filters, with facets of every match
+
+        Without a query, matches are the most recently changed records.
+        """
+        if not self.ready:
+            raise IndexNotReady()
+        started = time.perf_counter()
+
+        words, prefix = parse_query(query)
+        memory = self.memory
+        top, counters, total = memory.search(words, prefix, kinds, race_id, lap, list(driver_ids), limit)
+
+        rows = {}
+        if top:
+            ids = [document for document, _ in top]
+            rows = {row['id']: dict(row) for row in self._reader.execute(
+                f"SELECT * FROM docs WHERE id IN ({', '.join('?' * len(ids))})", ids)}
+        terms = words + ([prefix] if prefix else [])
+        hits = []
+        for document, score in top:
+            hit = rows.get(document)
+            if hit is None:
+                continue
+            hit['drivers'] = [int(driver_id) for driver_id in (hit['drivers'] or '').split(',') if driver_id]
+            hit['score'] = score
+            hit['snippet'] = _snippet(hit['description'], terms)
+            hits.append(hit)
+
+        facets = {}
+        for facet, counter in counters.items():
+            values = counter.most_common(FACET_LIMIT if facet in ('race', 'driver') else None)
+            facets[facet] = [(value, memory.race_names.get(value) if facet == 'race' else None, count)
+                             for value, count in values if value is not None]
+
+        ms = (time.perf_counter() - started) * 1000
+        self.metrics['searches'] += 1
+        self.metrics['search_ms_total'] += ms
+        return SearchResults(hits, total, facets, terms, ms)
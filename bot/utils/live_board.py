@@ -0,0 +1,204 @@
+"""
+Live standings board for Grid King Discord Bot
+
+A board is one standings message per channel that the bot keeps current by
+editing it in place, so people can watch it instead of calling /standings.
+All boards share one update: standings are fetched and rendered once, the
+rendered embed is hashed, and only boards whose last edit had a different
+hash are edited. Update requests (new results, the periodic refresh) are
+coalesced so the boards are edited at most once per MIN_EDIT_INTERVAL.
+The cost of an update depends on the number of boards, not on how many
+people are watching them. Boards survive restarts via a JSON state file.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import discord
+from discord.ext import tasks
+
+from utils.scheduler import NOTIFICATION
+
+logger = logging.getLogger('gridking_bot')
+
+# Minimum seconds between two updates of the boards
+MIN_EDIT_INTERVAL = 30
+
+# Drivers shown on a board
+BOARD_LIMIT = 20
+
+# Boards kept at most (one per channel)
+MAX_BOARDS = 25
+
+
+def embed_digest(embed: discord.Embed) -> str:
+    """Content hash of a rendered embed"""
+    return hashlib.sha1(json.dumps(embed.to_dict(), sort_keys=True).encode()).hexdigest()
+
+
+class LiveBoard:
+    """Standings messages edited in place when the standings change"""
+
+    def __init__(self, bot, path: str):
+        self.bot = bot
+        self.path = path
+        self.boards: Dict[str, dict] = self._load()
+        self.stats: Dict[str, int] = {'updates': 0, 'edits': 0, 'unchanged': 0, 'failed': 0}
+        self._wake: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                boards = json.load(f)
+            if not isinstance(boards, dict):
+                raise ValueError('malformed state')
+            return boards
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error('Unreadable live board state %s (%s), starting fresh', self.path, type(e).__name__)
+            return {}
+
+    def _save(self):
+        """Write the state atomically (write to a temp file, then rename)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.boards, f)
+        os.replace(tmp_path, self.path)
+
+    def start(self):
+        """Start the update worker and the periodic refresh"""
+        self._wake = asyncio.Event()
+        self._worker = asyncio.ensure_future(self._run())
+        self.refresh_loop.start()
+
+    def stop(self):
+        """Stop the update worker and the periodic refresh"""
+        self.refresh_loop.cancel()
+        if self._worker:
+            self._worker.cancel()
+
+    def request_update(self):
+        """Ask for an update; requests within MIN_EDIT_INTERVAL are merged"""
+        if self._wake is not None and self.boards:
+            self._wake.set()
+
+    @tasks.loop(minutes=2)
+    async def refresh_loop(self):
+        """Pick up standings changes nothing told us about (manual edits, penalties)"""
+        self.request_update()
+
+    @refresh_loop.before_loop
+    async def before_refresh_loop(self):
+        await self.bot.wait_until_ready()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last_update = -MIN_EDIT_INTERVAL
+        while True:
+            await self._wake.wait()
+            delay = last_update + MIN_EDIT_INTERVAL - loop.time()
+            if delay > 0:
+                # Everything requested while waiting is served by this one update
+                await asyncio.sleep(delay)
+            self._wake.clear()
+            last_update = loop.time()
+            try:
+                await self.update()
+            except Exception as e:
+                logger.error('Error updating live boards: %s', e)
+
+    async def render(self, refresh: bool = False) -> Optional[discord.Embed]:
+        """Current standings embed for a board (None if unavailable)"""
+        cog = self.bot.get_cog('StandingsCog')
+        data = await self.bot.api_request('standings', refresh=refresh, priority=NOTIFICATION,
+                                          fields=cog.STANDINGS_FIELDS if cog else None, limit=BOARD_LIMIT)
+        if cog is None or not data:
+            return None
+        embed = cog.build_standings_embed(data, BOARD_LIMIT)
+        embed.title = f"🔴 Live: {embed.title}"
+        return embed
+
+    async def update(self) -> int:
+        """Render once and edit the boards showing something else; returns edits made"""
+        if not self.boards:
+            return 0
+        embed = await self.render(refresh=True)
+        if embed is None:
+            return 0
+        self.stats['updates'] += 1
+        digest = embed_digest(embed)
+        stale = {channel_id: board for channel_id, board in self.boards.items() if board['digest'] != digest}
+        self.stats['unchanged'] += len(self.boards) - len(stale)
+        if not stale:
+            return 0
+
+        self._stamp(embed)
+        edited = await asyncio.gather(*(self._edit(channel_id, board, embed, digest)
+                                        for channel_id, board in stale.items()))
+        self._save()
+        return sum(edited)
+
+    @staticmethod
+    def _stamp(embed: discord.Embed):
+        """Mark the update time (added after hashing, so it doesn't count as a change)"""
+        embed.timestamp = datetime.now(timezone.utc)
+        embed.set_footer(text=f"{embed.footer.text} • Updated live")
+
+    async def _edit(self, channel_id: str, board: dict, embed: discord.Embed, digest: str) -> bool:
+        await self.bot.notifier.global_bucket.acquire()
+        try:
+            channel = self.bot.get_channel(int(channel_id)) or await self.bot.fetch_channel(int(channel_id))
+            await channel.get_partial_message(board['message_id']).edit(embed=embed)
+        except (discord.NotFound, discord.Forbidden) as e:
+            logger.warning('Live board in channel %s is gone (%s), removing it', channel_id, type(e).__name__)
+            self.boards.pop(channel_id, None)
+            return False
+        except discord.HTTPException as e:
+            # Digest stays stale, so the next update retries
+            self.stats['failed'] += 1
+            logger.error('Failed to edit live board in channel %s: %s', channel_id, e.status)
+            return False
+        board['digest'] = digest
+        self.stats['edits'] += 1
+        return True
+
+    async def post(self, channel) -> Optional[discord.Message]:
+        """Post a board in ``channel`` (replacing its previous one); None if unavailable"""
+        embed = await self.render()
+        if embed is None:
+            return None
+        digest = embed_digest(embed)
+        self._stamp(embed)
+        message = await channel.send(embed=embed)
+
+        previous = self.boards.get(str(channel.id))
+        self.boards[str(channel.id)] = {'message_id': message.id, 'digest': digest}
+        self._save()
+        if previous:
+            try:
+                await channel.get_partial_message(previous['message_id']).delete()
+            except discord.HTTPException:
+                pass
+        return message
+
+    def full(self, channel_id: int) -> bool:
+        """Whether a new board in ``channel_id`` would exceed MAX_BOARDS"""
+        return str(channel_id) not in self.boards and len(self.boards) >= MAX_BOARDS
+
+    def remove(self, channel_id: int) -> Optional[int]:
+        """Forget a channel's board; returns its message ID"""
+        board = self.boards.pop(str(channel_id), None)
+        if board is None:
+            return None
+        self._save()
+        return board['message_id']
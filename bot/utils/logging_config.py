@@ -0,0 +1,201 @@
+"""
+Logging pipeline for Grid King Discord Bot
+
+Log calls made on the event loop only merge the message arguments and
+enqueue the record. A listener thread does the redaction, exception and
+final formatting and the (rotating) file writes, so disk I/O never blocks
+command handling. Each time the listener wakes it drains everything
+queued and writes it with one write and flush per handler, so a burst of
+log calls costs it a few wakeups rather than one per record.
+
+Environment:
+- LOG_LEVEL: minimum level (default INFO)
+- LOG_FILE: log file path (default bot.log)
+- LOG_MAX_BYTES / LOG_BACKUP_COUNT: rotation size and number of kept files
+- LOG_FORMAT: ``text`` (default) or ``json`` for one JSON object per line
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+from typing import Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Compiled once; applied to the fully formatted message off the event loop
+SENSITIVE_PATTERN = re.compile(r'(token|key|password)["\s=:]+\S+', re.IGNORECASE)
+
+# Attributes every LogRecord has; anything else came in through ``extra=``
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def redact(text: str) -> str:
+    """Mask credentials such as ``token=...`` in a log line"""
+    return SENSITIVE_PATTERN.sub(r'\1=***', text)
+
+
+class SensitiveDataFilter(logging.Filter):
+    """Remove potential sensitive data from logs (message, traceback and stack)"""
+
+    _formatter = logging.Formatter()
+
+    def filter(self, record):
+        message = record.getMessage()
+        record.msg = redact(message)
+        record.args = None
+        # Formatters reuse a cached exc_text, so the redacted one is what gets written
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self._formatter.formatException(record.exc_info)
+        if record.exc_text:
+            record.exc_text = redact(record.exc_text)
+        if record.stack_info:
+            record.stack_info = redact(record.stack_info)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects"""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exception'] = record.exc_text
+        if record.stack_info:
+            payload['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records with their arguments merged and exception info intact
+
+    The stock ``prepare`` formats the whole record on the calling thread and
+    drops ``exc_info``; here the traceback is left for the listener to format
+    (so JsonFormatter can put it under ``exception``).
+    """
+
+    def prepare(self, record):
+        message = record.getMessage()
+        record = copy.copy(record)
+        record.msg = message
+        record.args = None
+        return record
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that handles every record queued by the time it wakes in one go
+
+    Each record is formatted once per formatter, and each handler gets one
+    write and flush per batch instead of one per record.
+    """
+
+    def _monitor(self):
+        log_queue = self.queue
+        while True:
+            batch = [log_queue.get()]
+            while True:
+                try:
+                    batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._sentinel in batch
+            self.handle_batch([record for record in batch if record is not self._sentinel])
+            if stop:
+                return
+
+    def handle_batch(self, records):
+        formatted = {}
+        for handler in self.handlers:
+            if not isinstance(handler, logging.StreamHandler):
+                for record in records:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+                continue
+
+            lines = []
+            for record in records:
+                if record.levelno < handler.level or not handler.filter(record):
+                    continue
+                key = (id(handler.formatter), id(record))
+                if key not in formatted:
+                    formatted[key] = handler.format(record)
+                lines.append(formatted[key])
+            if not lines:
+                continue
+            handler.acquire()
+            try:
+                if isinstance(handler, logging.handlers.RotatingFileHandler) and handler.shouldRollover(records[-1]):
+                    handler.doRollover()
+                if handler.stream is None:
+                    handler.stream = handler._open()
+                handler.stream.write(handler.terminator.join(lines) + handler.terminator)
+                handler.flush()
+            except Exception:
+                handler.handleError(records[-1])
+            finally:
+                handler.release()
+
+
+def configure_logging(level: Optional[str] = None, log_file: Optional[str] = None,
+                      json_format: Optional[bool] = None) -> logging.handlers.QueueListener:
+    """Route all logging through a queue to a background writer thread"""
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    log_file = log_file or os.getenv('LOG_FILE', 'bot.log')
+    if json_format is None:
+        json_format = os.getenv('LOG_FORMAT', 'text').lower() == 'json'
+
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=int(os.getenv('LOG_MAX_BYTES', 5 * 1024 * 1024)),
+        backupCount=int(os.getenv('LOG_BACKUP_COUNT', 5)),
+        encoding='utf-8',
+    )
+    stream_handler = logging.StreamHandler()
+
+    redaction = SensitiveDataFilter()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+        handler.addFilter(redaction)
+
+    log_queue = queue.SimpleQueue()
+    listener = BatchingQueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(level)
+
+    shutdown_logging()
+    listener.start()
+    _state['listener'] = listener
+    return listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    listener = _state.pop('listener', None)
+    if listener is not None:
+        listener.stop()
+
+
+_state = {}
+atexit.register(shutdown_logging)
@@ -0,0 +1,172 @@
+"""
+Event loop lag monitor for Grid King Discord Bot
+
+A heartbeat task measures how late the event loop wakes it up; a late
+wake-up means something ran on the loop without yielding, which also
+delays Discord heartbeats and interaction responses. In debug mode
+(LOOP_DEBUG=1) a watchdog thread samples the loop thread's stack whenever
+the heartbeat is overdue by more than the stall threshold, so the code
+that blocked the loop can be named. The worst offenders are logged
+periodically and shown by /botstatus.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger('gridking_bot')
+
+# Heartbeat period in seconds and how many lag samples are kept (5 minutes)
+INTERVAL = 0.25
+WINDOW = 1200
+
+# Lag above this is always logged; Discord heartbeats are at risk
+HEARTBEAT_WARNING = 1.0
+
+# Seconds between summaries in the log
+REPORT_INTERVAL = 600
+
+# Frames kept per blocking site
+STACK_DEPTH = 8
+
+BOT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LoopMonitor:
+    """Measures event loop lag and, in debug mode, where the loop blocks"""
+
+    def __init__(self, threshold: Optional[float] = None, debug: Optional[bool] = None,
+                 interval: float = INTERVAL):
+        if threshold is None:
+            threshold = float(os.getenv('LOOP_STALL_THRESHOLD', '0.1'))
+        if debug is None:
+            debug = os.getenv('LOOP_DEBUG', '').lower() in ('1', 'true', 'yes')
+        self.threshold = threshold
+        self.debug = debug
+        self.interval = interval
+        self.samples = deque(maxlen=WINDOW)
+        self.stalls = 0
+        self.max_lag = 0.0
+        self.offenders: Dict[str, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._captured: Optional[traceback.StackSummary] = None
+        self._lock = threading.Lock()
+        self._reported_stalls = 0
+
+    def start(self):
+        """Start the heartbeat (and the watchdog thread in debug mode)"""
+        self._loop_thread = threading.get_ident()
+        self._running = True
+        self._beat = time.monotonic()
+        self._task = asyncio.ensure_future(self._run())
+        if self.debug:
+            threading.Thread(target=self._watch, name='loop-watchdog', daemon=True).start()
+            logger.info('Loop debug mode: recording stacks of stalls over %.0f ms', self.threshold * 1000)
+
+    def stop(self):
+        """Stop the heartbeat and the watchdog"""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last_report = loop.time()
+        while self._running:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self._beat = time.monotonic()
+            self._record(max(0.0, now - expected))
+            if now - last_report >= REPORT_INTERVAL:
+                self._report()
+                last_report = now
+
+    def _watch(self):
+        """Watchdog thread: capture the loop thread's stack during a stall"""
+        captured_beat = None
+        while self._running:
+            time.sleep(self.threshold / 2)
+            beat = self._beat
+            if beat == captured_beat or time.monotonic() - beat - self.interval < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                with self._lock:
+                    self._captured = traceback.extract_stack(frame)
+            captured_beat = beat
+
+    def _record(self, lag: float):
+        self.samples.append(lag)
+        self.max_lag = max(self.max_lag, lag)
+        if lag < self.threshold:
+            return
+
+        self.stalls += 1
+        with self._lock:
+            stack, self._captured = self._captured, None
+
+        if stack:
+            site = self._site(stack)
+            entry = self.offenders.setdefault(site, {'count': 0, 'total': 0.0, 'max': 0.0, 'stack': ''})
+            entry['count'] += 1
+            entry['total'] += lag
+            entry['max'] = max(entry['max'], lag)
+            entry['stack'] = ''.join(traceback.format_list(stack[-STACK_DEPTH:]))
+            logger.warning('Event loop blocked for %.0f ms at %s\n%s', lag * 1000, site, entry['stack'])
+        elif lag >= HEARTBEAT_WARNING:
+            logger.warning('Event loop blocked for %.0f ms', lag * 1000)
+
+    @staticmethod
+    def _site(stack: traceback.StackSummary) -> str:
+        """Name the innermost frame from the bot's own code (else the innermost frame)"""
+        own = [frame for frame in stack
+               if frame.filename.startswith(BOT_ROOT) and frame.filename != os.path.abspath(__file__)]
+        frame = (own or list(stack))[-1]
+        filename = os.path.relpath(frame.filename, BOT_ROOT) if frame.filename.startswith(BOT_ROOT) else frame.filename
+        return f"{filename}:{frame.lineno} in {frame.name}"
+
+    def worst(self, limit: int = 5) -> List[Tuple[str, dict]]:
+        """Blocking sites by total time blocked"""
+        return sorted(self.offenders.items(), key=lambda item: item[1]['total'], reverse=True)[:limit]
+
+    def snapshot(self) -> dict:
+        """Lag percentiles over the recent window (milliseconds)"""
+        ordered = sorted(self.samples)
+
+        def percentile(fraction: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 1)
+
+        return {
+            'current_ms': round(self.samples[-1] * 1000, 1) if self.samples else 0.0,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(self.max_lag * 1000, 1),
+            'stalls': self.stalls,
+            'threshold_ms': round(self.threshold * 1000, 1),
+            'debug': self.debug,
+        }
+
+    def _report(self):
+        """Log a summary if the loop stalled since the last one"""
+        if self.stalls == self._reported_stalls:
+            return
+        self._reported_stalls = self.stalls
+        stats = self.snapshot()
+        worst = ', '.join(f"{site} ({entry['count']}x, max {entry['max'] * 1000:.0f} ms)"
+                          for site, entry in self.worst(3))
+        logger.info('Event loop lag p95 %.1f ms, max %.1f ms, %d stalls over %.0f ms%s',
+                    stats['p95_ms'], stats['max_ms'], stats['stalls'], stats['threshold_ms'],
+                    f"; worst: {worst}" if worst else '')
@@ -0,0 +1,258 @@
+"""
+Memory introspection for Grid King Discord Bot
+
+Reports what holds memory in the running bot: RSS, entry counts and
+estimated sizes of every cache, the rate-limit table, active views and the
+other per-subsystem structures. Sizes are estimated by walking a sample of
+each container with ``sys.getsizeof`` and scaling, so a report stays cheap
+enough to take periodically; every ten minutes one is kept in memory and
+appended to a JSON lines file so growth can be diffed over time.
+
+Allocation sites come from ``tracemalloc``, which has a real overhead and is
+therefore off unless MEMSTATS_TRACEMALLOC=1 or an admin asks for allocations
+in /memstats. While tracing, each periodic report also keeps a one-frame
+snapshot, and /memstats diffs the current allocations against it.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from typing import List, Optional, Tuple
+
+from discord.ext import tasks
+
+logger = logging.getLogger('gridking_bot')
+
+# Minutes between periodic reports and how many are kept in memory (6 hours)
+SNAPSHOT_MINUTES = 10
+HISTORY = 36
+
+# Entries walked per container when estimating sizes; larger ones are scaled
+SAMPLE = 64
+
+# Frames recorded per allocation while tracing
+TRACE_FRAMES = 1
+
+# Allocation sites shown by /memstats
+TOP_SITES = 10
+
+_ATOMIC = (str, bytes, bytearray, int, float, bool, type(None))
+_SKIP = (type, type(sys), type(len), type(lambda: None))
+
+
+def estimate_size(obj, seen: Optional[set] = None) -> int:
+    """Approximate deep size of ``obj`` in bytes (large containers are sampled)"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, _SKIP):
+        return 0
+    seen.add(id(obj))
+
+    # NumPy is only checked for once something has imported it
+    np = sys.modules.get('numpy')
+    if np is not None and isinstance(obj, np.memmap):
+        # Mapped pages belong to the page cache, not the heap
+        return 0
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _ATOMIC) or (np is not None and isinstance(obj, np.ndarray)):
+        return size
+
+    if isinstance(obj, dict):
+        items = list(obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        items = list(obj)
+    else:
+        items = []
+        if hasattr(obj, '__dict__'):
+            items.append(vars(obj))
+        for klass in type(obj).__mro__:
+            for name in getattr(klass, '__slots__', ()):
+                if hasattr(obj, name):
+                    items.append(getattr(obj, name))
+
+    if not items:
+        return size
+    sample = items[:SAMPLE]
+    sampled = sum(estimate_size(item, seen) for item in sample)
+    return size + sampled * len(items) // len(sample)
+
+
+def rss_bytes() -> Tuple[Optional[int], Optional[int]]:
+    """Current and peak resident set size (None where the platform can't tell)"""
+    current = peak = None
+    try:
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        peak = peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+    return current, peak
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class MemoryStats:
+    """Periodic and on-demand memory reports for the bot's subsystems"""
+
+    def __init__(self, bot, path: str):
+        self.bot = bot
+        self.path = path
+        self.history = deque(maxlen=HISTORY)
+        self._trace_baseline: Optional[tracemalloc.Snapshot] = None
+        if os.getenv('MEMSTATS_TRACEMALLOC', '').lower() in ('1', 'true', 'yes'):
+            self.start_tracing()
+
+    def start(self):
+        """Start the periodic reports"""
+        self.snapshot_loop.start()
+
+    def stop(self):
+        """Stop the periodic reports"""
+        self.snapshot_loop.cancel()
+
+    @staticmethod
+    def start_tracing() -> bool:
+        """Start tracemalloc; False if it was already tracing"""
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(TRACE_FRAMES)
+        logger.info('tracemalloc started (%d frame)', TRACE_FRAMES)
+        return True
+
+    def _caches(self) -> dict:
+        bot = self.bot
+        return {
+            'api': bot.api_cache,
+            'embeds': bot.embed_cache,
+            'driver_batch': bot.driver_batch.cache,
+            'charts': bot.charts.cache,
+            'predictor': bot.predictor.cache,
+        }
+
+    def _views(self) -> dict:
+        # discord.py has no public count of message-bound views; its private view
+        # store is read if present and reported as 0 when a release changes it
+        store = getattr(getattr(self.bot, '_connection', None), '_view_store', None)
+        try:
+            message_bound = len(getattr(store, '_synced_message_views', None) or ())
+        except TypeError:
+            message_bound = 0
+        return {
+            'persistent': len(self.bot.persistent_views),
+            'message_bound': message_bound,
+        }
+
+    def report(self) -> dict:
+        """Sizes of everything the bot holds; cheap enough to take periodically"""
+        bot = self.bot
+        current, peak = rss_bytes()
+        caches = {name: cache.size_report() for name, cache in self._caches().items()}
+        notifier = bot.notifier.snapshot()
+        return {
+            'time': int(time.time()),
+            'rss_bytes': current,
+            'peak_rss_bytes': peak,
+            'caches': caches,
+            'rate_limits': {
+                'users': len(bot.rate_limits),
+                'timestamps': sum(len(stamps) for stamps in bot.rate_limits.values()),
+                'bytes': estimate_size(bot.rate_limits),
+            },
+            'views': self._views(),
+            'structures': {
+                'notifier_pending': notifier['pending'],
+                'notifier_routes': notifier['routes'],
+                'scheduler_waiting': bot.scheduler.waiting,
+                'loop_samples': len(bot.loop_monitor.samples),
+                'loop_offenders': len(bot.loop_monitor.offenders),
+                'results_feed_races': len(bot.results_feed.state['races']),
+                'results_feed_bytes': estimate_size(bot.results_feed.state),
+                'live_boards': len(bot.live_board.boards),
+                'dedupe_answers': len(bot.dedupe),
+                'incident_documents': len(bot.incidents),
+                'race_control_buffered': bot.race_control.snapshot()['buffered'],
+                'tenants': len(bot.tenants),
+                'tenant_cache_entries': sum(len(tenant.api_cache) + len(tenant.embed_cache) for tenant in bot.tenants),
+            },
+            'files': {
+                'archive_mapped_bytes': bot.tenants.default.archive_mapped_bytes(),
+                'replica_bytes': _file_size(bot.replica.path) + _file_size(bot.replica.path + '-wal'),
+                'incident_index_bytes': _file_size(bot.incidents.path) + _file_size(bot.incidents.path + '-wal'),
+            },
+            'tracing': tracemalloc.is_tracing(),
+        }
+
+    @staticmethod
+    def diff(before: dict, after: dict) -> dict:
+        """Growth between two reports (RSS and per-cache bytes and entries)"""
+        def delta(a, b):
+            return None if a is None or b is None else b - a
+
+        return {
+            'seconds': after['time'] - before['time'],
+            'rss_bytes': delta(before['rss_bytes'], after['rss_bytes']),
+            'caches': {
+                name: {'entries': stats['entries'] - before['caches'].get(name, {}).get('entries', 0),
+                       'bytes': stats['bytes'] - before['caches'].get(name, {}).get('bytes', 0)}
+                for name, stats in after['caches'].items()
+            },
+            'rate_limits': after['rate_limits']['bytes'] - before['rate_limits']['bytes'],
+        }
+
+    def _export(self, report: dict):
+        """Append one report to the JSON lines metrics file"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report, separators=(',', ':')) + '\n')
+
+    @tasks.loop(minutes=SNAPSHOT_MINUTES)
+    async def snapshot_loop(self):
+        """Keep and export a memory report (plus a trace snapshot while tracing)"""
+        try:
+            report = self.report()
+            self.history.append(report)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._export, report)
+            if tracemalloc.is_tracing():
+                self._trace_baseline = await loop.run_in_executor(None, self._take_trace)
+        except Exception as e:
+            logger.error('Error taking memory snapshot: %s', e)
+
+    @staticmethod
+    def _take_trace() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    async def allocations(self, limit: int = TOP_SITES) -> Tuple[List[tracemalloc.Statistic],
+                                                                List[tracemalloc.StatisticDiff]]:
+        """Top allocation sites now, and the top growth since the last periodic trace"""
+        if not tracemalloc.is_tracing():
+            return [], []
+        snapshot = await asyncio.get_running_loop().run_in_executor(None, self._take_trace)
+        top = snapshot.statistics('lineno')[:limit]
+        growth = []
+        if self._trace_baseline is not None:
+            growth = [stat for stat in snapshot.compare_to(self._trace_baseline, 'lineno')
+                      if stat.size_diff > 0][:limit]
+        return top, growth
@@ -0,0 +1,329 @@
+"""
+Typed API models for Grid King Discord Bot
+
+Payloads are validated and converted once in ``api_request`` so cogs and
+caches hold compact slotted objects with numbers and datetimes already
+parsed, instead of raw JSON dicts carrying every column of the row.
+"""
+
+import sys
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, List, Optional
+
+
+def slotted(cls):
+    """Rebuild a dataclass with __slots__ (dataclass(slots=True) needs 3.10)"""
+    cls_dict = dict(cls.__dict__)
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict['__slots__'] = field_names
+    for name in field_names:
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """Parse API date strings ('2024-05-01 18:00:00' or ISO 8601)"""
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+
+def _int(value: Any) -> Optional[int]:
+    return None if value is None or value == '' else int(float(value))
+
+
+def _float(value: Any) -> float:
+    return 0.0 if value is None or value == '' else float(value)
+
+
+def _bool(value: Any) -> bool:
+    return value not in (None, '', 0, '0', False)
+
+
+def _label(value: Any) -> Optional[str]:
+    """Intern low-cardinality strings (team names, platforms, tracks)"""
+    return None if value is None else sys.intern(str(value))
+
+
+@slotted
+@dataclass
+class Result:
+    id: Optional[int] = None
+    race_id: Optional[int] = None
+    driver_id: Optional[int] = None
+    position: Optional[int] = None
+    points: float = 0.0
+    pole_position: bool = False
+    fastest_lap: bool = False
+    dnf: bool = False
+    username: Optional[str] = None
+    driver_number: Optional[int] = None
+    team_name: Optional[str] = None
+    race_name: Optional[str] = None
+    race_date: Optional[datetime] = None
+
+    @classmethod
+    def from_api(cls, data: dict) -> 'Result':
+        return cls(
+            id=_int(data.get('id')),
+            race_id=_int(data.get('race_id')),
+            driver_id=_int(data.get('driver_id')),
+            position=_int(data.get('position')),
+            points=_float(data.get('points')),
+            pole_position=_bool(data.get('pole_position')),
+            fastest_lap=_bool(data.get('fastest_lap')),
+            dnf=_bool(data.get('dnf')),
+            username=data.get('username'),
+            driver_number=_int(data.get('driver_number')),
+            team_name=_label(data.get('team_name')),
+            race_name=_label(data.get('race_name')),
+            race_date=parse_datetime(data.get('race_date')),
+        )
+
+
+@slotted
+@dataclass
+class Statistics:
+    races_participated: int = 0
+    wins: int = 0
+    podiums: int = 0
+    poles: int = 0
+    fastest_laps: int = 0
+    dnfs: int = 0
+    total_points: float = 0.0
+    avg_position: Optional[float] = None
+    best_position: Optional[int] = None
+    championship_position: Optional[int] = None
+
+    @classmethod
+    def from_api(cls, data: Optional[dict]) -> 'Statistics':
+        data = data or {}
+        avg_position = data.get('avg_position')
+        return cls(
+            races_participated=_int(data.get('races_participated')) or 0,
+            wins=_int(data.get('wins')) or 0,
+            podiums=_int(data.get('podiums')) or 0,
+            poles=_int(data.get('poles')) or 0,
+            fastest_laps=_int(data.get('fastest_laps')) or 0,
+            dnfs=_int(data.get('dnfs')) or 0,
+            total_points=_float(data.get('total_points')),
+            avg_position=None if avg_position is None else float(avg_position),
+            best_position=_int(data.get('best_position')),
+            championship_position=_int(data.get('championship_position')),
+        )
+
+
+@slotted
+@dataclass
+class Driver:
+    id: int
+    username: str
+    driver_number: Optional[int] = None
+    team_id: Optional[int] = None
+    team_name: Optional[str] = None
+    platform: Optional[str] = None
+    country: Optional[str] = None
+    bio: Optional[str] = None
+    livery_image: Optional[str] = None
+    statistics: Optional[Statistics] = None
+    recent_results: List[Result] = field(default_factory=list)
+    results: List[Result] = field(default_factory=list)
+
+    @classmethod
+    def from_api(cls, data: dict) -> 'Driver':
+        return cls(
+            id=int(data['id']),
+            username=str(data['username']),
+            driver_number=_int(data.get('driver_number')),
+            team_id=_int(data.get('team_id')),
+            team_name=_label(data.get('team_name')),
+            platform=_label(data.get('platform')),
+            country=_label(data.get('country')),
+            bio=data.get('bio') or None,
+            livery_image=data.get('livery_image') or None,
+            statistics=Statistics.from_api(data['statistics']) if data.get('statistics') else None,
+            recent_results=[Result.from_api(r) for r in data.get('recent_results') or []],
+            results=[Result.from_api(r) for r in data.get('results') or []],
+        )
+
+
+@slotted
+@dataclass
+class Team:
+    id: int
+    name: str
+    logo: Optional[str] = None
+    driver_count: Optional[int] = None
+    statistics: Optional[Statistics] = None
+    drivers: List[Driver] = field(default_factory=list)
+
+    @classmethod
+    def from_api(cls, data: dict) -> 'Team':
+        return cls(
+            id=int(data['id']),
+            name=_label(data['name']),
+            logo=data.get('logo') or None,
+            driver_count=_int(data.get('driver_count')),
+            statistics=Statistics.from_api(data['statistics']) if data.get('statistics') else None,
+            drivers=[Driver.from_api(d) for d in data.get('drivers') or []],
+        )
+
+
+@slotted
+@dataclass
+class Race:
+    id: int
+    name: str
+    track: str
+    race_date: datetime
+    format: Optional[str] = None
+    laps: Optional[int] = None
+    status: Optional[str] = None
+    season_id: Optional[int] = None
+    season_name: Optional[str] = None
+    seconds_until: Optional[int] = None
+    results: List[Result] = field(default_factory=list)
+
+    @classmethod
+    def from_api(cls, data: dict) -> 'Race':
+        time_until = data.get('time_until') or {}
+        return cls(
+            id=int(data['id']),
+            name=str(data['name']),
+            track=_label(data['track']),
+            race_date=parse_datetime(data['race_date']),
+            format=_label(data.get('format')),
+            laps=_int(data.get('laps')),
+            status=_label(data.get('status')),
+            season_id=_int(data.get('season_id')),
+            season_name=_label(data.get('season_name')),
+            seconds_until=_int(time_until.get('total_seconds')),
+            results=[Result.from_api(r) for r in data.get('results') or []],
+        )
+
+
+@slotted
+@dataclass
+class Schedule:
+    """All races of one season (optionally with their results)"""
+    season_id: Optional[int]
+    races: List[Race]
+
+    @classmethod
+    def from_api(cls, data: dict) -> 'Schedule':
+        return cls(
+            season_id=_int(data.get('season_id')),
+            races=[Race.from_api(row) for row in data['races']],
+        )
+
+
+@slotted
+@dataclass
+class Standing:
+    """One row of the championship table or a stats leaderboard"""
+    username: str
+    driver_id: Optional[int] = None
+    driver_number: Optional[int] = None
+    team_name: Optional[str] = None
+    total_points: float = 0.0
+    wins: int = 0
+    podiums: int = 0
+    poles: int = 0
+    fastest_laps: int = 0
+    dnfs: int = 0
+    races_participated: int = 0
+    avg_position: Optional[float] = None
+    dnf_percentage: Optional[float] = None
+    avg_points_per_race: Optional[float] = None
+
+    @classmethod
+    def from_api(cls, data: dict) -> 'Standing':
+        def optional_float(key):
+            value = data.get(key)
+            return None if value is None else float(value)
+
+        return cls(
+            username=str(data.get('username') or 'Unknown'),
+            driver_id=_int(data.get('id')),
+            driver_number=_int(data.get('driver_number')),
+            team_name=_label(data.get('team_name')),
+            total_points=_float(data.get('total_points')),
+            wins=_int(data.get('wins')) or 0,
+            podiums=_int(data.get('podiums')) or 0,
+            poles=_int(data.get('poles')) or 0,
+            fastest_laps=_int(data.get('fastest_laps')) or 0,
+            dnfs=_int(data.get('dnfs')) or 0,
+            races_participated=_int(data.get('races_participated') or data.get('total_races')) or 0,
+            avg_position=optional_float('avg_position'),
+            dnf_percentage=optional_float('dnf_percentage'),
+            avg_points_per_race=optional_float('avg_points_per_race'),
+        )
+
+
+@slotted
+@dataclass
+class StandingsTable:
+    season_name: Optional[str]
+    season_year: Optional[int]
+    standings: List[Standing]
+
+    @classmethod
+    def from_api(cls, data: dict) -> 'StandingsTable':
+        season = data.get('season') or {}
+        return cls(
+            season_name=season.get('name'),
+            season_year=_int(season.get('year')),
+            standings=[Standing.from_api(row) for row in data['standings']],
+        )
+
+
+@slotted
+@dataclass
+class StatsTable:
+    category: str
+    season_id: Optional[int]
+    rows: List[Standing]
+
+    @classmethod
+    def from_api(cls, data: dict) -> 'StatsTable':
+        return cls(
+            category=str(data.get('type', '')),
+            season_id=_int(data.get('season_id')),
+            rows=[Standing.from_api(row) for row in data['data']],
+        )
+
+
+def parse_payload(endpoint: str, data: Any) -> Any:
+    """Convert a decoded API response into models based on its route
+
+    Routes without a model (e.g. ``stats/overview``) are returned unchanged.
+    Raises ``KeyError``/``TypeError``/``ValueError`` on malformed payloads.
+    """
+    path = endpoint.split('?', 1)[0].strip('/')
+    parts = path.split('/')
+    root = parts[0]
+    sub = parts[1] if len(parts) > 1 else ''
+
+    if root == 'standings' and not sub:
+        return StandingsTable.from_api(data)
+    if root == 'drivers':
+        if sub.isdigit():
+            return Driver.from_api(data)
+        return [Driver.from_api(row) for row in data]
+    if root == 'teams':
+        if sub.isdigit():
+            return Team.from_api(data)
+        return [Team.from_api(row) for row in data]
+    if root == 'races':
+        if sub in ('upcoming', 'recent'):
+            return [Race.from_api(row) for row in data]
+        if sub.isdigit():
+            return Race.from_api(data)
+        if not sub:
+            return Schedule.from_api(data)
+    if root == 'stats' and sub and sub != 'overview':
+        return StatsTable.from_api(data)
+    return data
@@ -0,0 +1,181 @@
+"""
+Notification fan-out for Grid King Discord Bot
+
+Race reminders, results and penalty notices can go to many channels and
+threads across guilds. Each route (a channel or thread ID) gets its own
+outbound queue and worker, so routes are sent to concurrently while every
+route stays inside Discord's per-channel message bucket; all routes share
+one global bucket. The message is built once and the same embed is handed
+to every route. Transient failures (5xx, 429, network errors) are retried
+with backoff.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Iterable, List
+
+import aiohttp
+import discord
+
+logger = logging.getLogger('gridking_bot')
+
+REMINDER = 'reminder'
+RESULTS = 'results'
+PENALTY = 'penalty'
+
+# Discord allows about 5 messages per 5 seconds per channel
+ROUTE_RATE = (5, 5.0)
+
+# ... and 50 requests per second per bot overall
+GLOBAL_RATE = (50, 1.0)
+
+# Pending messages per route before new ones are dropped
+ROUTE_QUEUE_SIZE = 100
+
+# Send attempts per message and the base delay between them (doubled each retry)
+MAX_ATTEMPTS = 4
+RETRY_BACKOFF = 1.0
+
+
+class RateBucket:
+    """Sliding window allowing at most ``capacity`` sends in any ``per`` seconds"""
+
+    def __init__(self, capacity: int, per: float):
+        self.capacity = capacity
+        self.per = per
+        self.blocked_until = 0.0
+        self._sent = deque()
+
+    async def acquire(self):
+        """Wait until a send is allowed and record it"""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            while self._sent and now - self._sent[0] >= self.per:
+                self._sent.popleft()
+            if len(self._sent) < self.capacity:
+                self._sent.append(now)
+                return
+            await asyncio.sleep(self.per - (now - self._sent[0]))
+
+    def block(self, seconds: float):
+        """Hold all sends for ``seconds`` (after a 429)"""
+        now = asyncio.get_running_loop().time()
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class NotificationDispatcher:
+    """Fans notifications out to their routes through per-route queues"""
+
+    def __init__(self, bot, routes: Dict[str, List[int]], route_rate=ROUTE_RATE, global_rate=GLOBAL_RATE):
+        self.bot = bot
+        self.routes = routes
+        self.route_rate = route_rate
+        self.global_bucket = RateBucket(*global_rate)
+        self.stats: Dict[str, int] = {'queued': 0, 'sent': 0, 'retried': 0, 'failed': 0, 'dropped': 0}
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._buckets: Dict[int, RateBucket] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+
+    def publish(self, kind: str, **message) -> int:
+        """Queue one message (send() kwargs) for every route of ``kind``"""
+        return self.publish_to(self.routes.get(kind, ()), **message)
+
+    def publish_to(self, route_ids: Iterable[int], **message) -> int:
+        """Queue one message for each of ``route_ids``; returns how many were queued"""
+        queued = 0
+        for route_id in route_ids:
+            queue = self._queues.get(route_id)
+            if queue is None:
+                queue = self._queues[route_id] = asyncio.Queue(ROUTE_QUEUE_SIZE)
+                self._buckets[route_id] = RateBucket(*self.route_rate)
+                self._workers[route_id] = asyncio.ensure_future(self._drain(route_id))
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.stats['dropped'] += 1
+                logger.warning('Notification queue full for route %s, dropping message', route_id)
+                continue
+            queued += 1
+        self.stats['queued'] += queued
+        return queued
+
+    async def flush(self):
+        """Wait until every queued message has been sent or given up on"""
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
+
+    def snapshot(self) -> dict:
+        """Routes with a queue and messages still waiting in them"""
+        return {
+            'routes': len(self._queues),
+            'pending': sum(queue.qsize() for queue in self._queues.values()),
+        }
+
+    def stop(self):
+        """Cancel the route workers; pending messages are discarded"""
+        for worker in self._workers.values():
+            worker.cancel()
+        self._workers.clear()
+        self._queues.clear()
+        self._buckets.clear()
+
+    async def _drain(self, route_id: int):
+        queue = self._queues[route_id]
+        while True:
+            message = await queue.get()
+            try:
+                await self._deliver(route_id, message)
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error('Unexpected error notifying route %s: %s', route_id, type(e).__name__)
+            finally:
+                queue.task_done()
+
+    async def _resolve(self, route_id: int):
+        channel = self.bot.get_channel(route_id)
+        if channel is None:
+            # Threads and channels of other guilds are often not cached
+            await self.global_bucket.acquire()
+            channel = await self.bot.fetch_channel(route_id)
+        return channel
+
+    async def _deliver(self, route_id: int, message: dict) -> bool:
+        bucket = self._buckets[route_id]
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            await bucket.acquire()
+            await self.global_bucket.acquire()
+            delay = RETRY_BACKOFF * 2 ** (attempt - 1)
+            try:
+                channel = await self._resolve(route_id)
+                await channel.send(**message)
+                self.stats['sent'] += 1
+                return True
+            except (discord.Forbidden, discord.NotFound) as e:
+                logger.error('Cannot notify route %s: %s', route_id, type(e).__name__)
+                break
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    retry_after = float(e.response.headers.get('Retry-After', delay))
+                    if e.response.headers.get('X-RateLimit-Global'):
+                        self.global_bucket.block(retry_after)
+                    else:
+                        bucket.block(retry_after)
+                    delay = 0.0
+                elif e.status < 500:
+                    logger.error('Notification to route %s rejected: %s', route_id, e.status)
+                    break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.debug('Notification to route %s failed: %s', route_id, type(e).__name__)
+
+            if attempt < MAX_ATTEMPTS:
+                self.stats['retried'] += 1
+                await asyncio.sleep(delay)
+        else:
+            logger.error('Giving up notifying route %s after %d attempts', route_id, MAX_ATTEMPTS)
+
+        self.stats['failed'] += 1
+        return False
@@ -0,0 +1,259 @@
+"""
+Championship predictor for Grid King Discord Bot
+
+Simulates the rest of the season as a Monte Carlo over NumPy arrays. Each
+driver's finishing positions, DNF rate and fastest-lap rate are taken from
+their results so far (blended with a league-average prior), the remaining
+races are sampled all at once per race, and F1 points are applied. The
+simulation runs in a worker process and is cached until new results land.
+NumPy is only imported by the simulation itself, so loading the bot (and
+the standings commands that use the points table) doesn't pay for it.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Hashable, List, Optional, Sequence
+
+from utils.cache import TTLCache
+from utils.models import Race, Standing
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger('gridking_bot')
+
+POINTS_TABLE = (25, 18, 15, 12, 10, 8, 6, 4, 2, 1)
+# Awarded only when the fastest driver also finishes inside the points
+FASTEST_LAP_BONUS = 1
+MAX_RACE_POINTS = POINTS_TABLE[0] + FASTEST_LAP_BONUS
+
+DEFAULT_SIMULATIONS = 50000
+
+# Weight (in races) of the league-average prior blended into each history,
+# so a driver with two lucky results isn't treated as a certain winner
+PRIOR_RACES = 3
+PRIOR_DNF_RATE = 0.1
+
+# Entries in each per-driver outcome table; one random byte indexes a row
+TABLE_WIDTH = 256
+SIMULATION_BATCH = 8192
+
+
+def fit_driver_model(driver_ids: Sequence[int], races: Sequence[Race]) -> Dict[str, list]:
+    """Collect each driver's classified finishes, DNF and fastest-lap rates"""
+    index = {driver_id: i for i, driver_id in enumerate(driver_ids)}
+    histories = [[] for _ in driver_ids]
+    starts = [0] * len(driver_ids)
+    dnfs = [0] * len(driver_ids)
+    fastest_laps = [0] * len(driver_ids)
+
+    for race in races:
+        for result in race.results:
+            i = index.get(result.driver_id)
+            if i is None:
+                continue
+            starts[i] += 1
+            if result.dnf or result.position is None:
+                dnfs[i] += 1
+            else:
+                histories[i].append(result.position)
+            if result.fastest_lap:
+                fastest_laps[i] += 1
+
+    return {
+        'histories': histories,
+        'dnf_rates': [(dnfs[i] + PRIOR_DNF_RATE * PRIOR_RACES) / (starts[i] + PRIOR_RACES)
+                      for i in range(len(driver_ids))],
+        'fastest_lap_rates': [(fastest_laps[i] + PRIOR_RACES / len(driver_ids)) / (starts[i] + PRIOR_RACES)
+                              for i in range(len(driver_ids))],
+    }
+
+
+def build_sampling_table(histories: Sequence[Sequence[int]], dnf_rates: Sequence[float],
+                         size: int) -> 'np.ndarray':
+    """Per-driver table of TABLE_WIDTH equally likely race outcomes
+
+    Each row mixes the driver's DNF share (``inf``), a uniform league prior
+    and their classified finishes, so one uniform draw per driver and race
+    samples the whole blended distribution.
+    """
+    import numpy as np
+
+    table = np.empty((len(histories), TABLE_WIDTH), dtype=np.float32)
+    for i, history in enumerate(histories):
+        retired = int(round(dnf_rates[i] * TABLE_WIDTH))
+        classified = TABLE_WIDTH - retired
+        prior = classified if not history else int(round(classified * PRIOR_RACES / (PRIOR_RACES + len(history))))
+        table[i, :retired] = np.inf
+        table[i, retired:retired + prior] = np.linspace(1, size, prior)
+        table[i, retired + prior:] = np.resize(np.asarray(history, dtype=np.float32), classified - prior)
+    return table
+
+
+def simulate_championship(points: Sequence[float], histories: Sequence[Sequence[int]],
+                          dnf_rates: Sequence[float], fastest_lap_rates: Sequence[float],
+                          races: int, simulations: int = DEFAULT_SIMULATIONS,
+                          seed: Optional[int] = None) -> Dict[str, list]:
+    """Simulate the remaining races (runs in a worker process)
+
+    For every simulation and race each driver draws an outcome from their
+    sampling table; ranking the draws gives a consistent classification.
+    Returns the per-driver title probability and expected final points,
+    plus how often the title was settled after each remaining race (index 0
+    = already decided).
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    size = len(points)
+
+    table = build_sampling_table(histories, dnf_rates, size)
+    # Distinct fractional offsets per entry break ties between equal positions
+    table += rng.random(table.shape, dtype=np.float32)
+    table = table.ravel()
+    fastest_lap_p = np.asarray(fastest_lap_rates, dtype=np.float64)
+    fastest_lap_p /= fastest_lap_p.sum()
+    start = np.asarray(points, dtype=np.float32)
+
+    titles = np.zeros(size, dtype=np.int64)
+    point_sums = np.zeros(size, dtype=np.float64)
+    decided = np.zeros(races + 1, dtype=np.int64)
+
+    # Batches keep the working arrays cache-sized
+    for offset in range(0, simulations, SIMULATION_BATCH):
+        count = min(SIMULATION_BATCH, simulations - offset)
+        totals, decided_after = _simulate_batch(rng, table, fastest_lap_p, start, races, count)
+
+        # Random jitter splits exact ties instead of always favouring the lowest index
+        totals_jittered = totals + rng.random(totals.shape, dtype=np.float32) * 1e-3
+        titles += np.bincount(totals_jittered.argmax(axis=1), minlength=size)
+        point_sums += totals.sum(axis=0)
+        decided += np.bincount(decided_after[decided_after >= 0], minlength=races + 1)
+
+    return {
+        'title': (titles / simulations).tolist(),
+        'expected_points': (point_sums / simulations).tolist(),
+        'decided_after': (decided / simulations).tolist(),
+    }
+
+
+def _simulate_batch(rng: 'np.random.Generator', table: 'np.ndarray', fastest_lap_p: 'np.ndarray',
+                    start: 'np.ndarray', races: int, count: int):
+    """Run ``count`` simulations; returns final points and the deciding race"""
+    import numpy as np
+
+    size = len(start)
+    scoring = min(size, len(POINTS_TABLE))
+    scoring_points = np.asarray(POINTS_TABLE[:scoring], dtype=np.float32)[None, :]
+    index_type = np.uint16 if size * TABLE_WIDTH <= 1 << 16 else np.int32
+    row_offsets = (np.arange(size, dtype=index_type) * TABLE_WIDTH)[None, :]
+    sim_rows = np.arange(count)
+
+    totals = np.tile(start, (count, 1))
+    decided_after = np.full(count, -1, dtype=np.int16)
+    score = np.empty((count, size), dtype=np.float32)
+
+    for race in range(races + 1):
+        if size > 1:
+            top_two = np.partition(totals, size - 2, axis=1)[:, -2:]
+            settled = (top_two[:, 1] - top_two[:, 0] > (races - race) * MAX_RACE_POINTS) & (decided_after < 0)
+            decided_after[settled] = race
+        if race == races:
+            break
+
+        # One random byte per driver picks a table entry (TABLE_WIDTH == 256)
+        bins = np.frombuffer(rng.bytes(count * size), dtype=np.uint8).reshape(count, size)
+        np.take(table, bins.astype(index_type) + row_offsets, out=score)
+
+        top = np.argsort(score, axis=1)[:, :scoring]
+        # Retirements sort last but can't score when fewer cars finish than points places
+        awarded = scoring_points * np.isfinite(np.take_along_axis(score, top, axis=1))
+        totals[sim_rows[:, None], top] += awarded
+
+        if FASTEST_LAP_BONUS:
+            fastest = rng.choice(size, size=count, p=fastest_lap_p)
+            in_points = ((top == fastest[:, None]) & (awarded > 0)).any(axis=1)
+            totals[sim_rows[in_points], fastest[in_points]] += FASTEST_LAP_BONUS
+
+    return totals, decided_after
+
+
+def clinch_scenarios(standings: Sequence[Standing], remaining: Sequence[Race]) -> List[str]:
+    """Describe what the leader needs and who is already out of contention"""
+    if len(standings) < 2 or not remaining:
+        return []
+
+    leader, second = standings[0], standings[1]
+    lead = leader.total_points - second.total_points
+    available = len(remaining) * MAX_RACE_POINTS
+    lines = []
+
+    if lead > available:
+        return [f"🏆 {leader.username} has already clinched the title"]
+
+    for k, race in enumerate(remaining, start=1):
+        # Must lead by more than what is still available after race k
+        margin = (len(remaining) - k) * MAX_RACE_POINTS - lead
+        if margin < k * MAX_RACE_POINTS:
+            if k == 1:
+                lines.append(f"{leader.username} clinches at **{race.name}** by outscoring "
+                             f"{second.username} by {max(0, int(margin) + 1)}+ points")
+            else:
+                lines.append(f"Earliest possible clinch for {leader.username}: **{race.name}**")
+            break
+
+    eliminated = [row for row in standings[1:] if row.total_points + available < leader.total_points]
+    contenders = len(standings) - len(eliminated)
+    lines.append(f"{contenders} driver{'s' if contenders != 1 else ''} still mathematically in contention")
+    return lines
+
+
+class ChampionshipPredictor:
+    """Runs simulations in a worker process and caches them per result set"""
+
+    def __init__(self, simulations: int = DEFAULT_SIMULATIONS):
+        self.simulations = simulations
+        # Keyed by the last result ID, so a new result invalidates it anyway
+        self.cache = TTLCache(default_ttl=24 * 60 * 60, max_entries=8)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def predict(self, cache_key: Hashable, standings: Sequence[Standing],
+                      races: Sequence[Race], remaining: int) -> Dict[str, list]:
+        """Return cached or freshly simulated title probabilities"""
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        in_flight = self._in_flight.get(cache_key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1)
+
+        driver_ids = [row.driver_id for row in standings]
+        model = fit_driver_model(driver_ids, races)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._executor, simulate_championship,
+            [row.total_points for row in standings], model['histories'],
+            model['dnf_rates'], model['fastest_lap_rates'], remaining, self.simulations
+        )
+        self._in_flight[cache_key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            self._in_flight.pop(cache_key, None)
+
+        logger.info('Simulated %d races x %d drivers x %d runs', remaining, len(driver_ids), self.simulations)
+        self.cache.set(cache_key, result)
+        return result
+
+    def shutdown(self):
+        """Stop the worker process"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,304 @@
+"""
+Race control feed for Grid King Discord Bot
+
+While a race control session is live, new incidents, steward decisions and
+session status changes (safety car, red flag) are posted to a thread per
+session in the race control channel. The bot long-polls racecontrol/feed,
+which holds the request open until something happens, so events arrive
+within a couple of seconds without a request per second.
+
+Events are buffered per session and flushed once per TICK as a single
+message, so a burst of incidents never exceeds Discord's per-channel rate
+limit. Each buffer is capped at MAX_BUFFERED events (older overflow is only
+counted) and dropped when its session ends. The cursor is saved only after
+the buffered events have been handed to the notifier, so after a restart
+or a lost connection the feed resumes from the last posted event.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import discord
+
+from utils.replica import ReplicaNotReady
+from utils.scheduler import LONG_POLL
+
+logger = logging.getLogger('gridking_bot')
+
+# Seconds the API holds a poll open waiting for events
+LONG_POLL_WAIT = 20
+
+# Seconds between polls while no session is live
+IDLE_INTERVAL = 60
+
+# Seconds between flushes; at most one message per session thread per tick
+TICK = 5.0
+
+# Events buffered per session between flushes
+MAX_BUFFERED = 50
+
+# Longest wait between retries after failed polls
+MAX_BACKOFF = 60
+
+STATUS_LINES = {
+    'active': '🟢 **Green flag** - racing resumes',
+    'safety_car': '🟡 **Safety car** deployed',
+    'red_flag': '🔴 **Red flag** - session suspended',
+}
+
+DECISION_LABELS = {
+    'no_action': 'No further action',
+    'warning': 'Warning',
+    'time_penalty': 'Time penalty',
+    'grid_penalty': 'Grid penalty',
+    'points_deduction': 'Points deduction',
+    'disqualification': 'Disqualification',
+    'investigation_continues': 'Investigation continues',
+}
+
+PENALTY_UNITS = {'time_penalty': 's', 'grid_penalty': ' places', 'points_deduction': ' pts'}
+
+
+class RaceControlFeed:
+    """Posts live race control events to one Discord thread per session"""
+
+    def __init__(self, bot, channel_id: int, path: str):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.path = path
+        self.state = self._load()
+        self.sessions: Dict[str, dict] = {}
+        self.stats: Dict[str, int] = {'polls': 0, 'events': 0, 'messages': 0, 'dropped': 0}
+        self._buffers: Dict[str, Deque[str]] = {}
+        self._overflow: Dict[str, int] = {}
+        self._titles: Dict[str, str] = {}
+        self._ended: List[str] = []
+        self._cursor = list(self.state['cursor'])
+        self._sessions_version = ''
+        self._tasks: List[asyncio.Task] = []
+
+    def _load(self) -> dict:
+        fresh = {'cursor': [0, 0], 'threads': {}, 'status': {}}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+            if len(state['cursor']) != 2 or not isinstance(state['threads'], dict):
+                raise ValueError('malformed state')
+            state.setdefault('status', {})
+            return state
+        except FileNotFoundError:
+            return fresh
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error('Unreadable race control state %s (%s), starting fresh', self.path, type(e).__name__)
+            return fresh
+
+    def _save(self):
+        """Write the state atomically (write to a temp file, then rename)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    def start(self):
+        """Start polling and flushing"""
+        self._tasks = [asyncio.ensure_future(self._poll_loop()), asyncio.ensure_future(self._flush_loop())]
+
+    def stop(self):
+        """Stop polling and flushing; unflushed events are fetched again on restart"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def _poll_loop(self):
+        await self.bot.wait_until_ready()
+        failures = 0
+        while True:
+            after_incident, after_decision = self._cursor
+            page = await self.bot.api_request(
+                f'racecontrol/feed?after_incident={after_incident}&after_decision={after_decision}'
+                f'&sessions={self._sessions_version}&wait={LONG_POLL_WAIT}',
+                use_cache=False, priority=LONG_POLL, timeout=LONG_POLL_WAIT + 10
+            )
+            if not page:
+                failures += 1
+                await asyncio.sleep(min(MAX_BACKOFF, 2 ** failures))
+                continue
+            failures = 0
+            self.stats['polls'] += 1
+            try:
+                self._ingest(page)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error('Invalid race control payload: %s', type(e).__name__)
+                await asyncio.sleep(IDLE_INTERVAL)
+                continue
+            if not self.sessions:
+                await asyncio.sleep(IDLE_INTERVAL)
+
+    def _ingest(self, page: dict):
+        """Turn a feed page into buffered lines per session"""
+        sessions = {str(row['id']): row for row in page['sessions']}
+        known = self.state['status']
+
+        for session_id, session in sessions.items():
+            status = session['status']
+            name = ' - '.join(filter(None, (session.get('race_name'), session.get('session_type'))))
+            # Kept for the thread name, which may be needed after the session ended
+            self._titles[session_id] = name or f'Session {session_id}'
+            if session_id not in known:
+                self._add(session_id, f"📡 Race control is live for **{self._titles[session_id]}**")
+            elif known[session_id] != status and status in STATUS_LINES:
+                lap = session.get('current_lap')
+                self._add(session_id, f"{STATUS_LINES[status]}{f' (lap {lap})' if lap else ''}")
+            known[session_id] = status
+            if session.get('weather_update') and session.get('weather_update') != self.sessions.get(
+                    session_id, session).get('weather_update'):
+                self._add(session_id, f"🌦️ Weather: {session['weather_update']}")
+
+        for session_id in list(known):
+            if session_id not in sessions:
+                self._add(session_id, "🏁 Session ended")
+                self._ended.append(session_id)
+                del known[session_id]
+
+        by_race: Dict[int, List[str]] = {}
+        for session_id, session in sessions.items():
+            by_race.setdefault(int(session['race_id']), []).append(session_id)
+
+        names = self._driver_names(page['incidents'], page['decisions'])
+        for incident in page['incidents']:
+            for session_id in by_race.get(int(incident['race_id']), ()):
+                self._add(session_id, self._incident_line(incident, names))
+        for decision in page['decisions']:
+            for session_id in by_race.get(int(decision['race_id']), ()):
+                self._add(session_id, self._decision_line(decision, names))
+
+        self.sessions = sessions
+        self._sessions_version = page['sessions_version']
+        cursor = page['next_cursor']
+        self._cursor = [int(cursor['after_incident']), int(cursor['after_decision'])]
+
+    def _add(self, session_id: str, line: str):
+        buffer = self._buffers.get(session_id)
+        if buffer is None:
+            buffer = self._buffers[session_id] = deque(maxlen=MAX_BUFFERED)
+        if len(buffer) == MAX_BUFFERED:
+            # The oldest line falls out of the deque; only report how many were lost
+            self._overflow[session_id] = self._overflow.get(session_id, 0) + 1
+            self.stats['dropped'] += 1
+        buffer.append(line)
+        self.stats['events'] += 1
+
+    def _driver_names(self, incidents: list, decisions: list) -> Dict[int, str]:
+        driver_ids = {int(driver_id) for incident in incidents for driver_id in incident['drivers_involved']}
+        driver_ids.update(int(driver_id) for decision in decisions for driver_id in decision['penalty_target'])
+        try:
+            return self.bot.replica.driver_names(driver_ids)
+        except ReplicaNotReady:
+            return {}
+
+    @staticmethod
+    def _drivers(driver_ids: list, names: Dict[int, str]) -> str:
+        return ', '.join(names.get(int(driver_id), f"#{driver_id}") for driver_id in driver_ids)
+
+    def _incident_line(self, incident: dict, names: Dict[int, str]) -> str:
+        where = ' '.join(filter(None, (
+            f"Lap {incident['incident_lap']}" if incident.get('incident_lap') else None,
+            f"T{incident['incident_turn']}" if incident.get('incident_turn') else None,
+        )))
+        drivers = self._drivers(incident['drivers_involved'], names)
+        return (f"⚠️ {f'{where}: ' if where else ''}**{incident['incident_title']}** "
+                f"({incident['incident_type'].replace('_', ' ')}, {incident['severity']})"
+                f"{f' - {drivers}' if drivers else ''}")
+
+    def _decision_line(self, decision: dict, names: Dict[int, str]) -> str:
+        decision_type = decision['decision_type']
+        label = DECISION_LABELS.get(decision_type, decision_type)
+        if decision_type in PENALTY_UNITS and decision.get('penalty_value'):
+            label += f" {decision['penalty_value']}{PENALTY_UNITS[decision_type]}"
+        drivers = self._drivers(decision['penalty_target'], names)
+        return (f"⚖️ **{label}**{f' for {drivers}' if drivers else ''} "
+                f"({decision['incident_title']}): {decision['decision_summary']}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(TICK)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error('Error flushing race control feed: %s', e)
+
+    async def flush(self) -> int:
+        """Send each session's buffered lines as one message; returns messages queued"""
+        # Only events up to here are covered by the cursor saved below
+        cursor = list(self._cursor)
+        sent = 0
+        for session_id, buffer in list(self._buffers.items()):
+            if not buffer:
+                continue
+            thread_id = await self._thread(session_id)
+            if thread_id is None:
+                # Keep the lines (and the saved cursor) until the thread can be created
+                return sent
+            lines = list(buffer)
+            buffer.clear()
+            overflow = self._overflow.pop(session_id, 0)
+            if overflow:
+                lines.insert(0, f"… {overflow} earlier event{'s' if overflow != 1 else ''} not shown")
+            self.bot.notifier.publish_to([thread_id], embed=self._embed(lines))
+            sent += 1
+
+        for session_id in self._ended:
+            self._buffers.pop(session_id, None)
+            self._overflow.pop(session_id, None)
+            self._titles.pop(session_id, None)
+            self.state['threads'].pop(session_id, None)
+        self._ended.clear()
+
+        self.stats['messages'] += sent
+        if sent or self.state['cursor'] != cursor:
+            self.state['cursor'] = cursor
+            self._save()
+        return sent
+
+    @staticmethod
+    def _embed(lines: List[str]) -> discord.Embed:
+        description = ''
+        for shown, line in enumerate(lines):
+            if len(description) + len(line) + 40 > 4096:
+                description += f"… and {len(lines) - shown} more"
+                break
+            description += line + '\n'
+        return discord.Embed(description=description, color=discord.Color.orange())
+
+    async def _thread(self, session_id: str) -> Optional[int]:
+        """The session's thread, created in the race control channel on first use"""
+        thread_id = self.state['threads'].get(session_id)
+        if thread_id:
+            return thread_id
+
+        try:
+            await self.bot.notifier.global_bucket.acquire()
+            channel = self.bot.get_channel(self.channel_id) or await self.bot.fetch_channel(self.channel_id)
+            thread = await channel.create_thread(
+                name=f"Race Control: {self._titles.get(session_id, f'Session {session_id}')}"[:100],
+                type=discord.ChannelType.public_thread,
+                auto_archive_duration=1440
+            )
+        except discord.HTTPException as e:
+            logger.error('Could not create race control thread for session %s: %s', session_id, e.status)
+            return None
+        self.state['threads'][session_id] = thread.id
+        self._save()
+        return thread.id
+
+    def snapshot(self) -> dict:
+        """Live sessions, buffered events and counters"""
+        return dict(self.stats, sessions=len(self.sessions),
+                    buffered=sum(len(buffer) for buffer in self._buffers.values()))
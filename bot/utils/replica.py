@@ -0,0 +1,362 @@
+"""
+Local read replica of league reference data for Grid King Discord Bot
+
+Drivers, teams, races and seasons (plus the active season's results, which
+driver and team statistics are computed from) are mirrored into a SQLite
+file. A background loop pulls only the rows changed since the previous
+sync from the ``replica?updated_since=`` endpoint. Lookup commands query
+the replica instead of the API.
+
+Deltas are applied by a writer connection in an executor thread; with WAL
+the event loop's reader connection keeps seeing the last committed sync
+while a new one is written. A changed API schema version, a local schema
+change or row counts that no longer match the server (deleted rows, a new
+active season) trigger a full resync.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from utils.models import Driver, Race, Team
+
+logger = logging.getLogger('gridking_bot')
+
+TABLES = {
+    'seasons': (('id', 'INTEGER PRIMARY KEY'), ('name', 'TEXT'), ('year', 'INTEGER'), ('is_active', 'INTEGER'),
+                ('start_date', 'TEXT'), ('end_date', 'TEXT')),
+    'teams': (('id', 'INTEGER PRIMARY KEY'), ('name', 'TEXT'), ('logo', 'TEXT')),
+    'drivers': (('id', 'INTEGER PRIMARY KEY'), ('username', 'TEXT'), ('verified', 'INTEGER'), ('team_id', 'INTEGER'),
+                ('driver_number', 'INTEGER'), ('platform', 'TEXT'), ('country', 'TEXT'), ('bio', 'TEXT'),
+                ('livery_image', 'TEXT')),
+    'races': (('id', 'INTEGER PRIMARY KEY'), ('season_id', 'INTEGER'), ('name', 'TEXT'), ('track', 'TEXT'),
+              ('race_date', 'TEXT'), ('format', 'TEXT'), ('laps', 'INTEGER'), ('status', 'TEXT')),
+    'race_results': (('id', 'INTEGER PRIMARY KEY'), ('race_id', 'INTEGER'), ('driver_id', 'INTEGER'),
+                     ('position', 'INTEGER'), ('points', 'REAL'), ('pole_position', 'INTEGER'),
+                     ('fastest_lap', 'INTEGER'), ('dnf', 'INTEGER')),
+}
+
+INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_drivers_team ON drivers (team_id)',
+    'CREATE INDEX IF NOT EXISTS idx_races_date ON races (race_date)',
+    'CREATE INDEX IF NOT EXISTS idx_results_driver ON race_results (driver_id)',
+    'CREATE INDEX IF NOT EXISTS idx_results_race ON race_results (race_id)',
+)
+
+# Bump when TABLES or INDEXES change; the file is rebuilt and fully resynced
+LOCAL_SCHEMA = 1
+
+# Same rule as the drivers/search endpoint
+MIN_SEARCH_LENGTH = 2
+SEARCH_LIMIT = 10
+
+STATISTICS_COLUMNS = '''
+    COUNT(rr.id) as races_participated,
+    COALESCE(SUM(rr.position = 1), 0) as wins,
+    COALESCE(SUM(rr.position <= 3), 0) as podiums,
+    COALESCE(SUM(rr.pole_position = 1), 0) as poles,
+    COALESCE(SUM(rr.fastest_lap = 1), 0) as fastest_laps,
+    COALESCE(SUM(rr.dnf = 1), 0) as dnfs,
+    COALESCE(SUM(rr.points), 0) as total_points,
+    AVG(rr.position) as avg_position,
+    MIN(rr.position) as best_position
+'''
+
+STATISTICS_FIELDS = ('races_participated', 'wins', 'podiums', 'poles', 'fastest_laps', 'dnfs',
+                     'total_points', 'avg_position', 'best_position')
+
+
+class ReplicaNotReady(Exception):
+    """Raised by lookups before the first sync has completed"""
+
+    def __init__(self):
+        super().__init__("league data is still being synced, try again shortly")
+
+
+def _with_statistics(row: sqlite3.Row) -> dict:
+    """Split the statistics columns of a row into a nested dict (API shape)"""
+    data = dict(row)
+    data['statistics'] = {name: data.pop(name) for name in STATISTICS_FIELDS if name in data}
+    return data
+
+
+class ReferenceReplica:
+    """SQLite mirror of drivers, teams, races, seasons and season results"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
+        self._prepare()
+        self._reader = self._connect()
+        self.metrics = {
+            'syncs': 0,
+            'full_resyncs': 0,
+            'failures': 0,
+            'last_rows': 0,
+            'rows_applied': 0,
+            'last_fetch_ms': 0.0,
+            'last_apply_ms': 0.0,
+            'total_sync_ms': 0.0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _prepare(self):
+        """Create the tables, rebuilding them if the local schema changed"""
+        conn = self._writer
+        with conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            row = conn.execute("SELECT value FROM meta WHERE key = 'local_schema'").fetchone()
+            if row is None or int(row['value']) != LOCAL_SCHEMA:
+                for table in TABLES:
+                    conn.execute(f'DROP TABLE IF EXISTS {table}')
+                conn.execute('DELETE FROM meta')
+                conn.execute("INSERT INTO meta VALUES ('local_schema', ?)", (str(LOCAL_SCHEMA),))
+            for table, columns in TABLES.items():
+                definition = ', '.join(f'{name} {kind}' for name, kind in columns)
+                conn.execute(f'CREATE TABLE IF NOT EXISTS {table} ({definition})')
+            for statement in INDEXES:
+                conn.execute(statement)
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._reader.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row['value']
+
+    @property
+    def ready(self) -> bool:
+        """Whether at least one sync has completed (possibly before a restart)"""
+        return self._meta('cursor') is not None
+
+    def lag(self) -> Optional[float]:
+        """Seconds since the replica was last confirmed current"""
+        synced_at = self._meta('synced_at')
+        return None if synced_at is None else max(0.0, time.time() - float(synced_at))
+
+    def snapshot(self) -> dict:
+        """Sync cost counters plus lag and schema version"""
+        lag = self.lag()
+        return dict(self.metrics, lag_seconds=None if lag is None else round(lag, 1),
+                    schema_version=self._meta('schema_version'))
+
+    async def sync(self, api_request) -> int:
+        """Pull and apply changes since the last sync; returns rows applied"""
+        loop = asyncio.get_running_loop()
+        cursor = self._meta('cursor')
+        full = cursor is None
+
+        started = time.perf_counter()
+        page = await api_request(f'replica?updated_since={0 if full else cursor}', use_cache=False)
+        if not page:
+            self.metrics['failures'] += 1
+            return 0
+
+        if not full and page['schema_version'] != self._meta('schema_version'):
+            logger.info('API schema changed (%s -> %s), resyncing replica',
+                        self._meta('schema_version'), page['schema_version'])
+            full = True
+            page = await api_request('replica?updated_since=0', use_cache=False)
+            if not page:
+                self.metrics['failures'] += 1
+                return 0
+        fetched = time.perf_counter()
+
+        rows = await loop.run_in_executor(None, self._apply, page, full)
+        if rows is None:
+            # Delta applied cleanly but counts differ: rows were deleted upstream
+            logger.info('Replica row counts differ from the API, resyncing')
+            full = True
+            page = await api_request('replica?updated_since=0', use_cache=False)
+            if not page:
+                self.metrics['failures'] += 1
+                return 0
+            fetched = time.perf_counter()
+            rows = await loop.run_in_executor(None, self._apply, page, full)
+        applied = time.perf_counter()
+
+        self.metrics['syncs'] += 1
+        self.metrics['full_resyncs'] += int(full)
+        self.metrics['last_rows'] = rows
+        self.metrics['rows_applied'] += rows
+        self.metrics['last_fetch_ms'] = round((fetched - started) * 1000, 1)
+        self.metrics['last_apply_ms'] = round((applied - fetched) * 1000, 1)
+        self.metrics['total_sync_ms'] += round((applied - started) * 1000, 1)
+        return rows
+
+    def _apply(self, page: dict, full: bool) -> Optional[int]:
+        """Write one replica payload in a single transaction
+
+        Returns the number of rows written, or None (rolled back) when a
+        delta leaves row counts that differ from the server's.
+        """
+        with self._write_lock:
+            conn = self._writer
+            conn.execute('BEGIN')
+            try:
+                if full:
+                    for table in TABLES:
+                        conn.execute(f'DELETE FROM {table}')
+
+                written = 0
+                for table, columns in TABLES.items():
+                    names = [name for name, _ in columns]
+                    rows = page['tables'].get(table) or []
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO {table} ({', '.join(names)}) "
+                        f"VALUES ({', '.join('?' * len(names))})",
+                        ([row.get(name) for name in names] for row in rows)
+                    )
+                    written += len(rows)
+
+                counts = page.get('counts') or {}
+                mismatched = [
+                    table for table in TABLES
+                    if table in counts
+                    and conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] != int(counts[table])
+                ]
+                if mismatched and not full:
+                    conn.execute('ROLLBACK')
+                    return None
+                if mismatched:
+                    logger.warning('Replica counts still differ after full resync: %s', ', '.join(mismatched))
+
+                conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', (
+                    ('cursor', str(int(page['server_time']))),
+                    ('schema_version', str(page['schema_version'])),
+                    ('synced_at', str(time.time())),
+                    ('utc_offset', str(int(page.get('utc_offset') or 0))),
+                ))
+                conn.execute('COMMIT')
+                return written
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        if not self.ready:
+            raise ReplicaNotReady()
+        return self._reader.execute(sql, params).fetchall()
+
+    def drivers(self) -> List[Driver]:
+        """Verified drivers by name with basic season statistics"""
+        rows = self._query(f'''
+            SELECT d.*, t.name as team_name, t.logo as team_logo, {STATISTICS_COLUMNS}
+            FROM drivers d
+            LEFT JOIN teams t ON d.team_id = t.id
+            LEFT JOIN race_results rr ON rr.driver_id = d.id
+            WHERE d.verified = 1
+            GROUP BY d.id
+            ORDER BY d.username COLLATE NOCASE
+        ''')
+        return [Driver.from_api(_with_statistics(row)) for row in rows]
+
+    def search_drivers(self, query: str) -> List[Driver]:
+        """Drivers whose name contains ``query`` or whose number equals it"""
+        query = query.strip()
+        if len(query) < MIN_SEARCH_LENGTH:
+            return []
+        rows = self._query('''
+            SELECT d.*, t.name as team_name
+            FROM drivers d
+            LEFT JOIN teams t ON d.team_id = t.id
+            WHERE d.verified = 1 AND (d.username LIKE ? OR d.driver_number = ?)
+            ORDER BY d.username COLLATE NOCASE
+            LIMIT ?
+        ''', (f'%{query}%', int(query) if query.isdigit() else 0, SEARCH_LIMIT))
+        return [Driver.from_api(dict(row)) for row in rows]
+
+    def driver(self, driver_id: int) -> Optional[Driver]:
+        """One driver with season statistics and the last five results"""
+        rows = self._query(f'''
+            SELECT d.*, t.name as team_name, t.logo as team_logo, {STATISTICS_COLUMNS}
+            FROM drivers d
+            LEFT JOIN teams t ON d.team_id = t.id
+            LEFT JOIN race_results rr ON rr.driver_id = d.id
+            WHERE d.id = ? AND d.verified = 1
+            GROUP BY d.id
+        ''', (driver_id,))
+        if not rows:
+            return None
+
+        data = _with_statistics(rows[0])
+        data['recent_results'] = [dict(row) for row in self._query('''
+            SELECT rr.*, r.name as race_name, r.track, r.race_date
+            FROM race_results rr
+            INNER JOIN races r ON rr.race_id = r.id
+            WHERE rr.driver_id = ?
+            ORDER BY r.race_date DESC
+            LIMIT 5
+        ''', (driver_id,))]
+        return Driver.from_api(data)
+
+    def driver_names(self, driver_ids: Iterable[int]) -> Dict[int, str]:
+        """Usernames by driver ID (unknown IDs are left out)"""
+        driver_ids = list(driver_ids)
+        if not driver_ids:
+            return {}
+        rows = self._query(f"SELECT id, username FROM drivers WHERE id IN ({','.join('?' * len(driver_ids))})",
+                           driver_ids)
+        return {row['id']: row['username'] for row in rows}
+
+    def search_teams(self, query: str) -> List[Team]:
+        """Teams whose name contains ``query``"""
+        rows = self._query('''
+            SELECT t.*, COUNT(d.id) as driver_count
+            FROM teams t
+            LEFT JOIN drivers d ON d.team_id = t.id AND d.verified = 1
+            WHERE t.name LIKE ?
+            GROUP BY t.id
+            ORDER BY t.name COLLATE NOCASE
+            LIMIT ?
+        ''', (f'%{query.strip()}%', SEARCH_LIMIT))
+        return [Team.from_api(dict(row)) for row in rows]
+
+    def team(self, team_id: int) -> Optional[Team]:
+        """One team with its drivers and season statistics"""
+        rows = self._query(f'''
+            SELECT t.*, {STATISTICS_COLUMNS}
+            FROM teams t
+            LEFT JOIN drivers d ON d.team_id = t.id
+            LEFT JOIN race_results rr ON rr.driver_id = d.id
+            WHERE t.id = ?
+            GROUP BY t.id
+        ''', (team_id,))
+        if not rows:
+            return None
+
+        data = _with_statistics(rows[0])
+        data['drivers'] = [dict(row) for row in self._query('''
+            SELECT *
+            FROM drivers
+            WHERE team_id = ? AND verified = 1
+            ORDER BY username COLLATE NOCASE
+        ''', (team_id,))]
+        return Team.from_api(data)
+
+    def upcoming_races(self, limit: int = 5) -> List[Race]:
+        """Next races by date"""
+        # race_date is the league database's local time, not UTC
+        offset = timedelta(seconds=int(self._meta('utc_offset') or 0))
+        now = (datetime.utcnow() + offset).strftime('%Y-%m-%d %H:%M:%S')
+        rows = self._query('''
+            SELECT r.*, s.name as season_name
+            FROM races r
+            LEFT JOIN seasons s ON r.season_id = s.id
+            WHERE r.race_date > ?
+            ORDER BY r.race_date ASC
+            LIMIT ?
+        ''', (now, limit))
+        return [Race.from_api(dict(row)) for row in rows]
@@ -0,0 +1,125 @@
+"""
+Shared interaction response path for Grid King Discord Bot
+
+Deferring and then sending a followup costs two Discord HTTP calls. When a
+command can be answered from cache it is ready almost immediately, so the
+reply is built first and sent with a single ``response.send_message`` if it
+finishes within INLINE_BUDGET; only slower replies (cache misses) fall back
+to ``defer()`` plus ``followup.send``.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import discord
+
+from utils.dedupe import POINTER
+from utils.trace import current_command
+
+logger = logging.getLogger('gridking_bot')
+
+# Seconds a reply may take before the interaction is deferred instead.
+# Well inside Discord's 3 second window for the initial response.
+INLINE_BUDGET = 0.25
+
+# Counters for commands answered inline vs deferred and Discord calls made
+response_stats: Dict[str, int] = {'inline': 0, 'deferred': 0, 'discord_calls': 0}
+
+
+def reply(content: str = None, **kwargs) -> dict:
+    """Build the keyword arguments for send_message/followup.send"""
+    if content is not None:
+        kwargs['content'] = content
+    return kwargs
+
+
+async def respond(interaction: discord.Interaction, message: Awaitable[dict], error: str,
+                  budget: Optional[float] = None, ephemeral: bool = False) -> bool:
+    """Send a reply, answering inline when it is ready within ``budget``
+
+    ``ephemeral`` must be decided up front: a deferred reply takes its
+    visibility from the defer, not from the followup. It also applies to the
+    error reply sent when ``message`` raises. Returns whether the
+    interaction was deferred.
+    """
+    budget = INLINE_BUDGET if budget is None else budget
+    task = asyncio.ensure_future(_build(message, error, ephemeral))
+    done, _ = await asyncio.wait({task}, timeout=budget)
+
+    if done:
+        await interaction.response.send_message(**task.result())
+        response_stats['inline'] += 1
+        response_stats['discord_calls'] += 1
+        return False
+
+    await interaction.response.defer(ephemeral=ephemeral)
+    await interaction.followup.send(**await task)
+    response_stats['deferred'] += 1
+    response_stats['discord_calls'] += 2
+    return True
+
+
+async def _build(message: Awaitable[dict], error: str, ephemeral: bool = False) -> dict:
+    try:
+        return await message
+    except Exception as e:
+        # Errors from private commands stay private, even when answered inline
+        if ephemeral:
+            return reply(f"❌ {error}: {str(e)}", ephemeral=True)
+        return reply(f"❌ {error}: {str(e)}")
+
+
+def responder(error: str, ephemeral: bool = False, dedupe: Optional[float] = None,
+              dedupe_policy: str = POINTER) -> Callable:
+    """Decorate a slash command callback that returns ``reply(...)``
+
+    ``error`` prefixes the message sent when the callback raises;
+    ``ephemeral`` makes a deferred reply visible to the invoking user only.
+    ``dedupe`` shares a public answer with identical invocations in the same
+    channel for that many seconds, as ``dedupe_policy`` (see utils.dedupe).
+    While the bot records a traffic trace (see utils.trace) each invocation
+    is added to it once answered.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
+            command = getattr(interaction, 'command', None)
+            name = command.qualified_name if command else func.__name__
+            deduper = getattr(self.bot, 'dedupe', None)
+            claim = None
+            if deduper is not None and not ephemeral:
+                claim = deduper.claim(interaction, name, args, kwargs, dedupe, dedupe_policy)
+
+            def build() -> Awaitable[dict]:
+                return func(self, interaction, *args, **kwargs)
+
+            message = claim.run(build) if claim else build()
+            # Duplicates only tell their caller where the answer is
+            private = ephemeral or bool(claim and claim.duplicate)
+            sent = False
+            trace = getattr(self.bot, 'trace', None)
+            try:
+                if trace is None or trace.full:
+                    await respond(interaction, message, error, ephemeral=private)
+                    sent = True
+                    return
+
+                sequence, at = trace.begin_command()
+                start = time.perf_counter()
+                # Upstream requests made while building the reply are linked to it
+                token = current_command.set(sequence)
+                try:
+                    deferred = await respond(interaction, message, error, ephemeral=private)
+                    sent = True
+                finally:
+                    current_command.reset(token)
+                trace.command(sequence, at, interaction, name, kwargs, self.bot.tenant.name,
+                              (time.perf_counter() - start) * 1000, deferred)
+            finally:
+                if claim is not None:
+                    claim.done(interaction, sent)
+        return wrapper
+    return decorator
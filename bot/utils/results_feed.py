@@ -0,0 +1,234 @@
+"""
+Results publisher for Grid King Discord Bot
+
+Polls races/results with an (updated_after, after_id) cursor so each poll
+only transfers result rows that were added or amended since the previous
+one. Newly scored races are posted to the results channel; when penalties
+change a classification the existing post is edited instead. The cursor,
+the classifications of recent races and their message IDs are kept in a
+JSON state file, so a restart neither reposts nor misses results.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+import discord
+from discord.ext import tasks
+
+from utils.models import Race, Result
+from utils.notifier import RESULTS
+from utils.scheduler import NOTIFICATION
+
+logger = logging.getLogger('gridking_bot')
+
+# Rows per request and requests per poll
+RESULTS_PAGE_SIZE = 500
+MAX_PAGES = 20
+
+# Races whose classification is kept so amendments can edit their post
+TRACKED_RACES = 20
+
+# Without a state file, start this far back instead of from the beginning
+FIRST_RUN_LOOKBACK = 24 * 3600
+
+RESULT_FIELDS = ('driver_id', 'position', 'points', 'dnf', 'pole_position', 'fastest_lap',
+                 'username', 'driver_number', 'team_name')
+
+
+def _row(result: Result) -> dict:
+    """JSON-safe copy of the fields shown in a results post"""
+    return {name: getattr(result, name) for name in RESULT_FIELDS}
+
+
+def _classification_order(row: dict):
+    return (row['position'] is None, row['position'] or 0, row['driver_id'] or 0)
+
+
+class ResultsPublisher:
+    """Posts newly scored races and edits posts when results are amended"""
+
+    def __init__(self, bot, path: str):
+        self.bot = bot
+        self.path = path
+        self.state = self._load()
+
+    def _load(self) -> dict:
+        fresh = {'cursor': [int(time.time()) - FIRST_RUN_LOOKBACK, 0], 'races': {}, 'pending': []}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+            if not isinstance(state['races'], dict) or len(state['cursor']) != 2:
+                raise ValueError('malformed state')
+            state.setdefault('pending', [])
+            return state
+        except FileNotFoundError:
+            return fresh
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error('Unreadable results feed state %s (%s), starting fresh', self.path, type(e).__name__)
+            return fresh
+
+    def _save(self):
+        """Write the state atomically (write to a temp file, then rename)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    def start(self):
+        """Start the polling loop"""
+        self.poll_loop.start()
+
+    def stop(self):
+        """Stop the polling loop"""
+        self.poll_loop.cancel()
+
+    @tasks.loop(minutes=2)
+    async def poll_loop(self):
+        """Publish new and amended results"""
+        try:
+            published = await self.poll()
+            if published:
+                logger.info('Published results for %d race(s)', published)
+                self.bot.live_board.request_update()
+        except Exception as e:
+            logger.error('Error publishing results: %s', e)
+
+    @poll_loop.before_loop
+    async def before_poll_loop(self):
+        await self.bot.wait_until_ready()
+
+    async def poll(self) -> int:
+        """Fetch rows changed since the cursor, then post or edit affected races"""
+        for _ in range(MAX_PAGES):
+            updated_after, after_id = self.state['cursor']
+            page = await self.bot.api_request(
+                f'races/results?updated_after={updated_after}&after_id={after_id}&limit={RESULTS_PAGE_SIZE}',
+                use_cache=False, priority=NOTIFICATION
+            )
+            if not page:
+                break
+            rows = page.get('results') or []
+            if rows:
+                self._merge(rows)
+                cursor = page['next_cursor']
+                self.state['cursor'] = [int(cursor['updated_after']), int(cursor['after_id'])]
+                # Rows are recorded (and their races queued) before anything is posted
+                self._save()
+            if not page.get('has_more'):
+                break
+
+        published = 0
+        for race_key in sorted(self.state['pending'], key=int):
+            if not await self._publish(race_key):
+                continue
+            published += 1
+            self.state['pending'].remove(race_key)
+            self._save()
+        return published
+
+    def _merge(self, rows: list):
+        """Fold changed rows into the tracked classifications"""
+        races = self.state['races']
+        pending = self.state['pending']
+        for data in rows:
+            result = Result.from_api(data)
+            race_key = str(result.race_id)
+            race = races.get(race_key)
+            if race is None:
+                race = races[race_key] = {
+                    'race': {
+                        'id': result.race_id,
+                        'name': data.get('race_name'),
+                        'track': data.get('track'),
+                        'format': data.get('format'),
+                        'laps': data.get('laps'),
+                        'race_date': data.get('race_date'),
+                    },
+                    'results': {},
+                    'message_id': None,
+                    'digest': None,
+                    # An amendment to a race we never saw: fetch its full classification
+                    'incomplete': data.get('amended') not in (None, 0, '0', False),
+                }
+            race['results'][str(result.driver_id)] = _row(result)
+            if race_key not in pending:
+                pending.append(race_key)
+
+        # Forget the oldest races that have nothing left to publish
+        for race_key in sorted(races, key=int)[:max(0, len(races) - TRACKED_RACES)]:
+            if race_key not in pending:
+                del races[race_key]
+
+    async def _refetch(self, race_key: str, race: dict) -> bool:
+        full = await self.bot.api_request(f'races/{race_key}', use_cache=False, priority=NOTIFICATION)
+        if not full:
+            return False
+        race['race'].update(name=full.name, track=full.track, format=full.format, laps=full.laps,
+                            race_date=full.race_date.isoformat(sep=' '))
+        race['results'] = {str(result.driver_id): _row(result) for result in full.results}
+        race['incomplete'] = False
+        return True
+
+    def _build_race(self, race: dict) -> Race:
+        data = dict(race['race'], results=sorted(race['results'].values(), key=_classification_order))
+        return Race.from_api(data)
+
+    async def _publish(self, race_key: str) -> bool:
+        """Post or edit one race; False leaves it queued for the next poll"""
+        race = self.state['races'].get(race_key)
+        if race is None:
+            return True
+        if race['incomplete'] and not await self._refetch(race_key, race):
+            return False
+
+        classification = sorted(race['results'].values(), key=_classification_order)
+        digest = hashlib.sha1(json.dumps(classification, sort_keys=True).encode()).hexdigest()
+        if digest == race['digest']:
+            return True
+
+        races_cog = self.bot.get_cog('RacesCog')
+        if races_cog is None:
+            return False
+        embed = races_cog.build_last_race_embed(self._build_race(race))
+
+        try:
+            message_id = await self._post(race['message_id'], embed)
+        except discord.HTTPException as e:
+            logger.error('Failed to publish results for race %s: %s', race_key, e.status)
+            return False
+
+        if race['digest'] is None:
+            # Posts on the extra results routes can't be edited later, only the results
+            # channel's; fan out on the first publish only, even without a results channel
+            self.bot.notifier.publish_to(
+                [route for route in self.bot.notifier.routes[RESULTS] if route != self.bot.results_channel_id],
+                embed=embed
+            )
+        race['message_id'] = message_id
+        race['digest'] = digest
+        return True
+
+    async def _post(self, message_id: Optional[int], embed: discord.Embed) -> Optional[int]:
+        """Edit the existing post (or send a new one); returns the message ID"""
+        if not self.bot.results_channel_id:
+            return None
+        channel = self.bot.get_channel(self.bot.results_channel_id)
+        if channel is None:
+            channel = await self.bot.fetch_channel(self.bot.results_channel_id)
+
+        if message_id:
+            try:
+                await channel.get_partial_message(message_id).edit(embed=embed)
+                return message_id
+            except discord.NotFound:
+                logger.warning('Results post %s was deleted, posting again', message_id)
+
+        message = await channel.send(embed=embed)
+        return message.id
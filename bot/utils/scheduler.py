@@ -0,0 +1,193 @@
+"""
+Priority scheduler for upstream API requests for Grid King Discord Bot
+
+User commands, notifications and background jobs (warmer, archive sync)
+share one HTTP session. Requests wait here for a slot: interactive work is
+always dispatched first, each class has its own concurrency limit, and a
+request that waited past its class deadline is dropped instead of being
+sent late. Long polls (the race control feed) have a class of their own
+outside the shared limit, since they hold a slot while the server waits.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from utils.models import slotted
+
+logger = logging.getLogger('gridking_bot')
+
+INTERACTIVE = 'interactive'
+NOTIFICATION = 'notification'
+BACKGROUND = 'background'
+LONG_POLL = 'long_poll'
+
+# Dispatch order, highest priority first
+PRIORITIES = (INTERACTIVE, NOTIFICATION, BACKGROUND, LONG_POLL)
+
+# Classes limited only by their own limit, not MAX_CONCURRENCY
+SEPARATE_CLASSES = frozenset((LONG_POLL,))
+
+# Requests in flight across all classes (except SEPARATE_CLASSES)
+MAX_CONCURRENCY = 8
+
+# Per-class limits; lower classes can never take every slot
+CLASS_LIMITS = {
+    INTERACTIVE: 8,
+    NOTIFICATION: 3,
+    BACKGROUND: 2,
+    LONG_POLL: 1,
+}
+
+# Seconds a request may wait for a slot before it is dropped
+CLASS_DEADLINES = {
+    INTERACTIVE: 10,
+    NOTIFICATION: 120,
+    BACKGROUND: 600,
+    LONG_POLL: 60,
+}
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request waited for a slot longer than its deadline"""
+
+
+@slotted
+@dataclass
+class QueueMetrics:
+    queued: int = 0
+    running: int = 0
+    peak_queued: int = 0
+    completed: int = 0
+    dropped: int = 0
+    waits: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+    def record_wait(self, seconds: float):
+        self.waits += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            'queued': self.queued,
+            'running': self.running,
+            'peak_queued': self.peak_queued,
+            'completed': self.completed,
+            'dropped': self.dropped,
+            'avg_wait_ms': round(self.wait_total / self.waits * 1000, 1) if self.waits else 0.0,
+            'max_wait_ms': round(self.wait_max * 1000, 1),
+        }
+
+
+class RequestScheduler:
+    """Grants request slots by priority class, limit and deadline"""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY,
+                 limits: Optional[Dict[str, int]] = None,
+                 deadlines: Optional[Dict[str, float]] = None):
+        self.max_concurrency = max_concurrency
+        self.limits = dict(CLASS_LIMITS, **(limits or {}))
+        self.deadlines = dict(CLASS_DEADLINES, **(deadlines or {}))
+        self.metrics = {priority: QueueMetrics() for priority in PRIORITIES}
+        self._rank = {priority: rank for rank, priority in enumerate(PRIORITIES)}
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._running = 0
+
+    def _has_capacity(self, priority: str) -> bool:
+        if self.metrics[priority].running >= self.limits[priority]:
+            return False
+        return priority in SEPARATE_CLASSES or self._running < self.max_concurrency
+
+    def _start(self, priority: str):
+        if priority not in SEPARATE_CLASSES:
+            self._running += 1
+        self.metrics[priority].running += 1
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE, deadline: Optional[float] = None):
+        """Hold a request slot for the duration of the block"""
+        await self.acquire(priority, deadline)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    async def acquire(self, priority: str = INTERACTIVE, deadline: Optional[float] = None):
+        """Wait for a slot; raises DeadlineExceeded if none is granted in time"""
+        metrics = self.metrics[priority]
+        if not metrics.queued and self._has_capacity(priority):
+            self._start(priority)
+            metrics.record_wait(0.0)
+            return
+
+        loop = asyncio.get_running_loop()
+        timeout = self.deadlines[priority] if deadline is None else deadline
+        enqueued = loop.time()
+        future = loop.create_future()
+        heapq.heappush(self._waiting, (self._rank[priority], next(self._sequence), enqueued + timeout, priority, future))
+        metrics.queued += 1
+        metrics.peak_queued = max(metrics.peak_queued, metrics.queued)
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            # The slot may have been granted just as the timer fired
+            if not future.done() or future.cancelled() or future.exception() is not None:
+                metrics.dropped += 1
+                raise DeadlineExceeded(f"{priority} request waited {timeout}s for a slot")
+        except DeadlineExceeded:
+            metrics.dropped += 1
+            raise
+        except BaseException:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release(priority)
+            raise
+        finally:
+            metrics.queued -= 1
+
+        metrics.record_wait(loop.time() - enqueued)
+
+    def release(self, priority: str):
+        """Return a slot and hand it to the most urgent waiting request"""
+        if priority not in SEPARATE_CLASSES:
+            self._running -= 1
+        metrics = self.metrics[priority]
+        metrics.running -= 1
+        metrics.completed += 1
+        self._dispatch()
+
+    def _dispatch(self):
+        now = asyncio.get_running_loop().time()
+        blocked = []
+        while self._waiting:
+            entry = heapq.heappop(self._waiting)
+            _, _, expires, priority, future = entry
+            if future.done():
+                continue
+            if expires <= now:
+                future.set_exception(DeadlineExceeded(f"{priority} request expired in queue"))
+                continue
+            if not self._has_capacity(priority):
+                blocked.append(entry)
+                continue
+            self._start(priority)
+            future.set_result(None)
+
+        for entry in blocked:
+            heapq.heappush(self._waiting, entry)
+
+    @property
+    def waiting(self) -> int:
+        """Requests queued for a slot, across every class"""
+        return len(self._waiting)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Per-class queue metrics"""
+        return {priority: metrics.snapshot() for priority, metrics in self.metrics.items()}
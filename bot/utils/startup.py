@@ -0,0 +1,79 @@
+"""
+Startup profiler for Grid King Discord Bot
+
+Records how long each startup phase took: interpreter start and imports
+(measured from process start where the platform allows), building the
+bot, logging in, loading each extension, starting background tasks and
+connecting to the gateway. The breakdown is logged once the bot is ready
+and compared against the STARTUP_BUDGET; /botstatus shows the totals.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger('gridking_bot')
+
+# Seconds from process start to on_ready before a warning is logged
+DEFAULT_BUDGET = 30.0
+
+
+def process_age() -> Optional[float]:
+    """Seconds since this process started (None where /proc is unavailable)"""
+    try:
+        with open('/proc/self/stat') as f:
+            # Field 22 is the start time in clock ticks; skip past the command name first
+            fields = f.read().rsplit(')', 1)[1].split()
+        started = int(fields[19]) / os.sysconf('SC_CLK_TCK')
+        return max(0.0, time.clock_gettime(time.CLOCK_BOOTTIME) - started)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupProfiler:
+    """Time between consecutive marks, one entry per startup phase"""
+
+    def __init__(self, budget: Optional[float] = None):
+        if budget is None:
+            budget = float(os.getenv('STARTUP_BUDGET', str(DEFAULT_BUDGET)))
+        self.budget = budget
+        self.phases: Dict[str, float] = {}
+        self.ready_after: Optional[float] = None
+        self._started = time.perf_counter()
+        self._last = self._started
+        # Everything before the profiler exists: interpreter start and imports
+        self._offset = process_age()
+        if self._offset is not None:
+            self.phases['imports'] = self._offset
+
+    def mark(self, phase: str):
+        """Close ``phase``: it lasted from the previous mark until now"""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def elapsed(self) -> float:
+        """Seconds since process start (or since the profiler was created)"""
+        return (self._offset or 0.0) + time.perf_counter() - self._started
+
+    def ready(self):
+        """Record the gateway phase and log the breakdown (first call only)"""
+        if self.ready_after is not None:
+            return
+        self.mark('gateway')
+        self.ready_after = self.elapsed()
+        breakdown = ', '.join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.phases.items())
+        logger.info('Ready %.2fs after start: %s', self.ready_after, breakdown)
+        if self.ready_after > self.budget:
+            slowest = max(self.phases, key=self.phases.get)
+            logger.warning('Startup took %.2fs, over the %.0fs budget (slowest phase: %s)',
+                           self.ready_after, self.budget, slowest)
+
+    def snapshot(self) -> dict:
+        """Phase durations in milliseconds"""
+        return {
+            'phases_ms': {phase: round(seconds * 1000, 1) for phase, seconds in self.phases.items()},
+            'ready_ms': None if self.ready_after is None else round(self.ready_after * 1000, 1),
+            'budget_ms': round(self.budget * 1000, 1),
+        }
@@ -0,0 +1,268 @@
+"""
+Tenants for Grid King Discord Bot
+
+One bot process can serve many leagues. A tenant is one league: its API
+(URL and key), the guilds that use it and where its race reminders go.
+Every tenant has its own HTTP connection pool, API and embed cache
+partition, request scheduler, API rate budget, local replica, incident
+search index, results archive and reminder schedule, so a slow or busy
+league only ever queues behind its own requests. A tenant with a
+``database`` reads its hot routes straight from the league database (see
+utils.datasource).
+
+The tenant of the current work is carried in a context variable. The
+command tree sets it from the guild of each interaction, and the
+per-tenant background loops set it with ``use_tenant``. ``api_request``
+and the bot's cache/replica/scheduler attributes resolve through it.
+
+Without TENANTS_FILE the bot serves one tenant built from GRIDKING_API_URL
+and GRIDKING_API_KEY, for every guild, as before. With it, the tenants in
+the file are added (guilds not listed there and not DISCORD_GUILD_ID are
+refused), for example::
+
+    [{"name": "apex", "api_url": "https://apex.example.com/api",
+      "api_key_env": "APEX_API_KEY", "guilds": [123], "reminder_routes": [456],
+      "reminder_hours": [48, 2], "connections": 2, "api_rate": 120, "format": "msgpack",
+      "database": {"host": "db", "name": "apex", "user": "bot_ro", "password_env": "APEX_DB_PASS"}}]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import aiohttp
+import discord
+from discord import app_commands
+
+from utils.batch import DriverBatchClient
+from utils.cache import TTLCache
+from utils.datasource import FORMATS, JSON, HttpSource, SqlSource
+from utils.incidents import IncidentIndex
+from utils.notifier import RateBucket
+from utils.replica import ReferenceReplica
+from utils.scheduler import CLASS_LIMITS, LONG_POLL, MAX_CONCURRENCY, RequestScheduler
+
+logger = logging.getLogger('gridking_bot')
+
+DEFAULT = 'default'
+
+# Hours before a race that reminders are sent (each window is +/- 30 minutes)
+REMINDER_HOURS = (24, 1)
+
+# API requests per minute a tenant may send
+API_RATE = 600
+
+# Cache entries per tenant file entry (the default tenant keeps the larger limits)
+TENANT_API_CACHE = 128
+TENANT_EMBED_CACHE = 64
+
+TENANT_NAME = re.compile(r'^[a-z0-9][a-z0-9_-]{0,31}$')
+
+current_tenant: ContextVar[Optional['Tenant']] = ContextVar('current_tenant', default=None)
+
+
+@contextmanager
+def use_tenant(tenant: 'Tenant') -> Iterator['Tenant']:
+    """Run the block as ``tenant`` (API calls, caches, replica)"""
+    token = current_tenant.set(tenant)
+    try:
+        yield tenant
+    finally:
+        current_tenant.reset(token)
+
+
+class Tenant:
+    """One league's API, caches, request budget and reminder schedule"""
+
+    def __init__(self, bot, name: str, api_base_url: str, api_key: str, guild_ids: Sequence[int] = (),
+                 reminder_routes: Sequence[int] = (), reminder_hours: Sequence[int] = REMINDER_HOURS,
+                 connections: int = MAX_CONCURRENCY, api_rate: int = API_RATE,
+                 api_cache_entries: int = 512, embed_cache_entries: int = 256,
+                 replica_path: str = 'data/replica.sqlite3', incident_index_path: str = 'data/incidents.sqlite3',
+                 archive_dir: str = 'data/archive',
+                 database: Optional[dict] = None, response_format: str = JSON):
+        self.name = name
+        self.api_base_url = api_base_url
+        self.api_key = api_key
+        self.guild_ids = tuple(guild_ids)
+        self.reminder_routes = list(reminder_routes)
+        self.reminder_hours = tuple(sorted(set(reminder_hours), reverse=True))
+        self.connections = connections
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.scheduler = RequestScheduler(max_concurrency=connections)
+        self.budget = RateBucket(api_rate, 60.0)
+        self.api_cache = TTLCache(default_ttl=60, max_entries=api_cache_entries)
+        self.embed_cache = TTLCache(default_ttl=60, max_entries=embed_cache_entries)
+        # Where api_request reads from: the API, or the database for hot routes
+        self.http = HttpSource(self, response_format)
+        self.source = SqlSource(self.http, connections=connections, **database) if database else self.http
+        self.driver_batch = DriverBatchClient(bot)
+        self.replica = ReferenceReplica(replica_path)
+        self.incidents = IncidentIndex(incident_index_path)
+        self.archive_dir = archive_dir
+        self._archive = None
+
+    @property
+    def archive(self):
+        """All-time results archive, opened on first use (imports NumPy)"""
+        if self._archive is None:
+            from utils.archive import ResultsArchive
+            self._archive = ResultsArchive(self.archive_dir)
+        return self._archive
+
+    def archive_mapped_bytes(self) -> int:
+        """Mapped archive bytes, without opening the archive to find out"""
+        return self._archive.mapped_bytes() if self._archive is not None else 0
+
+    async def open_archive(self):
+        """The archive, opened in a worker thread the first time so the NumPy
+        import and column maps don't block the event loop"""
+        if self._archive is None:
+            from utils.archive import ResultsArchive
+            archive = await asyncio.get_running_loop().run_in_executor(None, ResultsArchive, self.archive_dir)
+            if self._archive is None:
+                self._archive = archive
+        return self._archive
+
+    def open(self):
+        """Create the tenant's HTTP session and connection pool"""
+        self.session = aiohttp.ClientSession(
+            # Long polls get connections beyond the scheduler's shared limit
+            connector=aiohttp.TCPConnector(limit=self.connections + CLASS_LIMITS[LONG_POLL]),
+            # HttpSource negotiates and decodes compressed bodies itself
+            auto_decompress=False,
+            headers={
+                'Authorization': f'Bearer {self.api_key}',
+                'Content-Type': 'application/json'
+            }
+        )
+
+    async def close(self):
+        await self.source.close()
+        if self.session:
+            await self.session.close()
+
+    def reminder_due(self, seconds_until: float) -> Optional[int]:
+        """The reminder (hours before the race) whose window contains ``seconds_until``"""
+        for hours in self.reminder_hours:
+            if abs(seconds_until - hours * 3600) <= 30 * 60:
+                return hours
+        return None
+
+    def snapshot(self) -> dict:
+        return {
+            'api_cache': len(self.api_cache),
+            'embed_cache': len(self.embed_cache),
+            'queued': sum(metrics.queued for metrics in self.scheduler.metrics.values()),
+            'dropped': sum(metrics.dropped for metrics in self.scheduler.metrics.values()),
+            'source': self.source.snapshot(),
+        }
+
+
+class TenantRegistry:
+    """All tenants, looked up by guild"""
+
+    def __init__(self, default: Tenant, tenants: Sequence[Tenant] = (), strict: bool = False):
+        self.default = default
+        self.strict = strict
+        self._tenants: Dict[str, Tenant] = {default.name: default}
+        self._by_guild: Dict[int, Tenant] = {guild_id: default for guild_id in default.guild_ids}
+        for tenant in tenants:
+            if tenant.name in self._tenants:
+                raise ValueError(f"duplicate tenant name {tenant.name!r}")
+            self._tenants[tenant.name] = tenant
+            for guild_id in tenant.guild_ids:
+                if guild_id in self._by_guild:
+                    raise ValueError(f"guild {guild_id} is mapped to more than one tenant")
+                self._by_guild[guild_id] = tenant
+
+    @classmethod
+    def load(cls, bot, path: str, default: Tenant, data_dir: str) -> 'TenantRegistry':
+        """Read the tenants file (see module docstring); only the default tenant if unset"""
+        if not path:
+            return cls(default)
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+
+        tenants = []
+        for entry in entries:
+            name = str(entry['name'])
+            if not TENANT_NAME.match(name) or name == DEFAULT:
+                raise ValueError(f"invalid tenant name {name!r}")
+            api_key = entry.get('api_key') or os.getenv(entry.get('api_key_env', ''), '')
+            response_format = str(entry.get('format', JSON))
+            if response_format not in FORMATS:
+                raise ValueError(f"invalid format {response_format!r} for tenant {name}")
+            database = entry.get('database')
+            if database:
+                database = {
+                    'host': str(database.get('host', 'db')),
+                    'port': int(database.get('port', 3306)),
+                    'database': str(database['name']),
+                    'user': str(database['user']),
+                    'password': database.get('password') or os.getenv(database.get('password_env', ''), ''),
+                }
+            tenants.append(Tenant(
+                bot, name,
+                bot._validate_url(entry['api_url']),
+                bot._validate_api_key(api_key),
+                guild_ids=[bot._validate_id(str(guild_id)) for guild_id in entry.get('guilds', ())],
+                reminder_routes=bot._validate_routes(','.join(str(i) for i in entry.get('reminder_routes', ())), 0),
+                reminder_hours=[int(hours) for hours in entry.get('reminder_hours', REMINDER_HOURS)],
+                connections=max(1, int(entry.get('connections', 2))),
+                api_rate=max(1, int(entry.get('api_rate', API_RATE))),
+                api_cache_entries=TENANT_API_CACHE,
+                embed_cache_entries=TENANT_EMBED_CACHE,
+                replica_path=os.path.join(data_dir, name, 'replica.sqlite3'),
+                incident_index_path=os.path.join(data_dir, name, 'incidents.sqlite3'),
+                archive_dir=os.path.join(data_dir, name, 'archive'),
+                database=database,
+                response_format=response_format,
+            ))
+        logger.info('Loaded %d tenant(s) from %s', len(tenants), path)
+        return cls(default, tenants, strict=True)
+
+    def for_guild(self, guild_id: Optional[int]) -> Optional[Tenant]:
+        """The guild's tenant; unmapped guilds get the default one unless tenants are configured"""
+        tenant = self._by_guild.get(guild_id) if guild_id else None
+        if tenant is None and not self.strict:
+            return self.default
+        return tenant
+
+    def get(self, name: str) -> Optional[Tenant]:
+        return self._tenants.get(name)
+
+    def open(self):
+        for tenant in self:
+            tenant.open()
+
+    async def close(self):
+        for tenant in self:
+            await tenant.close()
+
+    def __iter__(self) -> Iterator[Tenant]:
+        return iter(list(self._tenants.values()))
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def snapshot(self) -> List[dict]:
+        return [dict(tenant.snapshot(), name=tenant.name) for tenant in self]
+
+
+class TenantCommandTree(app_commands.CommandTree):
+    """Command tree that runs each interaction as its guild's tenant"""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        tenant = self.client.tenants.for_guild(interaction.guild_id)
+        if tenant is None:
+            await interaction.response.send_message("❌ This server isn't linked to a league.", ephemeral=True)
+            return False
+        # Set in the interaction's own task, so it holds for the whole command
+        current_tenant.set(tenant)
+        return True
@@ -0,0 +1,175 @@
+"""
+Traffic traces for Grid King Discord Bot
+
+With TRACE_FILE set, the bot records the traffic it actually serves: every
+slash command (name, options, arrival time, reply latency and whether it
+was deferred) and every upstream request that missed the cache (endpoint,
+response body and latency, linked to the command that made it).
+``benchmarks/replay_trace.py`` serves the recorded responses from a local
+stub and drives the real cogs with the recorded commands, so a change can
+be checked against the league's real command mix rather than a synthetic
+one.
+
+Traces are anonymised as they are recorded. Discord user, guild and channel
+IDs are replaced by keyed hashes that are stable within one trace (the key
+is random per process and never written), nothing else about the invoking
+user is kept, and personal fields in API payloads (PERSONAL_FIELDS) are
+replaced by placeholders of the same length. League data that commands
+look things up by, such as driver and team names, is kept: replays depend
+on it.
+
+Entries are serialized when recorded and appended to the file (JSON lines)
+from a worker thread every FLUSH_SECONDS. Recording stops after
+TRACE_MAX_ENTRIES entries.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Optional, Tuple
+
+from discord.ext import tasks
+
+logger = logging.getLogger('gridking_bot')
+
+TRACE_VERSION = 1
+
+# Seconds between appends to the trace file
+FLUSH_SECONDS = 5
+
+# Entries recorded before the trace stops growing
+MAX_ENTRIES = 200000
+
+# Payload fields replaced by same-length placeholders
+PERSONAL_FIELDS = frozenset((
+    'email', 'password_hash', 'bio', 'steward_notes', 'ip_address',
+    'discord_id', 'discord_username', 'real_name', 'phone',
+))
+
+# Trace sequence number of the command the current task is answering
+current_command: ContextVar[Optional[int]] = ContextVar('trace_command', default=None)
+
+
+def anonymise(data: Any) -> Any:
+    """Copy of an API payload with personal fields masked"""
+    if isinstance(data, dict):
+        return {
+            key: ('x' * len(str(value)) if value is not None else None) if key in PERSONAL_FIELDS else anonymise(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [anonymise(item) for item in data]
+    return data
+
+
+class TraceRecorder:
+    """Records commands and upstream responses to a JSON lines trace"""
+
+    def __init__(self, path: str, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = 0
+        self.started = time.monotonic()
+        self._key = os.urandom(16)
+        self._sequence = 0
+        self._pending = []
+        self._record({'type': 'meta', 'version': TRACE_VERSION, 'started_at': time.time()})
+
+    @classmethod
+    def from_env(cls) -> Optional['TraceRecorder']:
+        """Recorder for TRACE_FILE, or None when tracing is off"""
+        path = os.getenv('TRACE_FILE', '')
+        if not path:
+            return None
+        recorder = cls(path, int(os.getenv('TRACE_MAX_ENTRIES', MAX_ENTRIES)))
+        logger.info("Recording a traffic trace to %s", path)
+        return recorder
+
+    @property
+    def full(self) -> bool:
+        return self.entries >= self.max_entries
+
+    def pseudonym(self, value: Any, kind: str = 'id') -> Optional[str]:
+        """Stable, non-reversible stand-in for a Discord ID of the given kind"""
+        if value is None:
+            return None
+        return hashlib.blake2b(f"{kind}:{value}".encode(), key=self._key, digest_size=6).hexdigest()
+
+    def begin_command(self) -> Tuple[int, float]:
+        """Sequence number and trace time for a command that is starting"""
+        self._sequence += 1
+        return self._sequence, time.monotonic() - self.started
+
+    def command(self, sequence: int, at: float, interaction, name: str, options: dict, tenant: str,
+                ms: float, deferred: bool):
+        self._record({
+            'type': 'command',
+            'seq': sequence,
+            't': round(at, 4),
+            'command': name,
+            'options': {key: self._option(value) for key, value in options.items()},
+            'tenant': tenant,
+            'guild': self.pseudonym(getattr(interaction, 'guild_id', None), 'guild'),
+            'channel': self.pseudonym(getattr(interaction, 'channel_id', None), 'channel'),
+            'user': self.pseudonym(getattr(getattr(interaction, 'user', None), 'id', None), 'user'),
+            'ms': round(ms, 2),
+            'deferred': deferred,
+        })
+
+    def api(self, tenant: str, endpoint: str, method: str, data: Any, ms: float):
+        self._record({
+            'type': 'api',
+            't': round(time.monotonic() - self.started, 4),
+            'cmd': current_command.get(),
+            'tenant': tenant,
+            'method': method,
+            'endpoint': endpoint,
+            'ms': round(ms, 2),
+            'body': anonymise(data),
+        })
+
+    def _option(self, value: Any) -> Any:
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        # Discord objects (members, channels, roles) are only kept as pseudonyms
+        return self.pseudonym(getattr(value, 'id', value))
+
+    def _record(self, entry: dict):
+        if self.full:
+            return
+        self.entries += 1
+        self._pending.append(json.dumps(entry, default=str, separators=(',', ':')))
+        if self.full:
+            logger.warning("Trace %s reached %d entries; recording stopped", self.path, self.max_entries)
+
+    def _write(self, lines: list):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def start(self):
+        if not self.flush.is_running():
+            self.flush.start()
+
+    def stop(self):
+        self.flush.cancel()
+        if self._pending:
+            lines, self._pending = self._pending, []
+            self._write(lines)
+
+    @tasks.loop(seconds=FLUSH_SECONDS)
+    async def flush(self):
+        """Append the entries recorded since the last flush"""
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, lines)
+        except OSError as e:
+            logger.error("Error writing trace %s: %s", self.path, e)
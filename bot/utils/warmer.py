@@ -0,0 +1,156 @@
+"""
+Predictive cache warmer for Grid King Discord Bot
+
+Command traffic spikes right after results are published and just before the
+24h/1h race reminders go out. The warmer follows the race calendar and
+refreshes the API cache and pre-rendered embeds ahead of those spikes.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Hashable, Optional, Sequence, Set, Tuple
+
+from discord.ext import tasks
+
+from utils.scheduler import BACKGROUND
+
+logger = logging.getLogger('gridking_bot')
+
+# How long warmed entries stay valid; long enough to cover the spike
+WARM_TTL = 30 * 60
+
+# Upper bounds of the reminder windows used by check_upcoming_races
+REMINDER_WINDOWS = (
+    timedelta(hours=24, minutes=30),
+    timedelta(hours=1, minutes=30),
+)
+
+# Start warming this long before a reminder window opens
+WARM_LEAD = timedelta(minutes=15)
+
+STATS_CATEGORIES = ('wins', 'poles', 'fastest_laps', 'podiums', 'points', 'dnf', 'overview')
+
+# races/recent columns needed to notice new results (Race.from_api requires
+# name, track and race_date)
+RECENT_FIELDS = ('id', 'name', 'track', 'race_date', 'results.id')
+
+
+class CacheWarmer:
+    """Pre-fetches and pre-renders hot command responses"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._warmed_windows: Set[Tuple[int, timedelta]] = set()
+        self._last_result_fingerprint: Optional[Tuple] = None
+
+    def start(self):
+        """Start the background loop"""
+        self.warm_loop.start()
+
+    def stop(self):
+        """Stop the background loop"""
+        self.warm_loop.cancel()
+
+    @tasks.loop(minutes=5)
+    async def warm_loop(self):
+        """Check the calendar and warm caches when a spike is due"""
+        try:
+            upcoming = await self.bot.api_request('races/upcoming', refresh=True, priority=BACKGROUND) or []
+            recent = await self.bot.api_request('races/recent', refresh=True, priority=BACKGROUND,
+                                                fields=RECENT_FIELDS, limit=1) or []
+
+            landed = self._results_landed(recent)
+            if landed:
+                self.bot.live_board.request_update()
+            reason = landed or self._reminder_due(upcoming)
+            if reason:
+                logger.info('Warming caches: %s', reason)
+                await self.warm()
+        except Exception as e:
+            logger.error('Error warming caches: %s', e)
+
+    @warm_loop.before_loop
+    async def before_warm_loop(self):
+        await self.bot.wait_until_ready()
+
+    def _results_landed(self, recent: list) -> Optional[str]:
+        """Detect newly published results on races/recent"""
+        if not recent:
+            return None
+
+        latest = recent[0]
+        fingerprint = (latest.id, len(latest.results))
+        previous = self._last_result_fingerprint
+        self._last_result_fingerprint = fingerprint
+
+        if previous is None:
+            return 'cold start'
+        if fingerprint != previous and fingerprint[1] > 0:
+            return f"results for race {latest.id}"
+        return None
+
+    def _reminder_due(self, upcoming: list) -> Optional[str]:
+        """Detect a race reminder window that is about to open"""
+        now = datetime.utcnow()
+        upcoming_ids = {race.id for race in upcoming}
+        self._warmed_windows = {key for key in self._warmed_windows if key[0] in upcoming_ids}
+
+        for race in upcoming[:3]:
+            time_until = race.race_date - now
+
+            for window in REMINDER_WINDOWS:
+                key = (race.id, window)
+                if key in self._warmed_windows:
+                    continue
+                if window <= time_until <= window + WARM_LEAD:
+                    self._warmed_windows.add(key)
+                    return f"reminder for race {race.id} in {time_until}"
+        return None
+
+    async def warm(self):
+        """Refresh every hot endpoint and render its embed"""
+        standings = self.bot.get_cog('StandingsCog')
+        races = self.bot.get_cog('RacesCog')
+        stats = self.bot.get_cog('StatsCog')
+
+        # Fetched with the same projections as the commands, so they hit these entries
+        jobs = []
+        if standings:
+            jobs.append(self._warm('standings',
+                                   (('standings', 10), lambda data: standings.build_standings_embed(data, 10)),
+                                   fields=standings.STANDINGS_FIELDS, limit=10))
+        if stats:
+            jobs.append(self._warm('standings', ('leaderboard', stats.build_leaderboard_embed),
+                                   fields=stats.LEADERBOARD_FIELDS, limit=10))
+            for category in STATS_CATEGORIES:
+                jobs.append(self._warm(f'stats/{category}',
+                                       (('stats', category, 10), self._stats_renderer(stats, category))))
+        if races:
+            jobs.append(self._warm('races/recent', ('lastrace', lambda data: races.build_last_race_embed(data[0])),
+                                   fields=races.LAST_RACE_FIELDS, limit=1))
+
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        failures = sum(1 for result in results if result is not True)
+        logger.info('Cache warm finished: %d/%d entries', len(results) - failures, len(results))
+
+    @staticmethod
+    def _stats_renderer(cog, category: str) -> Callable:
+        if category == 'overview':
+            return cog.create_overview_embed
+        return lambda data: cog.create_stats_embed(category, data.rows[:10])
+
+    async def _warm(self, endpoint: str, *targets: Tuple[Hashable, Callable],
+                    fields: Optional[Sequence[str]] = None, limit: Optional[int] = None) -> bool:
+        """Fetch one endpoint as background work and cache its embeds"""
+        data = await self.bot.api_request(endpoint, refresh=True, cache_ttl=WARM_TTL, priority=BACKGROUND,
+                                          fields=fields, limit=limit)
+        if not data:
+            return False
+
+        for cache_key, render in targets:
+            embed = render(data)
+            if asyncio.iscoroutine(embed):
+                embed = await embed
+            self.bot.embed_cache.set(cache_key, embed, ttl=WARM_TTL)
+        return True
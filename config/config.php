@@ -68,22 +68,29 @@ function formatDate($date) {
     return date('M j, Y g:i A', strtotime($date));
 }
 
-function calculateStandings($seasonId) {
+// Columns of a standings row, by field name (see projectColumns in the API)
+define('STANDINGS_COLUMNS', [
+    'id' => 'd.id',
+    'username' => 'u.username',
+    'driver_number' => 'd.driver_number',
+    'team_name' => 't.name as team_name',
+    'total_points' => 'SUM(rr.points) as total_points',
+    'wins' => 'COUNT(CASE WHEN rr.position = 1 THEN 1 END) as wins',
+    'poles' => 'COUNT(CASE WHEN rr.pole_position = TRUE THEN 1 END) as poles',
+    'fastest_laps' => 'COUNT(CASE WHEN rr.fastest_lap = TRUE THEN 1 END) as fastest_laps',
+    'dnfs' => 'COUNT(CASE WHEN rr.dnf = TRUE THEN 1 END) as dnfs',
+    'avg_position' => 'AVG(CASE WHEN rr.position IS NOT NULL THEN rr.position END) as avg_position'
+]);
+
+function calculateStandings($seasonId, $columns = null, $limit = null) {
     $db = new Database();
     $conn = $db->getConnection();
     
+    // Ordered by expressions rather than aliases so any projection sorts the same
+    $select = $columns ?? implode(",\n            ", STANDINGS_COLUMNS);
     $query = "
         SELECT 
-            d.id,
-            u.username,
-            d.driver_number,
-            t.name as team_name,
-            SUM(rr.points) as total_points,
-            COUNT(CASE WHEN rr.position = 1 THEN 1 END) as wins,
-            COUNT(CASE WHEN rr.pole_position = TRUE THEN 1 END) as poles,
-            COUNT(CASE WHEN rr.fastest_lap = TRUE THEN 1 END) as fastest_laps,
-            COUNT(CASE WHEN rr.dnf = TRUE THEN 1 END) as dnfs,
-            AVG(CASE WHEN rr.position IS NOT NULL THEN rr.position END) as avg_position
+            $select
         FROM drivers d
         LEFT JOIN users u ON d.user_id = u.id
         LEFT JOIN teams t ON d.team_id = t.id
@@ -91,11 +98,16 @@ function calculateStandings($seasonId) {
         LEFT JOIN races r ON rr.race_id = r.id
         WHERE r.season_id = :season_id OR r.id IS NULL
         GROUP BY d.id, u.username, d.driver_number, t.name
-        ORDER BY total_points DESC, wins DESC, avg_position ASC
-    ";
+        ORDER BY SUM(rr.points) DESC,
+            COUNT(CASE WHEN rr.position = 1 THEN 1 END) DESC,
+            AVG(CASE WHEN rr.position IS NOT NULL THEN rr.position END) ASC
+    " . ($limit !== null ? "LIMIT :limit" : "");
     
     $stmt = $conn->prepare($query);
     $stmt->bindParam(':season_id', $seasonId);
+    if ($limit !== null) {
+        $stmt->bindValue(':limit', $limit, PDO::PARAM_INT);
+    }
     $stmt->execute();
     
     return $stmt->fetchAll();
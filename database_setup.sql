@@ -28,7 +28,9 @@ CREATE TABLE IF NOT EXISTS teams (
     logo VARCHAR(255),
     created_by INT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_name (name),
+    INDEX idx_teams_updated (updated_at),
     FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -49,6 +51,7 @@ CREATE TABLE IF NOT EXISTS drivers (
     INDEX idx_driver_number (driver_number),
     INDEX idx_platform (platform),
     INDEX idx_drivers_active (user_id, created_at),
+    INDEX idx_drivers_updated (updated_at),
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -63,7 +66,9 @@ CREATE TABLE IF NOT EXISTS seasons (
     end_date DATE,
     description TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_year (year),
+    INDEX idx_seasons_updated (updated_at),
     INDEX idx_active (is_active)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -85,6 +90,7 @@ CREATE TABLE IF NOT EXISTS races (
     INDEX idx_season_id (season_id),
     INDEX idx_race_date (race_date),
     INDEX idx_status (status),
+    INDEX idx_races_updated (updated_at),
     FOREIGN KEY (season_id) REFERENCES seasons(id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -136,6 +142,7 @@ CREATE TABLE IF NOT EXISTS race_results (
     INDEX idx_points (points),
     INDEX idx_race_results_race_season (race_id, driver_id),
     INDEX idx_race_results_points (points, position),
+    INDEX idx_race_results_updated (updated_at, id),
     UNIQUE KEY unique_race_driver (race_id, driver_id),
     FOREIGN KEY (race_id) REFERENCES races(id) ON DELETE CASCADE,
     FOREIGN KEY (driver_id) REFERENCES drivers(id) ON DELETE CASCADE
@@ -169,11 +176,13 @@ CREATE TABLE IF NOT EXISTS penalties (
     incident_time TIME,
     issued_by INT, -- admin user who issued penalty
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_race_id (race_id),
     INDEX idx_driver_id (driver_id),
     INDEX idx_penalty_type (penalty_type),
     INDEX idx_severity (severity),
     INDEX idx_penalties_race_driver (race_id, driver_id, created_at),
+    INDEX idx_penalties_updated (updated_at, id),
     FOREIGN KEY (race_id) REFERENCES races(id) ON DELETE CASCADE,
     FOREIGN KEY (driver_id) REFERENCES drivers(id) ON DELETE CASCADE,
     FOREIGN KEY (issued_by) REFERENCES users(id) ON DELETE SET NULL
@@ -572,6 +581,7 @@ CREATE TABLE IF NOT EXISTS race_incidents (
     INDEX idx_severity (severity),
     INDEX idx_steward_assigned (steward_assigned),
     INDEX idx_reported_by (reported_by),
+    INDEX idx_race_incidents_updated (updated_at, id),
     FOREIGN KEY (race_id) REFERENCES races(id) ON DELETE CASCADE,
     FOREIGN KEY (reported_by) REFERENCES users(id) ON DELETE SET NULL,
     FOREIGN KEY (steward_assigned) REFERENCES users(id) ON DELETE SET NULL
@@ -620,10 +630,12 @@ CREATE TABLE IF NOT EXISTS penalty_appeals (
     committee_reasoning TEXT NULL,
     final_decision_date TIMESTAMP NULL,
     processed_by INT, -- Appeal coordinator
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_decision_id (decision_id),
     INDEX idx_appealing_driver (appealing_driver_id),
     INDEX idx_appeal_status (appeal_status),
     INDEX idx_submitted_at (submitted_at),
+    INDEX idx_penalty_appeals_updated (updated_at, id),
     FOREIGN KEY (decision_id) REFERENCES steward_decisions(id) ON DELETE CASCADE,
     FOREIGN KEY (appealing_driver_id) REFERENCES drivers(id) ON DELETE CASCADE,
     FOREIGN KEY (processed_by) REFERENCES users(id) ON DELETE SET NULL
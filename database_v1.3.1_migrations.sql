@@ -0,0 +1,25 @@
+-- GridKing Racing League Management System
+-- Database Migration v1.3.1 - Change tracking for API delta sync
+-- Upgrade from v1.3.0 to v1.3.1
+
+USE racing_league;
+
+-- ============================================================
+-- 1.3.1 – updated_at on every table served by the replica feed
+-- ============================================================
+
+ALTER TABLE teams ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP AFTER created_at;
+ALTER TABLE seasons ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP AFTER created_at;
+
+-- Indexes for the updated_at filters (api/endpoints/replica.php, races/results)
+CREATE INDEX idx_teams_updated ON teams (updated_at);
+CREATE INDEX idx_seasons_updated ON seasons (updated_at);
+CREATE INDEX idx_drivers_updated ON drivers (updated_at);
+CREATE INDEX idx_races_updated ON races (updated_at);
+CREATE INDEX idx_race_results_updated ON race_results (updated_at, id);
+
+-- ============================================================
+-- Version bump to 1.3.1
+-- ============================================================
+UPDATE settings SET `value` = '1.3.1' WHERE `key` = 'db_version';
+UPDATE settings SET `value` = NOW()   WHERE `key` = 'last_migration';
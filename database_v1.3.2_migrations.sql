@@ -0,0 +1,23 @@
+-- GridKing Racing League Management System
+-- Database Migration v1.3.2 - Change tracking for the stewarding search feed
+-- Upgrade from v1.3.1 to v1.3.2
+
+USE racing_league;
+
+-- ============================================================
+-- 1.3.2 – updated_at on every table served by the stewarding feed
+-- ============================================================
+
+ALTER TABLE penalties ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP AFTER created_at;
+ALTER TABLE penalty_appeals ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP AFTER final_decision_date;
+
+-- Indexes for the updated_at filters (api/endpoints/stewarding.php)
+CREATE INDEX idx_race_incidents_updated ON race_incidents (updated_at, id);
+CREATE INDEX idx_penalties_updated ON penalties (updated_at, id);
+CREATE INDEX idx_penalty_appeals_updated ON penalty_appeals (updated_at, id);
+
+-- ============================================================
+-- Version bump to 1.3.2
+-- ============================================================
+UPDATE settings SET `value` = '1.3.2' WHERE `key` = 'db_version';
+UPDATE settings SET `value` = NOW()   WHERE `key` = 'last_migration';